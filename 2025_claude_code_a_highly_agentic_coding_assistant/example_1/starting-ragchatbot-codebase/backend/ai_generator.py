@@ -1,135 +1,285 @@
-import anthropic
-from typing import List, Optional, Dict, Any
-
-class AIGenerator:
-    """Handles interactions with Anthropic's Claude API for generating responses"""
-    
-    # Static system prompt to avoid rebuilding on each call
-    SYSTEM_PROMPT = """ You are an AI assistant specialized in course materials and educational content with access to a comprehensive search tool for course information.
-
-Search Tool Usage:
-- Use the search tool **only** for questions about specific course content or detailed educational materials
-- **One search per query maximum**
-- Synthesize search results into accurate, fact-based responses
-- If search yields no results, state this clearly without offering alternatives
-
-Response Protocol:
-- **General knowledge questions**: Answer using existing knowledge without searching
-- **Course-specific questions**: Search first, then answer
-- **No meta-commentary**:
- - Provide direct answers only — no reasoning process, search explanations, or question-type analysis
- - Do not mention "based on the search results"
-
-
-All responses must be:
-1. **Brief, Concise and focused** - Get to the point quickly
-2. **Educational** - Maintain instructional value
-3. **Clear** - Use accessible language
-4. **Example-supported** - Include relevant examples when they aid understanding
-Provide only the direct answer to what was asked.
-"""
-    
-    def __init__(self, api_key: str, model: str):
-        self.client = anthropic.Anthropic(api_key=api_key)
-        self.model = model
-        
-        # Pre-build base API parameters
-        self.base_params = {
-            "model": self.model,
-            "temperature": 0,
-            "max_tokens": 800
-        }
-    
-    def generate_response(self, query: str,
-                         conversation_history: Optional[str] = None,
-                         tools: Optional[List] = None,
-                         tool_manager=None) -> str:
-        """
-        Generate AI response with optional tool usage and conversation context.
-        
-        Args:
-            query: The user's question or request
-            conversation_history: Previous messages for context
-            tools: Available tools the AI can use
-            tool_manager: Manager to execute tools
-            
-        Returns:
-            Generated response as string
-        """
-        
-        # Build system content efficiently - avoid string ops when possible
-        system_content = (
-            f"{self.SYSTEM_PROMPT}\n\nPrevious conversation:\n{conversation_history}"
-            if conversation_history 
-            else self.SYSTEM_PROMPT
-        )
-        
-        # Prepare API call parameters efficiently
-        api_params = {
-            **self.base_params,
-            "messages": [{"role": "user", "content": query}],
-            "system": system_content
-        }
-        
-        # Add tools if available
-        if tools:
-            api_params["tools"] = tools
-            api_params["tool_choice"] = {"type": "auto"}
-        
-        # Get response from Claude
-        response = self.client.messages.create(**api_params)
-        
-        # Handle tool execution if needed
-        if response.stop_reason == "tool_use" and tool_manager:
-            return self._handle_tool_execution(response, api_params, tool_manager)
-        
-        # Return direct response
-        return response.content[0].text
-    
-    def _handle_tool_execution(self, initial_response, base_params: Dict[str, Any], tool_manager):
-        """
-        Handle execution of tool calls and get follow-up response.
-        
-        Args:
-            initial_response: The response containing tool use requests
-            base_params: Base API parameters
-            tool_manager: Manager to execute tools
-            
-        Returns:
-            Final response text after tool execution
-        """
-        # Start with existing messages
-        messages = base_params["messages"].copy()
-        
-        # Add AI's tool use response
-        messages.append({"role": "assistant", "content": initial_response.content})
-        
-        # Execute all tool calls and collect results
-        tool_results = []
-        for content_block in initial_response.content:
-            if content_block.type == "tool_use":
-                tool_result = tool_manager.execute_tool(
-                    content_block.name, 
-                    **content_block.input
-                )
-                
-                tool_results.append({
-                    "type": "tool_result",
-                    "tool_use_id": content_block.id,
-                    "content": tool_result
-                })
-        
-        # Add tool results as single message
-        if tool_results:
-            messages.append({"role": "user", "content": tool_results})
-        
-        # Prepare final API call without tools
-        final_params = {
-            **self.base_params,
-            "messages": messages,
-            "system": base_params["system"]
-        }
-        
-        # Get final response
-        final_response = self.client.messages.create(**final_params)
-        return final_response.content[0].text
\ No newline at end of file
+import anthropic
+from typing import AsyncIterator, List, Optional, Dict, Any
+from metrics import metrics
+from search_tools import ToolExecutionContext, ToolResult
+
+class AIGenerator:
+    """Handles interactions with Anthropic's Claude API for generating responses"""
+    
+    # Static system prompt to avoid rebuilding on each call
+    SYSTEM_PROMPT = """ You are an AI assistant specialized in course materials and educational content with access to a comprehensive search tool for course information.
+
+Search Tool Usage:
+- Use the search tool **only** for questions about specific course content or detailed educational materials
+- **One search per query maximum**
+- Synthesize search results into accurate, fact-based responses
+- If search yields no results, state this clearly without offering alternatives
+
+Response Protocol:
+- **General knowledge questions**: Answer using existing knowledge without searching
+- **Course-specific questions**: Search first, then answer
+- **No meta-commentary**:
+ - Provide direct answers only — no reasoning process, search explanations, or question-type analysis
+ - Do not mention "based on the search results"
+
+
+All responses must be:
+1. **Brief, Concise and focused** - Get to the point quickly
+2. **Educational** - Maintain instructional value
+3. **Clear** - Use accessible language
+4. **Example-supported** - Include relevant examples when they aid understanding
+Provide only the direct answer to what was asked.
+"""
+    
+    # Instructions for folding older exchanges into the running conversation summary
+    SUMMARY_PROMPT = """You maintain a running summary of a conversation between a student and a course materials assistant.
+Merge the earlier summary (if any) and the new messages into one updated summary of at most a short paragraph.
+Keep the courses, lessons and topics discussed, facts the assistant stated, and open questions the student may refer back to.
+Reply with the summary only."""
+    
+    def __init__(self, api_key: str, model: str, summary_model: Optional[str] = None):
+        self.client = anthropic.Anthropic(api_key=api_key)
+        self.async_client = anthropic.AsyncAnthropic(api_key=api_key)
+        self.model = model
+        self.summary_model = summary_model or model
+        
+        # The static instructions are identical on every call; marking them lets the
+        # API cache the tools + system prefix, with the conversation following it
+        self.system_block = {"type": "text", "text": self.SYSTEM_PROMPT, "cache_control": {"type": "ephemeral"}}
+        
+        # Pre-build base API parameters
+        self.base_params = {
+            "model": self.model,
+            "temperature": 0,
+            "max_tokens": 800
+        }
+    
+    def generate_response(self, query: str,
+                         conversation_history: Optional[str] = None,
+                         tools: Optional[List] = None,
+                         tool_manager=None,
+                         context: Optional[str] = None,
+                         tool_context: Optional[ToolExecutionContext] = None) -> str:
+        """
+        Generate AI response with optional tool usage and conversation context.
+        
+        Args:
+            query: The user's question or request
+            conversation_history: Previous messages for context
+            tools: Available tools the AI can use
+            tool_manager: Manager to execute tools
+            context: Search results retrieved up front, answered from in a single call
+            tool_context: The request's tool execution context, collects the sources of tool calls
+            
+        Returns:
+            Generated response as string
+        """
+        api_params = self._build_params(query, conversation_history, tools, context)
+        
+        # Get response from Claude
+        with metrics.span("anthropic_initial"):
+            response = self.client.messages.create(**api_params)
+        metrics.record_usage("initial", response)
+        
+        # Handle tool execution if needed
+        if response.stop_reason == "tool_use" and tool_manager:
+            return self._handle_tool_execution(response, api_params, tool_manager, tool_context)
+        
+        # Return direct response
+        return response.content[0].text
+    
+    async def agenerate_response(self, query: str,
+                                 conversation_history: Optional[str] = None,
+                                 tools: Optional[List] = None,
+                                 tool_manager=None,
+                                 context: Optional[str] = None,
+                                 tool_context: Optional[ToolExecutionContext] = None) -> str:
+        """
+        Async variant of generate_response on the async Anthropic client.
+        
+        Tools run through tool_manager.aexecute_tools, which keeps blocking
+        search work off the event loop.
+        """
+        api_params = self._build_params(query, conversation_history, tools, context)
+        
+        with metrics.span("anthropic_initial"):
+            response = await self.async_client.messages.create(**api_params)
+        metrics.record_usage("initial", response)
+        
+        if response.stop_reason == "tool_use" and tool_manager:
+            return await self._ahandle_tool_execution(response, api_params, tool_manager, tool_context)
+        
+        return response.content[0].text
+    
+    async def astream_response(self, query: str,
+                               conversation_history: Optional[str] = None,
+                               tools: Optional[List] = None,
+                               tool_manager=None,
+                               context: Optional[str] = None,
+                               tool_context: Optional[ToolExecutionContext] = None) -> AsyncIterator[str]:
+        """
+        Stream the response text as it is generated.
+        
+        The first call is streamed as well, so answers that need no search start
+        right away; after a tool use turn the follow-up answer is streamed.
+        
+        Yields:
+            Text deltas of the response
+        """
+        api_params = self._build_params(query, conversation_history, tools, context)
+        
+        # Streamed calls are timed to the end of the stream, consumer included
+        with metrics.span("anthropic_initial"):
+            async with self.async_client.messages.stream(**api_params) as stream:
+                async for text in stream.text_stream:
+                    yield text
+                response = await stream.get_final_message()
+        metrics.record_usage("initial", response)
+        
+        if response.stop_reason == "tool_use" and tool_manager:
+            tool_results = await self._aexecute_tools(response, tool_manager, tool_context)
+            final_params = self._final_params(response, api_params, tool_results)
+            with metrics.span("anthropic_final"):
+                async with self.async_client.messages.stream(**final_params) as stream:
+                    async for text in stream.text_stream:
+                        yield text
+                    final_response = await stream.get_final_message()
+            metrics.record_usage("final", final_response)
+    
+    def _build_params(self, query: str, conversation_history: Optional[str], tools: Optional[List],
+                      context: Optional[str] = None) -> Dict[str, Any]:
+        """Build the API parameters for the first call"""
+        # Conversation history goes in its own block after the cacheable instructions
+        system_content = [self.system_block]
+        if conversation_history:
+            system_content.append({"type": "text", "text": f"Previous conversation:\n{conversation_history}"})
+        
+        # Search results retrieved up front take the place of a tool round trip
+        if context:
+            query = f"Course material search results:\n{context}\n\n{query}"
+        
+        # Prepare API call parameters efficiently
+        api_params = {
+            **self.base_params,
+            "messages": [{"role": "user", "content": query}],
+            "system": system_content
+        }
+        
+        # Add tools if available
+        if tools:
+            api_params["tools"] = tools
+            api_params["tool_choice"] = {"type": "auto"}
+        
+        return api_params
+    
+    def summarize_conversation(self, summary: Optional[str], messages: List[str], max_tokens: int = 300) -> str:
+        """
+        Fold messages into the running summary of a conversation.
+        
+        Args:
+            summary: The summary so far, if any
+            messages: Formatted messages to fold in, oldest first
+            max_tokens: Upper bound on the length of the new summary
+            
+        Returns:
+            The updated summary
+        """
+        parts = [f"Earlier summary:\n{summary}"] if summary else []
+        parts.append("New messages:\n" + "\n".join(messages))
+        with metrics.span("anthropic_summary"):
+            response = self.client.messages.create(
+                model=self.summary_model,
+                temperature=0,
+                max_tokens=max_tokens,
+                system=self.SUMMARY_PROMPT,
+                messages=[{"role": "user", "content": "\n\n".join(parts)}]
+            )
+        metrics.record_usage("summary", response)
+        return response.content[0].text.strip()
+    
+    def _handle_tool_execution(self, initial_response, base_params: Dict[str, Any], tool_manager,
+                               tool_context: Optional[ToolExecutionContext] = None):
+        """
+        Handle execution of tool calls and get follow-up response.
+        
+        Args:
+            initial_response: The response containing tool use requests
+            base_params: Base API parameters
+            tool_manager: Manager to execute tools
+            tool_context: The request's tool execution context
+            
+        Returns:
+            Final response text after tool execution
+        """
+        # Execute all tool calls concurrently and collect results in request order
+        tool_calls = self._tool_calls(initial_response)
+        with metrics.span("tool_execution"):
+            tool_results = self._tool_results(tool_calls, tool_manager.execute_tools(
+                [(block.name, block.input) for block in tool_calls], tool_context
+            ))
+        
+        # Get final response
+        final_params = self._final_params(initial_response, base_params, tool_results)
+        with metrics.span("anthropic_final"):
+            final_response = self.client.messages.create(**final_params)
+        metrics.record_usage("final", final_response)
+        return final_response.content[0].text
+    
+    async def _ahandle_tool_execution(self, initial_response, base_params: Dict[str, Any], tool_manager,
+                                      tool_context: Optional[ToolExecutionContext] = None):
+        """Async variant of _handle_tool_execution"""
+        tool_results = await self._aexecute_tools(initial_response, tool_manager, tool_context)
+        final_params = self._final_params(initial_response, base_params, tool_results)
+        with metrics.span("anthropic_final"):
+            final_response = await self.async_client.messages.create(**final_params)
+        metrics.record_usage("final", final_response)
+        return final_response.content[0].text
+    
+    async def _aexecute_tools(self, initial_response, tool_manager,
+                              tool_context: Optional[ToolExecutionContext] = None) -> List[Dict[str, Any]]:
+        """Execute the tool calls of a response concurrently off the event loop and collect their results"""
+        tool_calls = self._tool_calls(initial_response)
+        with metrics.span("tool_execution"):
+            return self._tool_results(tool_calls, await tool_manager.aexecute_tools(
+                [(block.name, block.input) for block in tool_calls], tool_context
+            ))
+    
+    @staticmethod
+    def _tool_calls(response) -> List[Any]:
+        """The tool_use blocks of a response"""
+        return [block for block in response.content if block.type == "tool_use"]
+    
+    @staticmethod
+    def _tool_results(tool_calls: List[Any], outcomes: List[ToolResult]) -> List[Dict[str, Any]]:
+        """Pair each tool_use block with its outcome as a tool_result block"""
+        tool_results = []
+        for block, outcome in zip(tool_calls, outcomes):
+            tool_result = {
+                "type": "tool_result",
+                "tool_use_id": block.id,
+                "content": outcome.content
+            }
+            # Failed and timed out calls are flagged so the model does not treat them as search results
+            if outcome.is_error:
+                tool_result["is_error"] = True
+            tool_results.append(tool_result)
+        return tool_results
+    
+    def _final_params(self, initial_response, base_params: Dict[str, Any], tool_results: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Build the follow-up call parameters from the tool use turn and its results"""
+        # Start with existing messages
+        messages = base_params["messages"].copy()
+        
+        # Add AI's tool use response
+        messages.append({"role": "assistant", "content": initial_response.content})
+        
+        # Add tool results as single message
+        if tool_results:
+            messages.append({"role": "user", "content": tool_results})
+        
+        # Prepare final API call without tools
+        return {
+            **self.base_params,
+            "messages": messages,
+            "system": base_params["system"]
+        }
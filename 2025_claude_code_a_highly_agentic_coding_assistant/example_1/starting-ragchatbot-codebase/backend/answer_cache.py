@@ -0,0 +1,162 @@
+import re
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+import numpy as np
+
+_NUMBER = re.compile(r"\d+(?:\.\d+)?")
+
+
+def query_numbers(query: str) -> Tuple[str, ...]:
+    """The distinct numbers in a query ("lesson 3", "top 5"), which embeddings barely tell apart"""
+    return tuple(sorted(set(_NUMBER.findall(query))))
+
+
+@dataclass
+class CachedAnswer:
+    """An answer stored in the semantic answer cache"""
+    query: str
+    answer: str
+    sources: List[Any]
+    created: float
+    latency_seconds: float  # What producing the answer cost, i.e. what a hit saves
+
+
+class SemanticAnswerCache:
+    """
+    Answers keyed by query embedding: a new query reuses the answer of the most
+    similar cached query when their cosine similarity reaches the threshold and
+    both queries have the same scope. The scope holds what a near-identical
+    embedding does not pin down, by default the exact numbers in the query, so
+    "lesson 3 of MCP" never reuses the answer about lesson 4.
+
+    Entries expire after ttl_seconds, the least recently used entry is evicted
+    beyond max_size, and everything is dropped when the vector store's content
+    epoch moves, i.e. when ingestion changed what an answer could be based on.
+    """
+
+    def __init__(self, embed_fn: Callable[[str], Any], similarity_threshold: float = 0.92,
+                 max_size: int = 512, ttl_seconds: float = 3600,
+                 scope_fn: Callable[[str], Hashable] = query_numbers):
+        self.embed_fn = embed_fn
+        self.scope_fn = scope_fn
+        self.similarity_threshold = similarity_threshold
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[int, Tuple[np.ndarray, Hashable, CachedAnswer]]" = OrderedDict()
+        self._next_key = 0
+        self._epoch: Optional[int] = None
+        # Stacked unit vectors of all entries, rebuilt lazily after inserts and evictions
+        self._matrix: Optional[np.ndarray] = None
+        self._matrix_keys: List[int] = []
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self.saved_seconds = 0.0
+
+    @staticmethod
+    def _unit(embedding: Any) -> np.ndarray:
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def _sync_epoch(self, epoch: int):
+        """Drop every entry if the content epoch moved (caller holds the lock)"""
+        if self._epoch != epoch:
+            if self._entries:
+                self.invalidations += 1
+            self._entries.clear()
+            self._matrix = None
+            self._epoch = epoch
+
+    def lookup(self, query: str, epoch: int) -> Tuple[Optional[CachedAnswer], np.ndarray]:
+        """
+        Find a cached answer for a query.
+
+        Args:
+            query: User's question
+            epoch: Current content epoch of the vector store
+
+        Returns:
+            Tuple of (cached answer or None, query embedding to pass to store on a miss)
+        """
+        vector = self._unit(self.embed_fn(query))
+        scope = self.scope_fn(query)
+        now = time.monotonic()
+
+        with self._lock:
+            self._sync_epoch(epoch)
+            self._drop_expired(now)
+
+            if self._entries:
+                if self._matrix is None:
+                    self._matrix_keys = list(self._entries)
+                    self._matrix = np.stack([self._entries[key][0] for key in self._matrix_keys])
+                similarities = self._matrix @ vector
+                # The most similar entry of the same scope, if it is similar enough
+                for best in np.argsort(-similarities):
+                    if similarities[best] < self.similarity_threshold:
+                        break
+                    key = self._matrix_keys[best]
+                    _, entry_scope, entry = self._entries[key]
+                    if entry_scope != scope:
+                        continue
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    self.saved_seconds += entry.latency_seconds
+                    return entry, vector
+
+            self.misses += 1
+            return None, vector
+
+    def store(self, query: str, vector: np.ndarray, answer: str, sources: List[Any],
+              epoch: int, latency_seconds: float):
+        """Cache an answer produced at the given content epoch"""
+        with self._lock:
+            if self._epoch is not None and epoch < self._epoch:
+                return  # Content changed while the answer was being generated
+            self._sync_epoch(epoch)
+            self._entries[self._next_key] = (
+                vector, self.scope_fn(query), CachedAnswer(query, answer, list(sources), time.monotonic(), latency_seconds)
+            )
+            self._next_key += 1
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+            self._matrix = None
+
+    def _drop_expired(self, now: float):
+        """Remove entries past their TTL (caller holds the lock)"""
+        expired = [key for key, (_, _, entry) in self._entries.items() if now - entry.created >= self.ttl_seconds]
+        for key in expired:
+            del self._entries[key]
+        if expired:
+            self.evictions += len(expired)
+            self._matrix = None
+
+    def clear(self):
+        """Drop all cached answers"""
+        with self._lock:
+            self._entries.clear()
+            self._matrix = None
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and saved latency for tuning the threshold"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "similarity_threshold": self.similarity_threshold,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+                "saved_seconds": self.saved_seconds
+            }
@@ -1,16 +1,23 @@
+import time
+_import_started = time.perf_counter()
+
 import warnings
 warnings.filterwarnings("ignore", message="resource_tracker: There appear to be.*")
 
-from fastapi import FastAPI, HTTPException
+from fastapi import Depends, FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
-from pydantic import BaseModel
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
+from pydantic import BaseModel, Field
 from typing import List, Optional, Union, Dict, Any
+import asyncio
+import json
 import os
 
 from config import config
-from rag_system import RAGSystem
+from metrics import metrics
+from startup import StartupState
 
 # Initialize FastAPI app
 app = FastAPI(title="Course Materials RAG System", root_path="")
@@ -31,8 +38,50 @@ app.add_middleware(
     expose_headers=["*"],
 )
 
-# Initialize RAG system
-rag_system = RAGSystem(config)
+# The RAG system (index, embedding model, API client) loads in the background after the
+# server starts listening; rag_system is set once it is ready
+startup = StartupState(started=_import_started)
+rag_system = None
+_startup_task = None
+
+def load_rag_system(docs_path: Optional[str] = None):
+    """Build the RAG system, load its models and index the docs folder, timing each phase"""
+    global rag_system
+    docs_path = docs_path or config.DOCS_PATH
+    try:
+        with startup.phase("import"):
+            from rag_system import RAGSystem
+        with startup.phase("open_index"):
+            system = RAGSystem(config)
+        if config.INDEX_SNAPSHOT_PATH and system.vector_store.get_course_count() == 0:
+            # A fresh replica loads the prebuilt index; the docs scan below then finds nothing to embed
+            with startup.phase("import_snapshot"):
+                try:
+                    system.import_index_snapshot(config.INDEX_SNAPSHOT_PATH)
+                except Exception as e:
+                    print(f"Error importing index snapshot: {e}")
+        with startup.phase("load_models"):
+            system.vector_store.warm_up()
+        with startup.phase("index_documents"):
+            if os.path.exists(docs_path):
+                print("Loading initial documents...")
+                try:
+                    courses, chunks = system.add_course_folder(docs_path, clear_existing=False)
+                    print(f"Loaded {courses} courses with {chunks} chunks")
+                except Exception as e:
+                    print(f"Error loading documents: {e}")
+    except Exception as e:
+        startup.fail(e)
+        return
+    rag_system = system
+    startup.mark_ready()
+
+def ready_rag_system():
+    """Dependency returning the RAG system, or 503 while it is still loading"""
+    if rag_system is None:
+        detail = f"Startup failed: {startup.error}" if startup.error else f"Starting up ({startup.current})"
+        raise HTTPException(status_code=503, detail=detail, headers={"Retry-After": "1"})
+    return rag_system
 
 # Pydantic models for request/response
 class QueryRequest(BaseModel):
@@ -51,6 +100,11 @@ class QueryResponse(BaseModel):
     sources: List[Union[str, SourceInfo]]  # Support both legacy strings and new structured sources
     session_id: str
 
+class BatchQueryRequest(BaseModel):
+    """Request model for batch queries"""
+    queries: List[str]
+    max_concurrency: Optional[int] = Field(None, ge=1)
+
 class CourseStats(BaseModel):
     """Response model for course statistics"""
     total_courses: int
@@ -58,17 +112,27 @@ class CourseStats(BaseModel):
 
 # API Endpoints
 
+@app.get("/health")
+async def health():
+    """Liveness: answers as soon as the server is listening"""
+    return {"status": "ok"}
+
+@app.get("/ready")
+async def ready():
+    """Readiness with per-phase startup timings; 503 until the index and models are loaded"""
+    return JSONResponse(startup.report(), status_code=200 if startup.ready else 503)
+
 @app.post("/api/query", response_model=QueryResponse)
-async def query_documents(request: QueryRequest):
+async def query_documents(request: QueryRequest, rag_system=Depends(ready_rag_system)):
     """Process a query and return response with sources"""
     try:
         # Create session if not provided
         session_id = request.session_id
         if not session_id:
-            session_id = rag_system.session_manager.create_session()
+            session_id = await rag_system.acreate_session()
         
-        # Process query using RAG system
-        answer, sources = rag_system.query(request.query, session_id)
+        # Process query using RAG system without blocking the event loop
+        answer, sources = await rag_system.aquery(request.query, session_id)
         
         return QueryResponse(
             answer=answer,
@@ -78,11 +142,57 @@ async def query_documents(request: QueryRequest):
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+def _sse(event: str, data: Dict[str, Any]) -> str:
+    """Format one server-sent event"""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+@app.post("/api/query/stream")
+async def stream_query(request: QueryRequest, rag_system=Depends(ready_rag_system)):
+    """
+    Stream the answer as server-sent events: session, token (repeated), sources,
+    and done with time-to-first-token and total time in milliseconds
+    """
+    session_id = request.session_id or await rag_system.acreate_session()
+    
+    async def events():
+        yield _sse("session", {"session_id": session_id})
+        try:
+            async for event in rag_system.astream_query(request.query, session_id):
+                yield _sse(event.pop("type"), event)
+        except Exception as e:
+            # Headers are already sent, so errors are reported in-band
+            yield _sse("error", {"detail": str(e)})
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@app.post("/api/query/batch")
+async def batch_query(request: BatchQueryRequest, rag_system=Depends(ready_rag_system)):
+    """
+    Answer independent questions in bulk, streamed back as JSON lines in completion
+    order: one result (or error) per question, each with its index, then done
+    """
+    if len(request.queries) > config.BATCH_MAX_QUESTIONS:
+        raise HTTPException(status_code=413, detail=f"At most {config.BATCH_MAX_QUESTIONS} questions per batch")
+    
+    async def lines():
+        try:
+            async for result in rag_system.abatch_query(request.queries, request.max_concurrency):
+                yield json.dumps(result) + "\n"
+        except Exception as e:
+            # Headers are already sent, so errors are reported in-band
+            yield json.dumps({"type": "error", "detail": str(e)}) + "\n"
+    
+    return StreamingResponse(lines(), media_type="application/x-ndjson", headers={"X-Accel-Buffering": "no"})
+
 @app.get("/api/courses", response_model=CourseStats)
-async def get_course_stats():
+async def get_course_stats(rag_system=Depends(ready_rag_system)):
     """Get course analytics and statistics"""
     try:
-        analytics = rag_system.get_course_analytics()
+        analytics = await rag_system.aget_course_analytics()
         return CourseStats(
             total_courses=analytics["total_courses"],
             course_titles=analytics["course_titles"]
@@ -90,17 +200,43 @@ async def get_course_stats():
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/api/cache/stats")
+async def get_cache_stats(rag_system=Depends(ready_rag_system)):
+    """Answer and query embedding cache counters, for tuning thresholds and sizes"""
+    return {
+        "answer_cache": rag_system.answer_cache.stats() if rag_system.answer_cache else None,
+        "query_embedding_cache": rag_system.vector_store.query_embedding_cache.stats(),
+        "rerank_scores": rag_system.vector_store.reranker.stats() if rag_system.vector_store.reranker else None
+    }
+
+@app.get("/api/sessions/stats")
+async def get_session_stats(rag_system=Depends(ready_rag_system)):
+    """Conversation store size, memory use and eviction counters"""
+    # The SQLite backend scans every stored session for its size, so keep it off the event loop
+    loop = asyncio.get_running_loop()
+    stats = await loop.run_in_executor(rag_system.executor, rag_system.session_manager.stats)
+    if rag_system.summarizer:
+        stats["summarizer"] = rag_system.summarizer.stats()
+    return stats
+
+def _startup_samples():
+    """Readiness and startup phase timings, so restarts show up next to the query stages"""
+    samples = [("rag_ready", (), 1 if startup.ready else 0)]
+    samples += [("rag_startup_phase_seconds", (("phase", name),), seconds) for name, seconds in startup.phases.items()]
+    return samples
+
+metrics.register_collector("startup", _startup_samples)
+
+@app.get("/api/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    """Per-stage latency histograms, Anthropic token counts and cache hit ratios in the Prometheus text format"""
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
 @app.on_event("startup")
 async def startup_event():
-    """Load initial documents on startup"""
-    docs_path = "../docs"
-    if os.path.exists(docs_path):
-        print("Loading initial documents...")
-        try:
-            courses, chunks = rag_system.add_course_folder(docs_path, clear_existing=False)
-            print(f"Loaded {courses} courses with {chunks} chunks")
-        except Exception as e:
-            print(f"Error loading documents: {e}")
+    """Load the RAG system and initial documents in the background, so health checks pass right away"""
+    global _startup_task
+    _startup_task = asyncio.get_running_loop().run_in_executor(None, load_rag_system)
 
 # Custom static file handler with no-cache headers for development
 from fastapi.staticfiles import StaticFiles
@@ -121,4 +257,6 @@ class DevStaticFiles(StaticFiles):
     
     
 # Serve static files for the frontend
-app.mount("/", StaticFiles(directory="../frontend", html=True), name="static")
\ No newline at end of file
+app.mount("/", StaticFiles(directory="../frontend", html=True), name="static")
+
+startup.record("app_import", time.perf_counter() - _import_started)
\ No newline at end of file
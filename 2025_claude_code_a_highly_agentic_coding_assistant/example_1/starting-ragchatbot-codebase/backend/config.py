@@ -14,15 +14,72 @@ class Config:
     
     # Embedding model settings
     EMBEDDING_MODEL: str = "all-MiniLM-L6-v2"
+    QUERY_EMBEDDING_CACHE_SIZE: int = 1024   # Query embeddings kept in memory
+    QUERY_EMBEDDING_CACHE_TTL: float = 3600  # Seconds before a cached query embedding expires
     
     # Document processing settings
     CHUNK_SIZE: int = 800       # Size of text chunks for vector storage
     CHUNK_OVERLAP: int = 100     # Characters to overlap between chunks
+    CHUNK_UNIT: str = "characters"  # "characters" (CHUNK_SIZE) or "tokens" (CHUNK_TOKEN_BUDGET)
+    CHUNK_TOKEN_BUDGET: int = 200   # Embedding-model tokens per chunk in token mode
+    CHUNK_TOKEN_OVERLAP: int = 25   # Tokens to overlap between chunks in token mode
+    EMBEDDING_MAX_TOKENS: int = 256 # Input limit of the embedding model; the rest is truncated
     MAX_RESULTS: int = 5         # Maximum search results to return
-    MAX_HISTORY: int = 2         # Number of conversation messages to remember
+    SEARCH_MODE: str = "dense"   # "dense" (vectors only) or "hybrid" (BM25 + vectors, rank fused)
+    HYBRID_CANDIDATES: int = 20  # Candidates per retriever before reciprocal rank fusion
+    RRF_K: int = 60              # Reciprocal rank fusion damping constant
+    RERANK_MODEL: str = ""       # Cross-encoder for a rerank stage, e.g. "cross-encoder/ms-marco-MiniLM-L-6-v2" ("" disables)
+    RERANK_CANDIDATES: int = 20  # Candidates scored by the cross-encoder
+    RERANK_TOP_K: int = 3        # Results kept after reranking, replacing MAX_RESULTS
+    HISTORY_TOKEN_BUDGET: int = 1000  # Estimated tokens of conversation history to remember
+    SUMMARY_ENABLED: bool = False     # Fold older exchanges into a running summary in the background (one extra model call each)
+    SUMMARY_RECENT_TURNS: int = 2     # Exchanges kept verbatim after the summary
+    SUMMARY_MODEL: str = "claude-3-5-haiku-20241022"  # Model writing the summaries
+    SUMMARY_MAX_TOKENS: int = 300     # Upper bound on the summary length
+    SUMMARY_WORKERS: int = 2          # Threads writing summaries, apart from the search and session pool
+    
+    # Serving settings
+    BLOCKING_IO_WORKERS: int = 8  # Threads running Chroma and embedding calls
+    TOOL_WORKERS: int = 4         # Threads running tool calls, kept apart so slow tools cannot starve searches
+    TOOL_TIMEOUT: float = 10.0    # Seconds a tool call may run before the model gets an error result
+    QUERY_MODE: str = "tools"  # "tools" (the model decides to search, two calls) or
+                               # "retrieve_first" (a local classifier decides, one call)
+    ANSWER_CACHE_ENABLED: bool = False    # Reuse answers of near-duplicate questions without calling the model
+    # Minimum cosine similarity between query embeddings for a hit. Lower values hit more often but
+    # MiniLM puts opposite questions ("which lessons cover X" / "do not cover X") close together, so
+    # they may get each other's answer; higher values are safer and hit mostly on rephrasings.
+    ANSWER_CACHE_THRESHOLD: float = 0.92
+    ANSWER_CACHE_SIZE: int = 512          # Answers kept in memory
+    ANSWER_CACHE_TTL: float = 3600        # Seconds before a cached answer expires
+    SESSION_BACKEND: str = os.getenv("SESSION_BACKEND", "memory")  # "memory" (one worker), "sqlite"
+                                                                   # (workers on one host) or "redis"
+    MAX_SESSIONS: int = 10000             # Conversations kept, least recently used evicted first
+    SESSION_IDLE_TTL: float = 3600        # Seconds of inactivity before a conversation expires
+    SESSION_MAX_MEMORY_MB: int = 64       # Memory all conversation histories may use (memory backend)
+    METRICS_ENABLED: bool = True          # Per-stage latency histograms and token counters on /api/metrics
+    BATCH_MAX_QUESTIONS: int = 1000       # Questions accepted by one /api/query/batch request
+    BATCH_MAX_CONCURRENCY: int = 8        # Anthropic calls in flight per batch
+    BATCH_DEDUP_THRESHOLD: float = 0.98   # Cosine similarity from which batch searches are merged
+    
+    # Ingestion settings
+    DOCS_PATH: str = "../docs"       # Course documents indexed at startup
+    INGEST_WORKERS: int = 4          # Processes used to parse and chunk documents
+    EMBEDDING_BATCH_SIZE: int = 64   # Chunks embedded per batch during ingestion
+    INGEST_MANIFEST_PATH: str = "./chroma_db/ingest_manifest.json"  # Content hashes of ingested files
+    INDEX_SNAPSHOT_PATH: str = os.getenv("INDEX_SNAPSHOT_PATH", "")  # Prebuilt index loaded at startup
+                                                                     # when the index is empty
+    
+    # Vector store settings
+    VECTOR_BACKEND: str = os.getenv("VECTOR_BACKEND", "chroma")  # "chroma" or "numpy" (memory-mapped
+                                                                 # float16 matrix, exact or IVF search)
+    IVF_LISTS: int = 0  # IVF partitions of the numpy backend, 0 for exact search
+    IVF_PROBE: int = 8  # Partitions scanned per query when IVF_LISTS is set
+    VECTOR_SCAN_CACHE_MB: int = 512  # In-memory float32 copy of the numpy matrix, used while it fits
     
     # Database paths
-    CHROMA_PATH: str = "./chroma_db"  # ChromaDB storage location
+    CHROMA_PATH: str = "./chroma_db"  # ChromaDB (or numpy backend, under memmap/) storage location
+    SESSION_DB_PATH: str = "./sessions.db"  # Shared session store of the sqlite backend
+    REDIS_URL: str = os.getenv("REDIS_URL", "redis://localhost:6379/0")  # Session store of the redis backend
 
 config = Config()
 
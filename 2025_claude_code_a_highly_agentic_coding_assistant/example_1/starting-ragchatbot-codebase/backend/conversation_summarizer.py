@@ -0,0 +1,84 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Set
+
+SUMMARY_PREFIX = "Summary: "  # How a summary message is formatted in the history
+
+
+class ConversationSummarizer:
+    """
+    Rolling summary of each conversation.
+
+    After every exchange the session is compacted in the background: all but the
+    most recent recent_turns exchanges are folded, together with the previous
+    summary, into a single summary message. The history sent with each query is
+    then one short summary plus a fixed number of verbatim turns, however long the
+    conversation gets.
+
+    Summaries are blocking model calls of a second or more, so they run on the
+    summarizer's own small pool rather than the one serving searches and session
+    reads; a burst of long conversations only queues summaries.
+    """
+
+    def __init__(self, ai_generator, session_backend, max_workers: int = 2,
+                 recent_turns: int = 2, max_tokens: int = 300):
+        self.ai_generator = ai_generator
+        self.sessions = session_backend
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="rag-summary")
+        self.recent_turns = recent_turns  # Exchanges kept verbatim
+        self.max_tokens = max_tokens      # Upper bound on the summary length
+        self._lock = threading.Lock()
+        self._running: Set[str] = set()  # Sessions being summarized
+        self._pending: Set[str] = set()  # Sessions that changed while being summarized
+        self.folds = 0
+        self.failures = 0
+
+    def schedule(self, session_id: str):
+        """Compact a session in the background; calls for a session being compacted coalesce"""
+        with self._lock:
+            if session_id in self._running:
+                self._pending.add(session_id)
+                return
+            self._running.add(session_id)
+        self.executor.submit(self._run, session_id)
+
+    def _run(self, session_id: str):
+        """Compact a session until no exchange arrived in the meantime"""
+        while True:
+            try:
+                self.summarize_session(session_id)
+            except Exception as e:
+                # The verbatim history is still there, so the next exchange retries
+                self.failures += 1
+                print(f"Error summarizing session {session_id}: {e}")
+            with self._lock:
+                if session_id not in self._pending:
+                    self._running.discard(session_id)
+                    return
+                self._pending.discard(session_id)
+
+    def summarize_session(self, session_id: str) -> bool:
+        """
+        Fold everything but the recent turns of a session into its summary.
+
+        Returns:
+            True if the session was compacted, False if it was short enough or
+            changed underneath (for example, trimmed by another worker)
+        """
+        lines = self.sessions.get_lines(session_id)
+        keep = 2 * self.recent_turns
+        summary = lines[0][len(SUMMARY_PREFIX):] if lines and lines[0].startswith(SUMMARY_PREFIX) else None
+        start = 1 if summary is not None else 0
+        if len(lines) - start <= keep:
+            return False
+
+        old_lines = lines[:len(lines) - keep]
+        new_summary = self.ai_generator.summarize_conversation(summary, old_lines[start:], self.max_tokens)
+        if not new_summary or not self.sessions.fold(session_id, old_lines, new_summary):
+            return False
+        self.folds += 1
+        return True
+
+    def stats(self) -> Dict[str, Any]:
+        """Summaries written and failed"""
+        return {"folds": self.folds, "failures": self.failures, "recent_turns": self.recent_turns}
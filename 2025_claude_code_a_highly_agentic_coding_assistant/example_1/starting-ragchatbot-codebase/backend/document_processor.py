@@ -1,98 +1,256 @@
 import os
 import re
-from typing import List, Tuple
+from collections import deque
+from functools import lru_cache
+from itertools import chain, islice, tee
+from typing import Callable, Deque, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+from document_readers import iter_document_lines
 from models import Course, Lesson, CourseChunk
 
+
+@lru_cache(maxsize=None)
+def load_token_counter(model_name: str) -> Callable[[str], int]:
+    """
+    Token counter using the embedding model's own tokenizer (loaded once per process).
+    Bare sentence-transformers model names are resolved on the Hugging Face hub.
+    """
+    from transformers import AutoTokenizer
+
+    repo_id = model_name if "/" in model_name else f"sentence-transformers/{model_name}"
+    tokenizer = AutoTokenizer.from_pretrained(repo_id)
+    return lambda text: len(tokenizer.tokenize(text))
+
+
 class DocumentProcessor:
     """Processes course documents and extracts structured information"""
     
-    def __init__(self, chunk_size: int, chunk_overlap: int):
+    # Sentence boundary: whitespace after ., ! or ? followed by a capital letter,
+    # ignoring common abbreviations such as "e.g." and "Mr."
+    SENTENCE_ENDINGS = re.compile(r'(?<!\w\.\w.)(?<![A-Z][a-z]\.)(?<=\.|\!|\?)\s+(?=[A-Z])')
+    
+    # Lookbehind context kept when the sentence buffer is compacted
+    _SENTENCE_CONTEXT = 8
+    
+    # Lesson marker line, e.g. "Lesson 0: Introduction"
+    LESSON_MARKER = re.compile(r'^Lesson\s+(\d+):\s*(.+)$', re.IGNORECASE)
+    
+    # Chunks per batch yielded by iter_course_document
+    CHUNK_BATCH_SIZE = 32
+    
+    def __init__(self, chunk_size: int, chunk_overlap: int,
+                 chunk_unit: str = "characters",
+                 token_budget: int = 200,
+                 token_overlap: int = 25,
+                 tokenizer_model: Optional[str] = None,
+                 max_tokens: int = 256):
+        """
+        Args:
+            chunk_size: Characters per chunk in character mode
+            chunk_overlap: Characters to overlap between chunks in character mode
+            chunk_unit: "characters" or "tokens"
+            token_budget: Tokens per chunk in token mode
+            token_overlap: Tokens to overlap between chunks in token mode
+            tokenizer_model: Embedding model whose tokenizer measures chunks in token mode
+            max_tokens: Embedding model input limit, longer input is truncated
+        """
         self.chunk_size = chunk_size
         self.chunk_overlap = chunk_overlap
+        self.chunk_unit = chunk_unit
+        self.token_budget = token_budget
+        self.token_overlap = token_overlap
+        self.max_tokens = max_tokens
+        self.count_tokens: Optional[Callable[[str], int]] = None
+        if chunk_unit == "tokens":
+            if not tokenizer_model:
+                raise ValueError("Token-based chunking needs a tokenizer_model")
+            self.count_tokens = load_token_counter(tokenizer_model)
+        
+        # Chunks that exceed the embedding window in the last processed document,
+        # compared with what character sizing would have produced
+        self.truncation_audit: Dict[str, int] = {}
     
-    def read_file(self, file_path: str) -> str:
-        """Read content from file with UTF-8 encoding"""
-        try:
-            with open(file_path, 'r', encoding='utf-8') as file:
-                return file.read()
-        except UnicodeDecodeError:
-            # If UTF-8 fails, try with error handling
-            with open(file_path, 'r', encoding='utf-8', errors='ignore') as file:
-                return file.read()
+    def read_lines(self, file_path: str) -> Iterator[str]:
+        """Stream the lines of a .txt, .pdf or .docx file"""
+        return iter_document_lines(file_path)
     
 
 
-    def chunk_text(self, text: str) -> List[str]:
-        """Split text into sentence-based chunks with overlap using config settings"""
+    def iter_sentences(self, pieces: Iterable[str]) -> Iterator[str]:
+        """
+        Split a stream of text pieces into sentences in a single pass.
+        
+        Whitespace is normalized as the pieces arrive and only the current,
+        unfinished sentence is buffered, so memory does not grow with the text.
+        """
+        buffer = ""
+        position = 0  # Start of the current sentence in buffer
+        
+        for piece in pieces:
+            piece = re.sub(r'\s+', ' ', piece)
+            if not buffer:
+                piece = piece.lstrip()
+            elif buffer.endswith(' ') and piece.startswith(' '):
+                piece = piece[1:]
+            if not piece:
+                continue
+            
+            # A boundary can only start in the newly appended text or at the space before it
+            scan_from = max(position, len(buffer) - 1)
+            buffer += piece
+            
+            match = self.SENTENCE_ENDINGS.search(buffer, scan_from)
+            while match:
+                sentence = buffer[position:match.start()].strip()
+                if sentence:
+                    yield sentence
+                position = match.end()
+                match = self.SENTENCE_ENDINGS.search(buffer, position)
+            
+            # Drop consumed text, keeping enough context for the lookbehinds
+            if position > self._SENTENCE_CONTEXT:
+                cut = position - self._SENTENCE_CONTEXT
+                buffer = buffer[cut:]
+                position -= cut
         
-        # Clean up the text
-        text = re.sub(r'\s+', ' ', text.strip())  # Normalize whitespace
+        sentence = buffer[position:].strip()
+        if sentence:
+            yield sentence
+    
+    def iter_chunks(self, text: Union[str, Iterable[str]], reserve: int = 0) -> Iterator[str]:
+        """
+        Yield sentence-based chunks with overlap using config settings.
         
-        # Better sentence splitting that handles abbreviations
-        # This regex looks for periods followed by whitespace and capital letters
-        # but ignores common abbreviations
-        sentence_endings = re.compile(r'(?<!\w\.\w.)(?<![A-Z][a-z]\.)(?<=\.|\!|\?)\s+(?=[A-Z])')
-        sentences = sentence_endings.split(text)
+        Walks the sentence stream once and only keeps the sentences of the
+        chunk being built, so it runs in linear time and bounded memory.
         
-        # Clean sentences
-        sentences = [s.strip() for s in sentences if s.strip()]
+        Args:
+            text: Text, or an iterable of text pieces (lines, pages, ...)
+            reserve: Tokens to keep free for context added to each chunk (token mode only)
+        """
+        pieces = [text] if isinstance(text, str) else text
+        return self._iter_sized_chunks(self.iter_sentences(pieces), *self._sizing(reserve))
+    
+    def _sizing(self, reserve: int = 0) -> Tuple[int, int, Callable[[str], int], int]:
+        """(chunk size, overlap, measure, separator size) of the configured chunk unit"""
+        if self.count_tokens is None:
+            return self.chunk_size, self.chunk_overlap, len, 1
         
-        chunks = []
-        i = 0
+        # WordPiece splits on whitespace, so a sentence's tokens add up when sentences
+        # are joined with spaces; the special tokens come out of the budget
+        budget = max(1, min(self.token_budget, self.max_tokens - 2 - reserve))
+        return budget, self.token_overlap, self.count_tokens, 0
+    
+    def _iter_sized_chunks(self, sentences: Iterator[str], chunk_size: int, chunk_overlap: int,
+                           measure: Callable[[str], int], separator_size: int) -> Iterator[str]:
+        """Pack sentences into chunks of at most chunk_size units as measured by measure"""
+        # (sentence, size) from the start of the next chunk: overlap carried from the
+        # previous chunk plus the one sentence that did not fit into it
+        pending: Deque[Tuple[str, int]] = deque()
+        exhausted = False
         
-        while i < len(sentences):
+        while True:
             current_chunk = []
             current_size = 0
             
-            # Build chunk starting from sentence i
-            for j in range(i, len(sentences)):
-                sentence = sentences[j]
+            while True:
+                if len(current_chunk) < len(pending):
+                    sentence, sentence_size = pending[len(current_chunk)]
+                elif exhausted:
+                    break
+                else:
+                    sentence = next(sentences, None)
+                    if sentence is None:
+                        exhausted = True
+                        break
+                    sentence_size = measure(sentence)
+                    pending.append((sentence, sentence_size))
                 
-                # Calculate size with space
-                space_size = 1 if current_chunk else 0
-                total_addition = len(sentence) + space_size
+                # Calculate size with separator
+                space_size = separator_size if current_chunk else 0
+                total_addition = sentence_size + space_size
                 
                 # Check if adding this sentence would exceed chunk size
-                if current_size + total_addition > self.chunk_size and current_chunk:
+                if current_size + total_addition > chunk_size and current_chunk:
                     break
                 
-                current_chunk.append(sentence)
+                current_chunk.append(sentence_size)
                 current_size += total_addition
             
-            # Add chunk if we have content
-            if current_chunk:
-                chunks.append(' '.join(current_chunk))
-                
-                # Calculate overlap for next chunk
-                if hasattr(self, 'chunk_overlap') and self.chunk_overlap > 0:
-                    # Find how many sentences to overlap
-                    overlap_size = 0
-                    overlap_sentences = 0
-                    
-                    # Count backwards from end of current chunk
-                    for k in range(len(current_chunk) - 1, -1, -1):
-                        sentence_len = len(current_chunk[k]) + (1 if k < len(current_chunk) - 1 else 0)
-                        if overlap_size + sentence_len <= self.chunk_overlap:
-                            overlap_size += sentence_len
-                            overlap_sentences += 1
-                        else:
-                            break
-                    
-                    # Move start position considering overlap
-                    next_start = i + len(current_chunk) - overlap_sentences
-                    i = max(next_start, i + 1)  # Ensure we make progress
-                else:
-                    # No overlap - move to next sentence after current chunk
-                    i += len(current_chunk)
-            else:
-                # No sentences fit, move to next
-                i += 1
+            if not current_chunk:
+                return
+            
+            yield ' '.join(sentence for sentence, _ in islice(pending, len(current_chunk)))
+            
+            # Count how many trailing sentences fit into the overlap
+            overlap_sentences = 0
+            if chunk_overlap > 0:
+                overlap_size = 0
+                for k in range(len(current_chunk) - 1, -1, -1):
+                    sentence_len = current_chunk[k] + (separator_size if k < len(current_chunk) - 1 else 0)
+                    if overlap_size + sentence_len <= chunk_overlap:
+                        overlap_size += sentence_len
+                        overlap_sentences += 1
+                    else:
+                        break
+            
+            # Move start position considering overlap, always making progress
+            for _ in range(max(len(current_chunk) - overlap_sentences, 1)):
+                pending.popleft()
+    
+    def chunk_text(self, text: Union[str, Iterable[str]]) -> List[str]:
+        """Split text into sentence-based chunks with overlap using config settings"""
+        return list(self.iter_chunks(text))
+    
+    def _iter_chunks_with_context(self, pieces: Iterable[str], context: str) -> Iterator[str]:
+        """
+        Chunk a stream of section text, prefixing the context to the first chunk.
         
-        return chunks
-
-
-
-
+        In token mode every chunk is audited against the embedding window, next to
+        character sizing of the same sentences. Both packers read one sentence
+        stream in step, so the audit does not buffer the section either.
+        """
+        reserve = self.count_tokens(context) if self.count_tokens and context else 0
+        sentences = self.iter_sentences(pieces)
+        if self.count_tokens is None:
+            for idx, chunk in enumerate(self._iter_sized_chunks(sentences, *self._sizing(reserve))):
+                yield f"{context}{chunk}" if context and idx == 0 else chunk
+            return
+        
+        consumed = [0, 0]  # Sentences read by the token packer and by the character packer
+        
+        def counted(stream: Iterator[str], packer: int) -> Iterator[str]:
+            for sentence in stream:
+                consumed[packer] += 1
+                yield sentence
+        
+        token_sentences, character_sentences = tee(sentences)
+        chunks = self._iter_sized_chunks(counted(token_sentences, 0), *self._sizing(reserve))
+        legacy_chunks = enumerate(self._iter_sized_chunks(
+            counted(character_sentences, 1), self.chunk_size, self.chunk_overlap, len, 1
+        ))
+        for idx, chunk in enumerate(chunks):
+            content = f"{context}{chunk}" if context and idx == 0 else chunk
+            self._audit_chunk(content, "chunks", "truncated")
+            yield content
+            # Keep the character packer level with the token packer so tee buffers stay small
+            while consumed[1] < consumed[0]:
+                legacy = next(legacy_chunks, None)
+                if legacy is None:
+                    break
+                self._audit_legacy_chunk(*legacy, context)
+        for legacy in legacy_chunks:
+            self._audit_legacy_chunk(*legacy, context)
+    
+    def _audit_chunk(self, content: str, chunks_key: str, truncated_key: str):
+        """Count a chunk, and whether it exceeds the embedding window"""
+        limit = self.max_tokens - 2  # [CLS] and [SEP]
+        self.truncation_audit[chunks_key] += 1
+        self.truncation_audit[truncated_key] += self.count_tokens(content) > limit
+    
+    def _audit_legacy_chunk(self, idx: int, chunk: str, context: str):
+        """Audit a chunk character sizing would have produced"""
+        content = f"{context}{chunk}" if context and idx == 0 else chunk
+        self._audit_chunk(content, "legacy_chunks", "legacy_truncated")
     
     def process_course_document(self, file_path: str) -> Tuple[Course, List[CourseChunk]]:
         """
@@ -102,10 +260,39 @@ class DocumentProcessor:
         Line 3: Course Instructor: [instructor]
         Following lines: Lesson markers and content
         """
-        content = self.read_file(file_path)
+        course, course_chunks = None, []
+        for course, chunks in self.iter_course_document(file_path):
+            course_chunks.extend(chunks)
+        return course, course_chunks
+    
+    def iter_course_document(self, file_path: str) -> Iterator[Tuple[Course, List[CourseChunk]]]:
+        """
+        Stream a course document, see process_course_document for the format.
+        
+        Lines are pulled from the file and fed to the chunker as they are parsed,
+        and chunks are yielded in small batches as they are produced, so memory
+        stays bounded however long a lesson (or a document without lessons) is,
+        and callers can start embedding before extraction finishes. Text before
+        the first lesson marker becomes course-level chunks without a lesson number.
+        
+        Yields:
+            (course, chunks): first with no chunks once the header is parsed, then
+            per batch; lessons are appended to the same Course object as they produce chunks
+        """
+        lines = self.read_lines(file_path)
         filename = os.path.basename(file_path)
+        self.truncation_audit = {"chunks": 0, "truncated": 0, "legacy_chunks": 0, "legacy_truncated": 0}
         
-        lines = content.strip().split('\n')
+        # Header: the first four lines, ignoring leading blank lines
+        header = []
+        for line in lines:
+            if not header:
+                line = line.lstrip()
+                if not line:
+                    continue
+            header.append(line)
+            if len(header) == 4:
+                break
         
         # Extract course metadata from first three lines
         course_title = filename  # Default fallback
@@ -113,16 +300,16 @@ class DocumentProcessor:
         instructor_name = "Unknown"
         
         # Parse course title from first line
-        if len(lines) >= 1 and lines[0].strip():
-            title_match = re.match(r'^Course Title:\s*(.+)$', lines[0].strip(), re.IGNORECASE)
+        if header:
+            title_match = re.match(r'^Course Title:\s*(.+)$', header[0].strip(), re.IGNORECASE)
             if title_match:
                 course_title = title_match.group(1).strip()
             else:
-                course_title = lines[0].strip()
+                course_title = header[0].strip()
         
         # Parse remaining lines for course metadata
-        for i in range(1, min(len(lines), 4)):  # Check first 4 lines for metadata
-            line = lines[i].strip()
+        for line in header[1:4]:  # Check first 4 lines for metadata
+            line = line.strip()
             if not line:
                 continue
                 
@@ -144,116 +331,71 @@ class DocumentProcessor:
             course_link=course_link,
             instructor=instructor_name if instructor_name != "Unknown" else None
         )
+        yield course, []
+        
+        # Start processing from line 4 (after metadata)
+        start_index = 3
+        if len(header) > 3 and not header[3].strip():
+            start_index = 4  # Skip empty line after instructor
+        body = chain(header[start_index:], lines)
+        next_marker = None  # Lesson marker that ended the last section
+        
+        def section_lines() -> Iterator[str]:
+            """Lines up to the next lesson marker, each ending in a newline so words never merge"""
+            nonlocal next_marker
+            for line in body:
+                lesson_match = self.LESSON_MARKER.match(line.strip())
+                if lesson_match:
+                    next_marker = lesson_match
+                    return
+                yield line + '\n'
         
-        # Process lessons and create chunks
-        course_chunks = []
+        # The text before the first lesson (all of it in a document without lessons)
         current_lesson = None
+        lesson = None
         lesson_title = None
         lesson_link = None
-        lesson_content = []
+        context = ""
+        section = section_lines()
         chunk_counter = 0
+        batch: List[CourseChunk] = []
         
-        # Start processing from line 4 (after metadata)
-        start_index = 3
-        if len(lines) > 3 and not lines[3].strip():
-            start_index = 4  # Skip empty line after instructor
-        
-        i = start_index
-        while i < len(lines):
-            line = lines[i]
+        while True:
+            for content in self._iter_chunks_with_context(section, context):
+                if current_lesson is not None and lesson is None:
+                    # Lessons without any text are left out
+                    lesson = Lesson(lesson_number=current_lesson, title=lesson_title, lesson_link=lesson_link)
+                    course.lessons.append(lesson)
+                batch.append(CourseChunk(
+                    content=content,
+                    course_title=course.title,
+                    lesson_number=current_lesson,
+                    chunk_index=chunk_counter
+                ))
+                chunk_counter += 1
+                if len(batch) >= self.CHUNK_BATCH_SIZE:
+                    yield course, batch
+                    batch = []
             
-            # Check for lesson markers (e.g., "Lesson 0: Introduction")
-            lesson_match = re.match(r'^Lesson\s+(\d+):\s*(.+)$', line.strip(), re.IGNORECASE)
+            if next_marker is None:
+                break
             
-            if lesson_match:
-                # Process previous lesson if it exists
-                if current_lesson is not None and lesson_content:
-                    lesson_text = '\n'.join(lesson_content).strip()
-                    if lesson_text:
-                        # Add lesson to course
-                        lesson = Lesson(
-                            lesson_number=current_lesson,
-                            title=lesson_title,
-                            lesson_link=lesson_link
-                        )
-                        course.lessons.append(lesson)
-                        
-                        # Create chunks for this lesson
-                        chunks = self.chunk_text(lesson_text)
-                        for idx, chunk in enumerate(chunks):
-                            # For the first chunk of each lesson, add lesson context
-                            if idx == 0:
-                                chunk_with_context = f"Lesson {current_lesson} content: {chunk}"
-                            else:
-                                chunk_with_context = chunk
-                            
-                            course_chunk = CourseChunk(
-                                content=chunk_with_context,
-                                course_title=course.title,
-                                lesson_number=current_lesson,
-                                chunk_index=chunk_counter
-                            )
-                            course_chunks.append(course_chunk)
-                            chunk_counter += 1
-                
-                # Start new lesson
-                current_lesson = int(lesson_match.group(1))
-                lesson_title = lesson_match.group(2).strip()
-                lesson_link = None
-                
-                # Check if next line is a lesson link
-                if i + 1 < len(lines):
-                    next_line = lines[i + 1].strip()
-                    link_match = re.match(r'^Lesson Link:\s*(.+)$', next_line, re.IGNORECASE)
-                    if link_match:
-                        lesson_link = link_match.group(1).strip()
-                        i += 1  # Skip the link line so it's not added to content
-                
-                lesson_content = []
-            else:
-                # Add line to current lesson content
-                lesson_content.append(line)
-                
-            i += 1
-        
-        # Process the last lesson
-        if current_lesson is not None and lesson_content:
-            lesson_text = '\n'.join(lesson_content).strip()
-            if lesson_text:
-                lesson = Lesson(
-                    lesson_number=current_lesson,
-                    title=lesson_title,
-                    lesson_link=lesson_link
-                )
-                course.lessons.append(lesson)
-                
-                chunks = self.chunk_text(lesson_text)
-                for idx, chunk in enumerate(chunks):
-                    # For any chunk of each lesson, add lesson context & course title
-                  
-                    chunk_with_context = f"Course {course_title} Lesson {current_lesson} content: {chunk}"
-                    
-                    course_chunk = CourseChunk(
-                        content=chunk_with_context,
-                        course_title=course.title,
-                        lesson_number=current_lesson,
-                        chunk_index=chunk_counter
-                    )
-                    course_chunks.append(course_chunk)
-                    chunk_counter += 1
-        
-        # If no lessons found, treat entire content as one document
-        if not course_chunks and len(lines) > 2:
-            remaining_content = '\n'.join(lines[start_index:]).strip()
-            if remaining_content:
-                chunks = self.chunk_text(remaining_content)
-                for chunk in chunks:
-                    course_chunk = CourseChunk(
-                        content=chunk,
-                        course_title=course.title,
-                        chunk_index=chunk_counter
-                    )
-                    course_chunks.append(course_chunk)
-                    chunk_counter += 1
+            # Start new lesson (e.g., "Lesson 0: Introduction")
+            current_lesson = int(next_marker.group(1))
+            lesson_title = next_marker.group(2).strip()
+            lesson = None
+            next_marker = None
+            section = section_lines()
+            
+            # Check if the line after a lesson marker is a lesson link
+            first_line = next(section, None)
+            link_match = re.match(r'^Lesson Link:\s*(.+)$', first_line.strip(), re.IGNORECASE) if first_line else None
+            lesson_link = link_match.group(1).strip() if link_match else None
+            if first_line is not None and not link_match:
+                section = chain([first_line], section)
+            
+            # For the first chunk of each lesson, add lesson context
+            context = f"Lesson {current_lesson} content: "
         
-        return course, course_chunks
+        if batch:
+            yield course, batch
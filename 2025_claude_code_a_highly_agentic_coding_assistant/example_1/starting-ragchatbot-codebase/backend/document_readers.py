@@ -0,0 +1,81 @@
+import os
+import zipfile
+from typing import Iterator
+from xml.etree import ElementTree
+
+# WordprocessingML namespace used by word/document.xml
+_W = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+
+
+def iter_text_lines(file_path: str) -> Iterator[str]:
+    """Yield the lines of a UTF-8 text file without their line endings"""
+    # Undecodable bytes are dropped instead of failing the whole file
+    with open(file_path, 'r', encoding='utf-8', errors='ignore') as file:
+        for line in file:
+            yield line.rstrip('\n')
+
+
+def iter_pdf_pages(file_path: str) -> Iterator[str]:
+    """
+    Yield the extracted text of a PDF one page at a time.
+
+    Pages are parsed lazily as they are requested, so only the page being
+    extracted is held in memory rather than the whole document.
+    """
+    try:
+        from pypdf import PdfReader
+    except ImportError as e:
+        raise ImportError("Reading PDF course documents requires pypdf (pip install pypdf)") from e
+
+    with open(file_path, 'rb') as file:
+        reader = PdfReader(file)
+        for page_number in range(len(reader.pages)):
+            text = reader.pages[page_number].extract_text() or ""
+            # Forget the objects resolved for this page; pypdf re-reads them on demand
+            reader.resolved_objects.clear()
+            yield text
+
+
+def iter_docx_paragraphs(file_path: str) -> Iterator[str]:
+    """
+    Yield the text of a DOCX document one paragraph at a time.
+
+    word/document.xml is parsed incrementally straight from the archive and each
+    paragraph is discarded once yielded, so memory does not grow with the document.
+    """
+    with zipfile.ZipFile(file_path) as archive:
+        with archive.open("word/document.xml") as document:
+            parts = []
+            for event, element in ElementTree.iterparse(document, events=("end",)):
+                tag = element.tag
+                if tag == f"{_W}t":
+                    parts.append(element.text or "")
+                elif tag == f"{_W}tab":
+                    parts.append("\t")
+                elif tag in (f"{_W}br", f"{_W}cr"):
+                    parts.append("\n")
+                elif tag == f"{_W}p":
+                    yield "".join(parts)
+                    parts = []
+                    element.clear()
+                elif tag == f"{_W}body":
+                    element.clear()
+
+
+def iter_document_lines(file_path: str) -> Iterator[str]:
+    """
+    Yield the lines of a course document, streaming .pdf pages and .docx paragraphs.
+
+    Any other extension is read as UTF-8 text.
+    """
+    extension = os.path.splitext(file_path)[1].lower()
+    if extension == ".pdf":
+        blocks = iter_pdf_pages(file_path)
+    elif extension == ".docx":
+        blocks = iter_docx_paragraphs(file_path)
+    else:
+        yield from iter_text_lines(file_path)
+        return
+
+    for block in blocks:
+        yield from block.split('\n')
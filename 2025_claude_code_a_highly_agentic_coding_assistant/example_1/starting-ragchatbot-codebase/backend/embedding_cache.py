@@ -0,0 +1,85 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Tuple
+
+
+class EmbeddingCache:
+    """Bounded LRU cache of text embeddings with time-to-live eviction"""
+
+    def __init__(self, embed_fn: Callable[[List[str]], List[Any]], max_size: int = 1024, ttl_seconds: float = 3600):
+        self.embed_fn = embed_fn
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def normalize(text: str) -> str:
+        """
+        Cache key for a text: collapsed whitespace, lower case.
+        Lower-casing is lossless for uncased models such as all-MiniLM-L6-v2.
+        """
+        return " ".join(text.split()).lower()
+
+    def get(self, text: str) -> Any:
+        """Return the embedding for a text, computing it on a miss"""
+        return self.get_many([text])[0]
+
+    def get_many(self, texts: List[str]) -> List[Any]:
+        """Return embeddings for several texts, computing all misses in one batch"""
+        keys = [self.normalize(text) for text in texts]
+        results: List[Any] = [None] * len(keys)
+        missing: Dict[str, List[int]] = {}
+        now = time.monotonic()
+
+        with self._lock:
+            for i, key in enumerate(keys):
+                entry = self._entries.get(key)
+                if entry and now - entry[0] < self.ttl_seconds:
+                    self._entries.move_to_end(key)
+                    results[i] = entry[1]
+                    self.hits += 1
+                else:
+                    if entry:
+                        del self._entries[key]
+                        self.evictions += 1
+                    missing.setdefault(key, []).append(i)
+                    self.misses += 1
+
+        if missing:
+            # Embed outside the lock so concurrent hits are never blocked on the model
+            missing_keys = list(missing)
+            embeddings = self.embed_fn([texts[positions[0]] for positions in missing.values()])
+            with self._lock:
+                for key, embedding in zip(missing_keys, embeddings):
+                    for i in missing[key]:
+                        results[i] = embedding
+                    self._entries[key] = (now, embedding)
+                    self._entries.move_to_end(key)
+                while len(self._entries) > self.max_size:
+                    self._entries.popitem(last=False)
+                    self.evictions += 1
+
+        return results
+
+    def clear(self):
+        """Drop all cached embeddings"""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters for monitoring"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_ratio": self.hits / lookups if lookups else 0.0
+            }
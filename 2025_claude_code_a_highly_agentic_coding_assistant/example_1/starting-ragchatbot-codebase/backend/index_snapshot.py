@@ -0,0 +1,188 @@
+"""
+Prebuilt index snapshots, so replicas load the index instead of re-embedding docs/.
+
+A snapshot is a gzip-compressed tar archive holding both collections (records as
+JSON, embeddings as float32 .npy) and the ingestion manifest. Its first member,
+snapshot.json, names the format version and the embedding model and lists a
+SHA-256 checksum for every other member. An import checks the header before it
+reads any data, checks every member against its checksum, and then replaces the
+index in one bulk load. The snapshot is independent of the vector backend, so a
+snapshot exported from ChromaDB can be imported into the numpy backend and back.
+
+Usage (from backend/, with the same config as the server):
+    uv run python index_snapshot.py export-index ../index-snapshot.tar.gz
+    uv run python index_snapshot.py import-index ../index-snapshot.tar.gz
+"""
+import argparse
+import hashlib
+import io
+import json
+import os
+import tarfile
+import time
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+
+SNAPSHOT_FORMAT = "rag-index-snapshot"
+SNAPSHOT_VERSION = 1
+_HEADER = "snapshot.json"
+_MANIFEST = "ingest_manifest.json"
+_COLLECTIONS = ("course_catalog", "course_content")
+
+
+def _sha256(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def export_index(vector_store, manifest_path: str, snapshot_path: str) -> Dict[str, Any]:
+    """
+    Write both collections and the ingestion manifest to a compressed snapshot.
+
+    Args:
+        vector_store: Store to export
+        manifest_path: Ingestion manifest to include, if it exists
+        snapshot_path: Archive to write; replaced atomically
+
+    Returns:
+        The snapshot header
+    """
+    members: Dict[str, bytes] = {}
+    counts = {}
+    dimension = None
+    for name, records in vector_store.export_collections().items():
+        members[f"{name}/records.json"] = json.dumps(
+            {key: records[key] for key in ("ids", "documents", "metadatas")}
+        ).encode("utf-8")
+        buffer = io.BytesIO()
+        np.save(buffer, records["embeddings"], allow_pickle=False)
+        members[f"{name}/embeddings.npy"] = buffer.getvalue()
+        counts[name] = len(records["ids"])
+        if len(records["ids"]):
+            dimension = int(records["embeddings"].shape[1])
+    if os.path.exists(manifest_path):
+        with open(manifest_path, "rb") as file:
+            members[_MANIFEST] = file.read()
+
+    created = time.time()
+    header = {
+        "format": SNAPSHOT_FORMAT,
+        "version": SNAPSHOT_VERSION,
+        "embedding_model": vector_store.embedding_function.model_name,
+        "dimension": dimension,
+        "created_at": created,
+        "counts": counts,
+        "checksums": {name: _sha256(data) for name, data in members.items()},
+    }
+
+    # Header first, so an import can reject a snapshot without decompressing the data
+    tmp_path = f"{snapshot_path}.tmp"
+    with tarfile.open(tmp_path, "w:gz", compresslevel=6) as archive:
+        for name, data in [(_HEADER, json.dumps(header, indent=1).encode("utf-8"))] + list(members.items()):
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            info.mtime = int(created)
+            archive.addfile(info, io.BytesIO(data))
+    os.replace(tmp_path, snapshot_path)
+    return header
+
+
+def read_snapshot(snapshot_path: str, embedding_model: str
+                  ) -> Tuple[Dict[str, Any], Dict[str, Dict[str, Any]], Optional[bytes]]:
+    """
+    Read and verify a snapshot.
+
+    Args:
+        snapshot_path: Archive written by export_index
+        embedding_model: Model the importing store embeds queries with
+
+    Returns:
+        Tuple of (header, collections as returned by VectorStore.export_collections,
+        ingestion manifest bytes or None)
+
+    Raises:
+        ValueError: Not a snapshot, unsupported version, different embedding model,
+            or a member missing or failing its checksum
+    """
+    members: Dict[str, bytes] = {}
+    with tarfile.open(snapshot_path, "r:gz") as archive:
+        first = archive.next()
+        if first is None or first.name != _HEADER:
+            raise ValueError(f"{snapshot_path} is not an index snapshot")
+        header = json.load(archive.extractfile(first))
+        if header.get("format") != SNAPSHOT_FORMAT or header.get("version") != SNAPSHOT_VERSION:
+            raise ValueError(f"Unsupported snapshot format {header.get('format')} version {header.get('version')}")
+        if header.get("embedding_model") != embedding_model:
+            raise ValueError(
+                f"Snapshot was embedded with {header.get('embedding_model')}, "
+                f"but this index uses {embedding_model}"
+            )
+
+        checksums = header["checksums"]
+        for member in archive:
+            if member.name == _HEADER:
+                continue
+            data = archive.extractfile(member).read()
+            if checksums.get(member.name) != _sha256(data):
+                raise ValueError(f"Checksum mismatch for snapshot member {member.name}")
+            members[member.name] = data
+    missing = set(checksums) - set(members)
+    if missing:
+        raise ValueError(f"Snapshot is missing {', '.join(sorted(missing))}")
+
+    collections = {}
+    for name in _COLLECTIONS:
+        records = json.loads(members[f"{name}/records.json"])
+        records["embeddings"] = np.load(io.BytesIO(members[f"{name}/embeddings.npy"]), allow_pickle=False)
+        collections[name] = records
+    return header, collections, members.get(_MANIFEST)
+
+
+def import_index(vector_store, manifest_path: str, snapshot_path: str) -> Dict[str, Any]:
+    """
+    Replace the index and ingestion manifest with a snapshot's.
+
+    The manifest comes along so the next docs folder scan finds every file already
+    ingested: files are hashed once to refresh their stamps, nothing is re-embedded.
+
+    Returns:
+        The snapshot header
+    """
+    header, collections, manifest = read_snapshot(snapshot_path, vector_store.embedding_function.model_name)
+    vector_store.import_collections(collections)
+    if manifest is not None:
+        directory = os.path.dirname(manifest_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{manifest_path}.tmp"
+        with open(tmp_path, "wb") as file:
+            file.write(manifest)
+        os.replace(tmp_path, manifest_path)
+    return header
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("export-index", help="Write the configured index to a snapshot").add_argument("snapshot")
+    commands.add_parser("import-index", help="Replace the configured index with a snapshot").add_argument("snapshot")
+    args = parser.parse_args()
+
+    from config import config
+    from vector_store import VectorStore
+
+    store = VectorStore(config.CHROMA_PATH, config.EMBEDDING_MODEL, config.MAX_RESULTS,
+                        vector_backend=config.VECTOR_BACKEND)
+    start = time.perf_counter()
+    if args.command == "export-index":
+        header = export_index(store, config.INGEST_MANIFEST_PATH, args.snapshot)
+        action = f"Exported to {args.snapshot} ({os.path.getsize(args.snapshot) / 1e6:.1f} MB)"
+    else:
+        header = import_index(store, config.INGEST_MANIFEST_PATH, args.snapshot)
+        action = f"Imported {args.snapshot}"
+    counts = ", ".join(f"{count} {name}" for name, count in header["counts"].items())
+    print(f"{action}: {counts}, model {header['embedding_model']}, {time.perf_counter() - start:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+import hashlib
+import json
+import os
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+
+class IngestionManifest:
+    """
+    Persisted record of what has been ingested from each course file.
+
+    Files are grouped by the name of the folder they were ingested from and keyed
+    by their path relative to that folder, so the manifest stays valid when the
+    docs folder is mounted somewhere else. Each entry stores the file's content
+    hash and stamp (size and modification time), the course it produced and the
+    content-addressed IDs of its chunks, alongside the chunking settings those
+    chunks were produced with.
+    """
+
+    VERSION = 1
+
+    def __init__(self, path: str):
+        self.path = path
+        self.folders: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        self.chunking: Optional[str] = None
+        self._load()
+
+    def _load(self):
+        """Load the manifest from disk, starting empty if missing or unreadable"""
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as file:
+                data = json.load(file)
+            if data.get("version") == self.VERSION:
+                self.folders = data.get("folders", {})
+                self.chunking = data.get("chunking")
+            else:
+                print(f"Ignoring ingestion manifest with unsupported version {data.get('version')}")
+        except (OSError, ValueError) as e:
+            print(f"Error reading ingestion manifest: {e}")
+
+    def save(self):
+        """Atomically write the manifest to disk"""
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as file:
+            json.dump({"version": self.VERSION, "chunking": self.chunking, "folders": self.folders}, file, indent=1, sort_keys=True)
+        os.replace(tmp_path, self.path)
+
+    def clear(self):
+        """Forget everything that was ingested"""
+        self.folders = {}
+        self.chunking = None
+
+    @staticmethod
+    def file_digest(file_path: str) -> str:
+        """SHA-256 of a file's bytes, read in blocks"""
+        digest = hashlib.sha256()
+        with open(file_path, 'rb') as file:
+            for block in iter(lambda: file.read(1 << 20), b''):
+                digest.update(block)
+        return digest.hexdigest()
+
+    @staticmethod
+    def file_stamp(file_path: str) -> List[int]:
+        """[size, mtime in nanoseconds] of a file, to detect changes without reading it"""
+        stat = os.stat(file_path)
+        return [stat.st_size, stat.st_mtime_ns]
+
+    @staticmethod
+    def _locate(file_path: str) -> Tuple[str, str]:
+        """Split a file path into its (folder name, file name)"""
+        folder, name = os.path.split(os.path.abspath(file_path))
+        return os.path.basename(folder), name
+
+    @classmethod
+    def key(cls, file_path: str) -> str:
+        """Location-independent key of a file, e.g. 'docs/course1_script.txt'"""
+        return "/".join(cls._locate(file_path))
+
+    def get(self, file_path: str) -> Optional[Dict[str, Any]]:
+        """Get the manifest entry for a file, if it was ingested before"""
+        folder, name = self._locate(file_path)
+        return self.folders.get(folder, {}).get(name)
+
+    def set(self, file_path: str, digest: str, course_title: str, course_digest: str, chunks: Dict[str, int],
+            stamp: Optional[List[int]] = None):
+        """
+        Record a successfully ingested file.
+
+        Args:
+            file_path: Path of the ingested file
+            digest: Content hash of the file
+            course_title: Title of the course the file produced
+            course_digest: Hash of the course catalog entry
+            chunks: Chunk ID -> chunk index for every stored chunk of the file
+            stamp: file_stamp() taken before the file was hashed
+        """
+        folder, name = self._locate(file_path)
+        self.folders.setdefault(folder, {})[name] = {
+            "sha256": digest,
+            "stamp": stamp,
+            "course_title": course_title,
+            "course_sha256": course_digest,
+            "chunks": chunks
+        }
+
+    def restamp(self, file_path: str, stamp: List[int]) -> bool:
+        """Update the stamp of a file whose content hash is unchanged; True if it differed"""
+        entry = self.get(file_path)
+        if entry is None or entry.get("stamp") == stamp:
+            return False
+        entry["stamp"] = stamp
+        return True
+
+    def is_current(self, folder_path: str, file_paths: List[str], chunking: str, indexed_titles: Set[str]) -> bool:
+        """
+        Whether a folder is exactly as it was ingested, judged by file stamps alone.
+
+        Args:
+            folder_path: Folder the files were ingested from
+            file_paths: Course documents currently in the folder
+            chunking: Serialized chunking settings of the next ingestion
+            indexed_titles: Course titles present in the vector store
+
+        Returns:
+            True if the same files are present with unchanged stamps, were chunked
+            with the same settings and all of their courses are still indexed
+        """
+        if self.chunking != chunking:
+            return False
+        recorded = self.folders.get(os.path.basename(os.path.abspath(folder_path)), {})
+        if {self._locate(file_path)[1] for file_path in file_paths} != set(recorded):
+            return False
+        for file_path in file_paths:
+            entry = recorded[self._locate(file_path)[1]]
+            try:
+                stamp = self.file_stamp(file_path)
+            except OSError:
+                return False
+            if entry.get("stamp") != stamp or entry["course_title"] not in indexed_titles:
+                return False
+        return True
+
+    def remove(self, file_path: str):
+        """Drop a file from the manifest"""
+        folder, name = self._locate(file_path)
+        self.folders.get(folder, {}).pop(name, None)
+
+    def files_in_folder(self, folder_path: str) -> List[str]:
+        """Paths of all recorded files that belong to a folder"""
+        folder = os.path.basename(os.path.abspath(folder_path))
+        return [os.path.join(folder_path, name) for name in self.folders.get(folder, {})]
@@ -0,0 +1,399 @@
+import hashlib
+import json
+import multiprocessing
+import queue
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field, fields
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
+from document_processor import DocumentProcessor
+from ingestion_manifest import IngestionManifest
+from models import Course, CourseChunk
+
+
+def _course_file_events(file_path: str, processor_options: Dict[str, Any]
+                        ) -> Iterator[Tuple[str, str, Optional[Course], Any]]:
+    """
+    Parse and chunk one course file lesson by lesson.
+
+    Yields (file_path, "chunks", course, chunks) events, then
+    (file_path, "done", course, truncation audit) or (file_path, "error", None, message).
+    """
+    try:
+        processor = DocumentProcessor(**processor_options)
+        course = None
+        for course, chunks in processor.iter_course_document(file_path):
+            yield file_path, "chunks", course, chunks
+        yield file_path, "done", course, processor.truncation_audit
+    except Exception as e:
+        yield file_path, "error", None, str(e)
+
+
+def _stream_course_file(file_path: str, processor_options: Dict[str, Any], events):
+    """Send one course file's parse events to the ingesting process (runs inside a worker process)"""
+    for event in _course_file_events(file_path, processor_options):
+        events.put(event)
+
+
+@dataclass
+class IngestionStats:
+    """Per-stage counters and timings for one ingestion run"""
+    files: int = 0
+    unchanged_files: int = 0
+    failed_files: int = 0
+    courses: int = 0             # Courses added or changed
+    removed_courses: int = 0
+    chunks: int = 0              # New or changed chunks
+    updated_chunks: int = 0      # Unchanged chunks whose metadata moved
+    deleted_chunks: int = 0
+    embeddings: int = 0
+    audited_chunks: int = 0      # Chunks of parsed files, token mode only
+    truncated_chunks: int = 0    # ... that exceed the embedding model's input limit
+    legacy_chunks: int = 0       # Chunks character sizing would have produced for the same files
+    legacy_truncated_chunks: int = 0
+    parse_seconds: float = 0.0   # Wall time until the last file was parsed and chunked
+    embed_seconds: float = 0.0   # Time spent inside the embedder
+    write_seconds: float = 0.0   # Time spent committing to ChromaDB
+    total_seconds: float = 0.0
+
+    @staticmethod
+    def _rate(count: int, seconds: float) -> float:
+        return count / seconds if seconds > 0 else 0.0
+
+    @property
+    def files_per_second(self) -> float:
+        return self._rate(self.files, self.parse_seconds)
+
+    @property
+    def chunks_per_second(self) -> float:
+        return self._rate(self.chunks, self.parse_seconds)
+
+    @property
+    def embeddings_per_second(self) -> float:
+        return self._rate(self.embeddings, self.embed_seconds)
+
+    def add_truncation_audit(self, audit: Dict[str, int]):
+        """Accumulate a document processor's truncation audit"""
+        self.audited_chunks += audit.get("chunks", 0)
+        self.truncated_chunks += audit.get("truncated", 0)
+        self.legacy_chunks += audit.get("legacy_chunks", 0)
+        self.legacy_truncated_chunks += audit.get("legacy_truncated", 0)
+
+    def summary(self) -> str:
+        """Human readable one-line throughput report"""
+        report = (
+            f"{self.files} files ({self.files_per_second:.1f} files/s, {self.unchanged_files} unchanged), "
+            f"{self.chunks} chunks ({self.chunks_per_second:.1f} chunks/s), "
+            f"{self.embeddings} embeddings ({self.embeddings_per_second:.1f} embeddings/s), "
+            f"{self.deleted_chunks} chunks deleted, "
+            f"write {self.write_seconds:.2f}s, total {self.total_seconds:.2f}s"
+        )
+        if self.audited_chunks:
+            report += (
+                f"; truncated by the embedding model: {self.truncated_chunks}/{self.audited_chunks} chunks "
+                f"(character sizing: {self.legacy_truncated_chunks}/{self.legacy_chunks})"
+            )
+        return report
+
+
+@dataclass
+class _PendingWrites:
+    """Vector store changes staged until the next bulk flush"""
+    deleted_courses: List[str] = field(default_factory=list)
+    deleted_chunk_ids: List[str] = field(default_factory=list)
+    new_chunks: List[CourseChunk] = field(default_factory=list)
+    new_chunk_ids: List[str] = field(default_factory=list)
+    embeddings: List[Any] = field(default_factory=list)  # Computed so far, aligned with new_chunks
+    moved_chunks: List[CourseChunk] = field(default_factory=list)
+    moved_chunk_ids: List[str] = field(default_factory=list)
+    courses: List[Course] = field(default_factory=list)
+    manifest_entries: List[Tuple[str, str, str, str, Dict[str, int], List[int]]] = field(default_factory=list)
+
+    def is_empty(self) -> bool:
+        return not (self.deleted_courses or self.deleted_chunk_ids or self.new_chunks
+                    or self.moved_chunks or self.courses or self.manifest_entries)
+
+    def extend(self, other: "_PendingWrites"):
+        """Append another set of staged writes"""
+        for item in fields(self):
+            getattr(self, item.name).extend(getattr(other, item.name))
+
+
+@dataclass
+class _FileStage:
+    """A file whose chunks are still arriving; its writes join the flush once it is fully parsed"""
+    writes: _PendingWrites
+    old_chunks: Dict[str, int]
+    chunk_index: Dict[str, int] = field(default_factory=dict)  # Chunk ID -> index for the manifest
+    seen: Dict[str, int] = field(default_factory=dict)         # Chunk ID occurrence counts
+    skipped: bool = False
+
+
+class IngestionPipeline:
+    """
+    Pipelined ingestion: parse and chunk course files in a process pool while a
+    single embedder consumes the chunks in fixed-size batches and commits them
+    to the vector store in bulk.
+
+    Workers stream chunks back lesson by lesson, so large documents are embedded
+    while they are still being extracted.
+    """
+
+    def __init__(self, vector_store, processor_options: Dict[str, Any],
+                 max_workers: int = 1, batch_size: int = 64):
+        """
+        Args:
+            vector_store: Store that receives embeddings and catalog entries
+            processor_options: DocumentProcessor keyword arguments, passed to every worker
+            max_workers: Processes used to parse and chunk files
+            batch_size: Chunks embedded per batch
+        """
+        self.vector_store = vector_store
+        self.processor_options = dict(processor_options)
+        self.max_workers = max_workers
+        self.batch_size = max(1, batch_size)
+
+    @staticmethod
+    def chunking_key(processor_options: Dict[str, Any]) -> str:
+        """Serialized chunking settings, recorded in the manifest"""
+        return json.dumps(processor_options, sort_keys=True)
+
+    def run(self, file_paths: List[str], manifest: IngestionManifest,
+            removed_files: List[str] = ()) -> Tuple[int, int, IngestionStats]:
+        """
+        Incrementally ingest course files against the ingestion manifest.
+
+        Files whose bytes are unchanged are not even parsed. For changed files only
+        new chunks are embedded, chunks that disappeared are deleted and chunks that
+        merely moved get a metadata update.
+
+        Args:
+            file_paths: Course documents currently in the folder
+            manifest: Ingestion manifest, updated and saved after every flush
+            removed_files: Previously ingested files that no longer exist
+
+        Returns:
+            Tuple of (courses added or changed, chunks embedded, ingestion stats)
+        """
+        stats = IngestionStats()
+        pending = _PendingWrites()
+        start = time.perf_counter()
+        existing_titles = set(self.vector_store.get_existing_course_titles())
+
+        # Chunk boundaries depend on the chunking settings, so changing them re-chunks every file
+        chunking = self.chunking_key(self.processor_options)
+        rechunk = manifest.chunking != chunking
+        manifest.chunking = chunking
+
+        # Courses whose source file was deleted
+        for file_path in removed_files:
+            entry = manifest.get(file_path)
+            if entry:
+                pending.deleted_courses.append(entry["course_title"])
+                stats.removed_courses += 1
+                print(f"Removing course: {entry['course_title']} (source file deleted)")
+            manifest.remove(file_path)
+
+        # Only files whose content hash changed need parsing
+        claimed_titles: Dict[str, str] = {}
+        digests: Dict[str, str] = {}
+        stamps: Dict[str, List[int]] = {}
+        restamped = False
+        changed_files = []
+        for file_path in file_paths:
+            entry = manifest.get(file_path)
+            if entry and entry["course_title"] not in existing_titles:
+                # The manifest outlived the data it describes
+                manifest.remove(file_path)
+                entry = None
+            if entry:
+                claimed_titles[entry["course_title"]] = manifest.key(file_path)
+
+            try:
+                # Stamp first, so a write racing the hash leaves a stale stamp rather than a stale hash
+                stamp = manifest.file_stamp(file_path)
+                digest = manifest.file_digest(file_path)
+            except OSError as e:
+                stats.failed_files += 1
+                print(f"Error reading {file_path}: {e}")
+                continue
+
+            if entry and entry["sha256"] == digest and not rechunk:
+                stats.unchanged_files += 1
+                # Touched but identical: record the new stamp so the next startup can skip hashing it
+                restamped = manifest.restamp(file_path, stamp) or restamped
+            else:
+                digests[file_path] = digest
+                stamps[file_path] = stamp
+                changed_files.append(file_path)
+
+        stages: Dict[str, _FileStage] = {}
+        for file_path, event, course, payload in self._parse_events(changed_files, stats, start):
+            if event == "error":
+                # Nothing of a failed file is written
+                stages.pop(file_path, None)
+                stats.failed_files += 1
+                print(f"Error processing {file_path}: {payload}")
+                continue
+
+            stage = stages.get(file_path)
+            if stage is None:
+                stage = stages[file_path] = self._start_file(
+                    file_path, course, manifest, existing_titles, claimed_titles
+                )
+
+            if event == "chunks":
+                if not stage.skipped:
+                    self._stage_chunks(payload, stage, stats)
+                    # Embed full batches of a large file while the rest is still being extracted
+                    self._embed_pending(stage.writes, stats, full_batches_only=True)
+                continue
+
+            del stages[file_path]
+            stats.files += 1
+            stats.add_truncation_audit(payload)
+            if not stage.skipped:
+                self._finish_file(file_path, digests[file_path], stamps[file_path], course, stage,
+                                  manifest, pending, stats)
+
+            if len(pending.new_chunks) >= self.batch_size:
+                self._flush(pending, manifest, stats)
+                pending = _PendingWrites()
+
+        self._flush(pending, manifest, stats)
+        if restamped and pending.is_empty():
+            manifest.save()
+        stats.total_seconds = time.perf_counter() - start
+        return stats.courses, stats.chunks, stats
+
+    def _start_file(self, file_path: str, course: Course, manifest: IngestionManifest,
+                    existing_titles: Set[str], claimed_titles: Dict[str, str]) -> _FileStage:
+        """Decide how a file's course is staged once its header has been parsed"""
+        key = manifest.key(file_path)
+        owner = claimed_titles.get(course.title)
+        if owner and owner != key:
+            print(f"Course already exists: {course.title} (from {owner}) - skipping {key}")
+            return _FileStage(writes=_PendingWrites(), old_chunks={}, skipped=True)
+        claimed_titles[course.title] = key
+
+        writes = _PendingWrites()
+        entry = manifest.get(file_path)
+        old_chunks: Dict[str, int] = entry["chunks"] if entry else {}
+        if entry and entry["course_title"] != course.title:
+            # Renamed course: every chunk ID changes with the title
+            writes.deleted_courses.append(entry["course_title"])
+            old_chunks = {}
+        elif not entry and course.title in existing_titles:
+            # Indexed before the manifest existed, so its chunk IDs are unknown
+            writes.deleted_courses.append(course.title)
+        return _FileStage(writes=writes, old_chunks=old_chunks)
+
+    def _stage_chunks(self, chunks: List[CourseChunk], stage: _FileStage, stats: IngestionStats):
+        """Diff a batch of a file's chunks against its manifest entry"""
+        writes = stage.writes
+        for chunk_id, chunk in zip(self.vector_store.chunk_ids(chunks, stage.seen), chunks):
+            stage.chunk_index[chunk_id] = chunk.chunk_index
+            if chunk_id not in stage.old_chunks:
+                writes.new_chunks.append(chunk)
+                writes.new_chunk_ids.append(chunk_id)
+            elif stage.old_chunks[chunk_id] != chunk.chunk_index:
+                writes.moved_chunks.append(chunk)
+                writes.moved_chunk_ids.append(chunk_id)
+                stats.updated_chunks += 1
+
+    def _finish_file(self, file_path: str, digest: str, stamp: List[int], course: Course, stage: _FileStage,
+                     manifest: IngestionManifest, pending: _PendingWrites, stats: IngestionStats):
+        """Stage the writes of a fully parsed file for the next flush"""
+        writes = stage.writes
+        entry = manifest.get(file_path)
+        orphaned_ids = [chunk_id for chunk_id in stage.old_chunks if chunk_id not in stage.chunk_index]
+        writes.deleted_chunk_ids.extend(orphaned_ids)
+        stats.deleted_chunks += len(orphaned_ids)
+
+        course_digest = hashlib.sha256(course.model_dump_json().encode('utf-8')).hexdigest()
+        if not entry or entry.get("course_sha256") != course_digest or course.title in writes.deleted_courses:
+            writes.courses.append(course)
+        writes.manifest_entries.append((file_path, digest, course.title, course_digest, stage.chunk_index, stamp))
+
+        # Keep embeddings aligned with new chunks when the file was partly embedded while streaming
+        if writes.embeddings:
+            self._embed_pending(pending, stats)
+        pending.extend(writes)
+
+        new_count = len(writes.new_chunks)
+        stats.courses += 1
+        stats.chunks += new_count
+        print(f"Indexed course: {course.title} ({new_count} new, {len(orphaned_ids)} deleted, "
+              f"{len(stage.chunk_index) - new_count} unchanged chunks)")
+
+    def _parse_events(self, file_paths: List[str], stats: IngestionStats,
+                      start: float) -> Iterator[Tuple[str, str, Optional[Course], Any]]:
+        """Yield (file_path, event, course, payload) parse events as chunks become available"""
+        if self.max_workers <= 1 or len(file_paths) <= 1:
+            for file_path in file_paths:
+                yield from _course_file_events(file_path, self.processor_options)
+                stats.parse_seconds = time.perf_counter() - start
+            return
+
+        # Spawn rather than fork so workers never inherit the embedding model's threads
+        context = multiprocessing.get_context("spawn")
+        workers = min(self.max_workers, len(file_paths))
+        with context.Manager() as manager, \
+                ProcessPoolExecutor(max_workers=workers, mp_context=context) as executor:
+            events = manager.Queue(maxsize=workers * 4)  # Backpressure when the embedder falls behind
+            futures = {
+                executor.submit(_stream_course_file, file_path, self.processor_options, events): file_path
+                for file_path in file_paths
+            }
+
+            remaining = len(futures)
+            while remaining:
+                try:
+                    file_path, event, course, payload = events.get(timeout=1.0)
+                except queue.Empty:
+                    # A worker that died never reports back
+                    crashed = [future for future in futures if future.done() and future.exception()]
+                    for future in crashed:
+                        remaining -= 1
+                        yield futures.pop(future), "error", None, str(future.exception())
+                    continue
+
+                if event != "chunks":
+                    remaining -= 1
+                    stats.parse_seconds = max(stats.parse_seconds, time.perf_counter() - start)
+                yield file_path, event, course, payload
+
+    def _embed_pending(self, pending: _PendingWrites, stats: IngestionStats, full_batches_only: bool = False):
+        """Embed staged chunks that have no embedding yet, in batches"""
+        while len(pending.embeddings) < len(pending.new_chunks):
+            offset = len(pending.embeddings)
+            batch = [chunk.content for chunk in pending.new_chunks[offset:offset + self.batch_size]]
+            if full_batches_only and len(batch) < self.batch_size:
+                return
+            embed_start = time.perf_counter()
+            pending.embeddings.extend(self.vector_store.embed_texts(batch))
+            stats.embed_seconds += time.perf_counter() - embed_start
+            stats.embeddings += len(batch)
+
+    def _flush(self, pending: _PendingWrites, manifest: IngestionManifest, stats: IngestionStats):
+        """Embed staged chunks in batches, commit all staged writes and persist the manifest"""
+        if pending.is_empty():
+            return
+
+        self._embed_pending(pending, stats)
+
+        # Deletes first, catalog last: a course only becomes visible once all its chunks are stored
+        write_start = time.perf_counter()
+        for course_title in pending.deleted_courses:
+            self.vector_store.delete_course(course_title)
+        self.vector_store.delete_chunks(pending.deleted_chunk_ids)
+        self.vector_store.add_course_content(pending.new_chunks, embeddings=pending.embeddings, ids=pending.new_chunk_ids)
+        self.vector_store.update_chunk_metadata(pending.moved_chunks, pending.moved_chunk_ids)
+        self.vector_store.add_courses_metadata(pending.courses)
+        self.vector_store.persist()
+        stats.write_seconds += time.perf_counter() - write_start
+
+        # Only record files once their writes are committed
+        for file_path, digest, course_title, course_digest, chunk_index, stamp in pending.manifest_entries:
+            manifest.set(file_path, digest, course_title, course_digest, chunk_index, stamp)
+        manifest.save()
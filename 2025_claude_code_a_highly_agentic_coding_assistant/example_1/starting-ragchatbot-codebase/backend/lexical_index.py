@@ -0,0 +1,135 @@
+import math
+import re
+import threading
+from collections import Counter, defaultdict
+from typing import Any, Dict, List, Optional, Tuple
+
+_TOKEN_PATTERN = re.compile(r"\w+")
+
+# Function words that carry no lexical signal for course content
+_STOPWORDS = frozenset("""
+a an and are as at be but by can do for from has have how i if in into is it its
+of on or so that the their then there these this to was we what when which who
+will with you your
+""".split())
+
+
+def tokenize(text: str) -> List[str]:
+    """Lower-cased word tokens without stopwords; keeps identifiers like tool_use intact"""
+    return [token for token in _TOKEN_PATTERN.findall(text.lower()) if token not in _STOPWORDS]
+
+
+class BM25Index:
+    """In-memory BM25 inverted index over course chunks with course/lesson filtering"""
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self._lock = threading.Lock()
+        self._postings: Dict[str, Dict[str, int]] = defaultdict(dict)  # term -> {chunk id: term frequency}
+        self._doc_terms: Dict[str, List[str]] = {}                      # chunk id -> distinct terms
+        self._doc_lengths: Dict[str, int] = {}
+        self._doc_filters: Dict[str, Tuple[Optional[str], Optional[int]]] = {}  # chunk id -> (course, lesson)
+        self._total_length = 0
+
+    def __len__(self) -> int:
+        return len(self._doc_lengths)
+
+    def document_frequency(self, term: str) -> int:
+        """Number of indexed chunks containing a (tokenized) term"""
+        return len(self._postings.get(term, ()))
+
+    def add(self, ids: List[str], documents: List[str], metadatas: List[Dict[str, Any]]):
+        """Index chunks, replacing any existing chunk with the same ID"""
+        with self._lock:
+            for chunk_id, document, metadata in zip(ids, documents, metadatas):
+                self._remove(chunk_id)
+                counts = Counter(tokenize(document))
+                for term, frequency in counts.items():
+                    self._postings[term][chunk_id] = frequency
+                length = sum(counts.values())
+                self._doc_terms[chunk_id] = list(counts)
+                self._doc_lengths[chunk_id] = length
+                self._doc_filters[chunk_id] = (metadata.get("course_title"), metadata.get("lesson_number"))
+                self._total_length += length
+
+    def remove(self, ids: List[str]):
+        """Drop chunks from the index"""
+        with self._lock:
+            for chunk_id in ids:
+                self._remove(chunk_id)
+
+    def remove_course(self, course_title: str):
+        """Drop every chunk of a course"""
+        with self._lock:
+            for chunk_id in [cid for cid, (course, _) in self._doc_filters.items() if course == course_title]:
+                self._remove(chunk_id)
+
+    def clear(self):
+        """Drop everything"""
+        with self._lock:
+            self._postings.clear()
+            self._doc_terms.clear()
+            self._doc_lengths.clear()
+            self._doc_filters.clear()
+            self._total_length = 0
+
+    def _remove(self, chunk_id: str):
+        """Remove one chunk (caller holds the lock)"""
+        terms = self._doc_terms.pop(chunk_id, None)
+        if terms is None:
+            return
+        for term in terms:
+            postings = self._postings[term]
+            postings.pop(chunk_id, None)
+            if not postings:
+                del self._postings[term]
+        self._total_length -= self._doc_lengths.pop(chunk_id)
+        del self._doc_filters[chunk_id]
+
+    def search(self, query: str, limit: int,
+               course_title: Optional[str] = None,
+               lesson_number: Optional[int] = None) -> List[Tuple[str, float]]:
+        """
+        Rank chunks by BM25 score.
+
+        Args:
+            query: Free text query
+            limit: Maximum number of results
+            course_title: Only return chunks of this course
+            lesson_number: Only return chunks of this lesson
+
+        Returns:
+            List of (chunk ID, score), best first
+        """
+        terms = set(tokenize(query))
+        with self._lock:
+            doc_count = len(self._doc_lengths)
+            if not terms or not doc_count:
+                return []
+            average_length = self._total_length / doc_count
+            scores: Dict[str, float] = defaultdict(float)
+            for term in terms:
+                postings = self._postings.get(term)
+                if not postings:
+                    continue
+                idf = math.log(1 + (doc_count - len(postings) + 0.5) / (len(postings) + 0.5))
+                for chunk_id, frequency in postings.items():
+                    course, lesson = self._doc_filters[chunk_id]
+                    if course_title is not None and course != course_title:
+                        continue
+                    if lesson_number is not None and lesson != lesson_number:
+                        continue
+                    norm = self.k1 * (1 - self.b + self.b * self._doc_lengths[chunk_id] / average_length)
+                    scores[chunk_id] += idf * frequency * (self.k1 + 1) / (frequency + norm)
+
+        return sorted(scores.items(), key=lambda item: item[1], reverse=True)[:limit]
+
+
+def reciprocal_rank_fusion(rankings: List[List[str]], k: int = 60) -> List[Tuple[str, float]]:
+    """Fuse several ranked ID lists: score(id) = sum over lists of 1 / (k + rank)"""
+    scores: Dict[str, float] = defaultdict(float)
+    for ranking in rankings:
+        for rank, chunk_id in enumerate(ranking, start=1):
+            scores[chunk_id] += 1.0 / (k + rank)
+    return sorted(scores.items(), key=lambda item: item[1], reverse=True)
@@ -0,0 +1,749 @@
+import atexit
+import json
+import os
+import shutil
+import threading
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+_NULL_INT = np.iinfo(np.int64).min  # Stands for None in int columns
+_NULL_CODE = -1                     # Stands for None in string columns
+_BLOCK_ROWS = 16384                 # Rows upcast to float32 per matmul, bounds temporary memory
+
+
+def _grow(array: np.ndarray, needed: int) -> np.ndarray:
+    """Return array, or a copy with doubled capacity if it holds fewer than needed rows"""
+    if len(array) >= needed:
+        return array
+    grown = np.empty(max(needed, 2 * len(array), 1024), dtype=array.dtype)
+    grown[:len(array)] = array
+    return grown
+
+
+class _Column:
+    """
+    One metadata key over all rows: int64 values, float64 values, or
+    dictionary-encoded strings. Missing values are stored as a sentinel.
+    """
+
+    def __init__(self, kind: str, values: np.ndarray, table: Optional[List[str]] = None):
+        self.kind = kind      # "int", "float" or "str"
+        self.values = values  # Capacity may exceed the row count
+        self.table: List[str] = table or []
+        self._codes = {value: code for code, value in enumerate(self.table)}
+
+    @classmethod
+    def empty(cls, kind: str, capacity: int) -> '_Column':
+        """A column of missing values"""
+        column = cls(kind, np.empty(capacity, dtype=cls._dtype(kind)))
+        column.values[:] = cls._null(kind)
+        return column
+
+    @staticmethod
+    def _dtype(kind: str):
+        return {"int": np.int64, "float": np.float64, "str": np.int32}[kind]
+
+    @staticmethod
+    def _null(kind: str):
+        return {"int": _NULL_INT, "float": np.nan, "str": _NULL_CODE}[kind]
+
+    @staticmethod
+    def kind_of(value: Any) -> Optional[str]:
+        """Column kind needed to store value, None for a missing value"""
+        if value is None:
+            return None
+        if isinstance(value, (bool, int, np.integer)):
+            return "int"
+        if isinstance(value, (float, np.floating)):
+            return "float"
+        return "str"
+
+    def widen(self, kind: str, count: int):
+        """Convert the column so it can also hold values of the given kind"""
+        order = ["int", "float", "str"]
+        if order.index(kind) <= order.index(self.kind):
+            return
+        old = [self.get(row) for row in range(count)]
+        self.kind, self.table, self._codes = kind, [], {}
+        self.values = np.empty(len(self.values), dtype=self._dtype(kind))
+        self.values[:] = self._null(kind)
+        self.set(range(count), old)
+
+    def encode(self, value: Any):
+        """Storage representation of a value"""
+        if value is None:
+            return self._null(self.kind)
+        if self.kind == "str":
+            value = str(value)
+            code = self._codes.get(value)
+            if code is None:
+                code = self._codes[value] = len(self.table)
+                self.table.append(value)
+            return code
+        return value
+
+    def set(self, rows: Sequence[int], values: Sequence[Any]):
+        """Store values at the given rows"""
+        for row, value in zip(rows, values):
+            self.values[row] = self.encode(value)
+
+    def get(self, row: int) -> Any:
+        """Python value at a row"""
+        value = self.values[row]
+        if self.kind == "str":
+            return None if value == _NULL_CODE else self.table[value]
+        if self.kind == "int":
+            return None if value == _NULL_INT else int(value)
+        return None if np.isnan(value) else float(value)
+
+    def equals(self, value: Any, count: int) -> np.ndarray:
+        """Bitmap of the rows holding value"""
+        values = self.values[:count]
+        if self.kind == "str":
+            code = self._codes.get(str(value))
+            return values == code if code is not None else np.zeros(count, dtype=bool)
+        if self.kind_of(value) == "str":
+            return np.zeros(count, dtype=bool)
+        return values == value
+
+
+class MemmapCollection:
+    """
+    Chroma-compatible collection backed by a float16 embedding matrix that is
+    memory-mapped from disk, with documents in an append-only file and metadata
+    in a column store.
+
+    Rows are append-only: upserts append and tombstone the previous row of an ID,
+    deletes tombstone, and persist() compacts once enough rows are dead. Search is
+    an exact L2 scan by BLAS matmul, optionally limited to the nearest IVF
+    partitions. Metadata filters are answered from per-value row bitmaps that are
+    built on first use and kept until the next write.
+
+    BLAS has no float16 kernels and upcasting costs several times the matmul
+    itself, so while the matrix fits in scan_cache_mb a float32 copy is kept in
+    memory and extended as rows are appended. Larger matrices are upcast block by
+    block during each scan.
+
+    Writes become durable on persist(); anything appended after the last
+    snapshot is discarded on the next open. Compaction writes new data files
+    named for the snapshot generation that references them, and columns.json is
+    replaced atomically, so a crash at any point leaves the previous snapshot and
+    its files intact. Files no snapshot references are removed on open.
+    """
+
+    _SNAPSHOT = "columns.json"
+    _EMBEDDINGS = "embeddings.f16"  # Data files of stores written before files were generation-named
+    _DOCUMENTS = "documents.bin"
+
+    def __init__(self, path: str, name: str, embedding_function: Optional[Callable] = None,
+                 ivf_lists: int = 0, ivf_probe: int = 8, scan_cache_mb: int = 512):
+        self.path = path
+        self.name = name
+        self._embedding_function = embedding_function
+        self.ivf_lists = ivf_lists  # IVF partitions, 0 for exact search only
+        self.ivf_probe = ivf_probe  # Partitions scanned per query
+        self.scan_cache_bytes = scan_cache_mb * 1024 * 1024
+        self._lock = threading.RLock()
+        self._scan_cache: Optional[Tuple[int, int, np.ndarray]] = None  # (layout, rows filled, float32 rows)
+        self._scan_cache_lock = threading.Lock()
+        os.makedirs(path, exist_ok=True)
+        self._load()
+
+    # -- storage --------------------------------------------------------------
+
+    def _file(self, name: str) -> str:
+        return os.path.join(self.path, name)
+
+    @staticmethod
+    def _data_files(generation: int) -> Tuple[str, str]:
+        """Embedding and document file names written by the snapshot of a generation"""
+        return f"embeddings-{generation}.f16", f"documents-{generation}.bin"
+
+    def _open_data_files(self):
+        self._embedding_file = open(self._file(self._embeddings_name), "ab")
+        self._document_file = open(self._file(self._documents_name), "ab")
+        self._document_fd = os.open(self._file(self._documents_name), os.O_RDONLY)
+
+    def _close_data_files(self):
+        self._embedding_file.close()
+        self._document_file.close()
+        os.close(self._document_fd)
+        self._matrix = None
+
+    def _remove_unreferenced(self, snapshot: Optional[Dict[str, Any]]):
+        """Delete files left by a crash: compaction output or replaced files no snapshot references"""
+        keep = {self._SNAPSHOT, self._embeddings_name, self._documents_name}
+        if snapshot is not None:
+            keep.add(snapshot["arrays"])
+        for name in os.listdir(self.path):
+            if name not in keep and name.startswith(("embeddings", "documents", "columns")):
+                os.remove(self._file(name))
+
+    def _load(self):
+        """Open the last snapshot, dropping rows appended after it was written"""
+        self._generation = 0
+        self._count = 0                      # Rows ever appended, dead ones included
+        self._dim: Optional[int] = None
+        self._ids: List[str] = []
+        self._row_of: Dict[str, int] = {}    # Live rows only
+        self._alive = np.zeros(0, dtype=bool)
+        self._doc_offsets = np.zeros(0, dtype=np.int64)
+        self._doc_lengths = np.zeros(0, dtype=np.int32)
+        self._norms = np.zeros(0, dtype=np.float32)    # Squared L2 norm per row
+        self._columns: Dict[str, _Column] = {}
+        self._centroids: Optional[np.ndarray] = None
+        self._lists = np.zeros(0, dtype=np.int32)      # IVF partition per row
+        self._trained_rows = 0
+        self._layout = 0                     # Bumped when compaction renumbers rows
+        self._embeddings_name, self._documents_name = self._data_files(0)
+        self._replaced_files: List[str] = []  # Data files to delete once a snapshot stops referencing them
+        doc_bytes = 0
+
+        snapshot = None
+        snapshot_path = self._file(self._SNAPSHOT)
+        if os.path.exists(snapshot_path):
+            with open(snapshot_path, encoding="utf-8") as f:
+                snapshot = json.load(f)
+            self._embeddings_name = snapshot.get("embeddings", self._EMBEDDINGS)
+            self._documents_name = snapshot.get("documents", self._DOCUMENTS)
+            arrays = np.load(self._file(snapshot["arrays"]))
+            self._generation = snapshot["generation"]
+            self._count = len(snapshot["ids"])
+            self._dim = snapshot["dim"]
+            self._ids = snapshot["ids"]
+            self._alive = arrays["alive"].copy()
+            self._doc_offsets = arrays["doc_offsets"].copy()
+            self._doc_lengths = arrays["doc_lengths"].copy()
+            self._norms = arrays["norms"].copy()
+            self._lists = arrays["lists"].copy()
+            self._trained_rows = snapshot["trained_rows"]
+            if "centroids" in arrays:
+                self._centroids = arrays["centroids"]
+            for key, column in snapshot["columns"].items():
+                self._columns[key] = _Column(column["kind"], arrays[f"column:{key}"].copy(), column["table"])
+            self._row_of = {self._ids[row]: int(row) for row in np.flatnonzero(self._alive)}
+            doc_bytes = snapshot["doc_bytes"]
+        self._remove_unreferenced(snapshot)
+
+        # Truncate to the snapshot, then append from there
+        embedding_bytes = self._count * (self._dim or 0) * 2
+        for name, size in ((self._embeddings_name, embedding_bytes), (self._documents_name, doc_bytes)):
+            with open(self._file(name), "ab") as f:
+                f.truncate(size)
+        self._open_data_files()
+        self._doc_bytes = doc_bytes
+        self._matrix: Optional[np.ndarray] = None
+        self._bitmaps: Dict[Tuple[str, Any], np.ndarray] = {}
+        self._inverted: Optional[List[np.ndarray]] = None
+        self._dirty = False
+        self._closed = False
+
+    def close(self):
+        """Release file handles; unpersisted writes are lost"""
+        with self._lock:
+            self._closed = True
+            self._close_data_files()
+
+    def persist(self):
+        """Make all writes durable: compact, (re)train IVF and write a new snapshot"""
+        with self._lock:
+            if self._closed or not self._dirty:
+                return
+            generation = self._generation + 1
+            dead = self._count - len(self._row_of)
+            if dead > max(1024, self._count // 4):
+                self._compact(generation)
+            if self.ivf_lists and self._count >= 4 * self.ivf_lists and self._count >= 2 * self._trained_rows:
+                self._train_ivf()
+
+            self._embedding_file.flush()
+            self._document_file.flush()
+            os.fsync(self._embedding_file.fileno())
+            os.fsync(self._document_file.fileno())
+
+            count = self._count
+            arrays = {
+                "alive": self._alive[:count],
+                "doc_offsets": self._doc_offsets[:count],
+                "doc_lengths": self._doc_lengths[:count],
+                "norms": self._norms[:count],
+                "lists": self._lists[:count],
+            }
+            if self._centroids is not None:
+                arrays["centroids"] = self._centroids
+            for key, column in self._columns.items():
+                arrays[f"column:{key}"] = column.values[:count]
+
+            arrays_name = f"columns-{generation}.npz"
+            with open(self._file(arrays_name), "wb") as f:
+                np.savez(f, **arrays)
+                f.flush()
+                os.fsync(f.fileno())
+            snapshot = {
+                "generation": generation,
+                "arrays": arrays_name,
+                "embeddings": self._embeddings_name,
+                "documents": self._documents_name,
+                "dim": self._dim,
+                "ids": self._ids,
+                "doc_bytes": self._doc_bytes,
+                "trained_rows": self._trained_rows,
+                "columns": {key: {"kind": column.kind, "table": column.table}
+                            for key, column in self._columns.items()},
+            }
+            temp_path = self._file(self._SNAPSHOT + ".tmp")
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump(snapshot, f)
+                f.flush()
+                os.fsync(f.fileno())
+            # The commit point: until here a crash reopens the previous snapshot and its files
+            os.replace(temp_path, self._file(self._SNAPSHOT))
+
+            for name in [f"columns-{self._generation}.npz", *self._replaced_files]:
+                if os.path.exists(self._file(name)):
+                    os.remove(self._file(name))
+            self._replaced_files = []
+            self._generation = generation
+            self._dirty = False
+
+    def _compact(self, generation: int):
+        """
+        Copy the live rows into new data files for the snapshot of the given generation.
+
+        The current files stay untouched, since the last snapshot still points at
+        them; persist() deletes them once the new snapshot is in place.
+        """
+        live = np.flatnonzero(self._alive[:self._count])
+        matrix = self._mapped_matrix()
+
+        embeddings_name, documents_name = self._data_files(generation)
+        embeddings_path, documents_path = self._file(embeddings_name), self._file(documents_name)
+        offsets = np.empty(len(live), dtype=np.int64)
+        position = 0
+        with open(embeddings_path, "wb") as embeddings, open(documents_path, "wb") as documents:
+            for start in range(0, len(live), _BLOCK_ROWS):
+                rows = live[start:start + _BLOCK_ROWS]
+                embeddings.write(np.ascontiguousarray(matrix[rows]).tobytes())
+                for i, row in enumerate(rows, start=start):
+                    offsets[i] = position
+                    position += documents.write(self._read_document(row))
+            for f in (embeddings, documents):
+                f.flush()
+                os.fsync(f.fileno())
+
+        self._close_data_files()
+        self._replaced_files += [self._embeddings_name, self._documents_name]
+        self._embeddings_name, self._documents_name = embeddings_name, documents_name
+        self._open_data_files()
+
+        self._count = len(live)
+        self._doc_bytes = position
+        self._ids = [self._ids[row] for row in live]
+        self._row_of = {chunk_id: row for row, chunk_id in enumerate(self._ids)}
+        self._alive = np.ones(len(live), dtype=bool)
+        self._doc_offsets = offsets
+        self._doc_lengths = self._doc_lengths[live]
+        self._norms = self._norms[live]
+        self._lists = self._lists[live]
+        for column in self._columns.values():
+            column.values = column.values[live]
+        self._layout += 1
+        with self._scan_cache_lock:
+            self._scan_cache = None
+        self._invalidate()
+
+    def _mapped_matrix(self) -> np.ndarray:
+        """Read-only float16 view of all appended embeddings, remapped as the file grows"""
+        matrix = self._matrix
+        if matrix is None or len(matrix) < self._count:
+            self._embedding_file.flush()
+            if self._count == 0:
+                matrix = np.zeros((0, self._dim or 0), dtype=np.float16)
+            else:
+                matrix = np.memmap(self._file(self._embeddings_name), dtype=np.float16, mode="r",
+                                   shape=(self._count, self._dim))
+            self._matrix = matrix
+        return matrix
+
+    def _read_document(self, row: int) -> bytes:
+        return os.pread(self._document_fd, int(self._doc_lengths[row]), int(self._doc_offsets[row]))
+
+    def _invalidate(self):
+        """Drop bitmaps and inverted lists derived from the rows"""
+        self._bitmaps = {}
+        self._inverted = None
+        self._dirty = True
+
+    # -- IVF ------------------------------------------------------------------
+
+    def _train_ivf(self, iterations: int = 10, sample_per_list: int = 64):
+        """k-means centroids over a sample of live rows, then assign every row"""
+        matrix = self._mapped_matrix()
+        live = np.flatnonzero(self._alive[:self._count])
+        rng = np.random.default_rng(0)
+        sample = np.sort(rng.choice(live, min(len(live), self.ivf_lists * sample_per_list), replace=False))
+        vectors = np.asarray(matrix[sample], dtype=np.float32)
+        centroids = vectors[rng.choice(len(vectors), self.ivf_lists, replace=False)].copy()
+        for _ in range(iterations):
+            assignment = self._nearest_centroids(vectors, centroids)
+            for list_id in range(self.ivf_lists):
+                members = vectors[assignment == list_id]
+                if len(members):
+                    centroids[list_id] = members.mean(axis=0)
+
+        self._centroids = centroids
+        for start in range(0, self._count, _BLOCK_ROWS):
+            block = np.asarray(matrix[start:start + _BLOCK_ROWS], dtype=np.float32)
+            self._lists[start:start + len(block)] = self._nearest_centroids(block, centroids)
+        self._trained_rows = self._count
+        self._inverted = None
+
+    @staticmethod
+    def _nearest_centroids(vectors: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+        distances = (centroids * centroids).sum(axis=1) - 2 * vectors @ centroids.T
+        return distances.argmin(axis=1).astype(np.int32)
+
+    def _inverted_lists(self) -> List[np.ndarray]:
+        """Rows of each IVF partition, rebuilt after writes"""
+        inverted = self._inverted
+        if inverted is None:
+            lists = self._lists[:self._count]
+            order = np.argsort(lists, kind="stable")
+            bounds = np.searchsorted(lists[order], np.arange(len(self._centroids) + 1))
+            inverted = [order[bounds[i]:bounds[i + 1]] for i in range(len(self._centroids))]
+            self._inverted = inverted
+        return inverted
+
+    # -- filters --------------------------------------------------------------
+
+    def _bitmap(self, key: str, value: Any) -> np.ndarray:
+        """Rows whose metadata key equals value"""
+        cache_key = (key, value)
+        bitmap = self._bitmaps.get(cache_key)
+        if bitmap is None:
+            column = self._columns.get(key)
+            if column is None:
+                bitmap = np.zeros(self._count, dtype=bool)
+            else:
+                bitmap = column.equals(value, self._count)
+            self._bitmaps[cache_key] = bitmap
+        return bitmap
+
+    def _where_mask(self, where: Optional[Dict[str, Any]]) -> np.ndarray:
+        """Live rows matching a Chroma where filter ($and, $or, $eq, $ne, $in)"""
+        alive = self._alive[:self._count]
+        return alive if not where else alive & self._match(where)
+
+    def _match(self, where: Dict[str, Any]) -> np.ndarray:
+        if len(where) != 1:
+            return np.logical_and.reduce([self._match({key: value}) for key, value in where.items()])
+        (key, condition), = where.items()
+        if key == "$and":
+            return np.logical_and.reduce([self._match(clause) for clause in condition])
+        if key == "$or":
+            return np.logical_or.reduce([self._match(clause) for clause in condition])
+        if not isinstance(condition, dict):
+            return self._bitmap(key, condition)
+        (operator, value), = condition.items()
+        if operator == "$eq":
+            return self._bitmap(key, value)
+        if operator == "$ne":
+            return ~self._bitmap(key, value)
+        if operator == "$in":
+            return np.logical_or.reduce([self._bitmap(key, item) for item in value] or [np.zeros(self._count, bool)])
+        raise ValueError(f"Unsupported filter operator: {operator}")
+
+    # -- Chroma collection interface ------------------------------------------
+
+    def count(self) -> int:
+        return len(self._row_of)
+
+    def add(self, ids: List[str], documents: Optional[List[str]] = None,
+            metadatas: Optional[List[Dict[str, Any]]] = None, embeddings=None):
+        self.upsert(ids=ids, documents=documents, metadatas=metadatas, embeddings=embeddings)
+
+    def upsert(self, ids: List[str], documents: Optional[List[str]] = None,
+               metadatas: Optional[List[Dict[str, Any]]] = None, embeddings=None):
+        """Append rows, replacing any live rows with the same IDs"""
+        if not ids:
+            return
+        documents = documents if documents is not None else [""] * len(ids)
+        metadatas = metadatas if metadatas is not None else [{}] * len(ids)
+        if embeddings is None:
+            embeddings = self._embedding_function(documents)
+        vectors = np.asarray(embeddings, dtype=np.float32).astype(np.float16)
+        encoded = [document.encode("utf-8") for document in documents]
+
+        with self._lock:
+            if self._dim is None:
+                self._dim = vectors.shape[1]
+            elif vectors.shape[1] != self._dim:
+                raise ValueError(f"Embedding dimension {vectors.shape[1]} does not match collection dimension {self._dim}")
+
+            start, end = self._count, self._count + len(ids)
+            for name in ("_alive", "_doc_offsets", "_doc_lengths", "_norms", "_lists"):
+                setattr(self, name, _grow(getattr(self, name), end))
+            for column in self._columns.values():
+                if len(column.values) < end:
+                    grown = _grow(column.values, end)
+                    grown[len(column.values):] = column._null(column.kind)
+                    column.values = grown
+
+            self._embedding_file.write(vectors.tobytes())
+            lengths = np.fromiter((len(data) for data in encoded), dtype=np.int64, count=len(encoded))
+            self._doc_offsets[start:end] = self._doc_bytes + np.concatenate(([0], np.cumsum(lengths)[:-1]))
+            self._doc_lengths[start:end] = lengths
+            self._document_file.write(b"".join(encoded))
+            self._document_file.flush()  # Documents are read back with pread on another descriptor
+            self._doc_bytes += int(lengths.sum())
+
+            upcast = vectors.astype(np.float32)
+            self._norms[start:end] = (upcast * upcast).sum(axis=1)
+            self._lists[start:end] = (self._nearest_centroids(upcast, self._centroids)
+                                      if self._centroids is not None else 0)
+            self._set_metadata(range(start, end), metadatas, capacity=len(self._alive))
+
+            for row, chunk_id in enumerate(ids, start=start):
+                previous = self._row_of.get(chunk_id)
+                if previous is not None:
+                    self._alive[previous] = False
+                self._row_of[chunk_id] = row
+                self._alive[row] = True
+            self._ids.extend(ids)
+            self._count = end
+            self._invalidate()
+
+    def _set_metadata(self, rows: Sequence[int], metadatas: List[Dict[str, Any]], capacity: int,
+                      merge: bool = False):
+        """Write metadata dicts into the columns; without merge, absent keys become missing"""
+        keys = list(dict.fromkeys(key for metadata in metadatas for key in metadata))
+        for key in keys:
+            kinds = {_Column.kind_of(metadata.get(key)) for metadata in metadatas} - {None}
+            column = self._columns.get(key)
+            if column is None:
+                column = self._columns[key] = _Column.empty(max(kinds, key=["int", "float", "str"].index, default="int"),
+                                                            capacity)
+            for kind in kinds:
+                column.widen(kind, self._count)
+        for key, column in self._columns.items():
+            if merge and key not in keys:
+                continue
+            if merge:
+                pairs = [(row, metadata[key]) for row, metadata in zip(rows, metadatas) if key in metadata]
+            else:
+                pairs = [(row, metadata.get(key)) for row, metadata in zip(rows, metadatas)]
+            column.set([row for row, _ in pairs], [value for _, value in pairs])
+
+    def update(self, ids: List[str], metadatas: Optional[List[Dict[str, Any]]] = None, **kwargs):
+        """Merge new metadata into live rows; only metadata updates are supported"""
+        if kwargs.get("documents") is not None or kwargs.get("embeddings") is not None:
+            raise ValueError("MemmapCollection.update only supports metadatas; use upsert")
+        if not metadatas:
+            return
+        with self._lock:
+            pairs = [(self._row_of[chunk_id], metadata)
+                     for chunk_id, metadata in zip(ids, metadatas) if chunk_id in self._row_of]
+            if pairs:
+                self._set_metadata([row for row, _ in pairs], [metadata for _, metadata in pairs],
+                                   capacity=len(self._alive), merge=True)
+                self._invalidate()
+
+    def delete(self, ids: Optional[List[str]] = None, where: Optional[Dict[str, Any]] = None):
+        """Tombstone rows by ID or filter"""
+        with self._lock:
+            if ids is not None:
+                rows = [self._row_of.pop(chunk_id) for chunk_id in ids if chunk_id in self._row_of]
+            else:
+                rows = np.flatnonzero(self._where_mask(where))
+                for row in rows:
+                    self._row_of.pop(self._ids[row], None)
+            if len(rows):
+                self._alive[rows] = False
+                self._invalidate()
+
+    def _rows_payload(self, rows: Sequence[int], include: Sequence[str]) -> Dict[str, Any]:
+        """ids plus the requested documents, metadatas and embeddings of rows"""
+        result: Dict[str, Any] = {"ids": [self._ids[row] for row in rows],
+                                  "documents": None, "metadatas": None, "embeddings": None}
+        if "documents" in include:
+            result["documents"] = [self._read_document(row).decode("utf-8") for row in rows]
+        if "metadatas" in include:
+            result["metadatas"] = [
+                {key: value for key, value in ((key, column.get(row)) for key, column in self._columns.items())
+                 if value is not None}
+                for row in rows
+            ]
+        if "embeddings" in include:
+            matrix = self._mapped_matrix()
+            result["embeddings"] = np.asarray(matrix[list(rows)], dtype=np.float32)
+        return result
+
+    def get(self, ids: Optional[List[str]] = None, where: Optional[Dict[str, Any]] = None,
+            limit: Optional[int] = None, offset: Optional[int] = None,
+            include: Sequence[str] = ("documents", "metadatas")) -> Dict[str, Any]:
+        """Rows by ID (in the order given) or by filter (in insertion order)"""
+        with self._lock:
+            if ids is not None:
+                rows = [self._row_of[chunk_id] for chunk_id in ids if chunk_id in self._row_of]
+            else:
+                rows = np.flatnonzero(self._where_mask(where))
+                start = offset or 0
+                rows = rows[start:start + limit] if limit is not None else rows[start:]
+            return self._rows_payload([int(row) for row in rows], include)
+
+    def query(self, query_embeddings=None, n_results: int = 10, where: Optional[Dict[str, Any]] = None,
+              query_texts: Optional[List[str]] = None,
+              include: Sequence[str] = ("documents", "metadatas", "distances")) -> Dict[str, Any]:
+        """Nearest rows by squared L2 distance, one result list per query"""
+        if query_embeddings is None:
+            query_embeddings = self._embedding_function(query_texts)
+        queries = np.asarray(query_embeddings, dtype=np.float32).reshape(len(query_embeddings), -1)
+
+        # Take a consistent view; arrays are only replaced or appended to after this
+        with self._lock:
+            count = self._count
+            matrix = self._mapped_matrix()
+            norms = self._norms[:count]
+            mask = self._where_mask(where)
+            filtered = where is not None or len(self._row_of) < count
+            inverted = self._inverted_lists() if self._centroids is not None else None
+            centroids = self._centroids
+            layout = self._layout
+            if inverted is not None and where:
+                # A selective filter leaves fewer rows than the probed partitions hold: scan them exactly
+                if np.count_nonzero(mask) <= count * self.ivf_probe / len(centroids):
+                    inverted = None
+
+        results: Dict[str, List] = {"ids": [], "documents": [], "metadatas": [], "distances": [], "embeddings": None}
+        for query in queries:
+            rows = None
+            # Selective filters read a few rows, not worth upcasting the whole matrix for
+            upcast = inverted is not None or not filtered
+            if inverted is not None:
+                probe = self._nearest_probes(query, centroids)
+                rows = np.sort(np.concatenate([inverted[list_id] for list_id in probe]))
+                rows = rows[mask[rows]]
+            elif filtered:
+                rows = np.flatnonzero(mask)
+                upcast = len(rows) * 8 >= count
+
+            distances = self._distances(matrix, norms, query, rows, layout, upcast)
+            k = min(n_results, len(distances))
+            top = np.argpartition(distances, k - 1)[:k] if 0 < k < len(distances) else np.arange(k)
+            top = top[np.argsort(distances[top], kind="stable")]
+            best = top if rows is None else rows[top]
+
+            with self._lock:
+                if self._layout != layout:
+                    # Compacted while scanning, so row numbers changed; start over
+                    return self.query(queries, n_results, where, include=include)
+                payload = self._rows_payload([int(row) for row in best], include)
+            results["ids"].append(payload["ids"])
+            results["documents"].append(payload["documents"])
+            results["metadatas"].append(payload["metadatas"])
+            results["distances"].append([float(distance) for distance in distances[top]])
+        return results
+
+    def _nearest_probes(self, query: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+        distances = ((centroids - query) ** 2).sum(axis=1)
+        probe = min(self.ivf_probe, len(centroids))
+        return np.argpartition(distances, probe - 1)[:probe]
+
+    def _distances(self, matrix: np.ndarray, norms: np.ndarray, query: np.ndarray,
+                   rows: Optional[np.ndarray], layout: int, upcast: bool) -> np.ndarray:
+        """
+        Squared L2 distance of the query to the given rows (all rows when None), in
+        blocks. With upcast, rows are read from the float32 copy, creating it if needed.
+        """
+        source = self._float_matrix(matrix, layout) if upcast or self._has_float_matrix(matrix, layout) else None
+        if source is None:
+            source = matrix
+        total = len(norms) if rows is None else len(rows)
+        scores = np.empty(total, dtype=np.float32)
+        for start in range(0, total, _BLOCK_ROWS):
+            end = min(start + _BLOCK_ROWS, total)
+            block = source[start:end] if rows is None else source[rows[start:end]]
+            scores[start:end] = np.asarray(block, dtype=np.float32) @ query
+        selected = norms if rows is None else norms[rows]
+        return selected + float(query @ query) - 2 * scores
+
+    def _has_float_matrix(self, matrix: np.ndarray, layout: int) -> bool:
+        cache = self._scan_cache
+        return cache is not None and cache[0] == layout and cache[1] >= len(matrix)
+
+    def _float_matrix(self, matrix: np.ndarray, layout: int) -> Optional[np.ndarray]:
+        """float32 copy of the matrix, upcasting only rows appended since the last call; None if too large"""
+        count, dim = matrix.shape
+        row_bytes = 4 * dim
+        if count == 0 or count * row_bytes > self.scan_cache_bytes:
+            self._scan_cache = None
+            return None
+        with self._scan_cache_lock:
+            cache = self._scan_cache
+            if cache is None or cache[0] != layout:
+                cache = (layout, 0, np.empty((0, dim), dtype=np.float32))
+            _, filled, rows = cache
+            if filled < count:
+                if len(rows) < count:
+                    # Double the capacity within the budget, so appends do not copy every time
+                    capacity = min(max(count, 2 * len(rows)), self.scan_cache_bytes // row_bytes)
+                    grown = np.empty((capacity, dim), dtype=np.float32)
+                    grown[:filled] = rows[:filled]
+                    rows = grown
+                for start in range(filled, count, _BLOCK_ROWS):
+                    end = min(start + _BLOCK_ROWS, count)
+                    rows[start:end] = matrix[start:end]
+                self._scan_cache = (layout, count, rows)
+            return rows[:count]
+
+
+class MemmapClient:
+    """
+    Stand-in for a Chroma persistent client over MemmapCollections, one directory
+    per collection. Collections are persisted on persist() and at interpreter exit.
+    """
+
+    def __init__(self, path: str, ivf_lists: int = 0, ivf_probe: int = 8, scan_cache_mb: int = 512):
+        self.path = path
+        self.ivf_lists = ivf_lists
+        self.ivf_probe = ivf_probe
+        self.scan_cache_mb = scan_cache_mb
+        self._collections: Dict[str, MemmapCollection] = {}
+        self._lock = threading.Lock()
+        os.makedirs(path, exist_ok=True)
+        atexit.register(self._persist_at_exit)
+
+    def get_or_create_collection(self, name: str, embedding_function: Optional[Callable] = None) -> MemmapCollection:
+        with self._lock:
+            collection = self._collections.get(name)
+            if collection is None:
+                collection = MemmapCollection(os.path.join(self.path, name), name, embedding_function,
+                                              ivf_lists=self.ivf_lists, ivf_probe=self.ivf_probe,
+                                              scan_cache_mb=self.scan_cache_mb)
+                self._collections[name] = collection
+            return collection
+
+    def delete_collection(self, name: str):
+        with self._lock:
+            collection = self._collections.pop(name, None)
+            if collection is not None:
+                collection.close()
+            shutil.rmtree(os.path.join(self.path, name), ignore_errors=True)
+
+    def get_max_batch_size(self) -> int:
+        # No backend limit; batches only bound the size of a single write
+        return 65536
+
+    def persist(self):
+        """Write a snapshot of every collection with unsaved writes"""
+        with self._lock:
+            collections = list(self._collections.values())
+        for collection in collections:
+            collection.persist()
+
+    def _persist_at_exit(self):
+        try:
+            self.persist()
+        except Exception as e:
+            print(f"Error persisting vector store: {e}")
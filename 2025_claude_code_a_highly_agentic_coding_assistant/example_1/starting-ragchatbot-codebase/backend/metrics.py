@@ -0,0 +1,199 @@
+import threading
+import time
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+# Upper bounds in seconds, from an embedding cache hit to a slow Anthropic call
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# (metric name, label pairs, value) produced by a collector at scrape time; names ending
+# in _total are exported as counters, the rest as gauges
+Sample = Tuple[str, Tuple[Tuple[str, str], ...], float]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels: Iterable[Tuple[str, str]]) -> str:
+    pairs = ",".join(f'{name}="{_escape(str(value))}"' for name, value in labels)
+    return "{" + pairs + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Histogram:
+    """Cumulative Prometheus histogram, one series per label value"""
+
+    def __init__(self, name: str, help_text: str, label: str, buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.label = label
+        self.buckets = buckets
+        self._series: Dict[str, List[float]] = {}  # Label value -> bucket counts..., +Inf count, sum
+        self._lock = threading.Lock()
+
+    def observe(self, label_value: str, value: float):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(label_value)
+            if series is None:
+                series = self._series[label_value] = [0] * (len(self.buckets) + 1) + [0.0]
+            series[index] += 1
+            series[-1] += value
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            series = {label_value: list(counts) for label_value, counts in self._series.items()}
+        for label_value, counts in sorted(series.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                labels = _format_labels([(self.label, label_value), ("le", _format_value(float(bound)))])
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels([(self.label, label_value)])
+            lines.append(f"{self.name}_sum{labels} {_format_value(counts[-1])}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class Counter:
+    """Monotonic Prometheus counter keyed by a tuple of label values"""
+
+    def __init__(self, name: str, help_text: str, labels: Tuple[str, ...]):
+        self.name = name
+        self.help_text = help_text
+        self.labels = labels
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, label_values: Tuple[str, ...], amount: float = 1):
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            values = dict(self._values)
+        for label_values, value in sorted(values.items()):
+            lines.append(f"{self.name}{_format_labels(zip(self.labels, label_values))} {_format_value(value)}")
+        return lines
+
+
+class _Span:
+    """Times one stage into the stage histogram; a class rather than a generator to keep it cheap"""
+    __slots__ = ("histogram", "stage", "start")
+
+    def __init__(self, histogram: Histogram, stage: str):
+        self.histogram = histogram
+        self.stage = stage
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.histogram.observe(self.stage, time.perf_counter() - self.start)
+        return False
+
+
+class _NoSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+_NO_SPAN = _NoSpan()
+
+
+class Metrics:
+    """
+    Per-stage latency histograms and Anthropic token counters for the query path,
+    rendered in the Prometheus text format.
+
+    Stages are timed with `with metrics.span("stage"):` around the code they cover,
+    so nested stages (a search inside a tool call inside a query) each get their own
+    series. Gauges that already live elsewhere, such as cache hit counters, are read
+    from collectors when the metrics are scraped instead of being tracked twice.
+    """
+
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self.stage_seconds = Histogram(
+            "rag_stage_duration_seconds", "Wall time of each stage of answering a query", "stage"
+        )
+        self.tokens = Counter(
+            "rag_anthropic_tokens_total", "Tokens reported in Anthropic usage, by call and kind", ("call", "kind")
+        )
+        self.calls = Counter("rag_anthropic_calls_total", "Anthropic Messages API calls", ("call",))
+        self._collectors: Dict[str, Callable[[], Iterable[Sample]]] = {}
+
+    def span(self, stage: str):
+        """Context manager timing a stage; a shared no-op when metrics are disabled"""
+        if not self.enabled:
+            return _NO_SPAN
+        return _Span(self.stage_seconds, stage)
+
+    def observe(self, stage: str, seconds: float):
+        """Record a stage timed elsewhere, such as one spanning the yields of a stream"""
+        if self.enabled:
+            self.stage_seconds.observe(stage, seconds)
+
+    def record_usage(self, call: str, response):
+        """Count the tokens of an Anthropic response (responses without usage only count the call)"""
+        if not self.enabled:
+            return
+        self.calls.inc((call,))
+        usage = getattr(response, "usage", None)
+        if usage is None:
+            return
+        for kind in ("input_tokens", "output_tokens", "cache_read_input_tokens", "cache_creation_input_tokens"):
+            count = getattr(usage, kind, None)
+            if count:
+                self.tokens.inc((call, kind), count)
+
+    def register_collector(self, name: str, collect: Callable[[], Iterable[Sample]]):
+        """Add (or replace) a source of samples read at scrape time"""
+        self._collectors[name] = collect
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format"""
+        lines = self.stage_seconds.render() + self.tokens.render() + self.calls.render()
+
+        samples: Dict[str, List[Tuple[Tuple[Tuple[str, str], ...], float]]] = {}
+        for name, collect in list(self._collectors.items()):
+            try:
+                for metric, labels, value in collect():
+                    samples.setdefault(metric, []).append((labels, value))
+            except Exception as e:
+                print(f"Metrics collector {name} failed: {e}")
+        for metric, values in sorted(samples.items()):
+            lines.append(f"# TYPE {metric} {'counter' if metric.endswith('_total') else 'gauge'}")
+            lines.extend(f"{metric}{_format_labels(labels)} {_format_value(value)}" for labels, value in values)
+        return "\n".join(lines) + "\n"
+
+
+def cache_samples(cache: str, stats: Optional[Dict]) -> List[Sample]:
+    """Samples of a cache's stats() counters"""
+    if not stats:
+        return []
+    labels = (("cache", cache),)
+    return [
+        ("rag_cache_hits_total", labels, stats["hits"]),
+        ("rag_cache_misses_total", labels, stats["misses"]),
+        ("rag_cache_hit_ratio", labels, stats["hit_ratio"]),
+        ("rag_cache_size", labels, stats["size"]),
+    ]
+
+
+# Process-wide registry shared by every component on the query path
+metrics = Metrics()
@@ -0,0 +1,99 @@
+import re
+import threading
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Set
+
+from lexical_index import tokenize
+
+# Phrases that only make sense about the course material
+_COURSE_CUES = re.compile(
+    r"\b(course|courses|lesson|lessons|module|instructor|taught|teach(es)?|covered|covers|curriculum|syllabus)\b",
+    re.IGNORECASE
+)
+_LESSON_NUMBER = re.compile(r"\blesson\s+(\d+)\b", re.IGNORECASE)
+
+
+@dataclass
+class QueryRoute:
+    """What the classifier decided for a query"""
+    retrieve: bool                      # Search the course content before generating
+    course_name: Optional[str] = None   # Course the query names, if exactly one
+    lesson_number: Optional[int] = None
+    reason: str = ""
+
+
+class QueryClassifier:
+    """
+    Cheap local router deciding whether a question is about the course material.
+
+    A query is routed to up-front retrieval when it names a course, uses course
+    vocabulary ("lesson 3", "instructor", ...) or when most of its terms are
+    common in the indexed course content; a term seen in only a chunk or two is
+    more likely a passing mention than a course topic. Everything else is left
+    to the model and its search tool. Course title words are refreshed whenever
+    the store's content epoch moves.
+    """
+
+    def __init__(self, vector_store, min_term_coverage: float = 0.6, min_term_share: float = 0.01):
+        self.store = vector_store
+        self.min_term_coverage = min_term_coverage  # Share of query terms that must be course terms
+        self.min_term_share = min_term_share        # Share of chunks (at least 3) a course term occurs in
+        self._lock = threading.Lock()
+        self._epoch: Optional[int] = None
+        self._title_words: Dict[str, str] = {}  # Word unique to one course title -> that title
+
+    def _refresh(self):
+        """Rebuild the distinctive title words if the catalog may have changed"""
+        epoch = self.store.content_epoch
+        if epoch == self._epoch:
+            return
+        with self._lock:
+            owners: Dict[str, Set[str]] = defaultdict(set)
+            for title in self.store.title_index.titles():
+                for word in tokenize(title):
+                    if len(word) >= 3:
+                        owners[word].add(title)
+            self._title_words = {word: next(iter(titles)) for word, titles in owners.items() if len(titles) == 1}
+            self._epoch = epoch
+
+    def _named_courses(self, terms: List[str]) -> Set[str]:
+        """Titles of the courses a query's terms name"""
+        self._refresh()
+        return {self._title_words[term] for term in terms if term in self._title_words}
+
+    def named_course(self, query: str) -> Optional[str]:
+        """The course a query names, if exactly one"""
+        named = self._named_courses(tokenize(query))
+        return next(iter(named)) if len(named) == 1 else None
+
+    def classify(self, query: str) -> QueryRoute:
+        """
+        Route a query.
+
+        Args:
+            query: User's question
+
+        Returns:
+            QueryRoute with the decision and any course/lesson filter it implies
+        """
+        terms = tokenize(query)
+        named = self._named_courses(terms)
+        course_name = next(iter(named)) if len(named) == 1 else None
+
+        lesson_match = _LESSON_NUMBER.search(query)
+        lesson_number = int(lesson_match.group(1)) if lesson_match and course_name else None
+
+        if named:
+            return QueryRoute(True, course_name, lesson_number, "names a course")
+        if _COURSE_CUES.search(query):
+            return QueryRoute(True, reason="course vocabulary")
+
+        lexical_index = self.store.lexical_index
+        if lexical_index is not None and terms:
+            min_frequency = max(3, self.min_term_share * len(lexical_index))
+            covered = sum(1 for term in terms if lexical_index.document_frequency(term) >= min_frequency)
+            if covered / len(terms) >= self.min_term_coverage:
+                return QueryRoute(True, reason="terms are common in course content")
+
+        return QueryRoute(False, reason="no course signal")
@@ -1,10 +1,21 @@
-from typing import List, Tuple, Optional, Dict
+from typing import Any, AsyncIterator, List, Tuple, Optional, Dict
+import asyncio
 import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from conversation_summarizer import ConversationSummarizer
 from document_processor import DocumentProcessor
+from index_snapshot import import_index
 from vector_store import VectorStore
 from ai_generator import AIGenerator
-from session_manager import SessionManager
-from search_tools import ToolManager, CourseSearchTool
+from answer_cache import CachedAnswer, SemanticAnswerCache, query_numbers
+from embedding_cache import EmbeddingCache
+from ingestion_manifest import IngestionManifest
+from ingestion_pipeline import IngestionPipeline, IngestionStats
+from metrics import cache_samples, metrics
+from query_classifier import QueryClassifier
+from session_backends import create_session_backend
+from search_tools import ToolManager, CourseSearchTool, ToolExecutionContext, ToolResult
 from models import Course, Lesson, CourseChunk
 
 class RAGSystem:
@@ -14,15 +25,80 @@ class RAGSystem:
         self.config = config
         
         # Initialize core components
-        self.document_processor = DocumentProcessor(config.CHUNK_SIZE, config.CHUNK_OVERLAP)
-        self.vector_store = VectorStore(config.CHROMA_PATH, config.EMBEDDING_MODEL, config.MAX_RESULTS)
-        self.ai_generator = AIGenerator(config.ANTHROPIC_API_KEY, config.ANTHROPIC_MODEL)
-        self.session_manager = SessionManager(config.MAX_HISTORY)
+        self.processor_options = {
+            "chunk_size": config.CHUNK_SIZE,
+            "chunk_overlap": config.CHUNK_OVERLAP,
+            "chunk_unit": config.CHUNK_UNIT,
+            "token_budget": config.CHUNK_TOKEN_BUDGET,
+            "token_overlap": config.CHUNK_TOKEN_OVERLAP,
+            "tokenizer_model": config.EMBEDDING_MODEL,
+            "max_tokens": config.EMBEDDING_MAX_TOKENS
+        }
+        self.document_processor = DocumentProcessor(**self.processor_options)
+        self.vector_store = VectorStore(
+            config.CHROMA_PATH,
+            config.EMBEDDING_MODEL,
+            config.MAX_RESULTS,
+            query_cache_size=config.QUERY_EMBEDDING_CACHE_SIZE,
+            query_cache_ttl=config.QUERY_EMBEDDING_CACHE_TTL,
+            search_mode=config.SEARCH_MODE,
+            hybrid_candidates=config.HYBRID_CANDIDATES,
+            rrf_k=config.RRF_K,
+            rerank_model=config.RERANK_MODEL or None,
+            rerank_candidates=config.RERANK_CANDIDATES,
+            rerank_top_k=config.RERANK_TOP_K,
+            vector_backend=config.VECTOR_BACKEND,
+            ivf_lists=config.IVF_LISTS,
+            ivf_probe=config.IVF_PROBE,
+            scan_cache_mb=config.VECTOR_SCAN_CACHE_MB
+        )
+        self.ai_generator = AIGenerator(config.ANTHROPIC_API_KEY, config.ANTHROPIC_MODEL, config.SUMMARY_MODEL)
+        # In-process, or shared by all workers when SESSION_BACKEND is sqlite or redis
+        self.session_manager = create_session_backend(config)
+        
+        # Bounded pool for Chroma and embedding calls, shared by sync and async queries
+        self.executor = ThreadPoolExecutor(max_workers=config.BLOCKING_IO_WORKERS, thread_name_prefix="rag-io")
         
-        # Initialize search tools
-        self.tool_manager = ToolManager()
+        # Initialize search tools, run on the tool manager's own pool
+        self.tool_manager = ToolManager(max_workers=config.TOOL_WORKERS, timeout=config.TOOL_TIMEOUT)
         self.search_tool = CourseSearchTool(self.vector_store)
         self.tool_manager.register_tool(self.search_tool)
+        
+        # Keeps the history sent with each query short by summarizing older exchanges
+        self.summarizer: Optional[ConversationSummarizer] = None
+        if config.SUMMARY_ENABLED:
+            self.summarizer = ConversationSummarizer(
+                self.ai_generator,
+                self.session_manager,
+                max_workers=config.SUMMARY_WORKERS,
+                recent_turns=config.SUMMARY_RECENT_TURNS,
+                max_tokens=config.SUMMARY_MAX_TOKENS
+            )
+        
+        # Routes course questions to retrieval before generation in retrieve-first mode
+        self.query_classifier = QueryClassifier(self.vector_store)
+        
+        # Answers of near-duplicate questions about the same course and numbers,
+        # dropped whenever ingestion changes the store
+        self.answer_cache: Optional[SemanticAnswerCache] = None
+        if config.ANSWER_CACHE_ENABLED:
+            self.answer_cache = SemanticAnswerCache(
+                self.vector_store.embed_query,
+                similarity_threshold=config.ANSWER_CACHE_THRESHOLD,
+                max_size=config.ANSWER_CACHE_SIZE,
+                ttl_seconds=config.ANSWER_CACHE_TTL,
+                scope_fn=self._answer_scope
+            )
+        
+        # Content hashes of everything ingested so far
+        self.ingestion_manifest = IngestionManifest(config.INGEST_MANIFEST_PATH)
+        
+        # Throughput report from the most recent folder ingestion
+        self.last_ingestion_stats: Optional[IngestionStats] = None
+        
+        # Stage timings and token counts; cache hit ratios are read from the caches on scrape
+        metrics.enabled = config.METRICS_ENABLED
+        metrics.register_collector("caches", self._cache_samples)
     
     def add_course_document(self, file_path: str) -> Tuple[Course, int]:
         """
@@ -43,6 +119,7 @@ class RAGSystem:
             
             # Add course content chunks to vector store
             self.vector_store.add_course_content(course_chunks)
+            self.vector_store.persist()
             
             return course, len(course_chunks)
         except Exception as e:
@@ -51,54 +128,75 @@ class RAGSystem:
     
     def add_course_folder(self, folder_path: str, clear_existing: bool = False) -> Tuple[int, int]:
         """
-        Add all course documents from a folder.
+        Add all course documents from a folder, re-indexing only what changed.
         
         Args:
             folder_path: Path to folder containing course documents
             clear_existing: Whether to clear existing data first
             
         Returns:
-            Tuple of (total courses added, total chunks created)
+            Tuple of (courses added or changed, chunks embedded)
         """
-        total_courses = 0
-        total_chunks = 0
-        
         # Clear existing data if requested
         if clear_existing:
             print("Clearing existing data for fresh rebuild...")
             self.vector_store.clear_all_data()
+            self.ingestion_manifest.clear()
+            self.ingestion_manifest.save()
         
         if not os.path.exists(folder_path):
             print(f"Folder {folder_path} does not exist")
             return 0, 0
         
-        # Get existing course titles to avoid re-processing
-        existing_course_titles = set(self.vector_store.get_existing_course_titles())
-        
-        # Process each file in the folder
-        for file_name in os.listdir(folder_path):
+        file_paths = []
+        for file_name in sorted(os.listdir(folder_path)):
             file_path = os.path.join(folder_path, file_name)
             if os.path.isfile(file_path) and file_name.lower().endswith(('.pdf', '.docx', '.txt')):
-                try:
-                    # Check if this course might already exist
-                    # We'll process the document to get the course ID, but only add if new
-                    course, course_chunks = self.document_processor.process_course_document(file_path)
-                    
-                    if course and course.title not in existing_course_titles:
-                        # This is a new course - add it to the vector store
-                        self.vector_store.add_course_metadata(course)
-                        self.vector_store.add_course_content(course_chunks)
-                        total_courses += 1
-                        total_chunks += len(course_chunks)
-                        print(f"Added new course: {course.title} ({len(course_chunks)} chunks)")
-                        existing_course_titles.add(course.title)
-                    elif course:
-                        print(f"Course already exists: {course.title} - skipping")
-                except Exception as e:
-                    print(f"Error processing {file_name}: {e}")
+                file_paths.append(file_path)
+        
+        # A restart with nothing changed skips hashing, parsing and the process pool entirely
+        chunking = IngestionPipeline.chunking_key(self.processor_options)
+        indexed_titles = set(self.vector_store.get_existing_course_titles())
+        if self.ingestion_manifest.is_current(folder_path, file_paths, chunking, indexed_titles):
+            self.last_ingestion_stats = IngestionStats(unchanged_files=len(file_paths))
+            print(f"Course folder unchanged since last ingestion, skipped {len(file_paths)} files")
+            return 0, 0
+        
+        # Previously ingested files that have since been deleted
+        removed_files = [
+            file_path for file_path in self.ingestion_manifest.files_in_folder(folder_path)
+            if not os.path.isfile(file_path)
+        ]
+        
+        # Parse changed files in a process pool, embed in batches and commit in bulk
+        pipeline = IngestionPipeline(
+            self.vector_store,
+            self.processor_options,
+            max_workers=self.config.INGEST_WORKERS,
+            batch_size=self.config.EMBEDDING_BATCH_SIZE
+        )
+        total_courses, total_chunks, stats = pipeline.run(file_paths, self.ingestion_manifest, removed_files)
+        self.last_ingestion_stats = stats
+        print(f"Ingestion throughput: {stats.summary()}")
         
         return total_courses, total_chunks
     
+    def import_index_snapshot(self, snapshot_path: str) -> Dict[str, Any]:
+        """
+        Replace the index with a prebuilt snapshot instead of embedding the docs folder.
+        
+        Args:
+            snapshot_path: Archive written by `index_snapshot.py export-index`
+            
+        Returns:
+            The snapshot header (embedding model, counts, creation time)
+        """
+        header = import_index(self.vector_store, self.config.INGEST_MANIFEST_PATH, snapshot_path)
+        self.ingestion_manifest = IngestionManifest(self.config.INGEST_MANIFEST_PATH)
+        print(f"Imported index snapshot {snapshot_path}: "
+              + ", ".join(f"{count} {name}" for name, count in header["counts"].items()))
+        return header
+    
     def query(self, query: str, session_id: Optional[str] = None) -> Tuple[str, List[str]]:
         """
         Process a user query using the RAG system with tool-based search.
@@ -110,38 +208,377 @@ class RAGSystem:
         Returns:
             Tuple of (response, sources list - empty for tool-based approach)
         """
-        # Create prompt for the AI with clear instructions
-        prompt = f"""Answer this question about course materials: {query}"""
+        with metrics.span("query"):
+            start = time.perf_counter()
+            prompt, history = self._prepare_query(query, session_id)
+            
+            # Near-duplicate questions without conversation context reuse a cached answer
+            cached, cache_key = self._lookup_answer(query, history)
+            if cached:
+                return cached.answer, self._finish_cached_query(query, session_id, cached)
+            
+            # Sources are collected per request, so concurrent queries never see each other's
+            tool_context = ToolExecutionContext()
+            
+            # Generate response using AI with tools, or with search results retrieved up front
+            response = self.ai_generator.generate_response(
+                query=prompt,
+                conversation_history=history,
+                **self._generation_args(query, tool_context)
+            )
+            
+            sources = self._finish_query(query, session_id, response, tool_context)
+            self._store_answer(cache_key, query, response, sources, start)
+            return response, sources
+    
+    async def aquery(self, query: str, session_id: Optional[str] = None) -> Tuple[str, List[str]]:
+        """
+        Async variant of query for the web server.
+        
+        The Anthropic calls are awaited on the async client and searches run on the
+        bounded executor, so a slow response never blocks other requests.
+        """
+        with metrics.span("query"):
+            start = time.perf_counter()
+            prompt, history = await self._aprepare_query(query, session_id)
+            
+            cached, cache_key = await self._alookup_answer(query, history)
+            if cached:
+                return cached.answer, await self._afinish_cached_query(query, session_id, cached)
+            
+            tool_context = ToolExecutionContext()
+            response = await self.ai_generator.agenerate_response(
+                query=prompt,
+                conversation_history=history,
+                **await self._agenerate_args(query, tool_context)
+            )
+            
+            sources = await self._afinish_query(query, session_id, response, tool_context)
+            self._store_answer(cache_key, query, response, sources, start)
+            return response, sources
+    
+    async def astream_query(self, query: str, session_id: Optional[str] = None) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Stream the answer to a user query as it is generated.
+        
+        Args:
+            query: User's question
+            session_id: Optional session ID for conversation context
+            
+        Yields:
+            {"type": "token", "text": ...} for each piece of the answer, then
+            {"type": "sources", "sources": [...]} and
+            {"type": "done", "ttft_ms": ..., "total_ms": ..., "cached": ...}
+        """
+        start = time.perf_counter()
+        first_token_at = None
+        prompt, history = await self._aprepare_query(query, session_id)
+        
+        cached, cache_key = await self._alookup_answer(query, history)
+        if cached:
+            first_token_at = time.perf_counter()
+            yield {"type": "token", "text": cached.answer}
+            sources = await self._afinish_cached_query(query, session_id, cached)
+        else:
+            parts = []
+            tool_context = ToolExecutionContext()
+            generation_args = await self._agenerate_args(query, tool_context)
+            async for text in self.ai_generator.astream_response(
+                query=prompt,
+                conversation_history=history,
+                **generation_args
+            ):
+                if first_token_at is None:
+                    first_token_at = time.perf_counter()
+                parts.append(text)
+                yield {"type": "token", "text": text}
+            
+            response = "".join(parts)
+            sources = await self._afinish_query(query, session_id, response, tool_context)
+            self._store_answer(cache_key, query, response, sources, start)
+        
+        yield {"type": "sources", "sources": sources}
+        
+        end = time.perf_counter()
+        metrics.observe("query", end - start)
+        yield {
+            "type": "done",
+            "ttft_ms": 1000 * ((first_token_at or end) - start),
+            "total_ms": 1000 * (end - start),
+            "cached": cached is not None
+        }
+    
+    async def abatch_query(self, queries: List[str], max_concurrency: Optional[int] = None
+                           ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Answer a batch of independent questions, yielding each answer as it finishes.
+        
+        Identical questions are answered once. The questions are embedded in one batch,
+        and in retrieve-first mode the searches run in bulk: one multi-query store call
+        per course/lesson filter, with near-identical searches merged (BATCH_DEDUP_THRESHOLD).
+        The Anthropic calls then run with at most max_concurrency in flight. Questions
+        carry no conversation context.
+        
+        Args:
+            queries: The questions
+            max_concurrency: Anthropic calls in flight, capped at BATCH_MAX_CONCURRENCY
+            
+        Yields:
+            {"type": "result", "index": ..., "query": ..., "answer": ..., "sources": [...],
+            "cached": ..., "ms": ...} or {"type": "error", "index": ..., "query": ..., "detail": ...}
+            per question in completion order, then
+            {"type": "done", "questions": ..., "unique_questions": ..., "retrievals": ..., "total_ms": ...}
+        """
+        start = time.perf_counter()
+        positions: Dict[str, List[int]] = {}
+        for i, query in enumerate(queries):
+            positions.setdefault(EmbeddingCache.normalize(query), []).append(i)
+        unique = [queries[indices[0]] for indices in positions.values()]
+        
+        loop = asyncio.get_running_loop()
+        plans = await loop.run_in_executor(self.executor, self._plan_batch, unique)
+        
+        limit = self.config.BATCH_MAX_CONCURRENCY
+        semaphore = asyncio.Semaphore(min(max_concurrency, limit) if max_concurrency is not None else limit)
+        
+        async def answer(query: str, cached: Optional[CachedAnswer], cache_key, retrieved: Optional[ToolResult]):
+            if cached:
+                return {"answer": cached.answer, "sources": list(cached.sources), "cached": True}
+            t0 = time.perf_counter()
+            tool_context = ToolExecutionContext()
+            if retrieved:
+                tool_context.record(retrieved)
+                generation_args = {"context": retrieved.content}
+            else:
+                generation_args = self._tool_args(tool_context)
+            prompt = self._build_prompt(query)
+            async with semaphore:
+                response = await self.ai_generator.agenerate_response(query=prompt, **generation_args)
+            self._store_answer(cache_key, query, response, tool_context.sources, t0)
+            return {"answer": response, "sources": tool_context.sources, "cached": False}
+        
+        async def run(u: int):
+            try:
+                return u, await answer(unique[u], *plans[u])
+            except Exception as e:
+                return u, e
+        
+        tasks = [asyncio.create_task(run(u)) for u in range(len(unique))]
+        try:
+            for finished in asyncio.as_completed(tasks):
+                u, outcome = await finished
+                elapsed_ms = 1000 * (time.perf_counter() - start)
+                for i in positions[EmbeddingCache.normalize(unique[u])]:
+                    if isinstance(outcome, Exception):
+                        yield {"type": "error", "index": i, "query": queries[i], "detail": str(outcome)}
+                    else:
+                        yield {"type": "result", "index": i, "query": queries[i], **outcome, "ms": elapsed_ms}
+        finally:
+            # A client that goes away mid-batch leaves nothing running
+            for task in tasks:
+                task.cancel()
+        
+        end = time.perf_counter()
+        metrics.observe("batch_query", end - start)
+        yield {
+            "type": "done",
+            "questions": len(queries),
+            "unique_questions": len(unique),
+            "retrievals": len({id(retrieved) for _, _, retrieved in plans if retrieved}),
+            "total_ms": 1000 * (end - start)
+        }
+    
+    def _plan_batch(self, queries: List[str]
+                    ) -> List[Tuple[Optional[CachedAnswer], Optional[Tuple[Any, int]], Optional[ToolResult]]]:
+        """
+        Answer cache lookups and up-front retrieval for distinct batch questions.
+        
+        Returns:
+            Per question: (cached answer or None, answer cache key, search results to
+            answer from or None for the tool loop)
+        """
+        retrieve_first = self.config.QUERY_MODE == "retrieve_first"
+        if self.answer_cache is not None or retrieve_first:
+            # One embedding batch; the cache lookups and searches below then hit the embedding cache
+            with metrics.span("query_embedding"):
+                self.vector_store.query_embedding_cache.get_many(queries)
+        lookups = [self._lookup_answer(query, None) for query in queries]
+        
+        retrieved: List[Optional[ToolResult]] = [None] * len(queries)
+        if retrieve_first:
+            routed = []
+            for i, query in enumerate(queries):
+                if lookups[i][0] is None:
+                    with metrics.span("query_classification"):
+                        route = self.query_classifier.classify(query)
+                    if route.retrieve:
+                        routed.append((i, (query, route.course_name, route.lesson_number)))
+            if routed:
+                found = self.search_tool.retrieve_batch(
+                    [request for _, request in routed],
+                    dedup_threshold=self.config.BATCH_DEDUP_THRESHOLD
+                )
+                for (i, _), result in zip(routed, found):
+                    retrieved[i] = result
+        
+        return [(cached, cache_key, result) for (cached, cache_key), result in zip(lookups, retrieved)]
+    
+    def _generation_args(self, query: str, tool_context: ToolExecutionContext) -> Dict[str, Any]:
+        """
+        Search results retrieved up front when the classifier routes the query to
+        retrieval in retrieve-first mode, otherwise the search tool for the model.
+        Sources of either search end up in tool_context.
+        """
+        if self.config.QUERY_MODE == "retrieve_first":
+            with metrics.span("query_classification"):
+                route = self.query_classifier.classify(query)
+            if route.retrieve:
+                result = self.search_tool.retrieve(query, route.course_name, route.lesson_number)
+                if result:
+                    tool_context.record(result)
+                    return {"context": result.content}
+        
+        # Fall back to the tool loop, letting the model phrase its own search
+        return self._tool_args(tool_context)
+    
+    def _tool_args(self, tool_context: ToolExecutionContext) -> Dict[str, Any]:
+        """Generation arguments offering the model the search tool"""
+        return {
+            "tools": self.tool_manager.get_tool_definitions(),
+            "tool_manager": self.tool_manager,
+            "tool_context": tool_context
+        }
+    
+    async def _agenerate_args(self, query: str, tool_context: ToolExecutionContext) -> Dict[str, Any]:
+        """Async variant of _generation_args, searching on the executor"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, self._generation_args, query, tool_context)
+    
+    @staticmethod
+    def _build_prompt(query: str) -> str:
+        """Create prompt for the AI with clear instructions"""
+        return f"""Answer this question about course materials: {query}"""
+    
+    def _prepare_query(self, query: str, session_id: Optional[str]) -> Tuple[str, Optional[str]]:
+        """Build the prompt and look up the conversation history"""
+        prompt = self._build_prompt(query)
         
         # Get conversation history if session exists
         history = None
         if session_id:
             history = self.session_manager.get_conversation_history(session_id)
         
-        # Generate response using AI with tools
-        response = self.ai_generator.generate_response(
-            query=prompt,
-            conversation_history=history,
-            tools=self.tool_manager.get_tool_definitions(),
-            tool_manager=self.tool_manager
-        )
+        return prompt, history
+    
+    async def _aprepare_query(self, query: str, session_id: Optional[str]) -> Tuple[str, Optional[str]]:
+        """Async variant of _prepare_query, reading the session store on the executor"""
+        if not session_id:
+            return self._build_prompt(query), None
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, self._prepare_query, query, session_id)
+    
+    def _finish_query(self, query: str, session_id: Optional[str], response: str,
+                      tool_context: ToolExecutionContext) -> List[Any]:
+        """Collect the sources of the answer and record the exchange"""
+        # Update conversation history
+        self._record_exchange(session_id, query, response)
         
-        # Get sources from the search tool
-        sources = self.tool_manager.get_last_sources()
-
-        # Reset sources after retrieving them
-        self.tool_manager.reset_sources()
+        # Return sources from this request's searches
+        return tool_context.sources
+    
+    async def _afinish_query(self, query: str, session_id: Optional[str], response: str,
+                             tool_context: ToolExecutionContext) -> List[Any]:
+        """Async variant of _finish_query, writing the session store on the executor"""
+        await self._arecord_exchange(session_id, query, response)
+        return tool_context.sources
+    
+    def _lookup_answer(self, query: str, history: Optional[str]
+                       ) -> Tuple[Optional[CachedAnswer], Optional[Tuple[Any, int]]]:
+        """
+        Look a query up in the answer cache.
         
-        # Update conversation history
-        if session_id:
-            self.session_manager.add_exchange(session_id, query, response)
+        Returns:
+            Tuple of (cached answer or None, cache key for _store_answer or None
+            when the cache does not apply)
+        """
+        # An answer that depends on earlier turns must not be reused elsewhere
+        if self.answer_cache is None or history:
+            return None, None
         
-        # Return response with sources from tool searches
-        return response, sources
+        epoch = self.vector_store.content_epoch
+        with metrics.span("answer_cache_lookup"):
+            cached, vector = self.answer_cache.lookup(query, epoch)
+        return cached, (vector, epoch)
+    
+    async def _alookup_answer(self, query: str, history: Optional[str]
+                              ) -> Tuple[Optional[CachedAnswer], Optional[Tuple[Any, int]]]:
+        """Async variant of _lookup_answer, embedding the query on the executor"""
+        if self.answer_cache is None or history:
+            return None, None
+        
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, self._lookup_answer, query, history)
+    
+    def _answer_scope(self, query: str) -> Tuple[Optional[str], Tuple[str, ...]]:
+        """The course a query names and its exact numbers; cached answers are only reused within one scope"""
+        return self.query_classifier.named_course(query), query_numbers(query)
+    
+    def _store_answer(self, cache_key: Optional[Tuple[Any, int]], query: str, response: str,
+                      sources: List[Any], start: float):
+        """Cache a freshly generated answer under the key its lookup returned"""
+        if cache_key is None:
+            return
+        
+        vector, epoch = cache_key
+        self.answer_cache.store(query, vector, response, sources, epoch, time.perf_counter() - start)
+    
+    def _finish_cached_query(self, query: str, session_id: Optional[str], cached: CachedAnswer) -> List[Any]:
+        """Record an exchange answered from the cache"""
+        self._record_exchange(session_id, query, cached.answer)
+        return list(cached.sources)
+    
+    async def _afinish_cached_query(self, query: str, session_id: Optional[str], cached: CachedAnswer) -> List[Any]:
+        """Async variant of _finish_cached_query, writing the session store on the executor"""
+        await self._arecord_exchange(session_id, query, cached.answer)
+        return list(cached.sources)
+    
+    def _record_exchange(self, session_id: Optional[str], query: str, answer: str):
+        """Add an exchange to the session and fold older ones into its summary in the background"""
+        if not session_id:
+            return
+        self.session_manager.add_exchange(session_id, query, answer)
+        if self.summarizer:
+            self.summarizer.schedule(session_id)
+    
+    async def _arecord_exchange(self, session_id: Optional[str], query: str, answer: str):
+        """Async variant of _record_exchange; SQLite and Redis session stores block on I/O"""
+        if not session_id:
+            return
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(self.executor, self._record_exchange, session_id, query, answer)
+    
+    async def acreate_session(self) -> str:
+        """Create a conversation session on the executor, off the event loop"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, self.session_manager.create_session)
+    
+    def _cache_samples(self):
+        """Hit counters of the answer, query embedding and rerank score caches"""
+        samples = cache_samples("query_embedding", self.vector_store.query_embedding_cache.stats())
+        if self.answer_cache:
+            samples += cache_samples("answer", self.answer_cache.stats())
+        if self.vector_store.reranker:
+            samples += cache_samples("rerank_scores", self.vector_store.reranker.stats())
+        return samples
     
     def get_course_analytics(self) -> Dict:
         """Get analytics about the course catalog"""
         return {
             "total_courses": self.vector_store.get_course_count(),
             "course_titles": self.vector_store.get_existing_course_titles()
-        }
\ No newline at end of file
+        }
+    
+    async def aget_course_analytics(self) -> Dict:
+        """Async variant of get_course_analytics, read on the executor"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, self.get_course_analytics)
@@ -0,0 +1,99 @@
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from embedding_cache import EmbeddingCache
+
+
+class CrossEncoderReranker:
+    """
+    Second-stage ranking of search candidates with a small cross-encoder.
+
+    All (query, chunk) pairs of one search are scored in a single batched forward
+    pass on the CPU. Scores are cached per normalized query and chunk ID; chunk IDs
+    are content hashes, so a cached score can never belong to edited text.
+    """
+
+    def __init__(self, model_name: str, cache_size: int = 4096, max_length: int = 256):
+        self.model_name = model_name
+        self.cache_size = cache_size
+        self.max_length = max_length  # Tokens of query + chunk the model reads
+        self._model = None
+        self._model_lock = threading.Lock()
+        self._lock = threading.Lock()
+        self._scores: "OrderedDict[Tuple[str, str], float]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def _load_model(self):
+        """Load the cross-encoder on first use, so a disabled stage costs nothing"""
+        with self._model_lock:
+            if self._model is None:
+                from sentence_transformers import CrossEncoder
+                self._model = CrossEncoder(self.model_name, max_length=self.max_length, device="cpu")
+        return self._model
+
+    def score(self, query: str, ids: List[str], documents: List[str]) -> List[float]:
+        """
+        Relevance of each document to the query, higher is better.
+
+        Args:
+            query: Search query
+            ids: Chunk IDs, used as cache keys
+            documents: Chunk texts aligned with ids
+
+        Returns:
+            One score per document
+        """
+        key = EmbeddingCache.normalize(query)
+        scores: List[Optional[float]] = [None] * len(ids)
+        missing = []
+        with self._lock:
+            for i, chunk_id in enumerate(ids):
+                cached = self._scores.get((key, chunk_id))
+                if cached is None:
+                    missing.append(i)
+                else:
+                    self._scores.move_to_end((key, chunk_id))
+                    scores[i] = cached
+            self.hits += len(ids) - len(missing)
+            self.misses += len(missing)
+
+        if missing:
+            # One forward pass over every uncached pair, outside the lock
+            model = self._load_model()
+            predicted = model.predict([(query, documents[i]) for i in missing],
+                                      batch_size=len(missing), show_progress_bar=False)
+            with self._lock:
+                for i, value in zip(missing, predicted):
+                    scores[i] = float(value)
+                    self._scores[(key, ids[i])] = scores[i]
+                while len(self._scores) > self.cache_size:
+                    self._scores.popitem(last=False)
+
+        return scores
+
+    def rank(self, query: str, ids: List[str], documents: List[str], top_k: int) -> List[int]:
+        """Positions of the top_k documents by cross-encoder score, best first"""
+        if not ids:
+            return []
+        scores = self.score(query, ids, documents)
+        return sorted(range(len(scores)), key=lambda i: scores[i], reverse=True)[:top_k]
+
+    def clear(self):
+        """Drop all cached scores"""
+        with self._lock:
+            self._scores.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Score cache counters"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "model": self.model_name,
+                "size": len(self._scores),
+                "max_size": self.cache_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / lookups if lookups else 0.0
+            }
@@ -1,8 +1,37 @@
-from typing import Dict, Any, Optional, Protocol
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from dataclasses import dataclass, field
+from functools import partial
+from typing import Dict, Any, List, Optional, Protocol, Tuple, Union
 from abc import ABC, abstractmethod
+from metrics import metrics
 from vector_store import VectorStore, SearchResults
 
 
+@dataclass
+class ToolResult:
+    """Output of one tool call together with the sources it drew on"""
+    content: str
+    sources: List[Any] = field(default_factory=list)
+    is_error: bool = False
+
+
+@dataclass
+class ToolExecutionContext:
+    """
+    Per-request state threaded through tool execution.
+    
+    Each query gets its own context, so the sources of concurrent queries never
+    mix the way they did when tools kept them as instance attributes.
+    """
+    sources: List[Any] = field(default_factory=list)
+    
+    def record(self, result: ToolResult):
+        """Collect the sources of a finished tool call"""
+        self.sources.extend(result.sources)
+
+
 class Tool(ABC):
     """Abstract base class for all tools"""
     
@@ -12,8 +41,8 @@ class Tool(ABC):
         pass
     
     @abstractmethod
-    def execute(self, **kwargs) -> str:
-        """Execute the tool with given parameters"""
+    def execute(self, **kwargs) -> Union[str, ToolResult]:
+        """Execute the tool with given parameters; return a ToolResult to report sources"""
         pass
 
 
@@ -22,7 +51,6 @@ class CourseSearchTool(Tool):
     
     def __init__(self, vector_store: VectorStore):
         self.store = vector_store
-        self.last_sources = []  # Track sources from last search
     
     def get_tool_definition(self) -> Dict[str, Any]:
         """Return Anthropic tool definition for this tool"""
@@ -49,7 +77,7 @@ class CourseSearchTool(Tool):
             }
         }
     
-    def execute(self, query: str, course_name: Optional[str] = None, lesson_number: Optional[int] = None) -> str:
+    def execute(self, query: str, course_name: Optional[str] = None, lesson_number: Optional[int] = None) -> ToolResult:
         """
         Execute the search tool with given parameters.
         
@@ -59,7 +87,7 @@ class CourseSearchTool(Tool):
             lesson_number: Optional lesson filter
             
         Returns:
-            Formatted search results or error message
+            ToolResult with the formatted search results and their sources, or an error message
         """
         
         # Use the vector store's unified search interface
@@ -71,7 +99,7 @@ class CourseSearchTool(Tool):
         
         # Handle errors
         if results.error:
-            return results.error
+            return ToolResult(results.error)
         
         # Handle empty results
         if results.is_empty():
@@ -80,13 +108,52 @@ class CourseSearchTool(Tool):
                 filter_info += f" in course '{course_name}'"
             if lesson_number:
                 filter_info += f" in lesson {lesson_number}"
-            return f"No relevant content found{filter_info}."
+            return ToolResult(f"No relevant content found{filter_info}.")
         
         # Format and return results
         return self._format_results(results)
     
-    def _format_results(self, results: SearchResults) -> str:
+    def retrieve(self, query: str, course_name: Optional[str] = None, lesson_number: Optional[int] = None) -> Optional[ToolResult]:
+        """
+        Search up front, outside a tool call.
+        
+        Returns:
+            ToolResult with the formatted search results and their sources, or None
+            when the search failed or found nothing
+        """
+        results = self.store.search(
+            query=query,
+            course_name=course_name,
+            lesson_number=lesson_number
+        )
+        if results.error or results.is_empty():
+            return None
+        return self._format_results(results)
+    
+    def retrieve_batch(self, requests: List[Tuple[str, Optional[str], Optional[int]]],
+                       dedup_threshold: float = 1.0) -> List[Optional[ToolResult]]:
+        """
+        Search up front for a batch of (query, course_name, lesson_number) requests
+        in bulk (see VectorStore.search_batch).
+        
+        Returns:
+            One ToolResult or None per request, as retrieve would return; requests that
+            shared a search share the ToolResult
+        """
+        results = self.store.search_batch(requests, dedup_threshold=dedup_threshold)
+        formatted: Dict[int, Optional[ToolResult]] = {}
+        for result in results:
+            if id(result) not in formatted:
+                formatted[id(result)] = None if result.error or result.is_empty() else self._format_results(result)
+        return [formatted[id(result)] for result in results]
+    
+    def _format_results(self, results: SearchResults) -> ToolResult:
         """Format search results with course and lesson context"""
+        with metrics.span("format_results"):
+            return self._format(results)
+    
+    def _format(self, results: SearchResults) -> ToolResult:
+        """The body of _format_results, timed as one stage"""
         formatted = []
         sources = []  # Track sources for the UI (now with links)
         
@@ -105,10 +172,10 @@ class CourseSearchTool(Tool):
             if lesson_num is not None:
                 source_text += f" - Lesson {lesson_num}"
             
-            # Try to get lesson link from course catalog
+            # Lesson links come from the store's in-memory catalog map, no database round trip
             lesson_link = None
             if lesson_num is not None:
-                lesson_link = self._get_lesson_link(course_title, lesson_num)
+                lesson_link = self.store.get_lesson_link(course_title, lesson_num)
             
             # Create structured source with link (if available)
             source_info = {
@@ -119,39 +186,18 @@ class CourseSearchTool(Tool):
             
             formatted.append(f"{header}\n{doc}")
         
-        # Store sources for retrieval
-        self.last_sources = sources
-        
-        return "\n\n".join(formatted)
-
-    def _get_lesson_link(self, course_title: str, lesson_number: int) -> Optional[str]:
-        """Retrieve lesson link from course catalog collection"""
-        try:
-            # Query the course catalog collection for the specific lesson
-            results = self.store.course_catalog.query(
-                query_texts=[f"{course_title} lesson {lesson_number}"],
-                n_results=10,  # Get more results to find the exact match
-                where={"course_title": course_title}
-            )
-            
-            # Look through results to find the exact lesson match
-            if results['metadatas'] and len(results['metadatas'][0]) > 0:
-                for metadata in results['metadatas'][0]:
-                    if (metadata.get('lesson_number') == lesson_number and 
-                        metadata.get('course_title') == course_title):
-                        return metadata.get('lesson_link')
-            
-            return None
-            
-        except Exception as e:
-            print(f"Error retrieving lesson link: {e}")
-            return None
+        # Sources travel with the result instead of living on the shared tool
+        return ToolResult("\n\n".join(formatted), sources)
 
 class ToolManager:
     """Manages available tools for the AI"""
     
-    def __init__(self):
+    def __init__(self, max_workers: int = 4, timeout: Optional[float] = None):
         self.tools = {}
+        # Tool calls get their own bounded pool: a call that times out keeps running until it
+        # returns, and must not hold up the threads that serve searches and embeddings
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="rag-tools")
+        self.timeout = timeout  # Seconds a tool call may take before it is reported as failed
     
     def register_tool(self, tool: Tool):
         """Register any tool that implements the Tool interface"""
@@ -166,23 +212,94 @@ class ToolManager:
         """Get all tool definitions for Anthropic tool calling"""
         return [tool.get_tool_definition() for tool in self.tools.values()]
     
-    def execute_tool(self, tool_name: str, **kwargs) -> str:
-        """Execute a tool by name with given parameters"""
+    def execute_tool(self, tool_name: str, tool_input: Optional[Dict[str, Any]] = None,
+                     context: Optional[ToolExecutionContext] = None) -> str:
+        """
+        Execute a tool by name, recording its sources in the request's context.
+        
+        The input is passed as a dict rather than keyword arguments, so a tool
+        parameter can have any name, "context" included.
+        """
+        result = self._call_tool(tool_name, tool_input or {})
+        if context is not None:
+            context.record(result)
+        return result.content
+    
+    async def aexecute_tool(self, tool_name: str, tool_input: Optional[Dict[str, Any]] = None,
+                            context: Optional[ToolExecutionContext] = None) -> str:
+        """Execute a tool on the tool pool so its blocking work stays off the event loop"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, partial(self.execute_tool, tool_name, tool_input, context))
+    
+    def execute_tools(self, tool_calls: List[Tuple[str, Dict[str, Any]]],
+                      context: Optional[ToolExecutionContext] = None) -> List[ToolResult]:
+        """
+        Execute the tool calls of one model turn concurrently on the tool pool.
+        
+        Args:
+            tool_calls: (tool name, input) pairs in the order the model requested them
+            context: The request's execution context, receives the sources of every call
+            
+        Returns:
+            One ToolResult per call, in request order
+        """
+        if len(tool_calls) == 1 and self.timeout is None:
+            outcomes = [self._run_tool(name, tool_input) for name, tool_input in tool_calls]
+        else:
+            futures = [self.executor.submit(self._run_tool, name, tool_input) for name, tool_input in tool_calls]
+            deadline = time.monotonic() + self.timeout if self.timeout is not None else None
+            outcomes = []
+            for (name, _), future in zip(tool_calls, futures):
+                try:
+                    remaining = max(0.0, deadline - time.monotonic()) if deadline is not None else None
+                    outcomes.append(future.result(timeout=remaining))
+                except FutureTimeoutError:
+                    future.cancel()  # Not started yet: never run it; running: its result is discarded
+                    outcomes.append(self._timeout_error(name))
+        
+        self._record(outcomes, context)
+        return outcomes
+    
+    async def aexecute_tools(self, tool_calls: List[Tuple[str, Dict[str, Any]]],
+                             context: Optional[ToolExecutionContext] = None) -> List[ToolResult]:
+        """Async variant of execute_tools, awaiting the calls off the event loop"""
+        loop = asyncio.get_running_loop()
+        
+        async def run(name: str, tool_input: Dict[str, Any]) -> ToolResult:
+            call = loop.run_in_executor(self.executor, self._run_tool, name, tool_input)
+            try:
+                return await asyncio.wait_for(call, self.timeout)
+            except asyncio.TimeoutError:
+                return self._timeout_error(name)
+        
+        outcomes = list(await asyncio.gather(*(run(name, tool_input) for name, tool_input in tool_calls)))
+        self._record(outcomes, context)
+        return outcomes
+    
+    def _call_tool(self, tool_name: str, tool_input: Dict[str, Any]) -> ToolResult:
+        """Execute one tool call and normalize its output to a ToolResult"""
         if tool_name not in self.tools:
-            return f"Tool '{tool_name}' not found"
+            return ToolResult(f"Tool '{tool_name}' not found", is_error=True)
         
-        return self.tools[tool_name].execute(**kwargs)
-    
-    def get_last_sources(self) -> list:
-        """Get sources from the last search operation"""
-        # Check all tools for last_sources attribute
-        for tool in self.tools.values():
-            if hasattr(tool, 'last_sources') and tool.last_sources:
-                return tool.last_sources
-        return []
-
-    def reset_sources(self):
-        """Reset sources from all tools that track sources"""
-        for tool in self.tools.values():
-            if hasattr(tool, 'last_sources'):
-                tool.last_sources = []
\ No newline at end of file
+        result = self.tools[tool_name].execute(**tool_input)
+        return result if isinstance(result, ToolResult) else ToolResult(result)
+    
+    def _run_tool(self, tool_name: str, tool_input: Dict[str, Any]) -> ToolResult:
+        """Execute one tool call, reporting a failure as an error result instead of raising"""
+        try:
+            return self._call_tool(tool_name, tool_input)
+        except Exception as e:
+            print(f"Tool '{tool_name}' failed: {e}")
+            return ToolResult(f"Tool '{tool_name}' failed: {e}", is_error=True)
+    
+    def _timeout_error(self, tool_name: str) -> ToolResult:
+        """Error result for a tool call that did not finish in time"""
+        print(f"Tool '{tool_name}' timed out after {self.timeout}s")
+        return ToolResult(f"Tool '{tool_name}' timed out after {self.timeout} seconds", is_error=True)
+    
+    @staticmethod
+    def _record(outcomes: List[ToolResult], context: Optional[ToolExecutionContext]):
+        """Collect sources in request order, on the calling thread"""
+        if context is not None:
+            for outcome in outcomes:
+                context.record(outcome)
@@ -0,0 +1,349 @@
+import json
+import math
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from conversation_summarizer import SUMMARY_PREFIX
+from session_manager import SessionBackend, SessionManager
+
+
+def _trim_entries(entries: List[List[Any]], token_budget: int) -> int:
+    """
+    Drop the oldest [tokens, line] entries beyond the token budget, keeping the newest
+    and a leading summary.
+
+    Returns:
+        Token total of the remaining entries
+    """
+    total = sum(tokens for tokens, _ in entries)
+    oldest = 1 if entries and entries[0][1].startswith(SUMMARY_PREFIX) else 0
+    dropped = oldest
+    while total > token_budget and len(entries) - dropped > 1:
+        total -= entries[dropped][0]
+        dropped += 1
+    del entries[oldest:dropped]
+    return total
+
+
+class SQLiteSessionBackend(SessionBackend):
+    """
+    Sessions in an SQLite database in WAL mode, shared by the worker processes of one host.
+
+    Each session is one row holding its trimmed messages and the preformatted
+    history, so reading a history is a single primary key lookup and an append is
+    one short write transaction. Idle time counts from the last exchange.
+    """
+
+    def __init__(self, path: str, max_sessions: int = 10000, idle_ttl: float = 3600,
+                 history_token_budget: int = 1000):
+        super().__init__(idle_ttl, history_token_budget)
+        self.path = path
+        self.max_sessions = max_sessions
+        self._local = threading.local()  # sqlite3 connections must stay on their thread
+        self.evictions = 0
+        self.expirations = 0
+
+        connection = self._connection()
+        connection.execute("""
+            CREATE TABLE IF NOT EXISTS sessions (
+                session_id TEXT PRIMARY KEY,
+                last_used REAL NOT NULL,
+                tokens INTEGER NOT NULL,
+                messages TEXT NOT NULL,
+                history TEXT NOT NULL
+            )
+        """)
+        connection.execute("CREATE INDEX IF NOT EXISTS sessions_last_used ON sessions (last_used)")
+
+    def _connection(self) -> sqlite3.Connection:
+        """This thread's connection, opened on first use"""
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            # Autocommit mode: transactions are opened explicitly where they are needed
+            connection = sqlite3.connect(self.path, timeout=5.0, isolation_level=None)
+            # WAL lets readers in other workers proceed while one worker appends
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+        return connection
+
+    def create_session(self) -> str:
+        """Create a new conversation session, purging expired and surplus sessions"""
+        connection = self._connection()
+        expired = connection.execute(
+            "DELETE FROM sessions WHERE last_used < ?", (time.time() - self.idle_ttl,)
+        ).rowcount
+        evicted = connection.execute(
+            "DELETE FROM sessions WHERE session_id IN "
+            "(SELECT session_id FROM sessions ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+            (max(self.max_sessions - 1, 0),)
+        ).rowcount
+        self.expirations += expired
+        self.evictions += evicted
+        # The row is written with the first exchange
+        return self.new_session_id()
+
+    def append(self, session_id: str, messages: List[Tuple[str, str]]):
+        """Atomically add (role, content) messages and trim the history to the token budget"""
+        now = time.time()
+        lines = [self.format_message(role, content) for role, content in messages]
+        connection = self._connection()
+        # Take the write lock up front so concurrent appends queue instead of failing to upgrade
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            row = connection.execute(
+                "SELECT last_used, messages FROM sessions WHERE session_id = ?", (session_id,)
+            ).fetchone()
+            entries = json.loads(row[1]) if row and now - row[0] < self.idle_ttl else []
+            entries.extend([self.estimate_tokens(line), line] for line in lines)
+            tokens = _trim_entries(entries, self.history_token_budget)
+            connection.execute(
+                "INSERT INTO sessions (session_id, last_used, tokens, messages, history) VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT (session_id) DO UPDATE SET last_used = excluded.last_used, tokens = excluded.tokens, "
+                "messages = excluded.messages, history = excluded.history",
+                (session_id, now, tokens, json.dumps(entries), "\n".join(line for _, line in entries))
+            )
+            connection.execute("COMMIT")
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+
+    def get_conversation_history(self, session_id: Optional[str]) -> Optional[str]:
+        """Get formatted conversation history for a session"""
+        if not session_id:
+            return None
+        row = self._connection().execute(
+            "SELECT last_used, history FROM sessions WHERE session_id = ?", (session_id,)
+        ).fetchone()
+        if not row or time.time() - row[0] >= self.idle_ttl or not row[1]:
+            return None
+        return row[1]
+
+    def get_lines(self, session_id: str) -> List[str]:
+        """The formatted messages of a session, oldest first"""
+        row = self._connection().execute(
+            "SELECT messages FROM sessions WHERE session_id = ?", (session_id,)
+        ).fetchone()
+        return [line for _, line in json.loads(row[0])] if row else []
+
+    def fold(self, session_id: str, old_lines: List[str], summary: str) -> bool:
+        """Atomically replace the oldest messages with a summary message"""
+        if not old_lines:
+            return False
+        connection = self._connection()
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            row = connection.execute(
+                "SELECT messages FROM sessions WHERE session_id = ?", (session_id,)
+            ).fetchone()
+            entries = json.loads(row[0]) if row else []
+            if [line for _, line in entries[:len(old_lines)]] != old_lines:
+                connection.execute("ROLLBACK")
+                return False
+
+            line = self.format_message("summary", summary)
+            entries[:len(old_lines)] = [[self.estimate_tokens(line), line]]
+            connection.execute(
+                "UPDATE sessions SET tokens = ?, messages = ?, history = ? WHERE session_id = ?",
+                (sum(tokens for tokens, _ in entries), json.dumps(entries),
+                 "\n".join(line for _, line in entries), session_id)
+            )
+            connection.execute("COMMIT")
+            return True
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+
+    def clear_session(self, session_id: str):
+        """Clear all messages from a session"""
+        self._connection().execute("DELETE FROM sessions WHERE session_id = ?", (session_id,))
+
+    def stats(self) -> Dict[str, Any]:
+        """Live session count and stored size; eviction counters are this process's"""
+        sessions, stored_bytes = self._connection().execute(
+            "SELECT COUNT(*), COALESCE(SUM(LENGTH(messages) + LENGTH(history)), 0) FROM sessions "
+            "WHERE last_used >= ?", (time.time() - self.idle_ttl,)
+        ).fetchone()
+        return {
+            "backend": "sqlite",
+            "sessions": sessions,
+            "max_sessions": self.max_sessions,
+            "stored_bytes": stored_bytes,
+            "evictions": self.evictions,
+            "expirations": self.expirations
+        }
+
+
+# Appends messages and trims the history to the token budget in one atomic step,
+# never dropping the newest entry or a leading summary entry.
+# KEYS[1]: list of "<tokens>:<formatted message>" entries
+# KEYS[2]: hash with the token total and the preformatted history
+# ARGV[1]: token budget, ARGV[2]: idle TTL in seconds, ARGV[3...]: new entries
+_APPEND_SCRIPT = """
+local function entry_tokens(entry)
+    return tonumber(string.match(entry, '^(%d+):'))
+end
+
+local total = tonumber(redis.call('HGET', KEYS[2], 'tokens') or '0')
+for i = 3, #ARGV do
+    redis.call('RPUSH', KEYS[1], ARGV[i])
+    total = total + entry_tokens(ARGV[i])
+end
+
+local budget = tonumber(ARGV[1])
+local head = redis.call('LINDEX', KEYS[1], 0)
+local summary = head and string.find(head, '^%d+:Summary: ') and redis.call('LPOP', KEYS[1])
+while total > budget and redis.call('LLEN', KEYS[1]) > 1 do
+    total = total - entry_tokens(redis.call('LPOP', KEYS[1]))
+end
+if summary then
+    redis.call('LPUSH', KEYS[1], summary)
+end
+
+local lines = {}
+for i, entry in ipairs(redis.call('LRANGE', KEYS[1], 0, -1)) do
+    lines[i] = string.sub(entry, string.find(entry, ':', 1, true) + 1)
+end
+redis.call('HSET', KEYS[2], 'tokens', total, 'history', table.concat(lines, '\\n'))
+redis.call('EXPIRE', KEYS[1], ARGV[2])
+redis.call('EXPIRE', KEYS[2], ARGV[2])
+return total
+"""
+
+# Replaces the oldest entries with a summary entry if they are still the expected ones.
+# KEYS as for _APPEND_SCRIPT; ARGV[1]: summary entry, ARGV[2...]: entries being replaced
+_FOLD_SCRIPT = """
+local count = #ARGV - 1
+local current = redis.call('LRANGE', KEYS[1], 0, count - 1)
+if #current ~= count then
+    return 0
+end
+for i = 1, count do
+    if current[i] ~= ARGV[i + 1] then
+        return 0
+    end
+end
+redis.call('LTRIM', KEYS[1], count, -1)
+redis.call('LPUSH', KEYS[1], ARGV[1])
+
+local total = 0
+local lines = {}
+for i, entry in ipairs(redis.call('LRANGE', KEYS[1], 0, -1)) do
+    local separator = string.find(entry, ':', 1, true)
+    total = total + tonumber(string.sub(entry, 1, separator - 1))
+    lines[i] = string.sub(entry, separator + 1)
+end
+redis.call('HSET', KEYS[2], 'tokens', total, 'history', table.concat(lines, '\\n'))
+return 1
+"""
+
+
+class RedisSessionBackend(SessionBackend):
+    """
+    Sessions in Redis, or any server speaking its protocol, shared by workers on any host.
+
+    An append is a single server-side script call and a history read a single
+    HGET. Redis expires idle sessions itself; bound the number of sessions with
+    the server's maxmemory policy. Pass client to use an existing connection or
+    a local fake such as fakeredis.
+    """
+
+    def __init__(self, url: str = "redis://localhost:6379/0", client=None, key_prefix: str = "rag:session:",
+                 idle_ttl: float = 3600, history_token_budget: int = 1000):
+        super().__init__(idle_ttl, history_token_budget)
+        if client is None:
+            try:
+                import redis
+            except ImportError as e:
+                raise ImportError("The redis session backend requires redis (pip install redis)") from e
+            client = redis.Redis.from_url(url)
+        self.client = client
+        self.key_prefix = key_prefix
+        self._append_script = client.register_script(_APPEND_SCRIPT)
+        self._fold_script = client.register_script(_FOLD_SCRIPT)
+
+    def _keys(self, session_id: str) -> Tuple[str, str]:
+        """Message list and metadata hash of a session, in one cluster hash slot"""
+        base = f"{self.key_prefix}{{{session_id}}}"
+        return f"{base}:messages", base
+
+    def _entry(self, line: str) -> str:
+        """List entry of a formatted message, prefixed with its token estimate"""
+        return f"{self.estimate_tokens(line)}:{line}"
+
+    def create_session(self) -> str:
+        """Create a new conversation session; its keys are written with the first exchange"""
+        return self.new_session_id()
+
+    def append(self, session_id: str, messages: List[Tuple[str, str]]):
+        """Atomically add (role, content) messages and trim the history to the token budget"""
+        entries = [self._entry(self.format_message(role, content)) for role, content in messages]
+        self._append_script(
+            keys=list(self._keys(session_id)),
+            args=[self.history_token_budget, math.ceil(self.idle_ttl), *entries]
+        )
+
+    def get_conversation_history(self, session_id: Optional[str]) -> Optional[str]:
+        """Get formatted conversation history for a session"""
+        if not session_id:
+            return None
+        history = self.client.hget(self._keys(session_id)[1], "history")
+        if not history:
+            return None
+        return history.decode("utf-8") if isinstance(history, bytes) else history
+
+    def get_lines(self, session_id: str) -> List[str]:
+        """The formatted messages of a session, oldest first"""
+        entries = self.client.lrange(self._keys(session_id)[0], 0, -1)
+        lines = [entry.decode("utf-8") if isinstance(entry, bytes) else entry for entry in entries]
+        return [line.split(":", 1)[1] for line in lines]
+
+    def fold(self, session_id: str, old_lines: List[str], summary: str) -> bool:
+        """Atomically replace the oldest messages with a summary message"""
+        if not old_lines:
+            return False
+        summary_entry = self._entry(self.format_message("summary", summary))
+        return bool(self._fold_script(
+            keys=list(self._keys(session_id)),
+            args=[summary_entry, *(self._entry(line) for line in old_lines)]
+        ))
+
+    def clear_session(self, session_id: str):
+        """Clear all messages from a session"""
+        self.client.delete(*self._keys(session_id))
+
+    def stats(self) -> Dict[str, Any]:
+        """Backend settings; sizes and evictions are tracked by the Redis server"""
+        return {
+            "backend": "redis",
+            "key_prefix": self.key_prefix,
+            "idle_ttl": self.idle_ttl,
+            "history_token_budget": self.history_token_budget
+        }
+
+
+def create_session_backend(config) -> SessionBackend:
+    """The session store selected by config.SESSION_BACKEND"""
+    if config.SESSION_BACKEND == "sqlite":
+        return SQLiteSessionBackend(
+            config.SESSION_DB_PATH,
+            max_sessions=config.MAX_SESSIONS,
+            idle_ttl=config.SESSION_IDLE_TTL,
+            history_token_budget=config.HISTORY_TOKEN_BUDGET
+        )
+    if config.SESSION_BACKEND == "redis":
+        return RedisSessionBackend(
+            config.REDIS_URL,
+            idle_ttl=config.SESSION_IDLE_TTL,
+            history_token_budget=config.HISTORY_TOKEN_BUDGET
+        )
+    if config.SESSION_BACKEND != "memory":
+        raise ValueError(f"Unknown session backend: {config.SESSION_BACKEND}")
+    return SessionManager(
+        max_sessions=config.MAX_SESSIONS,
+        idle_ttl=config.SESSION_IDLE_TTL,
+        history_token_budget=config.HISTORY_TOKEN_BUDGET,
+        max_memory_bytes=config.SESSION_MAX_MEMORY_MB * 1024 * 1024
+    )
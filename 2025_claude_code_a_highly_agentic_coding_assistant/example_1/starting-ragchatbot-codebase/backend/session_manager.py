@@ -1,61 +1,278 @@
-from typing import Dict, List, Optional
-from dataclasses import dataclass
+import itertools
+import sys
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from collections import OrderedDict, deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+from dataclasses import dataclass, field
 
 @dataclass
 class Message:
     """Represents a single message in a conversation"""
-    role: str     # "user" or "assistant"
-    content: str  # The message content
-
-class SessionManager:
-    """Manages conversation sessions and message history"""
-    
-    def __init__(self, max_history: int = 5):
-        self.max_history = max_history
-        self.sessions: Dict[str, List[Message]] = {}
-        self.session_counter = 0
-    
+    role: str        # "user", "assistant" or "summary" (of earlier messages)
+    content: str     # The message content
+    tokens: int = 0  # Estimated prompt tokens of the formatted message
+
+@dataclass
+class Session:
+    """A conversation and the bookkeeping needed to bound it"""
+    last_used: float
+    messages: Deque[Message] = field(default_factory=deque)
+    tokens: int = 0                # Estimated tokens of all messages
+    size_bytes: int = 0            # Memory held by message contents and the cached history
+    history: Optional[str] = None  # Formatted history, rebuilt only after the messages change
+
+class SessionBackend(ABC):
+    """
+    Storage interface for conversation sessions.
+
+    Every implementation expires sessions after idle_ttl seconds without use and
+    trims each history, oldest message first, to history_token_budget tokens as
+    part of the same atomic append, so several server processes can share one
+    out-of-process store.
+    """
+
+    def __init__(self, idle_ttl: float = 3600, history_token_budget: int = 1000):
+        self.idle_ttl = idle_ttl
+        self.history_token_budget = history_token_budget
+
+    @staticmethod
+    def estimate_tokens(text: str) -> int:
+        """Rough prompt token count (about four characters per token for English text)"""
+        return len(text) // 4 + 1
+
+    @staticmethod
+    def format_message(role: str, content: str) -> str:
+        """A message as it appears in the conversation history"""
+        return f"{role.title()}: {content}"
+
+    @staticmethod
+    def new_session_id() -> str:
+        """Random session ID; counters are guessable and collide across processes and restarts"""
+        return f"session_{uuid.uuid4().hex}"
+
+    @abstractmethod
     def create_session(self) -> str:
         """Create a new conversation session"""
-        self.session_counter += 1
-        session_id = f"session_{self.session_counter}"
-        self.sessions[session_id] = []
-        return session_id
-    
+
+    @abstractmethod
+    def append(self, session_id: str, messages: List[Tuple[str, str]]):
+        """Atomically add (role, content) messages and trim the history to the token budget"""
+
+    @abstractmethod
+    def get_conversation_history(self, session_id: Optional[str]) -> Optional[str]:
+        """Get formatted conversation history for a session"""
+
+    @abstractmethod
+    def get_lines(self, session_id: str) -> List[str]:
+        """The formatted messages of a session, oldest first"""
+
+    @abstractmethod
+    def fold(self, session_id: str, old_lines: List[str], summary: str) -> bool:
+        """
+        Atomically replace the oldest messages with a summary message.
+
+        Args:
+            session_id: Session to compact
+            old_lines: The formatted messages being replaced, as read by get_lines
+            summary: Text of the "summary" message taking their place
+
+        Returns:
+            False, changing nothing, if the session no longer starts with old_lines
+        """
+
+    @abstractmethod
+    def clear_session(self, session_id: str):
+        """Clear all messages from a session"""
+
+    @abstractmethod
+    def stats(self) -> Dict[str, Any]:
+        """Size and eviction counters of the store"""
+
     def add_message(self, session_id: str, role: str, content: str):
         """Add a message to the conversation history"""
-        if session_id not in self.sessions:
-            self.sessions[session_id] = []
-        
-        message = Message(role=role, content=content)
-        self.sessions[session_id].append(message)
-        
-        # Keep conversation history within limits
-        if len(self.sessions[session_id]) > self.max_history * 2:
-            self.sessions[session_id] = self.sessions[session_id][-self.max_history * 2:]
-    
+        self.append(session_id, [(role, content)])
+
     def add_exchange(self, session_id: str, user_message: str, assistant_message: str):
         """Add a complete question-answer exchange"""
-        self.add_message(session_id, "user", user_message)
-        self.add_message(session_id, "assistant", assistant_message)
-    
+        self.append(session_id, [("user", user_message), ("assistant", assistant_message)])
+
+class SessionManager(SessionBackend):
+    """
+    In-process conversation sessions, for a single server worker.
+
+    Sessions live in an LRU map bounded by count and by memory; a session idle for
+    longer than idle_ttl seconds expires. Each history is trimmed, oldest message
+    first, to a token budget rather than a fixed number of messages.
+    """
+
+    def __init__(self, max_sessions: int = 10000, idle_ttl: float = 3600,
+                 history_token_budget: int = 1000, max_memory_bytes: int = 64 * 1024 * 1024):
+        super().__init__(idle_ttl, history_token_budget)
+        self.max_sessions = max_sessions
+        self.max_memory_bytes = max_memory_bytes
+        self.sessions: "OrderedDict[str, Session]" = OrderedDict()  # Least recently used first
+        self._lock = threading.Lock()
+        self.memory_bytes = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def create_session(self) -> str:
+        """Create a new conversation session"""
+        session_id = self.new_session_id()
+        with self._lock:
+            self._session(session_id, time.monotonic())
+        return session_id
+
+    def append(self, session_id: str, messages: List[Tuple[str, str]]):
+        """Add (role, content) messages and trim the history to the token budget"""
+        with self._lock:
+            session = self._session(session_id, time.monotonic())
+            for role, content in messages:
+                message = Message(role=role, content=content,
+                                  tokens=self.estimate_tokens(self.format_message(role, content)))
+                session.messages.append(message)
+                session.tokens += message.tokens
+                self._resize(session, sys.getsizeof(content))
+
+            # Keep conversation history within the token budget, but never drop the newest
+            # message or the summary standing in for everything before it
+            oldest = 1 if session.messages[0].role == "summary" else 0
+            while session.tokens > self.history_token_budget and len(session.messages) - oldest > 1:
+                dropped = session.messages[oldest]
+                del session.messages[oldest]
+                session.tokens -= dropped.tokens
+                self._resize(session, -sys.getsizeof(dropped.content))
+
+            self._set_history(session, None)
+            self._evict()
+
     def get_conversation_history(self, session_id: Optional[str]) -> Optional[str]:
         """Get formatted conversation history for a session"""
-        if not session_id or session_id not in self.sessions:
-            return None
-        
-        messages = self.sessions[session_id]
-        if not messages:
+        if not session_id:
             return None
-        
-        # Format messages for context
-        formatted_messages = []
-        for msg in messages:
-            formatted_messages.append(f"{msg.role.title()}: {msg.content}")
-        
-        return "\n".join(formatted_messages)
-    
+
+        with self._lock:
+            session = self._live_session(session_id, time.monotonic())
+            if session is None or not session.messages:
+                return None
+
+            # Format messages for context once per change, not once per turn
+            if session.history is None:
+                self._set_history(session, "\n".join(self.format_message(msg.role, msg.content)
+                                                     for msg in session.messages))
+                self._evict()
+            return session.history
+
+    def get_lines(self, session_id: str) -> List[str]:
+        """The formatted messages of a session, oldest first"""
+        with self._lock:
+            session = self.sessions.get(session_id)
+            if session is None:
+                return []
+            return [self.format_message(msg.role, msg.content) for msg in session.messages]
+
+    def fold(self, session_id: str, old_lines: List[str], summary: str) -> bool:
+        """Atomically replace the oldest messages with a summary message"""
+        with self._lock:
+            session = self.sessions.get(session_id)
+            if not old_lines or session is None or len(session.messages) < len(old_lines):
+                return False
+            current = [self.format_message(msg.role, msg.content)
+                       for msg in itertools.islice(session.messages, len(old_lines))]
+            if current != old_lines:
+                return False
+
+            for _ in old_lines:
+                dropped = session.messages.popleft()
+                session.tokens -= dropped.tokens
+                self._resize(session, -sys.getsizeof(dropped.content))
+            message = Message(role="summary", content=summary,
+                              tokens=self.estimate_tokens(self.format_message("summary", summary)))
+            session.messages.appendleft(message)
+            session.tokens += message.tokens
+            self._resize(session, sys.getsizeof(summary))
+            self._set_history(session, None)
+            return True
+
     def clear_session(self, session_id: str):
         """Clear all messages from a session"""
-        if session_id in self.sessions:
-            self.sessions[session_id] = []
\ No newline at end of file
+        with self._lock:
+            session = self.sessions.get(session_id)
+            if session is not None:
+                self._resize(session, -session.size_bytes)
+                self.sessions[session_id] = Session(last_used=session.last_used)
+
+    def stats(self) -> Dict[str, Any]:
+        """Session counts, memory use and eviction counters"""
+        with self._lock:
+            self._expire(time.monotonic())
+            return {
+                "backend": "memory",
+                "sessions": len(self.sessions),
+                "max_sessions": self.max_sessions,
+                "memory_bytes": self.memory_bytes,
+                "max_memory_bytes": self.max_memory_bytes,
+                "evictions": self.evictions,
+                "expirations": self.expirations
+            }
+
+    def _live_session(self, session_id: str, now: float) -> Optional[Session]:
+        """The session if it exists and has not expired, marked as used (caller holds the lock)"""
+        session = self.sessions.get(session_id)
+        if session is None:
+            return None
+        if now - session.last_used >= self.idle_ttl:
+            self._drop(session_id)
+            self.expirations += 1
+            return None
+        session.last_used = now
+        self.sessions.move_to_end(session_id)
+        return session
+
+    def _session(self, session_id: str, now: float) -> Session:
+        """The live session, created if missing or expired (caller holds the lock)"""
+        session = self._live_session(session_id, now)
+        if session is None:
+            self._expire(now)
+            session = self.sessions[session_id] = Session(last_used=now)
+            self._evict()
+        return session
+
+    def _set_history(self, session: Session, history: Optional[str]):
+        """Replace the cached history string, keeping memory accounting in step"""
+        if session.history is not None:
+            self._resize(session, -sys.getsizeof(session.history))
+        session.history = history
+        if history is not None:
+            self._resize(session, sys.getsizeof(history))
+
+    def _resize(self, session: Session, delta: int):
+        """Account for memory gained or released by a session"""
+        session.size_bytes += delta
+        self.memory_bytes += delta
+
+    def _drop(self, session_id: str):
+        """Remove a session and release its memory"""
+        session = self.sessions.pop(session_id)
+        self.memory_bytes -= session.size_bytes
+
+    def _expire(self, now: float):
+        """Drop idle sessions; they sit at the least recently used end (caller holds the lock)"""
+        while self.sessions:
+            session_id, session = next(iter(self.sessions.items()))
+            if now - session.last_used < self.idle_ttl:
+                break
+            self._drop(session_id)
+            self.expirations += 1
+
+    def _evict(self):
+        """Drop least recently used sessions beyond the count and memory limits (caller holds the lock)"""
+        # The most recently used session is kept even if it alone exceeds the memory limit
+        while len(self.sessions) > 1 and (
+            len(self.sessions) > self.max_sessions or self.memory_bytes > self.max_memory_bytes
+        ):
+            self._drop(next(iter(self.sessions)))
+            self.evictions += 1
@@ -0,0 +1,62 @@
+import contextlib
+import threading
+import time
+from typing import Any, Dict, Optional
+
+
+class StartupState:
+    """
+    Progress of the staged server startup.
+
+    The server answers health checks as soon as it is listening; the heavy phases
+    (imports, opening the index, loading the models, indexing the docs) run in the
+    background and are timed one by one. The server is ready once they all finished.
+    """
+
+    def __init__(self, started: Optional[float] = None):
+        self.started = started if started is not None else time.perf_counter()
+        self.phases: Dict[str, float] = {}  # Phase name -> seconds, in completion order
+        self.current: Optional[str] = None
+        self.error: Optional[str] = None
+        self._ready = threading.Event()
+
+    @contextlib.contextmanager
+    def phase(self, name: str):
+        """Time a startup phase and report it when it ends; a failing phase stays current"""
+        self.current = name
+        start = time.perf_counter()
+        yield
+        self.record(name, time.perf_counter() - start)
+        self.current = None
+
+    def record(self, name: str, seconds: float):
+        """Record a phase timed elsewhere"""
+        self.phases[name] = seconds
+        print(f"Startup phase {name}: {seconds:.2f}s")
+
+    def mark_ready(self):
+        self._ready.set()
+        print(f"Ready after {time.perf_counter() - self.started:.2f}s")
+
+    def fail(self, error: Exception):
+        """Startup cannot finish; the server stays up but never becomes ready"""
+        self.error = f"{type(error).__name__}: {error}"
+        print(f"Startup failed in phase {self.current}: {self.error}")
+
+    @property
+    def ready(self) -> bool:
+        return self._ready.is_set()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Block until ready; False on timeout"""
+        return self._ready.wait(timeout)
+
+    def report(self) -> Dict[str, Any]:
+        """Readiness, the running phase and per-phase timings"""
+        return {
+            "ready": self.ready,
+            "phase": self.current,
+            "error": self.error,
+            "phases_seconds": dict(self.phases),
+            "elapsed_seconds": time.perf_counter() - self.started,
+        }
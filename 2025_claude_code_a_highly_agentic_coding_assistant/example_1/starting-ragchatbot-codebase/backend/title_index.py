@@ -0,0 +1,142 @@
+import bisect
+import threading
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Set
+
+
+class CourseTitleIndex:
+    """
+    In-process lexical index over course titles.
+
+    Resolves a user supplied course name by exact, case-insensitive, prefix and
+    trigram-fuzzy matching. Returns None when nothing matches or when the best
+    matches are too close to call, so the caller can fall back to semantic search.
+    """
+
+    def __init__(self, fuzzy_threshold: float = 0.5, ambiguity_margin: float = 0.1, max_postings: int = 64):
+        self.fuzzy_threshold = fuzzy_threshold    # Minimum share of query trigrams found in a title
+        self.ambiguity_margin = ambiguity_margin  # Runner-up within this score is ambiguous
+        self.max_postings = max_postings          # Trigrams shared by more titles are too common to score
+        self._lock = threading.Lock()
+        self._titles: Set[str] = set()
+        self._rebuild_lookups()
+
+    @staticmethod
+    def normalize(text: str) -> str:
+        """Case-folded text with collapsed whitespace"""
+        return " ".join(text.split()).casefold()
+
+    @staticmethod
+    def trigrams(text: str) -> Set[str]:
+        """Character trigrams of normalized text, padded at word boundaries"""
+        padded = f" {text} "
+        return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+    def rebuild(self, titles: Iterable[str]):
+        """Replace the indexed titles"""
+        with self._lock:
+            self._titles = set(titles)
+            self._rebuild_lookups()
+
+    def add(self, titles: Iterable[str]):
+        """Index additional titles"""
+        with self._lock:
+            new_titles = set(titles) - self._titles
+            if new_titles:
+                self._titles |= new_titles
+                self._rebuild_lookups()
+
+    def remove(self, title: str):
+        """Drop a title from the index"""
+        with self._lock:
+            if title in self._titles:
+                self._titles.discard(title)
+                self._rebuild_lookups()
+
+    def _rebuild_lookups(self):
+        """Recompute the lookup structures (caller holds the lock)"""
+        by_normalized: Dict[str, List[str]] = defaultdict(list)
+        postings: Dict[str, List[str]] = defaultdict(list)
+        for title in self._titles:
+            normalized = self.normalize(title)
+            by_normalized[normalized].append(title)
+            for gram in self.trigrams(normalized):
+                postings[gram].append(title)
+
+        # Swap in complete structures so lock-free readers never see a partial index
+        self._by_normalized = dict(by_normalized)
+        self._sorted_normalized = sorted(by_normalized)
+        self._postings = dict(postings)
+
+    def __len__(self) -> int:
+        return len(self._titles)
+
+    def titles(self) -> List[str]:
+        """All indexed titles"""
+        return sorted(self._titles)
+
+    def resolve(self, course_name: str) -> Optional[str]:
+        """
+        Resolve a course name to a known title.
+
+        Args:
+            course_name: Full or partial course name as typed by the user
+
+        Returns:
+            The matching title, or None if there is no unambiguous lexical match
+        """
+        if course_name in self._titles:
+            return course_name
+
+        normalized = self.normalize(course_name)
+        if not normalized:
+            return None
+
+        by_normalized = self._by_normalized
+        exact = by_normalized.get(normalized)
+        if exact:
+            return exact[0] if len(exact) == 1 else None
+
+        prefixed = self._prefix_matches(normalized)
+        if len(prefixed) == 1:
+            return prefixed[0]
+
+        return self._fuzzy_match(normalized)
+
+    def _prefix_matches(self, normalized: str) -> List[str]:
+        """Titles whose normalized form starts with the query"""
+        keys = self._sorted_normalized
+        matches = []
+        i = bisect.bisect_left(keys, normalized)
+        while i < len(keys) and keys[i].startswith(normalized):
+            matches.extend(self._by_normalized[keys[i]])
+            if len(matches) > 1:
+                break
+            i += 1
+        return matches
+
+    def _fuzzy_match(self, normalized: str) -> Optional[str]:
+        """Best title by trigram containment, if it clearly beats the runner-up"""
+        postings = self._postings
+        query_grams = self.trigrams(normalized)
+
+        # Score only on selective trigrams so lookup cost stays flat as the catalog grows
+        selective = [gram for gram in query_grams if len(postings.get(gram, ())) <= self.max_postings]
+        if len(selective) < len(query_grams) / 2:
+            return None
+
+        shared: Dict[str, int] = defaultdict(int)
+        for gram in selective:
+            for title in postings.get(gram, ()):
+                shared[title] += 1
+        if not shared:
+            return None
+
+        scores = sorted((count / len(selective) for count in shared.values()), reverse=True)
+        best_score = scores[0]
+        if best_score < self.fuzzy_threshold:
+            return None
+        if len(scores) > 1 and best_score - scores[1] < self.ambiguity_margin:
+            return None
+
+        return max(shared, key=shared.get)
@@ -1,25 +1,36 @@
+import os
+import threading
 import chromadb
+import numpy as np
 from chromadb.config import Settings
-from typing import List, Dict, Any, Optional
-from dataclasses import dataclass
+from chromadb.utils.embedding_functions import SentenceTransformerEmbeddingFunction
+from typing import List, Dict, Any, Optional, Tuple
+from dataclasses import dataclass, field
 from models import Course, CourseChunk
-from sentence_transformers import SentenceTransformer
+from embedding_cache import EmbeddingCache
+from lexical_index import BM25Index, reciprocal_rank_fusion
+from title_index import CourseTitleIndex
+from reranker import CrossEncoderReranker
+from memmap_store import MemmapClient
+from metrics import metrics
 
 @dataclass
 class SearchResults:
     """Container for search results with metadata"""
     documents: List[str]
     metadata: List[Dict[str, Any]]
-    distances: List[float]
+    distances: List[Optional[float]]   # None for hits found only by lexical search
     error: Optional[str] = None
+    ids: List[str] = field(default_factory=list)
     
     @classmethod
-    def from_chroma(cls, chroma_results: Dict) -> 'SearchResults':
-        """Create SearchResults from ChromaDB query results"""
+    def from_chroma(cls, chroma_results: Dict, index: int = 0) -> 'SearchResults':
+        """Create SearchResults from ChromaDB query results (of the index-th query embedding)"""
         return cls(
-            documents=chroma_results['documents'][0] if chroma_results['documents'] else [],
-            metadata=chroma_results['metadatas'][0] if chroma_results['metadatas'] else [],
-            distances=chroma_results['distances'][0] if chroma_results['distances'] else []
+            documents=chroma_results['documents'][index] if chroma_results['documents'] else [],
+            metadata=chroma_results['metadatas'][index] if chroma_results['metadatas'] else [],
+            distances=chroma_results['distances'][index] if chroma_results['distances'] else [],
+            ids=chroma_results['ids'][index] if chroma_results.get('ids') else []
         )
     
     @classmethod
@@ -31,25 +42,114 @@ class SearchResults:
         """Check if results are empty"""
         return len(self.documents) == 0
 
+class LazySentenceTransformerEmbeddingFunction(SentenceTransformerEmbeddingFunction):
+    """
+    ChromaDB's sentence-transformer embedding function, but the model is loaded on
+    the first embedding rather than at construction, so opening the store is cheap.
+    Same name and config as the eager version, so existing collections accept it.
+    """
+    
+    def __init__(self, model_name: str = "all-MiniLM-L6-v2", device: str = "cpu",
+                 normalize_embeddings: bool = False, **kwargs: Any):
+        self.model_name = model_name
+        self.device = device
+        self.normalize_embeddings = normalize_embeddings
+        self.kwargs = kwargs
+        self._load_lock = threading.Lock()
+    
+    @staticmethod
+    def build_from_config(config: Dict[str, Any]) -> 'LazySentenceTransformerEmbeddingFunction':
+        # ChromaDB rebuilds the function from its config when opening a collection
+        return LazySentenceTransformerEmbeddingFunction(
+            model_name=config["model_name"],
+            device=config["device"],
+            normalize_embeddings=config["normalize_embeddings"],
+            **config.get("kwargs", {})
+        )
+    
+    @property
+    def _model(self):
+        model = self.models.get(self.model_name)
+        if model is None:
+            with self._load_lock:
+                model = self.models.get(self.model_name)
+                if model is None:
+                    from sentence_transformers import SentenceTransformer
+                    model = SentenceTransformer(model_name_or_path=self.model_name, device=self.device, **self.kwargs)
+                    self.models[self.model_name] = model
+        return model
+
 class VectorStore:
-    """Vector storage using ChromaDB for course content and metadata"""
+    """Vector storage for course content and metadata, in ChromaDB or memory-mapped NumPy matrices"""
     
-    def __init__(self, chroma_path: str, embedding_model: str, max_results: int = 5):
+    def __init__(self, chroma_path: str, embedding_model: str, max_results: int = 5,
+                 query_cache_size: int = 1024, query_cache_ttl: float = 3600,
+                 search_mode: str = "dense", hybrid_candidates: int = 20, rrf_k: int = 60,
+                 rerank_model: Optional[str] = None, rerank_candidates: int = 20, rerank_top_k: int = 3,
+                 rerank_cache_size: int = 4096, vector_backend: str = "chroma",
+                 ivf_lists: int = 0, ivf_probe: int = 8, scan_cache_mb: int = 512):
         self.max_results = max_results
-        # Initialize ChromaDB client
-        self.client = chromadb.PersistentClient(
-            path=chroma_path,
-            settings=Settings(anonymized_telemetry=False)
-        )
+        self.search_mode = search_mode              # "dense" or "hybrid" (BM25 + vectors with rank fusion)
+        self.hybrid_candidates = hybrid_candidates  # Candidates taken from each retriever before fusion
+        self.rrf_k = rrf_k
+        self.rerank_candidates = rerank_candidates  # Candidates fetched for the cross-encoder to rank
+        self.rerank_top_k = rerank_top_k            # Results kept after reranking
+        # Initialize the storage client: ChromaDB, or the memmap backend exposing the same collection API
+        self.vector_backend = vector_backend
+        if vector_backend == "numpy":
+            self.client = MemmapClient(os.path.join(chroma_path, "memmap"), ivf_lists=ivf_lists,
+                                       ivf_probe=ivf_probe, scan_cache_mb=scan_cache_mb)
+        else:
+            self.client = chromadb.PersistentClient(
+                path=chroma_path,
+                settings=Settings(anonymized_telemetry=False)
+            )
         
-        # Set up sentence transformer embedding function
-        self.embedding_function = chromadb.utils.embedding_functions.SentenceTransformerEmbeddingFunction(
-            model_name=embedding_model
+        # Set up sentence transformer embedding function; the model loads on first use (see warm_up)
+        self.embedding_function = LazySentenceTransformerEmbeddingFunction(model_name=embedding_model)
+        
+        # Repeated queries and course names skip the embedding model entirely
+        self.query_embedding_cache = EmbeddingCache(
+            self.embedding_function,
+            max_size=query_cache_size,
+            ttl_seconds=query_cache_ttl
         )
         
         # Create collections for different types of data
         self.course_catalog = self._create_collection("course_catalog")  # Course titles/instructors
         self.course_content = self._create_collection("course_content")  # Actual course material
+        
+        # Incremented by every write, so caches derived from the stored content know when to drop
+        self.content_epoch = 0
+        
+        # Parsed catalog links, loaded lazily and invalidated by catalog writes
+        self._catalog_links: Optional[Dict[str, Dict[str, Any]]] = None
+        self._catalog_lock = threading.Lock()
+        
+        # Lexical course title lookups, kept in sync with the catalog
+        self.title_index = CourseTitleIndex()
+        self.title_index.rebuild(self._course_links().keys())
+        
+        # Optional cross-encoder stage; the model loads on the first reranked search
+        self.reranker: Optional[CrossEncoderReranker] = None
+        if rerank_model:
+            self.reranker = CrossEncoderReranker(rerank_model, cache_size=rerank_cache_size)
+        
+        # BM25 index over chunk text for exact terms, kept in sync by content writes
+        self.lexical_index: Optional[BM25Index] = None
+        if search_mode == "hybrid":
+            self.lexical_index = BM25Index()
+            self._build_lexical_index()
+    
+    def _build_lexical_index(self, page_size: int = 1000):
+        """Load all stored chunks into the BM25 index"""
+        offset = 0
+        while True:
+            page = self.course_content.get(include=["documents", "metadatas"], limit=page_size, offset=offset)
+            if not page['ids']:
+                break
+            self.lexical_index.add(page['ids'], page['documents'], page['metadatas'])
+            offset += len(page['ids'])
     
     def _create_collection(self, name: str):
         """Create or get a ChromaDB collection"""
@@ -62,7 +162,9 @@ class VectorStore:
                query: str,
                course_name: Optional[str] = None,
                lesson_number: Optional[int] = None,
-               limit: Optional[int] = None) -> SearchResults:
+               limit: Optional[int] = None,
+               mode: Optional[str] = None,
+               rerank: Optional[bool] = None) -> SearchResults:
         """
         Main search interface that handles course resolution and content search.
         
@@ -71,14 +173,24 @@ class VectorStore:
             course_name: Optional course name/title to filter by
             lesson_number: Optional lesson number to filter by
             limit: Maximum results to return
+            mode: "dense" or "hybrid", defaults to the configured search mode
+            rerank: Rank an over-fetched candidate set with the cross-encoder,
+                defaults to whether a rerank model is configured
             
         Returns:
             SearchResults object with documents and metadata
         """
+        with metrics.span("search"):
+            return self._search(query, course_name, lesson_number, limit, mode, rerank)
+    
+    def _search(self, query: str, course_name: Optional[str], lesson_number: Optional[int],
+                limit: Optional[int], mode: Optional[str], rerank: Optional[bool]) -> SearchResults:
+        """The body of search, timed as one stage"""
         # Step 1: Resolve course name if provided
         course_title = None
         if course_name:
-            course_title = self._resolve_course_name(course_name)
+            with metrics.span("course_resolution"):
+                course_title = self._resolve_course_name(course_name)
             if not course_title:
                 return SearchResults.empty(f"No course found matching '{course_name}'")
         
@@ -86,24 +198,214 @@ class VectorStore:
         filter_dict = self._build_filter(course_title, lesson_number)
         
         # Step 3: Search course content
-        # Use provided limit or fall back to configured max_results
-        search_limit = limit if limit is not None else self.max_results
+        reranking, search_limit, candidates = self._limits(limit, rerank)
         
         try:
-            results = self.course_content.query(
-                query_texts=[query],
-                n_results=search_limit,
-                where=filter_dict
-            )
-            return SearchResults.from_chroma(results)
+            if self._is_hybrid(mode):
+                results = self._hybrid_search(query, course_title, lesson_number, filter_dict, candidates)
+            else:
+                embedding = self.embed_query(query)
+                with metrics.span("vector_query"):
+                    results = SearchResults.from_chroma(self.course_content.query(
+                        query_embeddings=[embedding],
+                        n_results=candidates,
+                        where=filter_dict
+                    ))
+            
+            if reranking:
+                results = self._rerank(query, results, search_limit)
+            return results
         except Exception as e:
             return SearchResults.empty(f"Search error: {str(e)}")
     
+    def search_batch(self,
+                     queries: List[Tuple[str, Optional[str], Optional[int]]],
+                     limit: Optional[int] = None,
+                     mode: Optional[str] = None,
+                     rerank: Optional[bool] = None,
+                     dedup_threshold: float = 1.0) -> List[SearchResults]:
+        """
+        Search for several queries at once, each with the results search would return.
+        
+        All query texts are embedded in one batch, and queries with the same course
+        and lesson filter go to the store in one multi-query call. Queries under the
+        same filter whose embeddings are at least dedup_threshold cosine-similar are
+        searched once and share one SearchResults object.
+        
+        Args:
+            queries: (query, course_name, lesson_number) per search
+            limit: Maximum results per query
+            mode: "dense" or "hybrid", defaults to the configured search mode
+            rerank: As for search
+            dedup_threshold: Cosine similarity from which two queries count as the same
+                search; 1.0 only merges texts that are identical after normalization
+            
+        Returns:
+            One SearchResults per query, in order
+        """
+        with metrics.span("search_batch"):
+            return self._search_batch(queries, limit, mode, rerank, dedup_threshold)
+    
+    def _search_batch(self, queries: List[Tuple[str, Optional[str], Optional[int]]], limit: Optional[int],
+                      mode: Optional[str], rerank: Optional[bool], dedup_threshold: float) -> List[SearchResults]:
+        """The body of search_batch, timed as one stage"""
+        results: List[Optional[SearchResults]] = [None] * len(queries)
+        
+        # Group by resolved filter, resolving each course name once
+        titles: Dict[str, Optional[str]] = {}
+        groups: Dict[Tuple[Optional[str], Optional[int]], List[int]] = {}
+        for i, (_, course_name, lesson_number) in enumerate(queries):
+            course_title = None
+            if course_name:
+                if course_name not in titles:
+                    with metrics.span("course_resolution"):
+                        titles[course_name] = self._resolve_course_name(course_name)
+                course_title = titles[course_name]
+                if not course_title:
+                    results[i] = SearchResults.empty(f"No course found matching '{course_name}'")
+                    continue
+            groups.setdefault((course_title, lesson_number), []).append(i)
+        
+        pending = [i for indices in groups.values() for i in indices]
+        if not pending:
+            return results
+        with metrics.span("query_embedding"):
+            embeddings = dict(zip(pending, self.query_embedding_cache.get_many([queries[i][0] for i in pending])))
+        
+        reranking, search_limit, candidates = self._limits(limit, rerank)
+        hybrid = self._is_hybrid(mode)
+        dense_candidates = max(candidates, self.hybrid_candidates) if hybrid else candidates
+        for (course_title, lesson_number), indices in groups.items():
+            representative = self._distinct_queries(indices, queries, embeddings, dedup_threshold)
+            searched = list(dict.fromkeys(representative.values()))
+            filter_dict = self._build_filter(course_title, lesson_number)
+            try:
+                with metrics.span("vector_query"):
+                    dense = self.course_content.query(
+                        query_embeddings=[embeddings[i] for i in searched],
+                        n_results=dense_candidates,
+                        where=filter_dict
+                    )
+                found = {}
+                for position, i in enumerate(searched):
+                    query = queries[i][0]
+                    found[i] = SearchResults.from_chroma(dense, position)
+                    if hybrid:
+                        found[i] = self._hybrid_search(query, course_title, lesson_number, filter_dict,
+                                                       candidates, dense=found[i])
+                    if reranking:
+                        found[i] = self._rerank(query, found[i], search_limit)
+            except Exception as e:
+                error = SearchResults.empty(f"Search error: {str(e)}")
+                found = {i: error for i in searched}
+            for i in indices:
+                results[i] = found[representative[i]]
+        return results
+    
+    @staticmethod
+    def _distinct_queries(indices: List[int], queries: List[Tuple[str, Optional[str], Optional[int]]],
+                          embeddings: Dict[int, Any], threshold: float) -> Dict[int, int]:
+        """Map each query to the earliest query it duplicates, or to itself"""
+        representative: Dict[int, int] = {}
+        by_text: Dict[str, int] = {}
+        kept: List[int] = []
+        vectors: Optional[np.ndarray] = None
+        for i in indices:
+            key = EmbeddingCache.normalize(queries[i][0])
+            if key in by_text:
+                representative[i] = by_text[key]
+                continue
+            
+            vector = np.asarray(embeddings[i], dtype=np.float32)
+            vector = vector / (np.linalg.norm(vector) or 1.0)
+            if kept and threshold < 1.0:
+                similarities = vectors[:len(kept)] @ vector
+                best = int(np.argmax(similarities))
+                if similarities[best] >= threshold:
+                    representative[i] = by_text[key] = kept[best]
+                    continue
+            
+            if vectors is None:
+                vectors = np.empty((len(indices), len(vector)), dtype=np.float32)
+            vectors[len(kept)] = vector
+            kept.append(i)
+            representative[i] = by_text[key] = i
+        return representative
+    
+    def _limits(self, limit: Optional[int], rerank: Optional[bool]) -> Tuple[bool, int, int]:
+        """Whether to rerank, the results to return and the candidates to fetch"""
+        # Use provided limit or fall back to configured max_results (top_k when reranking)
+        reranking = self.reranker is not None and rerank is not False
+        search_limit = limit if limit is not None else (self.rerank_top_k if reranking else self.max_results)
+        candidates = max(search_limit, self.rerank_candidates) if reranking else search_limit
+        return reranking, search_limit, candidates
+    
+    def _is_hybrid(self, mode: Optional[str]) -> bool:
+        return (mode or self.search_mode) == "hybrid" and self.lexical_index is not None
+    
+    def _rerank(self, query: str, results: SearchResults, limit: int) -> SearchResults:
+        """Keep the best candidates by cross-encoder score, best first"""
+        with metrics.span("rerank"):
+            order = self.reranker.rank(query, results.ids, results.documents, limit)
+        return SearchResults(
+            documents=[results.documents[i] for i in order],
+            metadata=[results.metadata[i] for i in order],
+            distances=[results.distances[i] for i in order],
+            ids=[results.ids[i] for i in order]
+        )
+    
+    def _hybrid_search(self, query: str, course_title: Optional[str], lesson_number: Optional[int],
+                       filter_dict: Optional[Dict], limit: int, dense: Optional[SearchResults] = None) -> SearchResults:
+        """Fuse dense and BM25 rankings with reciprocal rank fusion; dense results may come precomputed"""
+        candidates = max(limit, self.hybrid_candidates)
+        if dense is None:
+            embedding = self.embed_query(query)
+            with metrics.span("vector_query"):
+                dense = SearchResults.from_chroma(self.course_content.query(
+                    query_embeddings=[embedding],
+                    n_results=candidates,
+                    where=filter_dict
+                ))
+        with metrics.span("lexical_search"):
+            lexical = self.lexical_index.search(query, candidates, course_title, lesson_number)
+        
+        fused = reciprocal_rank_fusion([dense.ids, [chunk_id for chunk_id, _ in lexical]], k=self.rrf_k)[:limit]
+        
+        hits = {
+            chunk_id: (document, metadata, distance)
+            for chunk_id, document, metadata, distance in zip(dense.ids, dense.documents, dense.metadata, dense.distances)
+        }
+        # Chunks found only by BM25 still need their text and metadata
+        missing = [chunk_id for chunk_id, _ in fused if chunk_id not in hits]
+        if missing:
+            fetched = self.course_content.get(ids=missing, include=["documents", "metadatas"])
+            for chunk_id, document, metadata in zip(fetched['ids'], fetched['documents'], fetched['metadatas']):
+                hits[chunk_id] = (document, metadata, None)
+        
+        results = SearchResults(documents=[], metadata=[], distances=[])
+        for chunk_id, _ in fused:
+            if chunk_id in hits:
+                document, metadata, distance = hits[chunk_id]
+                results.ids.append(chunk_id)
+                results.documents.append(document)
+                results.metadata.append(metadata)
+                results.distances.append(distance)
+        return results
+    
+    def embed_query(self, text: str):
+        """Embed query text through the query embedding cache"""
+        with metrics.span("query_embedding"):
+            return self.query_embedding_cache.get(text)
+    
     def _resolve_course_name(self, course_name: str) -> Optional[str]:
-        """Use vector search to find best matching course by name"""
+        """Find the best matching course title, falling back to vector search when lexical matching is ambiguous"""
+        course_title = self.title_index.resolve(course_name)
+        if course_title:
+            return course_title
+        
         try:
             results = self.course_catalog.query(
-                query_texts=[course_name],
+                query_embeddings=[self.embed_query(course_name)],
                 n_results=1
             )
             
@@ -132,12 +434,22 @@ class VectorStore:
             
         return {"lesson_number": lesson_number}
     
-    def add_course_metadata(self, course: Course):
-        """Add course information to the catalog for semantic search"""
+    def warm_up(self):
+        """Load the embedding (and rerank) model and run it once, so the first query pays for neither"""
+        self.embed_texts(["warm up"])
+        if self.reranker is not None:
+            self.reranker.score("warm up", ["warm-up"], ["warm up"])
+    
+    def embed_texts(self, texts: List[str]) -> List[List[float]]:
+        """Embed a batch of texts with the collection embedding model"""
+        if not texts:
+            return []
+        return self.embedding_function(texts)
+    
+    def _course_catalog_entry(self, course: Course) -> Dict[str, Any]:
+        """Build the catalog metadata for a course"""
         import json
 
-        course_text = course.title
-        
         # Build lessons metadata and serialize as JSON string
         lessons_metadata = []
         for lesson in course.lessons:
@@ -147,37 +459,133 @@ class VectorStore:
                 "lesson_link": lesson.lesson_link
             })
         
-        self.course_catalog.add(
-            documents=[course_text],
-            metadatas=[{
-                "title": course.title,
-                "instructor": course.instructor,
-                "course_link": course.course_link,
-                "lessons_json": json.dumps(lessons_metadata),  # Serialize as JSON string
-                "lesson_count": len(course.lessons)
-            }],
-            ids=[course.title]
-        )
+        return {
+            "title": course.title,
+            "instructor": course.instructor,
+            "course_link": course.course_link,
+            "lessons_json": json.dumps(lessons_metadata),  # Serialize as JSON string
+            "lesson_count": len(course.lessons)
+        }
     
-    def add_course_content(self, chunks: List[CourseChunk]):
-        """Add course content chunks to the vector store"""
-        if not chunks:
+    def add_course_metadata(self, course: Course):
+        """Add course information to the catalog for semantic search"""
+        self.add_courses_metadata([course])
+    
+    def add_courses_metadata(self, courses: List[Course]):
+        """Add several courses to the catalog in a single write"""
+        if not courses:
             return
         
-        documents = [chunk.content for chunk in chunks]
-        metadatas = [{
+        self.course_catalog.upsert(
+            documents=[course.title for course in courses],
+            metadatas=[self._course_catalog_entry(course) for course in courses],
+            ids=[course.title for course in courses]
+        )
+        self.title_index.add(course.title for course in courses)
+        self._invalidate_course_links()
+        self.content_epoch += 1
+    
+    @staticmethod
+    def chunk_ids(chunks: List[CourseChunk], seen: Optional[Dict[str, int]] = None) -> List[str]:
+        """
+        Content-addressed IDs for chunks: course title plus a hash of the lesson
+        number and text, so an unchanged chunk keeps its ID when neighbouring
+        text is edited. Repeated identical chunks get an occurrence suffix.
+
+        Pass the same seen dict for successive batches of one document to number
+        repeated chunks across batches.
+        """
+        import hashlib
+
+        ids = []
+        seen = {} if seen is None else seen
+        for chunk in chunks:
+            digest = hashlib.sha256(f"{chunk.lesson_number}\x1f{chunk.content}".encode('utf-8')).hexdigest()[:16]
+            chunk_id = f"{chunk.course_title.replace(' ', '_')}_{digest}"
+            occurrence = seen.get(chunk_id, 0)
+            seen[chunk_id] = occurrence + 1
+            ids.append(chunk_id if occurrence == 0 else f"{chunk_id}_{occurrence}")
+        return ids
+    
+    @staticmethod
+    def _chunk_metadata(chunk: CourseChunk) -> Dict[str, Any]:
+        """Build the content metadata for a chunk"""
+        return {
             "course_title": chunk.course_title,
             "lesson_number": chunk.lesson_number,
             "chunk_index": chunk.chunk_index
-        } for chunk in chunks]
-        # Use title with chunk index for unique IDs
-        ids = [f"{chunk.course_title.replace(' ', '_')}_{chunk.chunk_index}" for chunk in chunks]
-        
-        self.course_content.add(
-            documents=documents,
-            metadatas=metadatas,
-            ids=ids
-        )
+        }
+    
+    def add_course_content(self, chunks: List[CourseChunk],
+                           embeddings: Optional[List[List[float]]] = None,
+                           ids: Optional[List[str]] = None):
+        """
+        Add course content chunks to the vector store.
+        
+        Args:
+            chunks: Chunks to store
+            embeddings: Optional precomputed embeddings, one per chunk
+            ids: Optional chunk IDs, defaults to chunk_ids(chunks)
+        """
+        if not chunks:
+            return
+        
+        documents = [chunk.content for chunk in chunks]
+        metadatas = [self._chunk_metadata(chunk) for chunk in chunks]
+        if ids is None:
+            ids = self.chunk_ids(chunks)
+        
+        # ChromaDB rejects writes larger than its max batch size
+        batch_size = self.client.get_max_batch_size()
+        for start in range(0, len(ids), batch_size):
+            end = start + batch_size
+            self.course_content.upsert(
+                documents=documents[start:end],
+                metadatas=metadatas[start:end],
+                ids=ids[start:end],
+                embeddings=embeddings[start:end] if embeddings is not None else None
+            )
+        
+        if self.lexical_index is not None:
+            self.lexical_index.add(ids, documents, metadatas)
+        self.content_epoch += 1
+    
+    def update_chunk_metadata(self, chunks: List[CourseChunk], ids: List[str]):
+        """Refresh chunk metadata (e.g. shifted chunk indices) without re-embedding"""
+        if not chunks:
+            return
+        
+        batch_size = self.client.get_max_batch_size()
+        for start in range(0, len(ids), batch_size):
+            end = start + batch_size
+            self.course_content.update(
+                ids=ids[start:end],
+                metadatas=[self._chunk_metadata(chunk) for chunk in chunks[start:end]]
+            )
+        self.content_epoch += 1
+    
+    def delete_chunks(self, ids: List[str]):
+        """Delete content chunks by ID"""
+        if not ids:
+            return
+        
+        batch_size = self.client.get_max_batch_size()
+        for start in range(0, len(ids), batch_size):
+            self.course_content.delete(ids=ids[start:start + batch_size])
+        
+        if self.lexical_index is not None:
+            self.lexical_index.remove(ids)
+        self.content_epoch += 1
+    
+    def delete_course(self, course_title: str):
+        """Delete a course from the catalog together with all of its content"""
+        self.course_content.delete(where={"course_title": course_title})
+        self.course_catalog.delete(ids=[course_title])
+        self.title_index.remove(course_title)
+        if self.lexical_index is not None:
+            self.lexical_index.remove_course(course_title)
+        self._invalidate_course_links()
+        self.content_epoch += 1
     
     def clear_all_data(self):
         """Clear all data from both collections"""
@@ -187,9 +595,66 @@ class VectorStore:
             # Recreate collections
             self.course_catalog = self._create_collection("course_catalog")
             self.course_content = self._create_collection("course_content")
+            self.title_index.rebuild([])
+            if self.lexical_index is not None:
+                self.lexical_index.clear()
+            self._invalidate_course_links()
+            self.content_epoch += 1
         except Exception as e:
             print(f"Error clearing data: {e}")
     
+    def export_collections(self, page_size: int = 5000) -> Dict[str, Dict[str, Any]]:
+        """
+        Every record of both collections with its stored embedding, for index snapshots.
+
+        Returns:
+            Collection name -> {"ids", "documents", "metadatas", "embeddings" (float32 matrix)}
+        """
+        exported = {}
+        for name, collection in (("course_catalog", self.course_catalog), ("course_content", self.course_content)):
+            records = {"ids": [], "documents": [], "metadatas": []}
+            embeddings = []
+            offset = 0
+            while True:
+                page = collection.get(include=["documents", "metadatas", "embeddings"], limit=page_size, offset=offset)
+                if not len(page['ids']):
+                    break
+                for key in records:
+                    records[key].extend(page[key])
+                embeddings.append(np.asarray(page['embeddings'], dtype=np.float32))
+                offset += len(page['ids'])
+            records["embeddings"] = np.concatenate(embeddings) if embeddings else np.zeros((0, 0), dtype=np.float32)
+            exported[name] = records
+        return exported
+    
+    def import_collections(self, collections: Dict[str, Dict[str, Any]]):
+        """Replace all stored data with exported collections, reusing their embeddings"""
+        self.clear_all_data()
+        batch_size = self.client.get_max_batch_size()
+        for name, collection in (("course_catalog", self.course_catalog), ("course_content", self.course_content)):
+            records = collections[name]
+            for start in range(0, len(records["ids"]), batch_size):
+                end = start + batch_size
+                collection.add(
+                    ids=records["ids"][start:end],
+                    documents=records["documents"][start:end],
+                    metadatas=records["metadatas"][start:end],
+                    embeddings=records["embeddings"][start:end]
+                )
+        
+        content = collections["course_content"]
+        if self.lexical_index is not None:
+            self.lexical_index.add(content["ids"], content["documents"], content["metadatas"])
+        self.title_index.rebuild(collections["course_catalog"]["ids"])
+        self._invalidate_course_links()
+        self.content_epoch += 1
+        self.persist()
+    
+    def persist(self):
+        """Make all writes so far durable (ChromaDB commits each write itself)"""
+        if isinstance(self.client, MemmapClient):
+            self.client.persist()
+    
     def get_existing_course_titles(self) -> List[str]:
         """Get all existing course titles from the vector store"""
         try:
@@ -233,35 +698,46 @@ class VectorStore:
             print(f"Error getting courses metadata: {e}")
             return []
 
+    def _course_links(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Course title -> {"course_link", "lessons": {lesson_number: lesson_link}},
+        parsed once from the catalog and reused until the catalog changes.
+        """
+        import json
+
+        links = self._catalog_links
+        if links is not None:
+            return links
+        
+        with self._catalog_lock:
+            if self._catalog_links is None:
+                links = {}
+                try:
+                    results = self.course_catalog.get(include=["metadatas"])
+                    for course_title, metadata in zip(results['ids'], results['metadatas']):
+                        lessons = json.loads(metadata.get('lessons_json') or '[]')
+                        links[course_title] = {
+                            "course_link": metadata.get('course_link'),
+                            "lessons": {lesson.get('lesson_number'): lesson.get('lesson_link') for lesson in lessons}
+                        }
+                except Exception as e:
+                    # Serve an empty map now and retry on the next lookup
+                    print(f"Error loading course links: {e}")
+                    return links
+                self._catalog_links = links
+            return self._catalog_links
+    
+    def _invalidate_course_links(self):
+        """Drop the cached link map after a catalog write"""
+        with self._catalog_lock:
+            self._catalog_links = None
+    
     def get_course_link(self, course_title: str) -> Optional[str]:
         """Get course link for a given course title"""
-        try:
-            # Get course by ID (title is the ID)
-            results = self.course_catalog.get(ids=[course_title])
-            if results and 'metadatas' in results and results['metadatas']:
-                metadata = results['metadatas'][0]
-                return metadata.get('course_link')
-            return None
-        except Exception as e:
-            print(f"Error getting course link: {e}")
-            return None
+        course = self._course_links().get(course_title)
+        return course["course_link"] if course else None
     
     def get_lesson_link(self, course_title: str, lesson_number: int) -> Optional[str]:
         """Get lesson link for a given course title and lesson number"""
-        import json
-        try:
-            # Get course by ID (title is the ID)
-            results = self.course_catalog.get(ids=[course_title])
-            if results and 'metadatas' in results and results['metadatas']:
-                metadata = results['metadatas'][0]
-                lessons_json = metadata.get('lessons_json')
-                if lessons_json:
-                    lessons = json.loads(lessons_json)
-                    # Find the lesson with matching number
-                    for lesson in lessons:
-                        if lesson.get('lesson_number') == lesson_number:
-                            return lesson.get('lesson_link')
-            return None
-        except Exception as e:
-            print(f"Error getting lesson link: {e}")
-    
\ No newline at end of file
+        course = self._course_links().get(course_title)
+        return course["lessons"].get(lesson_number) if course else None
@@ -0,0 +1,310 @@
+"""Shared helpers for the benchmark scripts"""
+import asyncio
+import contextlib
+import itertools
+import json
+import math
+import os
+import socket
+import sys
+import threading
+import time
+from types import SimpleNamespace
+from typing import Any, Dict, List, Optional
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BACKEND_DIR = os.path.join(ROOT, "backend")
+DOCS_DIR = os.path.join(ROOT, "docs")
+
+# Backend modules import each other as top-level modules
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of a list of values"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def latency_summary(seconds: List[float]) -> Dict[str, float]:
+    """p50/p95/p99/mean of latencies, reported in milliseconds"""
+    return {
+        "count": len(seconds),
+        "mean_ms": 1000 * sum(seconds) / len(seconds) if seconds else 0.0,
+        "p50_ms": 1000 * percentile(seconds, 50),
+        "p95_ms": 1000 * percentile(seconds, 95),
+        "p99_ms": 1000 * percentile(seconds, 99),
+    }
+
+
+def write_report(name: str, results: Dict[str, Any], output: Optional[str] = None):
+    """Print a benchmark report as JSON and optionally write it to a file"""
+    report = {"benchmark": name, "results": results}
+    text = json.dumps(report, indent=2, sort_keys=True)
+    print(text)
+    if output:
+        with open(output, 'w', encoding='utf-8') as file:
+            file.write(text + "\n")
+
+
+_tool_use_ids = itertools.count(1)
+
+
+def stub_response(params: Dict[str, Any]) -> SimpleNamespace:
+    """
+    Canned Messages API response: when tools are offered for a fresh question the
+    model asks for one search_course_content call, otherwise it answers.
+    """
+    question = params["messages"][-1]["content"]
+    # Usage as the API reports it, at roughly four characters per token
+    input_tokens = len(json.dumps(params["messages"], default=str)) // 4
+    if params.get("tools") and isinstance(question, str):
+        block = SimpleNamespace(
+            type="tool_use",
+            id=f"toolu_stub_{next(_tool_use_ids)}",
+            name="search_course_content",
+            input={"query": question}
+        )
+        usage = SimpleNamespace(input_tokens=input_tokens, output_tokens=len(question) // 4 + 20)
+        return SimpleNamespace(stop_reason="tool_use", content=[block], usage=usage)
+    text = "Stub answer: " + " ".join(["the course covers this topic in detail."] * 8)
+    usage = SimpleNamespace(input_tokens=input_tokens, output_tokens=len(text) // 4)
+    return SimpleNamespace(stop_reason="end_turn", content=[SimpleNamespace(type="text", text=text)], usage=usage)
+
+
+class StubAnthropic:
+    """
+    Stand-in for anthropic.Anthropic. messages.create takes latency seconds plus
+    token_latency per word of a generated answer.
+    """
+
+    def __init__(self, latency: float, token_latency: float = 0.0):
+        self.latency = latency
+        self.token_latency = token_latency
+        self.messages = self
+        self.calls = 0
+
+    def _generation_seconds(self, response: SimpleNamespace) -> float:
+        """Time to produce a whole response, as if it had been streamed"""
+        words = sum(len(block.text.split(" ")) - 1 for block in response.content if block.type == "text")
+        return self.latency + self.token_latency * words
+
+    def create(self, **params) -> SimpleNamespace:
+        self.calls += 1
+        response = stub_response(params)
+        time.sleep(self._generation_seconds(response))
+        return response
+
+
+class _StubStream:
+    """messages.stream context: the first token after the call latency, then one word per token_latency"""
+
+    def __init__(self, response: SimpleNamespace, latency: float, token_latency: float):
+        self.response = response
+        self.latency = latency
+        self.token_latency = token_latency
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+    @property
+    async def text_stream(self):
+        await asyncio.sleep(self.latency)
+        for block in self.response.content:
+            if block.type == "text":
+                for i, word in enumerate(block.text.split(" ")):
+                    if i:
+                        await asyncio.sleep(self.token_latency)
+                    yield word if i == 0 else " " + word
+
+    async def get_final_message(self) -> SimpleNamespace:
+        return self.response
+
+
+class AsyncStubAnthropic(StubAnthropic):
+    """Stand-in for anthropic.AsyncAnthropic; messages.stream yields the first word after latency seconds"""
+
+    async def create(self, **params) -> SimpleNamespace:
+        self.calls += 1
+        response = stub_response(params)
+        await asyncio.sleep(self._generation_seconds(response))
+        return response
+
+    def stream(self, **params) -> _StubStream:
+        self.calls += 1
+        return _StubStream(stub_response(params), self.latency, self.token_latency)
+
+
+class FakeAnthropicServer:
+    """
+    Local HTTP server answering POST /v1/messages, plain or streamed (server-sent
+    events), with the deterministic stub_response answers. Every response takes
+    latency seconds plus token_latency per generated word, so unlike the in-process
+    stubs the real SDK clients, HTTP and JSON handling are part of the measurement.
+
+    Usage:
+        with FakeAnthropicServer(latency=0.2) as server:
+            server.install(rag_system.ai_generator)
+    """
+
+    def __init__(self, latency: float = 0.0, token_latency: float = 0.0):
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+        self.latency = latency
+        self.token_latency = token_latency
+        self.calls = 0
+        self.generation_seconds = 0.0  # total time spent in simulated generation
+        self._lock = threading.Lock()
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True  # headers and body go out as separate writes
+
+            def do_POST(self):
+                params = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+                with fake._lock:
+                    fake.calls += 1
+                    message_id = f"msg_fake_{fake.calls}"
+                message = fake._message(message_id, params)
+                with fake._lock:
+                    fake.generation_seconds += fake._generation_seconds(message)
+                if params.get("stream"):
+                    fake._stream(self, message)
+                else:
+                    time.sleep(fake._generation_seconds(message))
+                    body = json.dumps(message).encode()
+                    self.send_response(200)
+                    self.send_header("Content-Type", "application/json")
+                    self.send_header("Content-Length", str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._server.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self._server.server_address[1]}"
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._server.shutdown()
+        self._server.server_close()
+        self._thread.join()
+        return False
+
+    def install(self, ai_generator):
+        """Point an AIGenerator's real SDK clients at this server"""
+        import anthropic
+
+        ai_generator.client = anthropic.Anthropic(api_key="fake", base_url=self.url, max_retries=0)
+        ai_generator.async_client = anthropic.AsyncAnthropic(api_key="fake", base_url=self.url, max_retries=0)
+
+    @staticmethod
+    def _message(message_id: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        """The stub answer as a Messages API response body"""
+        response = stub_response(params)
+        content = [
+            {"type": "text", "text": block.text} if block.type == "text"
+            else {"type": "tool_use", "id": block.id, "name": block.name, "input": block.input}
+            for block in response.content
+        ]
+        return {
+            "id": message_id, "type": "message", "role": "assistant", "model": params["model"],
+            "content": content, "stop_reason": response.stop_reason, "stop_sequence": None,
+            "usage": {"input_tokens": response.usage.input_tokens, "output_tokens": response.usage.output_tokens},
+        }
+
+    def _generation_seconds(self, message: Dict[str, Any]) -> float:
+        words = sum(len(block["text"].split(" ")) - 1 for block in message["content"] if block["type"] == "text")
+        return self.latency + self.token_latency * words
+
+    def _stream(self, handler, message: Dict[str, Any]):
+        """Send a message as the SDK's event stream: first event after latency, one word per token_latency"""
+        handler.send_response(200)
+        handler.send_header("Content-Type", "text/event-stream")
+        handler.send_header("Connection", "close")
+        handler.end_headers()
+
+        def send(event: Dict[str, Any]):
+            handler.wfile.write(f"event: {event['type']}\ndata: {json.dumps(event)}\n\n".encode())
+            handler.wfile.flush()
+
+        time.sleep(self.latency)
+        send({"type": "message_start", "message": {**message, "content": [], "stop_reason": None,
+                                                    "usage": {**message["usage"], "output_tokens": 0}}})
+        for index, block in enumerate(message["content"]):
+            if block["type"] == "text":
+                send({"type": "content_block_start", "index": index, "content_block": {"type": "text", "text": ""}})
+                for i, word in enumerate(block["text"].split(" ")):
+                    if i:
+                        time.sleep(self.token_latency)
+                    send({"type": "content_block_delta", "index": index,
+                          "delta": {"type": "text_delta", "text": word if i == 0 else " " + word}})
+            else:
+                send({"type": "content_block_start", "index": index, "content_block": {**block, "input": {}}})
+                send({"type": "content_block_delta", "index": index,
+                      "delta": {"type": "input_json_delta", "partial_json": json.dumps(block["input"])}})
+            send({"type": "content_block_stop", "index": index})
+        send({"type": "message_delta", "delta": {"stop_reason": message["stop_reason"], "stop_sequence": None},
+              "usage": {"output_tokens": message["usage"]["output_tokens"]}})
+        send({"type": "message_stop"})
+        handler.close_connection = True
+
+
+def install_stub_anthropic(ai_generator, latency: float, token_latency: float = 0.0):
+    """Point an AIGenerator at stub clients with the given per-call (and per-token) latency"""
+    ai_generator.client = StubAnthropic(latency, token_latency)
+    ai_generator.async_client = AsyncStubAnthropic(latency, token_latency)
+
+
+def load_app(chroma_path: str, docs_dir: str = DOCS_DIR):
+    """Import the FastAPI app module against a fresh index of docs_dir"""
+    from config import config
+
+    config.CHROMA_PATH = chroma_path
+    config.INGEST_MANIFEST_PATH = os.path.join(chroma_path, "ingest_manifest.json")
+
+    # app.py serves ../frontend relative to the backend directory
+    docs_dir = os.path.abspath(docs_dir)
+    os.chdir(BACKEND_DIR)
+    import app as app_module
+
+    # Run the staged startup in the foreground
+    app_module.load_rag_system(docs_dir)
+    if not app_module.startup.ready:
+        raise RuntimeError(f"App failed to start: {app_module.startup.error}")
+    return app_module
+
+
+@contextlib.contextmanager
+def serve_app(app):
+    """Serve an ASGI app with uvicorn on a free localhost port; yields its base URL"""
+    import uvicorn
+
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        port = probe.getsockname()[1]
+
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning", lifespan="off"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.01)
+    try:
+        yield f"http://127.0.0.1:{port}"
+    finally:
+        server.should_exit = True
+        thread.join()
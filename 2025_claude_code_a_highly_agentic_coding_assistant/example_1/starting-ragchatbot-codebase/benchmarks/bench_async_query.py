@@ -0,0 +1,104 @@
+"""
+Concurrent throughput of /api/query with a stubbed Anthropic API.
+
+Requests go through the FastAPI app in-process (httpx ASGI transport) against an
+index of the bundled docs/. Every Anthropic call is replaced by a stub that takes
+--llm-latency seconds, so the benchmark isolates how the server overlaps waiting.
+
+Two endpoints are compared at increasing numbers of in-flight requests:
+- blocking: the previous endpoint body, calling the synchronous RAGSystem.query
+  from an async handler, which holds the event loop for the whole request
+- async: /api/query, awaiting RAGSystem.aquery end to end
+
+Throughput of the async endpoint should grow with concurrency while the blocking
+one stays at one request at a time.
+
+Usage:
+    uv run python benchmarks/bench_async_query.py [--concurrency 1,2,4,8,16,32] [--llm-latency 0.1] [--output results.json]
+"""
+import argparse
+import asyncio
+import tempfile
+import time
+
+from _common import DOCS_DIR, install_stub_anthropic, latency_summary, load_app, write_report
+
+import httpx
+from fastapi.routing import APIRoute
+
+QUESTIONS = [
+    "What is MCP?",
+    "How does computer use work?",
+    "Explain prompt caching",
+    "What is a vector database?",
+    "How do I compress prompts?",
+    "What tools does the agent call?",
+]
+
+
+def add_blocking_route(app_module):
+    """Serve the previous endpoint body, which calls the synchronous query from an async handler"""
+    async def blocking_query(request: app_module.QueryRequest):
+        session_id = request.session_id or app_module.rag_system.session_manager.create_session()
+        answer, sources = app_module.rag_system.query(request.query, session_id)
+        return app_module.QueryResponse(answer=answer, sources=sources, session_id=session_id)
+
+    # Ahead of the static files mounted at /
+    app_module.app.router.routes.insert(0, APIRoute("/bench/blocking-query", blocking_query, methods=["POST"]))
+
+
+async def load_test(app, path: str, concurrency: int, requests: int):
+    """Send requests with at most concurrency in flight; returns (wall seconds, latencies)"""
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+    transport = httpx.ASGITransport(app=app)
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        async def one(i: int):
+            async with semaphore:
+                start = time.perf_counter()
+                response = await client.post(path, json={"query": QUESTIONS[i % len(QUESTIONS)]})
+                response.raise_for_status()
+                latencies.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(one(i) for i in range(requests)))
+        return time.perf_counter() - start, latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--docs", default=DOCS_DIR, help="Folder with course documents")
+    parser.add_argument("--concurrency", default="1,2,4,8,16,32", help="Comma separated in-flight request counts")
+    parser.add_argument("--requests-per-client", type=int, default=4, help="Requests per unit of concurrency")
+    parser.add_argument("--llm-latency", type=float, default=0.1, help="Seconds per stubbed Anthropic call")
+    parser.add_argument("--output", help="Write the JSON report here")
+    args = parser.parse_args()
+    levels = [int(level) for level in args.concurrency.split(",")]
+
+    with tempfile.TemporaryDirectory() as chroma_path:
+        app_module = load_app(chroma_path, args.docs)
+        add_blocking_route(app_module)
+        install_stub_anthropic(app_module.rag_system.ai_generator, args.llm_latency)
+
+        results = {"llm_latency_s": args.llm_latency}
+        for mode, path in (("blocking", "/bench/blocking-query"), ("async", "/api/query")):
+            baseline = None
+            results[mode] = {}
+            for concurrency in levels:
+                requests = max(concurrency * args.requests_per_client, 8)
+                seconds, latencies = asyncio.run(load_test(app_module.app, path, concurrency, requests))
+                throughput = requests / seconds
+                baseline = baseline or throughput
+                results[mode][str(concurrency)] = {
+                    "requests": requests,
+                    "throughput_rps": throughput,
+                    "speedup_vs_first_level": throughput / baseline,
+                    "latency": latency_summary(latencies),
+                }
+
+    write_report("async_query", results, args.output)
+
+
+if __name__ == "__main__":
+    main()
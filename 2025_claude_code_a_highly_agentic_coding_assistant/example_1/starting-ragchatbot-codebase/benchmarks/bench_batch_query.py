@@ -0,0 +1,144 @@
+"""
+Offline grading workload: a set of canned questions answered one by one, as a
+loop over /api/query does, vs in one RAGSystem.abatch_query call (/api/query/batch).
+
+Questions come from the indexed catalog (see bench_retrieve_first.py). Each is
+repeated --repeats times, and a case/whitespace variant of every other one is
+added, the way hand-written question sets drift. The stubbed Anthropic calls take
+--llm-latency seconds, and the answer cache is disabled so duplicates are only
+merged by the batch itself. Reported per strategy:
+
+- wall time and questions per second
+- vector store query calls and query embeddings computed
+- Anthropic calls
+- for the batch, time to the first streamed result
+
+Usage:
+    uv run python benchmarks/bench_batch_query.py [--mode retrieve_first] [--llm-latency 0.3] [--concurrency 8] [--output results.json]
+"""
+import argparse
+import asyncio
+import tempfile
+import time
+
+from _common import DOCS_DIR, install_stub_anthropic, write_report
+from bench_retrieve_first import GENERAL_QUESTIONS, catalog_questions
+
+from config import config
+from rag_system import RAGSystem
+
+
+class CallCounter:
+    """Wraps a callable and counts its calls (and the texts or embeddings passed in)"""
+
+    def __init__(self, function, argument: str):
+        self.function = function
+        self.argument = argument
+        self.calls = 0
+        self.items = 0
+
+    def __call__(self, *args, **kwargs):
+        self.calls += 1
+        self.items += len(kwargs[self.argument] if self.argument in kwargs else args[0])
+        return self.function(*args, **kwargs)
+
+
+def instrument(rag_system: RAGSystem):
+    """Count vector store queries and embedded texts"""
+    store = rag_system.vector_store
+    store.course_content.query = CallCounter(store.course_content.query, "query_embeddings")
+    store.query_embedding_cache.embed_fn = CallCounter(store.query_embedding_cache.embed_fn, "input")
+    return store.course_content.query, store.query_embedding_cache.embed_fn
+
+
+def reset(rag_system: RAGSystem, counters, llm_latency: float):
+    """Start a strategy cold: empty embedding cache, zeroed counters, fresh stub clients"""
+    rag_system.vector_store.query_embedding_cache.clear()
+    for counter in counters:
+        counter.calls = counter.items = 0
+    install_stub_anthropic(rag_system.ai_generator, llm_latency)
+
+
+def counts(counters, rag_system: RAGSystem):
+    store_query, embed = counters
+    generator = rag_system.ai_generator
+    return {
+        "store_query_calls": store_query.calls,
+        "store_query_embeddings": store_query.items,
+        "embedding_calls": embed.calls,
+        "texts_embedded": embed.items,
+        "llm_calls": generator.client.calls + generator.async_client.calls,
+    }
+
+
+async def run_loop(rag_system: RAGSystem, questions, counters):
+    """One request per question, each awaited before the next"""
+    start = time.perf_counter()
+    for question in questions:
+        await rag_system.aquery(question)
+    seconds = time.perf_counter() - start
+    return {"seconds": seconds, "questions_per_second": len(questions) / seconds, **counts(counters, rag_system)}
+
+
+async def run_batch(rag_system: RAGSystem, questions, concurrency: int, counters):
+    """All questions in one batch"""
+    start = time.perf_counter()
+    first_result, summary, errors = None, None, 0
+    async for event in rag_system.abatch_query(questions, concurrency):
+        if first_result is None and event["type"] == "result":
+            first_result = time.perf_counter() - start
+        errors += event["type"] == "error"
+        if event["type"] == "done":
+            summary = event
+    seconds = time.perf_counter() - start
+    return {"seconds": seconds, "questions_per_second": len(questions) / seconds,
+            "first_result_seconds": first_result, "errors": errors,
+            "unique_questions": summary["unique_questions"], "retrievals": summary["retrievals"],
+            **counts(counters, rag_system)}
+
+
+def build_questions(rag_system: RAGSystem, repeats: int):
+    base = catalog_questions(rag_system) + GENERAL_QUESTIONS
+    variants = [question.lower() + "  " for question in base[::2]]
+    return (base + variants) * repeats
+
+
+async def main_async(args):
+    with tempfile.TemporaryDirectory() as chroma_path:
+        config.CHROMA_PATH = chroma_path
+        config.INGEST_MANIFEST_PATH = f"{chroma_path}/ingest_manifest.json"
+        config.ANSWER_CACHE_ENABLED = False
+        config.QUERY_MODE = args.mode
+        config.BATCH_MAX_CONCURRENCY = max(config.BATCH_MAX_CONCURRENCY, args.concurrency)
+        rag_system = RAGSystem(config)
+        rag_system.add_course_folder(args.docs)
+        rag_system.vector_store.warm_up()
+        questions = build_questions(rag_system, args.repeats)
+        counters = instrument(rag_system)
+
+        results = {"questions": len(questions), "llm_latency_s": args.llm_latency,
+                   "concurrency": args.concurrency, "query_mode": config.QUERY_MODE}
+        reset(rag_system, counters, args.llm_latency)
+        results["loop"] = await run_loop(rag_system, questions, counters)
+        reset(rag_system, counters, args.llm_latency)
+        results["batch"] = await run_batch(rag_system, questions, args.concurrency, counters)
+        results["speedup"] = results["loop"]["seconds"] / results["batch"]["seconds"]
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--docs", default=DOCS_DIR, help="Folder with course documents")
+    parser.add_argument("--mode", default="retrieve_first",
+                        help='Query mode; "retrieve_first" (bulk retrieval) or "tools"')
+    parser.add_argument("--llm-latency", type=float, default=0.3, help="Seconds per stubbed Anthropic call")
+    parser.add_argument("--concurrency", type=int, default=config.BATCH_MAX_CONCURRENCY, help="Anthropic calls in flight")
+    parser.add_argument("--repeats", type=int, default=3, help="Times each question occurs in the set")
+    parser.add_argument("--output", help="Write the JSON report here")
+    args = parser.parse_args()
+
+    write_report("batch_query", asyncio.run(main_async(args)), args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+Microbenchmarks of DocumentProcessor.chunk_text.
+
+Inputs are the lessons of the bundled docs/ (the size chunk_text sees during
+ingestion), whole course documents, and a synthetic 1 MB transcript. Each input
+is chunked --repeat times per round; the best of --rounds rounds is reported,
+per chunk unit (characters with the configured CHUNK_SIZE, and tokens with the
+embedding model's tokenizer when it can be loaded):
+
+- microseconds per call and throughput in MB/s
+- chunks per call
+
+bench_chunker.py covers scaling to multi-hour transcripts and peak memory.
+
+Usage:
+    uv run python benchmarks/bench_chunk_text.py [--units characters,tokens] [--rounds 5] [--output results.json]
+"""
+import argparse
+import os
+import re
+import time
+
+from _common import DOCS_DIR, write_report
+from bench_chunker import synthetic_transcript
+
+from config import config
+from document_processor import DocumentProcessor
+
+_LESSON_MARKER = re.compile(r'^Lesson \d+:', re.MULTILINE)
+
+
+def load_inputs(docs_dir: str):
+    """{input name: [texts]}: every lesson body, every whole document, one synthetic transcript"""
+    documents = []
+    for file_name in sorted(os.listdir(docs_dir)):
+        with open(os.path.join(docs_dir, file_name), encoding="utf-8") as file:
+            documents.append(file.read())
+    lessons = [part for document in documents for part in _LESSON_MARKER.split(document)[1:] if part.strip()]
+    return {
+        "lesson": lessons,
+        "document": documents,
+        "transcript_1mb": ["".join(synthetic_transcript(1 << 20))],
+    }
+
+
+def time_chunking(processor: DocumentProcessor, texts, repeat: int, rounds: int):
+    """Best-of-rounds time per chunk_text call over a list of texts"""
+    best = float("inf")
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for _ in range(repeat):
+            for text in texts:
+                processor.chunk_text(text)
+        best = min(best, (time.perf_counter() - start) / (repeat * len(texts)))
+    chunks = sum(len(processor.chunk_text(text)) for text in texts) / len(texts)
+    megabytes = sum(len(text.encode("utf-8")) for text in texts) / len(texts) / 1e6
+    return {"us_per_call": 1e6 * best, "mb_per_second": megabytes / best, "chunks_per_call": chunks,
+            "bytes_per_call": int(megabytes * 1e6)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--docs", default=DOCS_DIR, help="Folder with course documents")
+    parser.add_argument("--units", default="characters,tokens", help="Chunk units to measure")
+    parser.add_argument("--repeat", type=int, default=3, help="Passes over the inputs per round")
+    parser.add_argument("--rounds", type=int, default=5, help="Rounds; the fastest is reported")
+    parser.add_argument("--output", help="Write the JSON report here")
+    args = parser.parse_args()
+
+    inputs = load_inputs(args.docs)
+    results = {"chunk_size": config.CHUNK_SIZE, "chunk_overlap": config.CHUNK_OVERLAP,
+               "token_budget": config.CHUNK_TOKEN_BUDGET, "token_overlap": config.CHUNK_TOKEN_OVERLAP}
+    for unit in args.units.split(","):
+        try:
+            processor = DocumentProcessor(config.CHUNK_SIZE, config.CHUNK_OVERLAP, chunk_unit=unit,
+                                          token_budget=config.CHUNK_TOKEN_BUDGET,
+                                          token_overlap=config.CHUNK_TOKEN_OVERLAP,
+                                          tokenizer_model=config.EMBEDDING_MODEL,
+                                          max_tokens=config.EMBEDDING_MAX_TOKENS)
+        except Exception as e:
+            print(f"Skipping {unit} chunking: {e}")
+            continue
+        results[unit] = {
+            name: time_chunking(processor, texts, 1 if name == "transcript_1mb" else args.repeat, args.rounds)
+            for name, texts in inputs.items()
+        }
+
+    write_report("chunk_text", results, args.output)
+
+
+if __name__ == "__main__":
+    main()
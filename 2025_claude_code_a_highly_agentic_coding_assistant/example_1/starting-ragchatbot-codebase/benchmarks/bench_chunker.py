@@ -0,0 +1,89 @@
+"""
+Scaling of the streaming chunker over synthetic multi-hour transcripts.
+
+Text is generated lazily line by line and fed to DocumentProcessor.iter_chunks,
+so the measured peak memory is the chunker's own working set. Time per MB should
+stay flat across sizes (linear scaling) and peak memory should not grow.
+
+Usage:
+    uv run python benchmarks/bench_chunker.py [--sizes-mb 10,25,50,100] [--output results.json]
+"""
+import argparse
+import random
+import time
+import tracemalloc
+from typing import Iterator
+
+from _common import write_report
+
+from config import config
+from document_processor import DocumentProcessor
+
+_WORDS = (
+    "the model uses a prompt with context and the agent calls a tool to retrieve documents "
+    "embeddings vector search query results lesson course server client cache token "
+    "we can see that this is e.g. an example of how Claude handles the API response"
+).split()
+
+
+def synthetic_transcript(size_bytes: int, seed: int = 7) -> Iterator[str]:
+    """Yield transcript lines until roughly size_bytes of text has been produced"""
+    rng = random.Random(seed)
+    produced = 0
+    while produced < size_bytes:
+        sentences = []
+        for _ in range(rng.randint(1, 4)):
+            words = rng.choices(_WORDS, k=rng.randint(6, 30))
+            sentences.append(words[0].capitalize() + " " + " ".join(words[1:]) + rng.choice(".!?"))
+        line = " ".join(sentences) + "\n"
+        produced += len(line)
+        yield line
+
+
+def run_once(processor: DocumentProcessor, size_bytes: int):
+    """Chunk one synthetic transcript, returning (seconds, chunk count)"""
+    start = time.perf_counter()
+    chunks = 0
+    for _ in processor.iter_chunks(synthetic_transcript(size_bytes)):
+        chunks += 1
+    return time.perf_counter() - start, chunks
+
+
+def peak_memory(processor: DocumentProcessor, size_bytes: int) -> int:
+    """Peak traced allocation while chunking, in bytes"""
+    tracemalloc.start()
+    for _ in processor.iter_chunks(synthetic_transcript(size_bytes)):
+        pass
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes-mb", default="10,25,50,100", help="Comma separated transcript sizes in MB")
+    parser.add_argument("--skip-memory", action="store_true", help="Skip the (slower) traced memory pass")
+    parser.add_argument("--output", help="Write the JSON report here")
+    args = parser.parse_args()
+
+    processor = DocumentProcessor(config.CHUNK_SIZE, config.CHUNK_OVERLAP)
+    results = {}
+    baseline_seconds_per_mb = None
+    for size_mb in [float(size) for size in args.sizes_mb.split(",")]:
+        size_bytes = int(size_mb * 1024 * 1024)
+        seconds, chunks = run_once(processor, size_bytes)
+        seconds_per_mb = seconds / size_mb
+        baseline_seconds_per_mb = baseline_seconds_per_mb or seconds_per_mb
+        results[f"{size_mb:g}MB"] = {
+            "seconds": seconds,
+            "chunks": chunks,
+            "mb_per_second": size_mb / seconds,
+            "seconds_per_mb_vs_smallest": seconds_per_mb / baseline_seconds_per_mb,
+            "peak_memory_kb": None if args.skip_memory else peak_memory(processor, size_bytes) / 1024,
+        }
+
+    write_report("chunker", results, args.output)
+
+
+if __name__ == "__main__":
+    main()
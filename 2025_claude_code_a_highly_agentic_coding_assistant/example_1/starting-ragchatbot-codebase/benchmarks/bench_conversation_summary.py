@@ -0,0 +1,118 @@
+"""
+Prompt size per turn over a long conversation, with and without the rolling summary.
+
+One session asks --turns course questions through RAGSystem.query with a stubbed
+Anthropic API that records every generation request. Three history policies
+are compared:
+
+    unbounded   every exchange verbatim (no token budget, no summary)
+    budget      oldest messages dropped beyond HISTORY_TOKEN_BUDGET
+    summary     older exchanges folded into a running summary after each turn
+
+Input tokens are estimated at four characters per token over the system blocks
+and messages of the answering call; history tokens cover the conversation block
+alone. The summarizer runs in the background as in production, but the
+benchmark waits for it between turns, like a user reading the answer would.
+
+Usage:
+    uv run python benchmarks/bench_conversation_summary.py [--turns 30] [--output results.json]
+"""
+import argparse
+import json
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+from _common import DOCS_DIR, StubAnthropic, install_stub_anthropic, write_report
+
+from config import config
+from conversation_summarizer import ConversationSummarizer
+from rag_system import RAGSystem
+from session_manager import SessionManager
+
+
+class RecordingStub(StubAnthropic):
+    """StubAnthropic that keeps the parameters of every answering call"""
+
+    def __init__(self, answer_model: str):
+        super().__init__(latency=0.0)
+        self.answer_model = answer_model
+        self.requests = []
+
+    def create(self, **params):
+        if params["model"] == self.answer_model:
+            self.requests.append(params)
+        return super().create(**params)
+
+
+def estimate_tokens(value) -> int:
+    """Rough token count of a request part, about four characters per token"""
+    return len(json.dumps(value, default=str)) // 4
+
+
+def run_policy(rag_system: RAGSystem, policy: str, questions, summarizer_executor):
+    """Input and history tokens of every turn of one conversation"""
+    budget = 10 ** 9 if policy == "unbounded" else config.HISTORY_TOKEN_BUDGET
+    rag_system.session_manager = SessionManager(history_token_budget=budget)
+    rag_system.summarizer = None
+    if policy == "summary":
+        rag_system.summarizer = ConversationSummarizer(
+            rag_system.ai_generator, rag_system.session_manager, summarizer_executor,
+            recent_turns=config.SUMMARY_RECENT_TURNS, max_tokens=config.SUMMARY_MAX_TOKENS
+        )
+
+    stub = RecordingStub(rag_system.ai_generator.model)
+    rag_system.ai_generator.client = stub
+    session_id = rag_system.session_manager.create_session()
+    input_tokens, history_tokens = [], []
+    for question in questions:
+        stub.requests.clear()
+        rag_system.query(question, session_id)
+        # The summarizer executor has one thread, so this waits for the turn's summary
+        summarizer_executor.submit(lambda: None).result()
+
+        first_call = stub.requests[0]
+        input_tokens.append(estimate_tokens(first_call["system"]) + estimate_tokens(first_call["messages"]))
+        history_tokens.append(sum(estimate_tokens(block["text"]) for block in first_call["system"][1:]))
+
+    return {
+        "input_tokens_by_turn": input_tokens,
+        "history_tokens_by_turn": history_tokens,
+        "final_input_tokens": input_tokens[-1],
+        "max_history_tokens": max(history_tokens),
+        "summaries": rag_system.summarizer.folds if rag_system.summarizer else 0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--docs", default=DOCS_DIR, help="Folder with course documents")
+    parser.add_argument("--turns", type=int, default=30, help="Questions asked in the conversation")
+    parser.add_argument("--output", help="Write the JSON report here")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as chroma_path:
+        config.CHROMA_PATH = chroma_path
+        config.INGEST_MANIFEST_PATH = f"{chroma_path}/ingest_manifest.json"
+        config.ANSWER_CACHE_ENABLED = False
+        rag_system = RAGSystem(config)
+        rag_system.add_course_folder(args.docs)
+        install_stub_anthropic(rag_system.ai_generator, 0.0)
+
+        lessons = [
+            f"What does lesson {lesson['lesson_number']} of {course['title']} cover?"
+            for course in rag_system.vector_store.get_all_courses_metadata()
+            for lesson in course.get("lessons", [])
+        ]
+        questions = [lessons[i % len(lessons)] for i in range(args.turns)]
+
+        results = {"turns": args.turns, "recent_turns": config.SUMMARY_RECENT_TURNS,
+                   "history_token_budget": config.HISTORY_TOKEN_BUDGET}
+        with ThreadPoolExecutor(max_workers=1) as summarizer_executor:
+            for policy in ("unbounded", "budget", "summary"):
+                results[policy] = run_policy(rag_system, policy, questions, summarizer_executor)
+
+    write_report("conversation_summary", results, args.output)
+
+
+if __name__ == "__main__":
+    main()
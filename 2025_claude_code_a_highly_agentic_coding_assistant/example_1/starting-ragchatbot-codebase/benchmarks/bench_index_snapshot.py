@@ -0,0 +1,116 @@
+"""
+Time to a query-ready index on a fresh replica: re-embedding docs/ vs importing a
+prebuilt index snapshot.
+
+An index is built from --docs through RAGSystem.add_course_folder, exported with
+index_snapshot.export_index and imported into an empty store (optionally of the
+other vector backend). Reported:
+
+- rebuild: seconds to ingest and embed the docs folder
+- export: seconds and compressed snapshot size
+- import: seconds to open the empty store, load the snapshot, and answer the first query
+- the docs scan after the import, which must embed nothing
+- whether the imported index returns the same search results as the original
+- whether a snapshot is rejected by a store using another embedding model
+
+Usage:
+    uv run python benchmarks/bench_index_snapshot.py [--backend numpy] [--queries 50] [--output results.json]
+"""
+import argparse
+import copy
+import os
+import random
+import tempfile
+import time
+
+from _common import DOCS_DIR, write_report
+
+from config import config
+from index_snapshot import export_index, read_snapshot
+from rag_system import RAGSystem
+
+
+def make_system(path: str, backend: str) -> RAGSystem:
+    system_config = copy.copy(config)
+    system_config.CHROMA_PATH = path
+    system_config.INGEST_MANIFEST_PATH = os.path.join(path, "ingest_manifest.json")
+    system_config.VECTOR_BACKEND = backend
+    return RAGSystem(system_config)
+
+
+def search_results(system: RAGSystem, queries):
+    return [(results.ids, results.documents) for results in (system.vector_store.search(q) for q in queries)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--docs", default=DOCS_DIR, help="Folder with course documents")
+    parser.add_argument("--backend", default=config.VECTOR_BACKEND, help="Vector backend the snapshot is imported into")
+    parser.add_argument("--queries", type=int, default=50, help="Queries compared between original and import")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--output", help="Write the JSON report here")
+    args = parser.parse_args()
+
+    docs_dir = os.path.abspath(args.docs)
+    with tempfile.TemporaryDirectory() as root:
+        original = make_system(os.path.join(root, "original"), config.VECTOR_BACKEND)
+        original.vector_store.warm_up()
+        start = time.perf_counter()
+        courses, chunks = original.add_course_folder(docs_dir, clear_existing=True)
+        rebuild = time.perf_counter() - start
+
+        snapshot_path = os.path.join(root, "index-snapshot.tar.gz")
+        start = time.perf_counter()
+        header = export_index(original.vector_store, original.config.INGEST_MANIFEST_PATH, snapshot_path)
+        export = time.perf_counter() - start
+
+        # The model is loaded before the clock starts on both sides: replicas pay for it either way
+        start = time.perf_counter()
+        replica = make_system(os.path.join(root, "replica"), args.backend)
+        opened = time.perf_counter() - start
+        replica.vector_store.warm_up()
+        start = time.perf_counter()
+        replica.import_index_snapshot(snapshot_path)
+        imported = time.perf_counter() - start
+        rng = random.Random(args.seed)
+        contents = original.vector_store.export_collections()["course_content"]["documents"]
+        queries = [" ".join(rng.choice(contents).split()[:12]) for _ in range(args.queries)]
+        start = time.perf_counter()
+        replica.vector_store.search(queries[0])
+        first_query = time.perf_counter() - start
+
+        start = time.perf_counter()
+        rescanned = replica.add_course_folder(docs_dir)
+        rescan = time.perf_counter() - start
+
+        try:
+            read_snapshot(snapshot_path, header["embedding_model"] + "-other")
+            rejected = False
+        except ValueError:
+            rejected = True
+
+        results = {
+            "courses": courses,
+            "chunks": chunks,
+            "embedding_model": header["embedding_model"],
+            "source_backend": config.VECTOR_BACKEND,
+            "target_backend": args.backend,
+            "rebuild_seconds": rebuild,
+            "export_seconds": export,
+            "snapshot_bytes": os.path.getsize(snapshot_path),
+            "import": {
+                "open_seconds": opened,
+                "load_seconds": imported,
+                "first_query_seconds": first_query,
+                "query_ready_seconds": opened + imported + first_query,
+            },
+            "rescan_after_import": {"seconds": rescan, "courses": rescanned[0], "chunks_embedded": rescanned[1]},
+            "identical_results": search_results(original, queries) == search_results(replica, queries),
+            "model_mismatch_rejected": rejected,
+        }
+
+    write_report("index_snapshot", results, args.output)
+
+
+if __name__ == "__main__":
+    main()
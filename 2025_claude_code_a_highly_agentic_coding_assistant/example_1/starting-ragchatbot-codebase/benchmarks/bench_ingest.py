@@ -0,0 +1,95 @@
+"""
+Ingestion throughput over a synthetic corpus scaled from docs/.
+
+At scale N every course document is copied N times under a distinct course
+title (the header line is rewritten, the lessons stay the same), so the corpus
+has N times the files, courses and chunks with realistic text. Each scale is
+ingested into a fresh index through RAGSystem.add_course_folder, then ingested
+again unchanged. Reported per scale:
+
+- files, chunks, and the ingestion's own per-stage stats (parse, embed, write)
+- end-to-end seconds, files/s and chunks/s
+- seconds of the unchanged re-run
+
+Usage:
+    uv run python benchmarks/bench_ingest.py [--scales 1,10,100] [--output results.json]
+"""
+import argparse
+import copy
+import dataclasses
+import os
+import tempfile
+import time
+
+from _common import DOCS_DIR, write_report
+
+from config import config
+from rag_system import RAGSystem
+
+
+def scaled_corpus(docs_dir: str, target_dir: str, scale: int) -> int:
+    """Write scale copies of every course document with distinct titles; return the file count"""
+    count = 0
+    for file_name in sorted(os.listdir(docs_dir)):
+        with open(os.path.join(docs_dir, file_name), encoding="utf-8") as file:
+            lines = file.read().split("\n")
+        base, extension = os.path.splitext(file_name)
+        for copy_number in range(scale):
+            header = next(i for i, line in enumerate(lines) if line.startswith("Course Title:"))
+            renamed = list(lines)
+            if copy_number:
+                renamed[header] = f"{lines[header]} (copy {copy_number})"
+            with open(os.path.join(target_dir, f"{base}_{copy_number:03d}{extension}"), "w", encoding="utf-8") as file:
+                file.write("\n".join(renamed))
+            count += 1
+    return count
+
+
+def ingest(docs_dir: str, chroma_path: str):
+    """Ingest a folder into a fresh index twice; return (first run, unchanged run) reports"""
+    system_config = copy.copy(config)
+    system_config.CHROMA_PATH = chroma_path
+    system_config.INGEST_MANIFEST_PATH = os.path.join(chroma_path, "ingest_manifest.json")
+    rag_system = RAGSystem(system_config)
+    # The model loads before the clock starts; startup cost is bench_startup.py's subject
+    rag_system.vector_store.warm_up()
+
+    start = time.perf_counter()
+    courses, chunks = rag_system.add_course_folder(docs_dir)
+    seconds = time.perf_counter() - start
+    stats = dataclasses.asdict(rag_system.last_ingestion_stats)
+
+    start = time.perf_counter()
+    rag_system.add_course_folder(docs_dir)
+    unchanged_seconds = time.perf_counter() - start
+    return {
+        "courses": courses,
+        "chunks": chunks,
+        "seconds": seconds,
+        "files_per_second": stats["files"] / seconds if seconds else 0.0,
+        "chunks_per_second": chunks / seconds if seconds else 0.0,
+        "stats": stats,
+        "unchanged_seconds": unchanged_seconds,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--docs", default=DOCS_DIR, help="Folder with course documents to scale")
+    parser.add_argument("--scales", default="1,10,100", help="Comma-separated corpus multipliers")
+    parser.add_argument("--output", help="Write the JSON report here")
+    args = parser.parse_args()
+
+    results = {"workers": config.INGEST_WORKERS, "embedding_batch_size": config.EMBEDDING_BATCH_SIZE}
+    for scale in [int(value) for value in args.scales.split(",")]:
+        with tempfile.TemporaryDirectory() as root:
+            docs_dir = os.path.join(root, "docs")
+            os.makedirs(docs_dir)
+            files = scaled_corpus(args.docs, docs_dir, scale)
+            results[f"x{scale}"] = {"files": files, **ingest(docs_dir, os.path.join(root, "index"))}
+
+    write_report("ingest", results, args.output)
+
+
+if __name__ == "__main__":
+    main()
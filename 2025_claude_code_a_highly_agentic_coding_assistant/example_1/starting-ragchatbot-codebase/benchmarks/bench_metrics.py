@@ -0,0 +1,115 @@
+"""
+Overhead of the per-stage metrics on the query path, with a stubbed Anthropic API.
+
+The same questions are answered with metrics enabled and disabled, in
+alternating rounds so drift hits both sides alike. The stubbed calls take
+--llm-latency seconds (0 by default: the worst case, where local work is all
+there is). The answer cache is disabled so every query searches. Reported:
+
+- query latency with and without metrics, and the overhead in percent
+- cost of one span and the number of spans per query
+- the per-stage breakdown and token counts the metrics collected
+- the rendered /api/metrics payload size and render time
+
+Usage:
+    uv run python benchmarks/bench_metrics.py [--mode tools] [--rounds 5] [--output results.json]
+"""
+import argparse
+import re
+import tempfile
+import time
+
+from _common import DOCS_DIR, install_stub_anthropic, latency_summary, write_report
+from bench_retrieve_first import catalog_questions
+
+from config import config
+from metrics import Metrics, metrics
+from rag_system import RAGSystem
+
+
+def span_seconds(count: int = 200000) -> float:
+    """Cost of entering and leaving one span on a private registry"""
+    registry = Metrics()
+    start = time.perf_counter()
+    for _ in range(count):
+        with registry.span("stage"):
+            pass
+    return (time.perf_counter() - start) / count
+
+
+def stage_breakdown(rendered: str):
+    """Calls and mean milliseconds per stage, parsed back from the Prometheus text"""
+    totals = {}
+    for kind, stage, value in re.findall(r'rag_stage_duration_seconds_(sum|count)\{stage="([^"]+)"\} (\S+)', rendered):
+        totals.setdefault(stage, {})[kind] = float(value)
+    return {
+        stage: {"calls": int(values["count"]), "mean_ms": 1000 * values["sum"] / values["count"]}
+        for stage, values in totals.items() if values.get("count")
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--docs", default=DOCS_DIR, help="Folder with course documents")
+    parser.add_argument("--mode", default=config.QUERY_MODE, help='Query mode, "tools" or "retrieve_first"')
+    parser.add_argument("--llm-latency", type=float, default=0.0, help="Seconds per stubbed Anthropic call")
+    parser.add_argument("--rounds", type=int, default=5, help="Alternating enabled/disabled rounds")
+    parser.add_argument("--output", help="Write the JSON report here")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as chroma_path:
+        config.CHROMA_PATH = chroma_path
+        config.INGEST_MANIFEST_PATH = f"{chroma_path}/ingest_manifest.json"
+        config.ANSWER_CACHE_ENABLED = False
+        config.QUERY_MODE = args.mode
+        rag_system = RAGSystem(config)
+        rag_system.add_course_folder(args.docs)
+        rag_system.vector_store.warm_up()
+        install_stub_anthropic(rag_system.ai_generator, args.llm_latency)
+        questions = catalog_questions(rag_system)
+
+        # One unmeasured pass fills the query embedding cache, so both sides see the same hits
+        for question in questions:
+            rag_system.query(question)
+
+        latencies = {True: [], False: []}
+        for _ in range(args.rounds):
+            for enabled in (False, True):
+                metrics.enabled = enabled
+                for question in questions:
+                    start = time.perf_counter()
+                    rag_system.query(question)
+                    latencies[enabled].append(time.perf_counter() - start)
+        metrics.enabled = True
+
+        start = time.perf_counter()
+        rendered = metrics.render()
+        render_seconds = time.perf_counter() - start
+
+    enabled, disabled = latency_summary(latencies[True]), latency_summary(latencies[False])
+    stages = stage_breakdown(rendered)
+    span_count = sum(values["calls"] for values in stages.values())
+    queries = stages.get("query", {}).get("calls", 0) or 1
+    tokens = {
+        f"{call}/{kind}": float(value)
+        for call, kind, value in re.findall(r'rag_anthropic_tokens_total\{call="([^"]+)",kind="([^"]+)"\} (\S+)', rendered)
+    }
+    results = {
+        "mode": args.mode,
+        "llm_latency_s": args.llm_latency,
+        "questions": len(questions),
+        "disabled": disabled,
+        "enabled": enabled,
+        "overhead_pct": 100 * (enabled["mean_ms"] / disabled["mean_ms"] - 1) if disabled["mean_ms"] else 0.0,
+        "span_us": 1e6 * span_seconds(),
+        "spans_per_query": span_count / queries,
+        "stages": stages,
+        "tokens": tokens,
+        "metrics_bytes": len(rendered),
+        "render_ms": 1000 * render_seconds,
+    }
+    write_report("metrics", results, args.output)
+
+
+if __name__ == "__main__":
+    main()
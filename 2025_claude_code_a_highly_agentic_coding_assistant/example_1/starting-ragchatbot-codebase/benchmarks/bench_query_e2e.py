@@ -0,0 +1,78 @@
+"""
+End-to-end RAGSystem.query latency against a local fake Anthropic server.
+
+The AIGenerator's real SDK clients talk HTTP to FakeAnthropicServer, which
+answers deterministically after --llm-latency seconds (plus --token-latency
+per generated word), so the numbers include SDK and HTTP overhead and are
+reproducible without an API key. Questions come from the indexed catalog plus a
+few general-knowledge ones (see bench_retrieve_first.py); the answer cache is
+disabled. Reported per query mode:
+
+- query latency p50/p95/p99/mean in ms
+- local overhead: latency minus the time the fake server spent generating
+- Anthropic calls per query
+
+Usage:
+    uv run python benchmarks/bench_query_e2e.py [--llm-latency 0.2] [--modes tools,retrieve_first] [--output results.json]
+"""
+import argparse
+import tempfile
+import time
+
+from _common import DOCS_DIR, FakeAnthropicServer, latency_summary, write_report
+from bench_retrieve_first import GENERAL_QUESTIONS, catalog_questions
+
+from config import config
+from rag_system import RAGSystem
+
+
+def run_mode(rag_system: RAGSystem, server: FakeAnthropicServer, questions, mode: str):
+    rag_system.config.QUERY_MODE = mode
+    calls_before = server.calls
+    latencies, overheads = [], []
+    for question in questions:
+        generation_before = server.generation_seconds
+        start = time.perf_counter()
+        rag_system.query(question)
+        latency = time.perf_counter() - start
+        latencies.append(latency)
+        overheads.append(max(0.0, latency - (server.generation_seconds - generation_before)))
+    return {
+        "latency": latency_summary(latencies),
+        "local_overhead": latency_summary(overheads),
+        "llm_calls_per_query": (server.calls - calls_before) / len(questions),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--docs", default=DOCS_DIR, help="Folder with course documents")
+    parser.add_argument("--llm-latency", type=float, default=0.2, help="Seconds per fake Anthropic call")
+    parser.add_argument("--token-latency", type=float, default=0.0, help="Extra seconds per generated word")
+    parser.add_argument("--modes", default="tools,retrieve_first", help="Query modes to measure")
+    parser.add_argument("--output", help="Write the JSON report here")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as chroma_path:
+        config.CHROMA_PATH = chroma_path
+        config.INGEST_MANIFEST_PATH = f"{chroma_path}/ingest_manifest.json"
+        config.ANSWER_CACHE_ENABLED = False
+        rag_system = RAGSystem(config)
+        rag_system.add_course_folder(args.docs)
+        rag_system.vector_store.warm_up()
+        questions = catalog_questions(rag_system) + GENERAL_QUESTIONS
+
+        results = {"questions": len(questions), "llm_latency_s": args.llm_latency,
+                   "token_latency_s": args.token_latency}
+        with FakeAnthropicServer(args.llm_latency, args.token_latency) as server:
+            server.install(rag_system.ai_generator)
+            # One unmeasured query opens the HTTP connection pool
+            rag_system.query(GENERAL_QUESTIONS[0])
+            for mode in args.modes.split(","):
+                results[mode] = run_mode(rag_system, server, questions, mode)
+
+    write_report("query_e2e", results, args.output)
+
+
+if __name__ == "__main__":
+    main()
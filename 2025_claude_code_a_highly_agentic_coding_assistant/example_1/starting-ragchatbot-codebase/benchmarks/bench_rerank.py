@@ -0,0 +1,86 @@
+"""
+Quality, latency and context size of cross-encoder reranking over the bundled docs/ corpus.
+
+Compares the configured search returning MAX_RESULTS chunks with the same search
+over-fetching --candidates chunks and keeping the --top-k best by cross-encoder
+score. Query sets are the synthetic ones of bench_retrieval.py. Reported per
+query set and strategy:
+
+- recall and MRR of the returned chunks
+- context tokens: estimated LLM input tokens of the returned chunks (4 chars/token)
+- latency cold (every pair scored) and warm (pair scores cached)
+
+Usage:
+    uv run python benchmarks/bench_rerank.py [--model cross-encoder/ms-marco-MiniLM-L-6-v2] [--top-k 3] [--output results.json]
+"""
+import argparse
+import random
+import tempfile
+import time
+
+from _common import DOCS_DIR, latency_summary, write_report
+from bench_retrieval import build_queries, build_store
+
+from config import config
+from reranker import CrossEncoderReranker
+
+
+def evaluate(store, queries, rerank: bool, limit: int):
+    """Recall, MRR, context tokens and latency of one pass over a query set"""
+    hits, reciprocal_ranks, context_tokens, latencies = 0, 0.0, 0, []
+    for query, relevant in queries:
+        start = time.perf_counter()
+        results = store.search(query, limit=limit, rerank=rerank)
+        latencies.append(time.perf_counter() - start)
+
+        context_tokens += sum(len(document) for document in results.documents) // 4
+        rank = next((i for i, chunk_id in enumerate(results.ids, start=1) if chunk_id in relevant), None)
+        if rank:
+            hits += 1
+            reciprocal_ranks += 1 / rank
+
+    count = len(queries) or 1
+    return {
+        "recall": hits / count,
+        "mrr": reciprocal_ranks / count,
+        "context_tokens_per_query": context_tokens / count,
+        "latency": latency_summary(latencies),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--docs", default=DOCS_DIR, help="Folder with course documents")
+    parser.add_argument("--model", default="cross-encoder/ms-marco-MiniLM-L-6-v2", help="Cross-encoder to rerank with")
+    parser.add_argument("--candidates", type=int, default=config.RERANK_CANDIDATES, help="Candidates scored per query")
+    parser.add_argument("--top-k", type=int, default=config.RERANK_TOP_K, help="Chunks kept after reranking")
+    parser.add_argument("--queries", type=int, default=200, help="Queries per query set")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--output", help="Write the JSON report here")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as chroma_path:
+        store, chunks = build_store(args.docs, chroma_path)
+        store.reranker = CrossEncoderReranker(args.model)
+        store.rerank_candidates = args.candidates
+        query_sets = build_queries(chunks, args.queries, random.Random(args.seed))
+
+        # Load the model outside the timed runs
+        store.reranker.score("warm up", ["warm-up"], ["warm up"])
+
+        results = {"corpus_chunks": len(chunks), "model": args.model,
+                   "candidates": args.candidates, "top_k": args.top_k, "baseline_k": config.MAX_RESULTS}
+        for query_set, queries in query_sets.items():
+            store.reranker.clear()
+            results[query_set] = {
+                "baseline": evaluate(store, queries, rerank=False, limit=config.MAX_RESULTS),
+                "rerank_cold": evaluate(store, queries, rerank=True, limit=args.top_k),
+                "rerank_warm": evaluate(store, queries, rerank=True, limit=args.top_k),
+            }
+        results["score_cache"] = store.reranker.stats()
+
+    write_report("rerank", results, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""
+Recall@k and latency of dense-only vs hybrid (BM25 + dense, rank fused) retrieval
+over the bundled docs/ corpus.
+
+Two synthetic query sets are derived from the indexed chunks:
+- sentence: a sentence taken verbatim from a chunk (paraphrase-free semantic lookup)
+- keywords: the three rarest terms of a chunk (exact-term lookup: API names, acronyms)
+
+Usage:
+    uv run python benchmarks/bench_retrieval.py [--k 5] [--queries 200] [--output results.json]
+"""
+import argparse
+import os
+import random
+import re
+import tempfile
+import time
+from collections import Counter
+
+from _common import DOCS_DIR, latency_summary, write_report
+
+from config import config
+from document_processor import DocumentProcessor
+from lexical_index import tokenize
+from vector_store import VectorStore
+
+
+def build_store(docs_dir: str, chroma_path: str):
+    """Index every course document into a fresh hybrid-capable store"""
+    store = VectorStore(chroma_path, config.EMBEDDING_MODEL, config.MAX_RESULTS, search_mode="hybrid")
+    processor = DocumentProcessor(config.CHUNK_SIZE, config.CHUNK_OVERLAP)
+    chunks = []
+    for file_name in sorted(os.listdir(docs_dir)):
+        course, course_chunks = processor.process_course_document(os.path.join(docs_dir, file_name))
+        store.add_course_metadata(course)
+        store.add_course_content(course_chunks)
+        chunks.extend(zip(store.chunk_ids(course_chunks), course_chunks))
+    return store, chunks
+
+
+def build_queries(chunks, count: int, rng: random.Random):
+    """Return {query set: [(query, relevant chunk IDs)]}"""
+    document_frequency = Counter()
+    for _, chunk in chunks:
+        document_frequency.update(set(tokenize(chunk.content)))
+
+    sentence_queries, keyword_queries = [], []
+    for chunk_id, chunk in rng.sample(chunks, min(count, len(chunks))):
+        sentences = [s for s in re.split(r'(?<=[.!?])\s+', chunk.content) if len(s.split()) >= 8]
+        if sentences:
+            sentence = rng.choice(sentences)
+            relevant = {cid for cid, c in chunks if sentence in c.content}
+            sentence_queries.append((sentence, relevant))
+
+        terms = sorted(set(tokenize(chunk.content)), key=lambda term: (document_frequency[term], term))[:3]
+        if terms:
+            keyword_queries.append((" ".join(terms), {chunk_id}))
+
+    return {"sentence": sentence_queries, "keywords": keyword_queries}
+
+
+def evaluate(store: VectorStore, queries, mode: str, k: int):
+    """Recall@k, MRR and latency for one retrieval mode"""
+    store.query_embedding_cache.clear()  # Every mode pays for its own query embeddings
+    hits, reciprocal_ranks, latencies = 0, 0.0, []
+    for query, relevant in queries:
+        start = time.perf_counter()
+        results = store.search(query, limit=k, mode=mode)
+        latencies.append(time.perf_counter() - start)
+
+        rank = next((i for i, chunk_id in enumerate(results.ids, start=1) if chunk_id in relevant), None)
+        if rank:
+            hits += 1
+            reciprocal_ranks += 1 / rank
+
+    return {
+        f"recall@{k}": hits / len(queries) if queries else 0.0,
+        "mrr": reciprocal_ranks / len(queries) if queries else 0.0,
+        "latency": latency_summary(latencies),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--docs", default=DOCS_DIR, help="Folder with course documents")
+    parser.add_argument("--k", type=int, default=5, help="Results per query")
+    parser.add_argument("--queries", type=int, default=200, help="Queries per query set")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--output", help="Write the JSON report here")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as chroma_path:
+        store, chunks = build_store(args.docs, chroma_path)
+        query_sets = build_queries(chunks, args.queries, random.Random(args.seed))
+        results = {
+            query_set: {mode: evaluate(store, queries, mode, args.k) for mode in ("dense", "hybrid")}
+            for query_set, queries in query_sets.items()
+        }
+        results["corpus_chunks"] = len(chunks)
+
+    write_report("retrieval", results, args.output)
+
+
+if __name__ == "__main__":
+    main()
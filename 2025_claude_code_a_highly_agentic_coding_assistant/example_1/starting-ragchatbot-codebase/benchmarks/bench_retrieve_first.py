@@ -0,0 +1,90 @@
+"""
+LLM latency of the tool loop vs retrieve-first generation with a stubbed Anthropic API.
+
+In "tools" mode the model first asks for a search and then answers, two
+sequential calls. In "retrieve_first" mode the local query classifier routes
+course questions to retrieval up front and the answer takes a single call.
+Each stubbed call takes --llm-latency seconds; the answer cache is disabled.
+
+Questions are generated from the indexed catalog (course and lesson titles)
+plus a handful of general-knowledge questions that should keep the tool loop.
+
+Usage:
+    uv run python benchmarks/bench_retrieve_first.py [--llm-latency 0.3] [--output results.json]
+"""
+import argparse
+import tempfile
+import time
+
+from _common import DOCS_DIR, install_stub_anthropic, latency_summary, write_report
+
+from config import config
+from rag_system import RAGSystem
+
+GENERAL_QUESTIONS = [
+    "What is the capital of France?",
+    "How many days are in a leap year?",
+    "Who painted the Mona Lisa?",
+    "What is the boiling point of water at sea level?",
+]
+
+
+def catalog_questions(rag_system: RAGSystem):
+    """Course questions in the shapes students ask them"""
+    questions = []
+    for course in rag_system.vector_store.get_all_courses_metadata():
+        title = course["title"]
+        questions.append(f"What is the {title} course about?")
+        for lesson in course.get("lessons", [])[:4]:
+            questions.append(f"What does lesson {lesson['lesson_number']} of {title} cover?")
+            questions.append(f"Explain {lesson['lesson_title']}")
+    return questions
+
+
+def run_mode(rag_system: RAGSystem, mode: str, questions, llm_latency: float):
+    """Latency, LLM calls and routing for one query mode"""
+    rag_system.config.QUERY_MODE = mode
+    install_stub_anthropic(rag_system.ai_generator, llm_latency)
+    latencies = []
+    for question in questions:
+        start = time.perf_counter()
+        rag_system.query(question)
+        latencies.append(time.perf_counter() - start)
+    return {
+        "latency": latency_summary(latencies),
+        "llm_calls_per_query": rag_system.ai_generator.client.calls / len(questions),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--docs", default=DOCS_DIR, help="Folder with course documents")
+    parser.add_argument("--llm-latency", type=float, default=0.3, help="Seconds per stubbed Anthropic call")
+    parser.add_argument("--output", help="Write the JSON report here")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as chroma_path:
+        config.CHROMA_PATH = chroma_path
+        config.INGEST_MANIFEST_PATH = f"{chroma_path}/ingest_manifest.json"
+        config.ANSWER_CACHE_ENABLED = False
+        rag_system = RAGSystem(config)
+        rag_system.add_course_folder(args.docs)
+
+        course_questions = catalog_questions(rag_system)
+        routed = sum(rag_system.query_classifier.classify(q).retrieve for q in course_questions)
+        misrouted = sum(rag_system.query_classifier.classify(q).retrieve for q in GENERAL_QUESTIONS)
+
+        results = {"llm_latency_s": args.llm_latency}
+        for name, questions in (("course", course_questions), ("general", GENERAL_QUESTIONS)):
+            results[name] = {mode: run_mode(rag_system, mode, questions, args.llm_latency)
+                             for mode in ("tools", "retrieve_first")}
+        results["classifier"] = {
+            "course_questions_retrieved": routed / len(course_questions),
+            "general_questions_retrieved": misrouted / len(GENERAL_QUESTIONS),
+        }
+
+    write_report("retrieve_first", results, args.output)
+
+
+if __name__ == "__main__":
+    main()
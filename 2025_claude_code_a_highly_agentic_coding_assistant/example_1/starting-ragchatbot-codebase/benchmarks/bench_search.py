@@ -0,0 +1,76 @@
+"""
+VectorStore.search latency over the bundled docs/ corpus, with and without filters.
+
+Queries are sentences taken from indexed chunks (see bench_retrieval.py), each
+searched without a filter, filtered by its chunk's course (given as a partial
+course name, so course resolution is included), and filtered by course and
+lesson. Every search mode is measured twice: cold, where each query is
+embedded, and warm, with the query embedding cached, which leaves the store
+and fusion work. Reported per mode, filter and pass: p50/p95/p99/mean in ms.
+
+bench_vector_backends.py covers the same filters on large synthetic corpora.
+
+Usage:
+    uv run python benchmarks/bench_search.py [--queries 200] [--modes dense,hybrid] [--output results.json]
+"""
+import argparse
+import random
+import tempfile
+import time
+
+from _common import DOCS_DIR, latency_summary, write_report
+from bench_retrieval import build_queries, build_store
+
+
+def filtered_workload(chunks, count: int, rng: random.Random):
+    """{filter: [(query, course_name, lesson_number)]} over the same query texts"""
+    by_id = dict(chunks)
+    queries = []
+    for query, relevant in build_queries(chunks, count, rng)["sentence"]:
+        chunk = by_id[next(iter(relevant))]
+        # The first two words of the title, the way users name courses
+        queries.append((query, " ".join(chunk.course_title.split()[:2]), chunk.lesson_number))
+    return {
+        "unfiltered": [(query, None, None) for query, _, _ in queries],
+        "course": [(query, course, None) for query, course, _ in queries],
+        "course_lesson": queries,
+    }
+
+
+def measure(store, workload, mode: str):
+    latencies = []
+    for query, course_name, lesson_number in workload:
+        start = time.perf_counter()
+        results = store.search(query, course_name=course_name, lesson_number=lesson_number, mode=mode)
+        latencies.append(time.perf_counter() - start)
+        if results.error:
+            raise RuntimeError(results.error)
+    return latency_summary(latencies)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--docs", default=DOCS_DIR, help="Folder with course documents")
+    parser.add_argument("--queries", type=int, default=200, help="Queries per filter")
+    parser.add_argument("--modes", default="dense,hybrid", help="Search modes to measure")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--output", help="Write the JSON report here")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as chroma_path:
+        store, chunks = build_store(args.docs, chroma_path)
+        store.warm_up()
+        workloads = filtered_workload(chunks, args.queries, random.Random(args.seed))
+
+        results = {"corpus_chunks": len(chunks), "queries": len(workloads["unfiltered"])}
+        for mode in args.modes.split(","):
+            results[mode] = {}
+            for name, workload in workloads.items():
+                store.query_embedding_cache.clear()
+                results[mode][name] = {"cold": measure(store, workload, mode), "warm": measure(store, workload, mode)}
+
+    write_report("search", results, args.output)
+
+
+if __name__ == "__main__":
+    main()
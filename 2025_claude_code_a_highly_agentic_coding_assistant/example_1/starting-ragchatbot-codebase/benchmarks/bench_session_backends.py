@@ -0,0 +1,128 @@
+"""
+Per-request overhead and multi-worker consistency of the session backends.
+
+Every simulated request reads a conversation history and appends one
+question/answer exchange, as RAGSystem.query does. The memory, sqlite and redis
+backends are timed in this process; redis runs against --redis-url, or against
+an in-process fakeredis server when no URL is given and fakeredis is installed.
+
+The sharing check starts --workers processes that append concurrently to the
+same sessions of the sqlite (and, with --redis-url, redis) backend and then
+verifies that no exchange was lost or interleaved.
+
+Usage:
+    uv run python benchmarks/bench_session_backends.py [--requests 2000] [--workers 4] [--redis-url redis://localhost:6379/0] [--output results.json]
+"""
+import argparse
+import multiprocessing
+import os
+import random
+import tempfile
+import time
+
+from _common import latency_summary, write_report
+
+from session_backends import RedisSessionBackend, SQLiteSessionBackend
+from session_manager import SessionManager
+
+ANSWER = "An answer of typical length that explains the course material in a few sentences. " * 4
+
+
+def make_backend(kind: str, db_path: str, redis_url: str = None, token_budget: int = 1000):
+    """A fresh backend of the given kind"""
+    if kind == "memory":
+        return SessionManager(history_token_budget=token_budget)
+    if kind == "sqlite":
+        return SQLiteSessionBackend(db_path, history_token_budget=token_budget)
+    if redis_url:
+        return RedisSessionBackend(redis_url, key_prefix=f"bench:{os.getpid()}:", history_token_budget=token_budget)
+    import fakeredis
+    return RedisSessionBackend(client=fakeredis.FakeRedis(), history_token_budget=token_budget)
+
+
+def time_requests(backend, requests: int, sessions: int):
+    """Latency of history read plus exchange append over a pool of sessions"""
+    session_ids = [backend.create_session() for _ in range(sessions)]
+    rng = random.Random(0)
+    latencies = []
+    for i in range(requests):
+        session_id = rng.choice(session_ids)
+        start = time.perf_counter()
+        backend.get_conversation_history(session_id)
+        backend.add_exchange(session_id, f"Question {i} about lesson {i % 7}?", ANSWER)
+        latencies.append(time.perf_counter() - start)
+    return latency_summary(latencies)
+
+
+def _append_worker(kind: str, db_path: str, redis_url: str, worker: int, session_ids, turns: int):
+    """Child process: append tagged exchanges to shared sessions"""
+    backend = make_backend(kind, db_path, redis_url, token_budget=10 ** 9)
+    for turn in range(turns):
+        for session_id in session_ids:
+            backend.add_exchange(session_id, f"q {worker}/{turn}", f"a {worker}/{turn}")
+
+
+def check_sharing(kind: str, db_path: str, redis_url: str, workers: int, turns: int, sessions: int = 8):
+    """Run workers concurrently and count exchanges that were lost or split apart"""
+    backend = make_backend(kind, db_path, redis_url, token_budget=10 ** 9)
+    session_ids = [backend.create_session() for _ in range(sessions)]
+
+    context = multiprocessing.get_context("spawn")
+    start = time.perf_counter()
+    processes = [
+        context.Process(target=_append_worker, args=(kind, db_path, redis_url, worker, session_ids, turns))
+        for worker in range(workers)
+    ]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+    elapsed = time.perf_counter() - start
+
+    lost = split = 0
+    for session_id in session_ids:
+        lines = (backend.get_conversation_history(session_id) or "").split("\n")
+        lost += workers * turns * 2 - len(lines)
+        # An exchange is atomic when every question is directly followed by its answer
+        split += sum(1 for question, answer in zip(lines[::2], lines[1::2])
+                     if question.replace("User: q", "") != answer.replace("Assistant: a", ""))
+    appends = workers * turns * sessions
+    return {"workers": workers, "appends": appends, "appends_per_s": appends / elapsed,
+            "lost_messages": lost, "split_exchanges": split}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=2000, help="Simulated requests per backend")
+    parser.add_argument("--sessions", type=int, default=200, help="Conversations the requests are spread over")
+    parser.add_argument("--workers", type=int, default=4, help="Processes in the sharing check")
+    parser.add_argument("--turns", type=int, default=50, help="Exchanges per worker and session in the sharing check")
+    parser.add_argument("--redis-url", help="Redis server to test; defaults to an in-process fakeredis")
+    parser.add_argument("--output", help="Write the JSON report here")
+    args = parser.parse_args()
+
+    kinds = ["memory", "sqlite", "redis"]
+    if not args.redis_url:
+        try:
+            import fakeredis  # noqa: F401
+        except ImportError:
+            kinds.remove("redis")
+
+    results = {"overhead": {}, "sharing": {}}
+    with tempfile.TemporaryDirectory() as tmp:
+        for kind in kinds:
+            backend = make_backend(kind, os.path.join(tmp, f"{kind}.db"), args.redis_url)
+            results["overhead"][kind] = time_requests(backend, args.requests, args.sessions)
+
+        # fakeredis lives inside one process, so only a real server can be shared
+        shared = ["sqlite"] + (["redis"] if args.redis_url else [])
+        for kind in shared:
+            results["sharing"][kind] = check_sharing(
+                kind, os.path.join(tmp, "shared.db"), args.redis_url, args.workers, args.turns
+            )
+
+    write_report("session_backends", results, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+Cold start of the API server: time until /health and /ready answer, with the
+per-phase timings the server reports on /ready.
+
+The server is started as a fresh process (uvicorn, as run.sh does) against an
+empty index, then restarted against the index the first start built, which is
+the replica restart case: the ingestion manifest is unchanged, so the docs scan
+is skipped.
+
+Usage:
+    uv run python benchmarks/bench_startup.py [--restarts 3] [--output results.json]
+"""
+import argparse
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.error
+import urllib.request
+
+from _common import BACKEND_DIR, DOCS_DIR, write_report
+
+SERVER = """
+import sys
+from config import config
+config.CHROMA_PATH = sys.argv[1]
+config.INGEST_MANIFEST_PATH = sys.argv[1] + "/ingest_manifest.json"
+config.DOCS_PATH = sys.argv[2]
+import uvicorn
+import app
+uvicorn.run(app.app, host="127.0.0.1", port=int(sys.argv[3]), log_level="warning")
+"""
+
+
+def free_port() -> int:
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        return probe.getsockname()[1]
+
+
+def status(url: str):
+    """(HTTP status, parsed JSON body), or (None, None) while nothing listens"""
+    try:
+        with urllib.request.urlopen(url, timeout=5) as response:
+            return response.status, json.loads(response.read())
+    except urllib.error.HTTPError as e:
+        return e.code, json.loads(e.read() or b"null")
+    except OSError:
+        return None, None
+
+
+def start_server(chroma_path: str, docs_dir: str, timeout: float):
+    """Start a server process; time until /health and /ready first succeed"""
+    port = free_port()
+    base_url = f"http://127.0.0.1:{port}"
+    start = time.perf_counter()
+    process = subprocess.Popen([sys.executable, "-c", SERVER, chroma_path, docs_dir, str(port)],
+                               cwd=BACKEND_DIR, stdout=subprocess.DEVNULL)
+    try:
+        health = None
+        while time.perf_counter() - start < timeout:
+            if process.poll() is not None:
+                raise RuntimeError(f"Server exited with code {process.returncode}")
+            if health is None and status(f"{base_url}/health")[0] == 200:
+                health = time.perf_counter() - start
+            if health is not None:
+                code, report = status(f"{base_url}/ready")
+                if code == 200:
+                    return {"health_seconds": health, "ready_seconds": time.perf_counter() - start,
+                            "phases_seconds": report["phases_seconds"]}
+                if report and report.get("error"):
+                    raise RuntimeError(report["error"])
+            time.sleep(0.02)
+        raise TimeoutError(f"Server not ready after {timeout}s")
+    finally:
+        process.terminate()
+        process.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--docs", default=DOCS_DIR, help="Folder with course documents")
+    parser.add_argument("--restarts", type=int, default=3, help="Restarts against the built index")
+    parser.add_argument("--timeout", type=float, default=600, help="Seconds to wait for readiness")
+    parser.add_argument("--output", help="Write the JSON report here")
+    args = parser.parse_args()
+
+    docs_dir = os.path.abspath(args.docs)
+    with tempfile.TemporaryDirectory() as chroma_path:
+        results = {"first_start": start_server(chroma_path, docs_dir, args.timeout)}
+        results["restarts"] = [start_server(chroma_path, docs_dir, args.timeout) for _ in range(args.restarts)]
+
+    write_report("startup", results, args.output)
+
+
+if __name__ == "__main__":
+    main()
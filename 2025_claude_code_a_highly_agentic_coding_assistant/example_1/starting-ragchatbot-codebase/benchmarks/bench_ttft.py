@@ -0,0 +1,80 @@
+"""
+Time to first token of /api/query/stream compared with the latency of /api/query.
+
+A non-streaming answer shows nothing until it is complete, so its latency is its
+time to first token. The streaming endpoint is measured client side (first token
+event, over HTTP to a local uvicorn server) and server side (ttft_ms in its done event). Anthropic calls are stubbed:
+each call takes --llm-latency seconds to its first token and --token-latency
+seconds per further word.
+
+Usage:
+    uv run python benchmarks/bench_ttft.py [--queries 20] [--llm-latency 0.3] [--token-latency 0.02] [--output results.json]
+"""
+import argparse
+import asyncio
+import json
+import tempfile
+import time
+
+from _common import DOCS_DIR, install_stub_anthropic, latency_summary, load_app, serve_app, write_report
+
+import httpx
+
+from bench_async_query import QUESTIONS
+
+
+async def measure(base_url: str, queries: int):
+    """Return latency lists for the non-streaming and streaming endpoints"""
+    timings = {"query_latency": [], "stream_ttft_client": [], "stream_ttft_server": [], "stream_total": []}
+
+    async with httpx.AsyncClient(base_url=base_url, timeout=None) as client:
+        for i in range(queries):
+            question = QUESTIONS[i % len(QUESTIONS)]
+
+            start = time.perf_counter()
+            response = await client.post("/api/query", json={"query": question})
+            response.raise_for_status()
+            timings["query_latency"].append(time.perf_counter() - start)
+
+            start = time.perf_counter()
+            first_token = None
+            event = None
+            async with client.stream("POST", "/api/query/stream", json={"query": question}) as response:
+                response.raise_for_status()
+                async for line in response.aiter_lines():
+                    if line.startswith("event: "):
+                        event = line[len("event: "):]
+                        if event == "token" and first_token is None:
+                            first_token = time.perf_counter() - start
+                    elif line.startswith("data: ") and event == "done":
+                        timings["stream_ttft_server"].append(json.loads(line[len("data: "):])["ttft_ms"] / 1000)
+            timings["stream_total"].append(time.perf_counter() - start)
+            timings["stream_ttft_client"].append(first_token)
+
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--docs", default=DOCS_DIR, help="Folder with course documents")
+    parser.add_argument("--queries", type=int, default=20, help="Questions sent to each endpoint")
+    parser.add_argument("--llm-latency", type=float, default=0.3, help="Seconds to the first token of a stubbed call")
+    parser.add_argument("--token-latency", type=float, default=0.02, help="Seconds per further word")
+    parser.add_argument("--output", help="Write the JSON report here")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as chroma_path:
+        app_module = load_app(chroma_path, args.docs)
+        install_stub_anthropic(app_module.rag_system.ai_generator, args.llm_latency, args.token_latency)
+        # Over a real socket: the in-process ASGI transport buffers response bodies
+        with serve_app(app_module.app) as base_url:
+            timings = asyncio.run(measure(base_url, args.queries))
+
+    results = {name: latency_summary(values) for name, values in timings.items()}
+    results["llm_latency_s"] = args.llm_latency
+    results["token_latency_s"] = args.token_latency
+    write_report("ttft", results, args.output)
+
+
+if __name__ == "__main__":
+    main()
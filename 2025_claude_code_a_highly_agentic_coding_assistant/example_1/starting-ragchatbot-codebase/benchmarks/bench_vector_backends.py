@@ -0,0 +1,172 @@
+"""
+Chroma vs the memory-mapped NumPy backend (exact and IVF) on identical data.
+
+A synthetic corpus of --chunks chunks spread over --courses courses of --lessons
+lessons each is generated with clustered, MiniLM-sized embeddings, so the
+benchmark scales to corpus sizes the bundled docs/ cannot reach. Every backend
+is filled through VectorStore.add_course_content with the same chunks, IDs and
+embeddings. Reported per backend:
+
+- build seconds and on-disk size
+- startup: opening the persisted store and answering the first filtered query
+- VectorStore.search latency without a filter, by course, and by course and lesson
+- recall@k against an exact float32 scan of the same rows
+
+Usage:
+    uv run python benchmarks/bench_vector_backends.py [--chunks 200000] [--ivf-lists 512] [--output results.json]
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import chromadb
+import numpy as np
+from chromadb.config import Settings
+
+from _common import latency_summary, write_report
+
+from config import config
+from memmap_store import MemmapClient
+from models import Course, CourseChunk, Lesson
+from vector_store import VectorStore
+
+
+def build_corpus(chunks: int, courses: int, lessons: int, dim: int, doc_chars: int, rng: np.random.Generator):
+    """Courses, chunks and clustered unit-length embeddings, one topic cluster per lesson"""
+    catalog = [
+        Course(title=f"Course {c:04d}", instructor="Instructor",
+               lessons=[Lesson(lesson_number=l, title=f"Lesson {l}") for l in range(lessons)])
+        for c in range(courses)
+    ]
+    centers = rng.standard_normal((courses * lessons, dim)).astype(np.float32)
+    topic = rng.integers(0, courses * lessons, chunks)
+    embeddings = centers[topic] + 0.8 * rng.standard_normal((chunks, dim)).astype(np.float32)
+    embeddings /= np.linalg.norm(embeddings, axis=1, keepdims=True)
+
+    filler = ("lorem ipsum dolor sit amet " * (doc_chars // 27 + 1))[:doc_chars]
+    corpus = [
+        CourseChunk(content=f"chunk {i} {filler}", course_title=catalog[t // lessons].title,
+                    lesson_number=int(t % lessons), chunk_index=i)
+        for i, t in enumerate(topic)
+    ]
+    return catalog, corpus, embeddings
+
+
+def directory_bytes(path: str) -> int:
+    return sum(os.path.getsize(os.path.join(root, name)) for root, _, names in os.walk(path) for name in names)
+
+
+def build_store(path: str, backend: str, catalog, corpus, embeddings, ids, ivf_lists: int, ivf_probe: int,
+                scan_cache_mb: int, batch_size: int = 5000):
+    """Fill a fresh store the way the ingestion pipeline does and persist it"""
+    start = time.perf_counter()
+    store = VectorStore(path, config.EMBEDDING_MODEL, config.MAX_RESULTS, search_mode="dense",
+                        vector_backend=backend, ivf_lists=ivf_lists, ivf_probe=ivf_probe,
+                        scan_cache_mb=scan_cache_mb)
+    for offset in range(0, len(corpus), batch_size):
+        end = offset + batch_size
+        store.add_course_content(corpus[offset:end], embeddings=embeddings[offset:end].tolist(), ids=ids[offset:end])
+    store.add_courses_metadata(catalog)
+    store.persist()
+    return store, time.perf_counter() - start
+
+
+def startup_seconds(path: str, backend: str, query, where) -> float:
+    """Open the persisted content collection and answer one filtered query"""
+    start = time.perf_counter()
+    if backend == "chroma":
+        client = chromadb.PersistentClient(path=path, settings=Settings(anonymized_telemetry=False))
+        collection = client.get_collection("course_content")
+    else:
+        collection = MemmapClient(os.path.join(path, "memmap")).get_or_create_collection("course_content")
+    collection.query(query_embeddings=[query], n_results=config.MAX_RESULTS, where=where)
+    return time.perf_counter() - start
+
+
+def exact_neighbours(embeddings: np.ndarray, mask: np.ndarray, query: np.ndarray, k: int) -> set:
+    """Rows of the k nearest embeddings among the masked rows, by float32 L2"""
+    rows = np.flatnonzero(mask)
+    distances = ((embeddings[rows] - query) ** 2).sum(axis=1)
+    return set(rows[np.argsort(distances)[:k]].tolist())
+
+
+def evaluate(store: VectorStore, workload, row_of, k: int):
+    """Search latency and recall@k of one backend over a query workload"""
+    latencies, found, relevant = [], 0, 0
+    for text, course, lesson, truth in workload:
+        start = time.perf_counter()
+        results = store.search(text, course_name=course, lesson_number=lesson, limit=k)
+        latencies.append(time.perf_counter() - start)
+        if results.error:
+            raise RuntimeError(results.error)
+        found += len(truth & {row_of[chunk_id] for chunk_id in results.ids})
+        relevant += len(truth)
+    return {"latency": latency_summary(latencies), "recall": found / relevant if relevant else 0.0}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--chunks", type=int, default=200000, help="Chunks in the synthetic corpus")
+    parser.add_argument("--courses", type=int, default=200)
+    parser.add_argument("--lessons", type=int, default=10, help="Lessons per course")
+    parser.add_argument("--dim", type=int, default=384, help="Embedding dimension (all-MiniLM-L6-v2: 384)")
+    parser.add_argument("--doc-chars", type=int, default=config.CHUNK_SIZE, help="Characters per chunk")
+    parser.add_argument("--ivf-lists", type=int, default=512, help="IVF partitions of the numpy IVF run")
+    parser.add_argument("--ivf-probe", type=int, default=config.IVF_PROBE, help="Partitions scanned per query")
+    parser.add_argument("--scan-cache-mb", type=int, default=config.VECTOR_SCAN_CACHE_MB,
+                        help="float32 block cache of the numpy backend")
+    parser.add_argument("--queries", type=int, default=200, help="Queries per filter kind")
+    parser.add_argument("--k", type=int, default=config.MAX_RESULTS)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--output", help="Write the JSON report here")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    catalog, corpus, embeddings = build_corpus(args.chunks, args.courses, args.lessons, args.dim, args.doc_chars, rng)
+    ids = [f"chunk_{i}" for i in range(len(corpus))]
+    row_of = {chunk_id: row for row, chunk_id in enumerate(ids)}
+    courses = np.array([chunk.course_title for chunk in corpus])
+    lessons = np.array([chunk.lesson_number for chunk in corpus])
+
+    # Queries near stored chunks, so every filter kind has relevant rows; ground truth is an exact scan
+    workload, vectors = {}, {}
+    everything = np.ones(len(corpus), dtype=bool)
+    for kind in ("unfiltered", "course", "course_lesson"):
+        workload[kind] = []
+        for i, row in enumerate(rng.integers(0, len(corpus), args.queries)):
+            text = f"{kind} query {i}"
+            vectors[text] = embeddings[row] + 0.5 * rng.standard_normal(args.dim).astype(np.float32) / np.sqrt(args.dim)
+            course = corpus[row].course_title if kind != "unfiltered" else None
+            lesson = corpus[row].lesson_number if kind == "course_lesson" else None
+            mask = everything if course is None else (courses == course) & (
+                lessons == lesson if lesson is not None else everything)
+            workload[kind].append((text, course, lesson, exact_neighbours(embeddings, mask, vectors[text], args.k)))
+
+    backends = [("chroma", "chroma", 0), ("numpy_exact", "numpy", 0), ("numpy_ivf", "numpy", args.ivf_lists)]
+    results = {"chunks": args.chunks, "courses": args.courses, "lessons_per_course": args.lessons,
+               "dim": args.dim, "k": args.k, "ivf_lists": args.ivf_lists, "ivf_probe": args.ivf_probe}
+    with tempfile.TemporaryDirectory() as root:
+        for name, backend, ivf_lists in backends:
+            path = os.path.join(root, name)
+            store, build = build_store(path, backend, catalog, corpus, embeddings, ids,
+                                       ivf_lists, args.ivf_probe, args.scan_cache_mb)
+            # Queries are synthetic vectors, so skip the embedding model
+            store.embed_query = vectors.__getitem__
+            first = workload["course_lesson"][0]
+            results[name] = {
+                "build_seconds": build,
+                "disk_bytes": directory_bytes(path),
+                "startup_seconds": startup_seconds(
+                    path, backend, vectors[first[0]],
+                    store._build_filter(first[1], first[2])
+                ),
+            }
+            for kind, queries in workload.items():
+                results[name][kind] = evaluate(store, queries, row_of, args.k)
+
+    write_report("vector_backends", results, args.output)
+
+
+if __name__ == "__main__":
+    main()
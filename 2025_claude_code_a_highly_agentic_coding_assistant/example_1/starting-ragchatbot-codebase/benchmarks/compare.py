@@ -0,0 +1,146 @@
+"""
+Compare two benchmark reports and flag regressions.
+
+Reports are either the merged output of run_all.py or a single benchmark's
+--output file. Metrics are matched by their dotted path (for example
+"search.hybrid.course.warm.p95_ms"); the direction comes from the name:
+
+- lower is better: times (*_ms, *_seconds, *_us) and sizes (*_bytes, *_kb)
+- higher is better: throughput (*per_second), recall, mrr, speedup, hit ratios
+
+Keys of a nested map take their parent's direction (phases_seconds.load). Other
+numbers (counts, settings) are never flagged and only listed with --all. A
+metric regresses when it is worse than the baseline by more than --tolerance
+(relative) and, for times, by more than --min-delta-ms, since sub-millisecond
+timings jitter by tens of percent between identical runs. Timings only compare
+on the same machine, so baselines are recorded per machine rather than
+committed. A baseline metric the current report lacks (a benchmark that crashed
+midway, a renamed key) fails the comparison too; --ignore it to accept.
+
+Usage:
+    uv run python benchmarks/compare.py baseline.json current.json [--tolerance 0.2] [--min-delta-ms 1] [--ignore 'ingest.*']
+Exits with status 1 when any metric regressed or is missing from the current report.
+"""
+import argparse
+import fnmatch
+import json
+import sys
+from typing import Any, Dict, List, Optional
+
+_LOWER_IS_BETTER = ("_ms", "seconds", "_us", "_bytes", "_kb")
+_HIGHER_IS_BETTER = ("per_second", "recall", "mrr", "speedup", "hit_ratio")
+# Milliseconds per unit of the time metrics
+_MS_PER_UNIT = {"_ms": 1.0, "seconds": 1000.0, "_us": 0.001}
+
+
+def direction(path: str) -> int:
+    """-1 if lower is better, 1 if higher is better, 0 if the metric is informational"""
+    for name in path.split(".")[::-1][:2]:
+        if any(marker in name for marker in _HIGHER_IS_BETTER):
+            return 1
+        if name.endswith(_LOWER_IS_BETTER):
+            return -1
+    return 0
+
+
+def milliseconds_per_unit(path: str) -> float:
+    """Scale of a time metric to milliseconds, 0.0 for anything that isn't a time"""
+    for name in path.split(".")[::-1][:2]:
+        for suffix, scale in _MS_PER_UNIT.items():
+            if name.endswith(suffix):
+                return scale
+    return 0.0
+
+
+def flatten(value: Any, prefix: str = "") -> Dict[str, float]:
+    """{dotted path: number} for every numeric leaf"""
+    if isinstance(value, dict):
+        flat = {}
+        for key, item in value.items():
+            flat.update(flatten(item, f"{prefix}.{key}" if prefix else str(key)))
+        return flat
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return {prefix: float(value)}
+    return {}
+
+
+def load_metrics(path: str) -> Dict[str, float]:
+    """Numeric metrics of a run_all.py or single-benchmark report, keyed by benchmark name first"""
+    with open(path, encoding="utf-8") as file:
+        report = json.load(file)
+    if "benchmarks" in report:
+        return flatten(report["benchmarks"])
+    return flatten({report["benchmark"]: report["results"]})
+
+
+def compare(baseline: Dict[str, float], current: Dict[str, float], tolerance: float,
+            ignore: Optional[List[str]] = None, min_delta_ms: float = 0.0) -> List[Dict[str, Any]]:
+    """
+    One row per baseline metric, with the relative change and a regression flag.
+    Metrics missing from the current report are flagged missing; new ones are skipped.
+    """
+    rows = []
+    for path in sorted(baseline):
+        if any(fnmatch.fnmatch(path, pattern) for pattern in ignore or []):
+            continue
+        before, after = baseline[path], current.get(path)
+        if after is None:
+            rows.append({"metric": path, "baseline": before, "current": None, "change": None,
+                         "regression": False, "missing": True})
+            continue
+        better = direction(path)
+        change = (after - before) / abs(before) if before else 0.0
+        scale = milliseconds_per_unit(path)
+        small = bool(scale) and abs(after - before) * scale < min_delta_ms
+        rows.append({
+            "metric": path,
+            "baseline": before,
+            "current": after,
+            "change": change,
+            # A zero baseline has no meaningful relative change
+            "regression": bool(before) and better != 0 and -better * change > tolerance and not small,
+            "missing": False,
+        })
+    return rows
+
+
+def print_table(rows: List[Dict[str, Any]], show_all: bool = False):
+    width = max((len(row["metric"]) for row in rows), default=6)
+    print(f"{'metric':<{width}}  {'baseline':>12}  {'current':>12}  {'change':>8}")
+    for row in rows:
+        if row["missing"]:
+            print(f"{row['metric']:<{width}}  {row['baseline']:>12.4g}  {'-':>12}  {'-':>8}  MISSING")
+            continue
+        if not show_all and not row["regression"] and direction(row["metric"]) == 0:
+            continue
+        flag = "  REGRESSION" if row["regression"] else ""
+        print(f"{row['metric']:<{width}}  {row['baseline']:>12.4g}  {row['current']:>12.4g}  "
+              f"{row['change']:>+8.1%}{flag}")
+
+
+def summarize(rows: List[Dict[str, Any]], tolerance: float, show_all: bool = False) -> int:
+    """Print the comparison and return the number of regressed or missing metrics"""
+    print_table(rows, show_all)
+    regressions = sum(row["regression"] for row in rows)
+    missing = sum(row["missing"] for row in rows)
+    print(f"\n{len(rows) - missing} metrics compared, {regressions} regressed beyond {tolerance:.0%}, "
+          f"{missing} missing from the current report")
+    return regressions + missing
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("baseline", help="Baseline report")
+    parser.add_argument("current", help="Report to check")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed relative slowdown, 0.2 = 20%%")
+    parser.add_argument("--ignore", action="append", default=[], help="Glob of metric paths to skip (repeatable)")
+    parser.add_argument("--min-delta-ms", type=float, default=1.0, help="Ignore time changes smaller than this")
+    parser.add_argument("--all", action="store_true", help="Also list informational metrics")
+    args = parser.parse_args(argv)
+
+    rows = compare(load_metrics(args.baseline), load_metrics(args.current), args.tolerance, args.ignore, args.min_delta_ms)
+    return 1 if summarize(rows, args.tolerance, args.all) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,147 @@
+"""
+Run the benchmark suite, merge the reports into one JSON file, and optionally
+compare it against a baseline so regressions are caught before a deploy.
+
+The default suite is ingest throughput (bench_ingest.py), chunk_text
+microbenchmarks (bench_chunk_text.py), search latency with and without filters
+(bench_search.py) and end-to-end queries against the fake Anthropic server
+(bench_query_e2e.py); --include adds any other bench_*.py. Each benchmark runs in
+its own process, so one's caches and loaded models don't skew the next. Quick
+settings are the default; --full scales ingestion to 1x/10x/100x. With --repeat N
+every benchmark runs N times and each metric is the median of the runs, which
+keeps a noisy run from passing for a regression.
+
+Baselines only make sense on the machine that recorded them: record one with
+--output before a change, then pass it as --baseline afterwards.
+
+Usage:
+    uv run python benchmarks/run_all.py --repeat 3 --output baseline.json
+    uv run python benchmarks/run_all.py --repeat 3 --baseline baseline.json [--output current.json] [--tolerance 0.2]
+Exits with status 1 when a benchmark fails, or a baseline metric regressed or is missing.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+from datetime import datetime, timezone
+
+from _common import ROOT
+
+import compare
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+
+SUITE = {
+    "ingest": ["--scales", "1,10"],
+    "chunk_text": ["--rounds", "3"],
+    "search": ["--queries", "100"],
+    "query_e2e": ["--llm-latency", "0.05"],
+}
+FULL_ARGS = {
+    "ingest": ["--scales", "1,10,100"],
+    "chunk_text": [],
+    "search": [],
+    "query_e2e": [],
+}
+
+
+def environment():
+    """Where the numbers came from"""
+    try:
+        commit = subprocess.run(["git", "rev-parse", "HEAD"], cwd=ROOT, capture_output=True,
+                                text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "git_commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "processor": platform.processor() or platform.machine(),
+        "cpu_count": os.cpu_count(),
+    }
+
+
+def run_benchmark(name: str, args, output_dir: str):
+    """Run benchmarks/bench_<name>.py in a subprocess; return its results or None if it failed"""
+    output = os.path.join(output_dir, f"{name}.json")
+    command = [sys.executable, os.path.join(BENCH_DIR, f"bench_{name}.py"), *args, "--output", output]
+    print(f"Running {name}: {' '.join(command[1:])}", flush=True)
+    completed = subprocess.run(command, stdout=subprocess.DEVNULL)
+    if completed.returncode != 0 or not os.path.exists(output):
+        print(f"Benchmark {name} failed with exit code {completed.returncode}")
+        return None
+    with open(output, encoding="utf-8") as file:
+        return json.load(file)["results"]
+
+
+def median_report(runs):
+    """Merge repeated reports of one benchmark: the median of every number, the first run's other values"""
+    first = runs[0]
+    if isinstance(first, dict):
+        return {key: median_report([run[key] for run in runs if isinstance(run, dict) and key in run])
+                for key in first}
+    if isinstance(first, (int, float)) and not isinstance(first, bool):
+        return statistics.median(run for run in runs if run is not None)
+    return first
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--only", help="Comma-separated subset of the default suite")
+    parser.add_argument("--include", default="", help="Comma-separated extra benchmarks, e.g. retrieval,rerank")
+    parser.add_argument("--full", action="store_true", help="Full-size settings instead of the quick ones")
+    parser.add_argument("--repeat", type=int, default=1, help="Runs per benchmark; metrics are the median")
+    parser.add_argument("--output", help="Write the merged report here")
+    parser.add_argument("--baseline", help="Compare against this merged report")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed relative slowdown, 0.2 = 20%%")
+    parser.add_argument("--min-delta-ms", type=float, default=1.0, help="Ignore time changes smaller than this")
+    parser.add_argument("--ignore", action="append", default=[], help="Glob of metric paths to skip (repeatable)")
+    args = parser.parse_args()
+
+    names = args.only.split(",") if args.only else list(SUITE)
+    names += [name for name in args.include.split(",") if name and name not in names]
+    settings = FULL_ARGS if args.full else SUITE
+
+    report = {"environment": environment(), "settings": "full" if args.full else "quick",
+              "repeat": args.repeat, "benchmarks": {}}
+    failed = []
+    with tempfile.TemporaryDirectory() as output_dir:
+        for name in names:
+            runs = [run_benchmark(name, settings.get(name, []), output_dir) for _ in range(args.repeat)]
+            if None in runs:
+                failed.append(name)
+            else:
+                report["benchmarks"][name] = median_report(runs)
+
+    text = json.dumps(report, indent=2, sort_keys=True)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as file:
+            file.write(text + "\n")
+        print(f"Wrote {args.output}")
+    else:
+        print(text)
+
+    status = 1 if failed else 0
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as file:
+            baseline = json.load(file)
+        if baseline.get("settings") != report["settings"]:
+            print(f"Warning: baseline used {baseline.get('settings')} settings, this run used {report['settings']}")
+        # Benchmarks not selected for this run are not missing; ones that failed are
+        expected = {name: results for name, results in baseline["benchmarks"].items() if name in names}
+        rows = compare.compare(compare.flatten(expected), compare.flatten(report["benchmarks"]),
+                               args.tolerance, args.ignore, args.min_delta_ms)
+        if compare.summarize(rows, args.tolerance):
+            status = 1
+    if failed:
+        print(f"Failed benchmarks: {', '.join(failed)}")
+    sys.exit(status)
+
+
+if __name__ == "__main__":
+    main()
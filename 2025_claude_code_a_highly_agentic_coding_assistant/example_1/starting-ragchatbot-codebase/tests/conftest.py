@@ -0,0 +1,271 @@
+"""
+Shared fixtures: deterministic stand-ins for the embedding model and the
+Anthropic API, a config whose state lives in a temporary directory, and small
+course documents.
+"""
+import asyncio
+import copy
+import hashlib
+import re
+from pathlib import Path
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+from chromadb.utils.embedding_functions import SentenceTransformerEmbeddingFunction
+
+from config import config as default_config
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent / "backend"
+
+EMBEDDING_DIMENSION = 384
+
+
+class HashingEmbeddingModel:
+    """
+    Stands in for the SentenceTransformer model: bag-of-words vectors hashed
+    into EMBEDDING_DIMENSION buckets and normalized, so texts sharing words are
+    close and every run embeds the same text the same way.
+    """
+
+    def __init__(self):
+        self.calls = 0
+        self.texts = 0
+
+    def encode(self, sentences, convert_to_numpy=True, normalize_embeddings=False, **kwargs):
+        self.calls += 1
+        self.texts += len(sentences)
+        vectors = np.zeros((len(sentences), EMBEDDING_DIMENSION), dtype=np.float32)
+        for row, text in enumerate(sentences):
+            for word in re.findall(r"\w+", text.lower()):
+                vectors[row, int(hashlib.md5(word.encode()).hexdigest(), 16) % EMBEDDING_DIMENSION] += 1.0
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return vectors / norms
+
+
+@pytest.fixture(autouse=True)
+def embedding_model(monkeypatch):
+    """Serve the configured embedding model from HashingEmbeddingModel instead of downloading it"""
+    model = HashingEmbeddingModel()
+    monkeypatch.setitem(SentenceTransformerEmbeddingFunction.models, default_config.EMBEDDING_MODEL, model)
+    return model
+
+
+@pytest.fixture
+def config(tmp_path):
+    """The default config with every path under tmp_path and ingestion in-process"""
+    test_config = copy.copy(default_config)
+    test_config.ANTHROPIC_API_KEY = "test-key"
+    test_config.CHROMA_PATH = str(tmp_path / "chroma_db")
+    test_config.INGEST_MANIFEST_PATH = str(tmp_path / "chroma_db" / "ingest_manifest.json")
+    test_config.SESSION_DB_PATH = str(tmp_path / "sessions.db")
+    test_config.SESSION_BACKEND = "memory"
+    test_config.VECTOR_BACKEND = "chroma"
+    test_config.INDEX_SNAPSHOT_PATH = ""
+    test_config.INGEST_WORKERS = 1
+    return test_config
+
+
+COURSES = {
+    "course1_script.txt": (
+        "Building Retrieval Systems with Chroma",
+        {
+            0: ("Introduction", "Retrieval augmented generation grounds answers in documents. "
+                "A vector database stores embeddings of every chunk. "
+                "This course uses Chroma as the vector database."),
+            1: ("Embeddings", "An embedding maps text to a dense vector. "
+                "Similar sentences have nearby embeddings. "
+                "Cosine similarity compares two embedding vectors."),
+            2: ("Hybrid Search", "Keyword search with BM25 finds exact terms. "
+                "Reciprocal rank fusion merges the keyword and vector rankings. "
+                "Hybrid search helps with product codes such as XJ-9000."),
+        },
+    ),
+    "course2_script.txt": (
+        "MCP: Build Rich-Context AI Apps",
+        {
+            0: ("Introduction", "The Model Context Protocol connects assistants to tools. "
+                "Servers expose tools, resources and prompts."),
+            1: ("Servers", "An MCP server is a small program. "
+                "It declares the tools it offers and answers tool calls over a transport."),
+            2: ("Clients", "An MCP client lives inside the host application. "
+                "It opens a session with each server and forwards tool calls."),
+        },
+    ),
+    "course3_script.txt": (
+        "Prompt Compression Fundamentals",
+        {
+            0: ("Introduction", "Long prompts cost tokens and latency. "
+                "Prompt compression removes redundant words before the call."),
+            1: ("Query Optimization", "Rewriting a query can shorten it. "
+                "Shorter queries retrieve faster and cost less."),
+        },
+    ),
+}
+
+
+def course_document(title, lessons, instructor="Ada Lovelace", slug=None):
+    """Text of a course document in the docs/ format; lessons maps number -> (title, text)"""
+    slug = slug or re.sub(r"\W+", "-", title.lower()).strip("-")
+    lines = [
+        f"Course Title: {title}",
+        f"Course Link: https://example.com/{slug}",
+        f"Course Instructor: {instructor}",
+        "",
+    ]
+    for number, (lesson_title, text) in lessons.items():
+        lines += [
+            f"Lesson {number}: {lesson_title}",
+            f"Lesson Link: https://example.com/{slug}/lesson-{number}",
+            text,
+        ]
+    return "\n".join(lines) + "\n"
+
+
+@pytest.fixture
+def docs_dir(tmp_path):
+    """A docs folder with the three COURSES"""
+    folder = tmp_path / "docs"
+    folder.mkdir()
+    for file_name, (title, lessons) in COURSES.items():
+        (folder / file_name).write_text(course_document(title, lessons), encoding="utf-8")
+    return folder
+
+
+def message(content, stop_reason="end_turn"):
+    """An Anthropic Message-like response; content is text or a list of blocks"""
+    if isinstance(content, str):
+        content = [SimpleNamespace(type="text", text=content)]
+    return SimpleNamespace(
+        content=content,
+        stop_reason=stop_reason,
+        usage=SimpleNamespace(input_tokens=100, output_tokens=20),
+    )
+
+
+class FakeAnthropic:
+    """
+    Stands in for the sync and async Anthropic clients with a scripted model:
+    offered the search tool, it searches for the question; given tool results
+    or search results up front, it answers "Answer from: <first result header>";
+    otherwise it answers "Direct answer". Every call's parameters are recorded.
+    """
+
+    def __init__(self):
+        self.calls = []
+        self.delay = 0.0          # Seconds each async call takes
+        self.use_tools = True     # Whether the model calls the search tool when offered
+        self.messages = self
+
+    def respond(self, params):
+        self.calls.append(params)
+        last = params["messages"][-1]["content"]
+        if isinstance(last, list):
+            results = [block["content"] for block in last if block.get("type") == "tool_result"]
+            return message(f"Answer from: {results[0].splitlines()[0] if results and results[0] else 'nothing'}")
+        if params.get("system") == self.summary_prompt:
+            return message("Summary: " + " | ".join(last.splitlines()[1:])[:200])
+        if "Course material search results:" in last:
+            return message(f"Answer from: {last.splitlines()[1]}")
+        if params.get("tools") and self.use_tools:
+            question = last.split(": ", 1)[-1]
+            block = SimpleNamespace(type="tool_use", id=f"toolu_{len(self.calls)}",
+                                    name="search_course_content", input={"query": question})
+            return message([block], stop_reason="tool_use")
+        return message("Direct answer")
+
+    @property
+    def summary_prompt(self):
+        from ai_generator import AIGenerator
+        return AIGenerator.SUMMARY_PROMPT
+
+    def create(self, **params):
+        return self.respond(params)
+
+    def stream(self, **params):
+        return FakeStream(self, params)
+
+
+class FakeAsyncAnthropic:
+    """The async client, answering from the same FakeAnthropic"""
+
+    def __init__(self, fake):
+        self.fake = fake
+        self.messages = self
+
+    async def create(self, **params):
+        await asyncio.sleep(self.fake.delay)
+        return self.fake.respond(params)
+
+    def stream(self, **params):
+        return FakeStream(self.fake, params)
+
+
+class FakeStream:
+    """messages.stream(): text deltas word by word, then the final message"""
+
+    def __init__(self, fake, params):
+        self.fake = fake
+        self.params = params
+
+    async def __aenter__(self):
+        await asyncio.sleep(self.fake.delay)
+        self.response = self.fake.respond(self.params)
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+    @property
+    async def text_stream(self):
+        for block in self.response.content:
+            if block.type == "text":
+                for word in re.findall(r"\S+\s*", block.text):
+                    yield word
+
+    async def get_final_message(self):
+        return self.response
+
+
+@pytest.fixture
+def anthropic_client(monkeypatch):
+    """Route AIGenerator's sync and async clients to one FakeAnthropic"""
+    import anthropic
+
+    fake = FakeAnthropic()
+    monkeypatch.setattr(anthropic, "Anthropic", lambda api_key: fake)
+    monkeypatch.setattr(anthropic, "AsyncAnthropic", lambda api_key: FakeAsyncAnthropic(fake))
+    return fake
+
+
+@pytest.fixture
+def rag_system(request, config, docs_dir, anthropic_client):
+    """
+    A RAGSystem over the three COURSES, answering through the fake Anthropic client;
+    tests marked answer_cache get the semantic answer cache enabled
+    """
+    from rag_system import RAGSystem
+
+    config.ANSWER_CACHE_ENABLED = request.node.get_closest_marker("answer_cache") is not None
+    system = RAGSystem(config)
+    system.add_course_folder(str(docs_dir))
+    return system
+
+
+@pytest.fixture
+def app_module(monkeypatch):
+    """The FastAPI module, imported from backend/ where it finds ../frontend"""
+    monkeypatch.chdir(BACKEND_DIR)
+    import app
+
+    return app
+
+
+@pytest.fixture
+def client(app_module, rag_system, monkeypatch):
+    """A test client of the app with rag_system loaded (the startup task does not run)"""
+    from fastapi.testclient import TestClient
+
+    monkeypatch.setattr(app_module, "rag_system", rag_system)
+    return TestClient(app_module.app)
@@ -0,0 +1,115 @@
+import asyncio
+import re
+
+import numpy as np
+import pytest
+
+from answer_cache import SemanticAnswerCache, query_numbers
+
+
+def digit_blind_embedding(text):
+    """Embeds "lesson 3" and "lesson 4" identically, the worst case for numbers"""
+    return [1.0, float(len(re.sub(r"\d", "", text).split()))]
+
+
+def store(cache, query, answer, epoch=0):
+    _, vector = cache.lookup(query, epoch)
+    cache.store(query, vector, answer, [{"text": query}], epoch, 1.5)
+
+
+def test_near_duplicate_query_reuses_the_answer():
+    cache = SemanticAnswerCache(digit_blind_embedding)
+    store(cache, "What is MCP?", "A protocol")
+
+    cached, _ = cache.lookup("What's MCP?", 0)
+
+    assert cached.answer == "A protocol"
+    assert cache.stats()["saved_seconds"] == 1.5
+
+
+def test_queries_with_other_numbers_miss():
+    cache = SemanticAnswerCache(digit_blind_embedding)
+    store(cache, "Summarize lesson 3", "Lesson three")
+
+    assert cache.lookup("Summarize lesson 4", 0)[0] is None
+    assert cache.lookup("Summarize lesson 3", 0)[0].answer == "Lesson three"
+
+
+def test_best_match_of_the_same_scope_wins():
+    cache = SemanticAnswerCache(lambda text: [1.0, 0.0], scope_fn=lambda query: query.split()[0])
+    store(cache, "MCP servers", "About MCP")
+    store(cache, "Chroma servers", "About Chroma")
+
+    assert cache.lookup("MCP hosts", 0)[0].answer == "About MCP"
+    assert cache.lookup("Chroma hosts", 0)[0].answer == "About Chroma"
+    assert cache.lookup("Prompt hosts", 0)[0] is None
+
+
+def test_query_numbers_are_order_independent():
+    assert query_numbers("Compare lesson 3 and lesson 10, top 2.5") == ("10", "2.5", "3")
+    assert query_numbers("lesson 10 vs lesson 3") == query_numbers("lesson 3 vs 10")
+    assert query_numbers("What is MCP?") == ()
+
+
+def test_content_changes_drop_every_answer():
+    cache = SemanticAnswerCache(digit_blind_embedding)
+    store(cache, "What is MCP?", "A protocol", epoch=1)
+
+    assert cache.lookup("What is MCP?", 2)[0] is None
+    assert cache.stats()["invalidations"] == 1
+
+    # An answer generated before the change is not cached
+    _, vector = cache.lookup("What is MCP?", 2)
+    cache.store("What is MCP?", vector, "Stale", [], 1, 1.0)
+    assert cache.lookup("What is MCP?", 2)[0] is None
+
+
+def test_entries_expire_and_are_evicted(monkeypatch):
+    clock = [100.0]
+    monkeypatch.setattr("answer_cache.time.monotonic", lambda: clock[0])
+    cache = SemanticAnswerCache(lambda text: np.eye(3)[len(text) % 3], max_size=2, ttl_seconds=60)
+    store(cache, "a", "A")
+    store(cache, "bb", "B")
+    store(cache, "ccc", "C")
+
+    assert cache.lookup("a", 0)[0] is None
+    clock[0] += 61
+    assert cache.lookup("bb", 0)[0] is None
+    assert cache.stats()["evictions"] == 3
+
+
+@pytest.mark.answer_cache
+def test_lessons_of_one_course_never_share_an_answer(rag_system, anthropic_client):
+    rag_system.config.QUERY_MODE = "tools"
+    question = ("Please summarize everything the instructor explains about servers, clients, "
+                "transports and tool calls in lesson {} of MCP")
+    lesson_three, lesson_four = question.format(3), question.format(4)
+    embed = rag_system.vector_store.embed_query
+    # Close enough that the embeddings alone would reuse the answer
+    assert float(np.dot(embed(lesson_three), embed(lesson_four))) >= rag_system.config.ANSWER_CACHE_THRESHOLD
+
+    asyncio.run(rag_system.aquery(lesson_three))
+    calls = len(anthropic_client.calls)
+    asyncio.run(rag_system.aquery(lesson_four))
+
+    assert len(anthropic_client.calls) > calls
+    assert rag_system.answer_cache.stats()["hits"] == 0
+
+    asyncio.run(rag_system.aquery(lesson_four.replace("Please summarize", "Summarize")))
+    assert rag_system.answer_cache.stats()["hits"] == 1
+
+
+def test_courses_never_share_an_answer(rag_system):
+    assert rag_system._answer_scope("What do the Chroma lessons cover?") == (
+        "Building Retrieval Systems with Chroma", ()
+    )
+    assert rag_system._answer_scope("What do the MCP lessons cover in lesson 2?") == (
+        "MCP: Build Rich-Context AI Apps", ("2",)
+    )
+
+
+def test_the_answer_cache_is_off_by_default(rag_system):
+    from config import config
+
+    assert not config.ANSWER_CACHE_ENABLED
+    assert rag_system.answer_cache is None
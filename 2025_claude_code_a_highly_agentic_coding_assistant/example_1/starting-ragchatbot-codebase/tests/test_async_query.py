@@ -0,0 +1,58 @@
+import asyncio
+import time
+
+
+def test_query_endpoint_answers_with_sources_and_a_session(client, rag_system):
+    rag_system.config.QUERY_MODE = "tools"
+
+    response = client.post("/api/query", json={"query": "What does an MCP server declare?"})
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["answer"].startswith("Answer from: [MCP: Build Rich-Context AI Apps")
+    assert body["sources"] and all(source["url"] for source in body["sources"])
+    history = rag_system.session_manager.get_conversation_history(body["session_id"])
+    assert "What does an MCP server declare?" in history
+
+
+def test_follow_up_queries_send_the_session_history(client, rag_system, anthropic_client):
+    session_id = client.post("/api/query", json={"query": "What is Chroma?"}).json()["session_id"]
+
+    client.post("/api/query", json={"query": "And BM25?", "session_id": session_id})
+
+    system = anthropic_client.calls[-1]["system"]
+    assert any("What is Chroma?" in block["text"] for block in system[1:])
+
+
+def test_queries_wait_for_the_api_concurrently(rag_system, anthropic_client):
+    rag_system.config.QUERY_MODE = "tools"
+    anthropic_client.delay = 0.1
+    questions = [f"Question {number} about embeddings?" for number in range(4)]
+
+    async def ask_all():
+        start = time.perf_counter()
+        answers = await asyncio.gather(*(rag_system.aquery(question) for question in questions))
+        return answers, time.perf_counter() - start
+
+    answers, elapsed = asyncio.run(ask_all())
+
+    # Four queries of two calls each take 0.8s back to back
+    assert elapsed < 0.6
+    assert all(answer.startswith("Answer from:") for answer, _ in answers)
+
+
+def test_async_and_sync_queries_agree(rag_system):
+    rag_system.config.QUERY_MODE = "tools"
+
+    assert asyncio.run(rag_system.aquery("How are embeddings compared?")) == (
+        rag_system.query("How are embeddings compared?")
+    )
+
+
+def test_queries_are_refused_until_the_system_is_ready(client, app_module, monkeypatch):
+    monkeypatch.setattr(app_module, "rag_system", None)
+
+    response = client.post("/api/query", json={"query": "What is MCP?"})
+
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
@@ -0,0 +1,184 @@
+import asyncio
+import json
+import time
+
+import pytest
+
+
+def read_lines(response):
+    """Decoded JSON lines of a batch response"""
+    return [json.loads(line) for line in response.text.splitlines()]
+
+
+def post_batch(client, queries, **options):
+    response = client.post("/api/query/batch", json={"queries": queries, **options})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    return read_lines(response)
+
+
+@pytest.fixture
+def in_flight(rag_system, monkeypatch):
+    """Peak number of async Anthropic calls running at once"""
+    messages = rag_system.ai_generator.async_client.messages
+    create = messages.create
+    counts = {"now": 0, "peak": 0}
+
+    async def counting_create(**params):
+        counts["now"] += 1
+        counts["peak"] = max(counts["peak"], counts["now"])
+        try:
+            return await create(**params)
+        finally:
+            counts["now"] -= 1
+
+    monkeypatch.setattr(messages, "create", counting_create)
+    return counts
+
+
+def test_every_question_is_answered_then_done(client, rag_system):
+    queries = ["What does an MCP client do?", "What is prompt compression?", "How does Chroma store vectors?"]
+
+    lines = post_batch(client, queries)
+
+    results, done = lines[:-1], lines[-1]
+    assert sorted(line["index"] for line in results) == [0, 1, 2]
+    for line in results:
+        assert line["type"] == "result" and line["query"] == queries[line["index"]]
+        assert line["answer"].startswith("Answer from:") and line["sources"]
+    assert done["type"] == "done" and done["questions"] == 3
+
+
+def test_repeated_questions_are_answered_once(client, rag_system, anthropic_client):
+    queries = ["What is prompt compression?", "what is  PROMPT compression?", "What does an MCP client do?"]
+
+    lines = post_batch(client, queries)
+
+    results = {line["index"]: line for line in lines[:-1]}
+    assert results[0]["answer"] == results[1]["answer"]
+    assert lines[-1]["unique_questions"] == 2
+    # Two calls (tool use, then the answer) per distinct question
+    assert len(anthropic_client.calls) == 4
+
+
+def test_anthropic_calls_are_bounded(client, rag_system, anthropic_client, in_flight):
+    rag_system.config.BATCH_MAX_CONCURRENCY = 3
+    anthropic_client.delay = 0.05
+    queries = [f"Question {number} about MCP servers" for number in range(10)]
+
+    post_batch(client, queries, max_concurrency=5)
+    assert in_flight["peak"] == 3
+
+    in_flight["peak"] = 0
+    post_batch(client, [f"Another question {number} about MCP" for number in range(10)], max_concurrency=2)
+    assert in_flight["peak"] == 2
+
+
+def test_retrieve_first_searches_in_bulk(client, rag_system, anthropic_client, monkeypatch):
+    rag_system.config.QUERY_MODE = "retrieve_first"
+    store = rag_system.vector_store
+    single_searches, bulk_searches = [], []
+    search_batch = store.search_batch
+
+    def counting_search_batch(queries, **kwargs):
+        bulk_searches.append(queries)
+        return search_batch(queries, **kwargs)
+
+    monkeypatch.setattr(store, "search", lambda *args, **kwargs: single_searches.append(args))
+    monkeypatch.setattr(store, "search_batch", counting_search_batch)
+    queries = [
+        "What is covered in lesson 1 of the MCP course?",
+        "What is covered in lesson 1 of the MCP course, please?",
+        "What does lesson 2 of the MCP course cover?",
+    ]
+
+    lines = post_batch(client, queries)
+
+    assert single_searches == [] and len(bulk_searches) == 1
+    assert all(line["type"] == "result" and line["sources"] for line in lines[:-1])
+    assert 1 <= lines[-1]["retrievals"] <= 3
+    # Retrieved up front: one answer call per question, no tool loop
+    assert len(anthropic_client.calls) == 3 and all("tools" not in call for call in anthropic_client.calls)
+
+
+def test_a_failing_question_does_not_fail_the_batch(client, rag_system, monkeypatch):
+    generate = rag_system.ai_generator.agenerate_response
+
+    async def flaky(query, **kwargs):
+        if "broken" in query:
+            raise RuntimeError("overloaded")
+        return await generate(query, **kwargs)
+
+    monkeypatch.setattr(rag_system.ai_generator, "agenerate_response", flaky)
+
+    lines = post_batch(client, ["What is MCP?", "A broken question"])
+
+    by_index = {line["index"]: line for line in lines[:-1]}
+    assert by_index[0]["type"] == "result"
+    assert by_index[1] == {"type": "error", "index": 1, "query": "A broken question", "detail": "overloaded"}
+    assert lines[-1]["type"] == "done"
+
+
+@pytest.mark.answer_cache
+def test_cached_answers_are_reused(client, rag_system):
+    queries = ["What does an MCP client do?", "What is prompt compression?"]
+    post_batch(client, queries)
+
+    lines = post_batch(client, queries)
+
+    assert all(line["cached"] for line in lines[:-1])
+
+
+@pytest.mark.answer_cache
+def test_cached_latency_is_each_answers_own(client, rag_system, monkeypatch):
+    plan_batch, store = rag_system._plan_batch, rag_system.answer_cache.store
+    latencies = []
+
+    def slow_plan_batch(unique):
+        time.sleep(0.3)
+        return plan_batch(unique)
+
+    def recording_store(*args):
+        latencies.append(args[-1])
+        return store(*args)
+
+    monkeypatch.setattr(rag_system, "_plan_batch", slow_plan_batch)
+    monkeypatch.setattr(rag_system.answer_cache, "store", recording_store)
+
+    post_batch(client, ["What does an MCP client do?", "What is prompt compression?"])
+
+    # Planning the batch is not part of any one answer's cost
+    assert len(latencies) == 2 and all(latency < 0.3 for latency in latencies)
+
+
+@pytest.mark.parametrize("max_concurrency", [0, -1])
+def test_a_concurrency_below_one_is_rejected(client, max_concurrency):
+    response = client.post("/api/query/batch", json={"queries": ["a"], "max_concurrency": max_concurrency})
+
+    assert response.status_code == 422
+
+
+def test_oversized_batches_are_rejected(client, app_module, monkeypatch):
+    monkeypatch.setattr(app_module.config, "BATCH_MAX_QUESTIONS", 2)
+
+    response = client.post("/api/query/batch", json={"queries": ["a", "b", "c"]})
+
+    assert response.status_code == 413
+
+
+def test_a_batch_abandoned_midway_leaves_nothing_running(rag_system, anthropic_client):
+    anthropic_client.delay = 0.05
+    queries = [f"Question {number} about prompt compression" for number in range(6)]
+
+    async def first_result():
+        batch = rag_system.abatch_query(queries, max_concurrency=1)
+        first = await batch.__anext__()
+        await batch.aclose()
+        await asyncio.sleep(0.2)
+        return first, len(anthropic_client.calls)
+
+    first, calls = asyncio.run(first_result())
+
+    assert first["type"] == "result"
+    # The first question took two calls; at most the one in flight when the client left followed
+    assert calls <= 4
@@ -0,0 +1,58 @@
+import json
+
+import pytest
+
+import compare
+
+
+def test_directions_come_from_the_metric_names():
+    assert compare.direction("search.hybrid.warm.p95_ms") == -1
+    assert compare.direction("startup.phases_seconds.load") == -1
+    assert compare.direction("ingest.scale_1.chunks_per_second") == 1
+    assert compare.direction("retrieval.recall_at_5") == 1
+    assert compare.direction("ingest.scale_1.chunks") == 0
+
+
+def test_regressions_beyond_the_tolerance_are_flagged():
+    baseline = {"search.p95_ms": 10.0, "ingest.chunks_per_second": 100.0, "ingest.chunks": 50.0}
+    current = {"search.p95_ms": 13.0, "ingest.chunks_per_second": 90.0, "ingest.chunks": 80.0}
+
+    rows = {row["metric"]: row for row in compare.compare(baseline, current, tolerance=0.2)}
+
+    assert rows["search.p95_ms"]["regression"]
+    assert not rows["ingest.chunks_per_second"]["regression"]
+    assert not rows["ingest.chunks"]["regression"]
+
+
+def test_small_time_changes_are_jitter():
+    rows = compare.compare({"chunk.mean_us": 10.0}, {"chunk.mean_us": 20.0}, tolerance=0.2, min_delta_ms=1.0)
+
+    assert not rows[0]["regression"]
+
+
+def test_metrics_missing_from_the_current_run_fail():
+    baseline = {"search.p95_ms": 10.0, "query_e2e.p95_ms": 50.0, "query_e2e.queries": 20.0}
+    current = {"search.p95_ms": 10.0, "rerank.p95_ms": 30.0}
+
+    rows = compare.compare(baseline, current, tolerance=0.2)
+
+    assert [row["metric"] for row in rows if row["missing"]] == ["query_e2e.p95_ms", "query_e2e.queries"]
+    assert "rerank.p95_ms" not in {row["metric"] for row in rows}
+    assert compare.summarize(rows, 0.2) == 2
+    ignored = compare.compare(baseline, current, tolerance=0.2, ignore=["query_e2e.*"])
+    assert compare.summarize(ignored, 0.2) == 0
+
+
+@pytest.mark.parametrize("current, status", [
+    ({"search": {"p95_ms": 10.5, "queries": 100}}, 0),
+    ({"search": {"p95_ms": 20.0, "queries": 100}}, 1),
+    ({"search": {"queries": 100}}, 1),
+])
+def test_the_exit_status_reports_failures(tmp_path, capsys, current, status):
+    baseline_path, current_path = tmp_path / "baseline.json", tmp_path / "current.json"
+    baseline_path.write_text(json.dumps({"benchmarks": {"search": {"p95_ms": 10.0, "queries": 100}}}))
+    current_path.write_text(json.dumps({"benchmarks": current}))
+
+    assert compare.main([str(baseline_path), str(current_path)]) == status
+    if "p95_ms" not in current["search"]:
+        assert "search.p95_ms" in capsys.readouterr().out.split("MISSING")[0]
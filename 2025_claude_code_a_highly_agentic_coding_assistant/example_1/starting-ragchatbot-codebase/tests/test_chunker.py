@@ -0,0 +1,140 @@
+import random
+import re
+
+import pytest
+
+from document_processor import DocumentProcessor
+
+WORDS = "the model reads each chunk e.g. vectors and Mr. Smith retrieval embeddings 3.5 tokens".split()
+
+
+def reference_chunks(text, chunk_size, chunk_overlap):
+    """The list-based chunker that iter_chunks replaced, kept as the expected output"""
+    text = re.sub(r'\s+', ' ', text.strip())
+    sentences = [s.strip() for s in DocumentProcessor.SENTENCE_ENDINGS.split(text) if s.strip()]
+    chunks = []
+    i = 0
+    while i < len(sentences):
+        current_chunk, current_size = [], 0
+        for sentence in sentences[i:]:
+            addition = len(sentence) + (1 if current_chunk else 0)
+            if current_size + addition > chunk_size and current_chunk:
+                break
+            current_chunk.append(sentence)
+            current_size += addition
+        chunks.append(' '.join(current_chunk))
+        overlap_size = overlap_sentences = 0
+        if chunk_overlap > 0:
+            for k in range(len(current_chunk) - 1, -1, -1):
+                sentence_len = len(current_chunk[k]) + (1 if k < len(current_chunk) - 1 else 0)
+                if overlap_size + sentence_len > chunk_overlap:
+                    break
+                overlap_size += sentence_len
+                overlap_sentences += 1
+        i = max(i + len(current_chunk) - overlap_sentences, i + 1)
+    return chunks
+
+
+def random_text(rng, sentences):
+    parts = []
+    for _ in range(sentences):
+        words = [rng.choice(WORDS) for _ in range(rng.randint(1, 25))]
+        parts.append(words[0].capitalize() + " " + " ".join(words[1:]) + rng.choice([".", "!", "?"]))
+    return rng.choice([" ", "\n", "  \t"]).join(parts)
+
+
+def random_pieces(rng, text):
+    """Split text at arbitrary offsets, including inside words and whitespace runs"""
+    cuts = sorted(rng.sample(range(len(text)), min(len(text) - 1, rng.randint(0, 40))))
+    return [text[start:end] for start, end in zip([0] + cuts, cuts + [len(text)])]
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_streaming_chunker_matches_the_list_based_one(seed):
+    rng = random.Random(seed)
+    text = random_text(rng, rng.randint(1, 60))
+    chunk_size, chunk_overlap = rng.choice([(800, 100), (120, 40), (60, 0), (30, 30)])
+    processor = DocumentProcessor(chunk_size, chunk_overlap)
+    expected = reference_chunks(text, chunk_size, chunk_overlap)
+
+    assert processor.chunk_text(text) == expected
+    assert processor.chunk_text(random_pieces(rng, text)) == expected
+
+
+def test_empty_and_blank_text_produce_no_chunks():
+    processor = DocumentProcessor(800, 100)
+
+    assert processor.chunk_text("") == []
+    assert processor.chunk_text(["  ", "\n", ""]) == []
+
+
+def test_chunks_are_produced_before_the_input_ends():
+    processor = DocumentProcessor(40, 0)
+    consumed = []
+
+    def pieces():
+        for number in range(1000):
+            consumed.append(number)
+            yield f"Sentence number {number} is here. "
+
+    chunks = processor.iter_chunks(pieces())
+    next(chunks)
+
+    assert len(consumed) < 5
+
+
+@pytest.fixture
+def word_counter(monkeypatch):
+    """Token mode with one token per word instead of the embedding model's tokenizer"""
+    monkeypatch.setattr("document_processor.load_token_counter", lambda model_name: lambda text: len(text.split()))
+
+
+def token_processor(**options):
+    options = {"token_budget": 10, "token_overlap": 0, "tokenizer_model": "test-model", "max_tokens": 256, **options}
+    return DocumentProcessor(800, 100, chunk_unit="tokens", **options)
+
+
+def test_token_mode_packs_sentences_up_to_the_token_budget(word_counter):
+    text = "One two three four. Five six seven. Eight nine ten eleven twelve. Thirteen."
+
+    assert token_processor().chunk_text(text) == [
+        "One two three four. Five six seven.",
+        "Eight nine ten eleven twelve. Thirteen.",
+    ]
+    # Trailing sentences of up to three tokens start the next chunk again
+    assert token_processor(token_overlap=3).chunk_text(text) == [
+        "One two three four. Five six seven.",
+        "Five six seven. Eight nine ten eleven twelve. Thirteen.",
+        "Thirteen.",
+    ]
+
+
+def test_token_budget_is_capped_by_the_model_window(word_counter):
+    text = " ".join(f"Sentence {number} here." for number in range(20))
+
+    chunks = token_processor(token_budget=1000, max_tokens=14).chunk_text(text)
+
+    # 14 tokens less [CLS] and [SEP] leaves 12 words, four sentences of three
+    assert all(len(chunk.split()) == 12 for chunk in chunks)
+    assert len(chunks) == 5
+
+
+def test_token_mode_needs_a_tokenizer():
+    with pytest.raises(ValueError):
+        DocumentProcessor(800, 100, chunk_unit="tokens")
+
+
+def test_token_mode_audits_truncation_against_character_sizing(word_counter, tmp_path):
+    from conftest import COURSES, course_document
+
+    path = tmp_path / "course.txt"
+    path.write_text(course_document(*COURSES["course1_script.txt"]), encoding="utf-8")
+    processor = token_processor(token_budget=20, max_tokens=24)
+
+    _, chunks = processor.process_course_document(str(path))
+
+    audit = processor.truncation_audit
+    assert audit["chunks"] == len(chunks)
+    assert audit["truncated"] == 0
+    # 800-character chunks hold whole lessons, beyond a 24-token window
+    assert 0 < audit["legacy_truncated"] <= audit["legacy_chunks"]
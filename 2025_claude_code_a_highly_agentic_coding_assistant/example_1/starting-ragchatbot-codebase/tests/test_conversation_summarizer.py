@@ -0,0 +1,107 @@
+import threading
+import time
+
+import pytest
+
+from conversation_summarizer import ConversationSummarizer
+from rag_system import RAGSystem
+from session_manager import SessionManager
+
+
+@pytest.fixture
+def summarizer(anthropic_client, config):
+    from ai_generator import AIGenerator
+
+    generator = AIGenerator(config.ANTHROPIC_API_KEY, config.ANTHROPIC_MODEL, config.SUMMARY_MODEL)
+    summarizer = ConversationSummarizer(generator, SessionManager(), max_workers=1, recent_turns=1)
+    yield summarizer
+    summarizer.executor.shutdown()
+
+
+def summary_calls(anthropic_client):
+    from ai_generator import AIGenerator
+
+    return [call for call in anthropic_client.calls if call.get("system") == AIGenerator.SUMMARY_PROMPT]
+
+
+def test_summaries_are_off_by_default(config, anthropic_client):
+    assert not config.SUMMARY_ENABLED
+    assert RAGSystem(config).summarizer is None
+
+
+def test_older_exchanges_fold_into_the_summary(summarizer, anthropic_client):
+    sessions = summarizer.sessions
+    session_id = sessions.create_session()
+    sessions.add_exchange(session_id, "What is MCP?", "A protocol.")
+
+    # One exchange is kept verbatim, so there is nothing to fold yet
+    assert not summarizer.summarize_session(session_id)
+
+    sessions.add_exchange(session_id, "Who made it?", "Anthropic.")
+    assert summarizer.summarize_session(session_id)
+
+    lines = sessions.get_lines(session_id)
+    assert len(lines) == 3 and lines[0].startswith("Summary: ")
+    assert "What is MCP?" in lines[0]
+    assert lines[1:] == ["User: Who made it?", "Assistant: Anthropic."]
+    assert summarizer.stats()["folds"] == 1
+
+
+def test_the_previous_summary_is_folded_into_the_next(summarizer, anthropic_client):
+    sessions = summarizer.sessions
+    session_id = sessions.create_session()
+    for number in range(3):
+        sessions.add_exchange(session_id, f"Question {number}", f"Answer {number}")
+        summarizer.summarize_session(session_id)
+
+    assert len(sessions.get_lines(session_id)) == 3
+    last_request = summary_calls(anthropic_client)[-1]["messages"][0]["content"]
+    assert last_request.startswith("Earlier summary:\n")
+    assert "Question 1" in last_request and "Question 2" not in last_request
+
+
+def test_a_session_changed_underneath_is_left_alone(summarizer, anthropic_client, monkeypatch):
+    sessions = summarizer.sessions
+    session_id = sessions.create_session()
+    sessions.add_exchange(session_id, "One", "Two")
+    sessions.add_exchange(session_id, "Three", "Four")
+    monkeypatch.setattr(sessions, "fold", lambda *args: False)
+
+    assert not summarizer.summarize_session(session_id)
+    assert len(sessions.get_lines(session_id)) == 4
+
+
+def test_enabled_summaries_run_after_each_exchange(config, docs_dir, anthropic_client):
+    config.SUMMARY_ENABLED = True
+    config.SUMMARY_RECENT_TURNS = 1
+    rag_system = RAGSystem(config)
+    rag_system.add_course_folder(str(docs_dir))
+    session_id = rag_system.session_manager.create_session()
+
+    rag_system.query("What does an MCP client do?", session_id)
+    rag_system.query("What is prompt compression?", session_id)
+
+    deadline = time.monotonic() + 5
+    while not summary_calls(anthropic_client) or rag_system.summarizer._running:
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+
+    lines = rag_system.session_manager.get_lines(session_id)
+    assert lines[0].startswith("Summary: ") and "What does an MCP client do?" in lines[0]
+    assert len(lines) == 3 and lines[1] == "User: What is prompt compression?"
+
+
+def test_summaries_run_on_their_own_threads(config, anthropic_client, monkeypatch):
+    config.SUMMARY_ENABLED = True
+    rag_system = RAGSystem(config)
+    summarizer = rag_system.summarizer
+    threads = []
+    monkeypatch.setattr(summarizer, "summarize_session",
+                        lambda session_id: threads.append(threading.current_thread().name))
+
+    summarizer.schedule(rag_system.session_manager.create_session())
+    summarizer.executor.shutdown(wait=True)
+
+    # The pool serving searches and session reads is not held by a model call
+    assert summarizer.executor is not rag_system.executor
+    assert len(threads) == 1 and threads[0].startswith("rag-summary")
@@ -0,0 +1,65 @@
+import pytest
+
+from models import Course, Lesson
+from rag_system import RAGSystem
+from search_tools import CourseSearchTool
+
+
+@pytest.fixture
+def store(config, docs_dir):
+    rag_system = RAGSystem(config)
+    rag_system.add_course_folder(str(docs_dir))
+    return rag_system.vector_store
+
+
+def count_catalog_reads(store):
+    """Wrap the catalog's get and query so the test can see database round trips"""
+    calls = []
+    for name in ("get", "query"):
+        method = getattr(store.course_catalog, name)
+        setattr(store.course_catalog, name,
+                lambda *args, _method=method, _name=name, **kwargs: calls.append(_name) or _method(*args, **kwargs))
+    return calls
+
+
+def test_links_are_served_from_the_catalog_map(store):
+    store.get_course_link("MCP: Build Rich-Context AI Apps")
+    calls = count_catalog_reads(store)
+
+    assert store.get_course_link("MCP: Build Rich-Context AI Apps") == (
+        "https://example.com/mcp-build-rich-context-ai-apps"
+    )
+    assert store.get_lesson_link("MCP: Build Rich-Context AI Apps", 2) == (
+        "https://example.com/mcp-build-rich-context-ai-apps/lesson-2"
+    )
+    assert store.get_lesson_link("MCP: Build Rich-Context AI Apps", 9) is None
+    assert store.get_course_link("Unknown Course") is None
+    assert calls == []
+
+
+def test_catalog_writes_invalidate_the_map(store):
+    store.get_course_link("MCP: Build Rich-Context AI Apps")
+
+    store.add_course_metadata(Course(
+        title="Astronomy for Beginners",
+        course_link="https://example.com/astronomy",
+        lessons=[Lesson(lesson_number=1, title="Stars", lesson_link="https://example.com/astronomy/1")],
+    ))
+    assert store.get_lesson_link("Astronomy for Beginners", 1) == "https://example.com/astronomy/1"
+
+    store.delete_course("Astronomy for Beginners")
+    assert store.get_course_link("Astronomy for Beginners") is None
+
+
+def test_search_results_carry_lesson_links_without_catalog_queries(store):
+    tool = CourseSearchTool(store)
+    store.get_course_link("MCP: Build Rich-Context AI Apps")
+    calls = count_catalog_reads(store)
+
+    result = tool.execute("MCP server tool calls", course_name="MCP")
+
+    assert result.sources
+    for source in result.sources:
+        lesson = int(source["text"].rsplit(" ", 1)[1])
+        assert source["url"] == f"https://example.com/mcp-build-rich-context-ai-apps/lesson-{lesson}"
+    assert calls == []
@@ -0,0 +1,149 @@
+import zipfile
+from xml.sax.saxutils import escape
+
+import pytest
+
+from conftest import COURSES, course_document
+from document_processor import DocumentProcessor
+from document_readers import iter_document_lines
+from rag_system import RAGSystem
+
+HEADER = [
+    "Course Title: Streaming Course",
+    "Course Link: https://example.com/streaming",
+    "Course Instructor: Ada Lovelace",
+    "",
+]
+
+
+def write_pdf(path, lines):
+    """A one-page PDF with a text line per entry, built with pypdf"""
+    from pypdf import PdfWriter
+    from pypdf.generic import DecodedStreamObject, DictionaryObject, NameObject
+
+    writer = PdfWriter()
+    page = writer.add_blank_page(612, 792)
+    font = DictionaryObject({
+        NameObject("/Type"): NameObject("/Font"),
+        NameObject("/Subtype"): NameObject("/Type1"),
+        NameObject("/BaseFont"): NameObject("/Helvetica"),
+    })
+    page[NameObject("/Resources")] = DictionaryObject({
+        NameObject("/Font"): DictionaryObject({NameObject("/F1"): writer._add_object(font)})
+    })
+    operations = ["BT", "/F1 10 Tf", "14 TL", "40 760 Td"]
+    for line in lines:
+        text = line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+        operations.append(f"({text}) Tj T*")
+    operations.append("ET")
+    contents = DecodedStreamObject()
+    contents.set_data("\n".join(operations).encode("latin-1"))
+    page[NameObject("/Contents")] = writer._add_object(contents)
+    with open(path, "wb") as file:
+        writer.write(file)
+
+
+def write_docx(path, lines):
+    """A minimal DOCX archive with one paragraph per entry"""
+    paragraphs = "".join(f"<w:p><w:r><w:t>{escape(line)}</w:t></w:r></w:p>" for line in lines)
+    document = (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main">'
+        f"<w:body>{paragraphs}</w:body></w:document>"
+    )
+    with zipfile.ZipFile(path, "w") as archive:
+        archive.writestr("word/document.xml", document)
+
+
+def test_chunks_are_yielded_while_the_file_is_still_being_read(monkeypatch):
+    processor = DocumentProcessor(100, 0)
+    read = []
+
+    def lines(file_path):
+        for line in HEADER + ["Lesson 1: Everything"]:
+            read.append(line)
+            yield line
+        for number in range(10000):
+            read.append(number)
+            yield f"Sentence number {number} of a very long lesson."
+
+    monkeypatch.setattr(processor, "read_lines", lines)
+    batches = processor.iter_course_document("long.txt")
+    course, chunks = next(batches)
+    assert (course.title, chunks) == ("Streaming Course", [])
+
+    _, chunks = next(batches)
+
+    assert len(chunks) == DocumentProcessor.CHUNK_BATCH_SIZE
+    assert len(read) < 200
+    assert course.lessons[0].lesson_number == 1
+
+
+def test_lines_stay_separate_words():
+    processor = DocumentProcessor(800, 0)
+    lines = iter(HEADER + ["Lesson 1: Wrapped", "A sentence wrapped at the", "line break. Another one"])
+    processor.read_lines = lambda file_path: lines
+
+    _, chunks = processor.process_course_document("wrapped.txt")
+
+    assert [chunk.content for chunk in chunks] == [
+        "Lesson 1 content: A sentence wrapped at the line break. Another one"
+    ]
+
+
+def test_lessons_get_their_links_and_context(tmp_path):
+    path = tmp_path / "course1_script.txt"
+    title, lessons = COURSES["course1_script.txt"]
+    path.write_text(course_document(title, lessons), encoding="utf-8")
+
+    course, chunks = DocumentProcessor(800, 100).process_course_document(str(path))
+
+    assert [lesson.lesson_number for lesson in course.lessons] == [0, 1, 2]
+    assert course.lessons[2].lesson_link == "https://example.com/building-retrieval-systems-with-chroma/lesson-2"
+    assert chunks[0].content.startswith("Lesson 0 content: Retrieval augmented generation")
+    assert not any("Lesson Link:" in chunk.content for chunk in chunks)
+    assert [chunk.chunk_index for chunk in chunks] == list(range(len(chunks)))
+
+
+def test_text_before_the_first_lesson_is_course_level_content(config, tmp_path):
+    docs = tmp_path / "docs"
+    docs.mkdir()
+    (docs / "preamble.txt").write_text("\n".join(HEADER + [
+        "Welcome to the course. It covers streaming ingestion.",
+        "Lesson 1: Basics",
+        "Lines are chunked as they arrive.",
+    ]), encoding="utf-8")
+    (docs / "no_lessons.txt").write_text("\n".join([
+        "Course Title: Notes Without Lessons", "", "", "",
+        "Free text notes. They have no lesson markers at all.",
+    ]), encoding="utf-8")
+    config.CHUNK_OVERLAP = 0
+    rag_system = RAGSystem(config)
+
+    assert rag_system.add_course_folder(str(docs)) == (2, 3)
+
+    stored = rag_system.vector_store.course_content.get()
+    by_content = {document: metadata for document, metadata in zip(stored["documents"], stored["metadatas"])}
+    assert by_content["Welcome to the course. It covers streaming ingestion."].get("lesson_number") is None
+    assert by_content["Lesson 1 content: Lines are chunked as they arrive."]["lesson_number"] == 1
+    assert by_content["Free text notes. They have no lesson markers at all."]["course_title"] == "Notes Without Lessons"
+
+
+@pytest.mark.parametrize("writer, extension", [(write_pdf, ".pdf"), (write_docx, ".docx")])
+def test_pdf_and_docx_documents_are_parsed_like_text(tmp_path, writer, extension):
+    lines = HEADER + [
+        "Lesson 1: Readers",
+        "Lesson Link: https://example.com/streaming/lesson-1",
+        "Pages and paragraphs are streamed. Each one is split into lines.",
+    ]
+    path = tmp_path / f"course{extension}"
+    writer(path, lines)
+
+    assert [line.strip() for line in iter_document_lines(str(path))][:3] == lines[:3]
+    course, chunks = DocumentProcessor(800, 0).process_course_document(str(path))
+
+    assert (course.title, course.instructor) == ("Streaming Course", "Ada Lovelace")
+    assert course.lessons[0].lesson_link == "https://example.com/streaming/lesson-1"
+    assert [chunk.content for chunk in chunks] == [
+        "Lesson 1 content: Pages and paragraphs are streamed. Each one is split into lines."
+    ]
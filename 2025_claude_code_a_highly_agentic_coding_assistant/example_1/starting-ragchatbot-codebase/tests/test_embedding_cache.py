@@ -0,0 +1,75 @@
+from embedding_cache import EmbeddingCache
+from rag_system import RAGSystem
+
+
+class CountingEmbedder:
+    def __init__(self):
+        self.batches = []
+
+    def __call__(self, texts):
+        self.batches.append(list(texts))
+        return [[float(len(text))] for text in texts]
+
+
+def test_repeated_text_is_embedded_once():
+    embedder = CountingEmbedder()
+    cache = EmbeddingCache(embedder)
+
+    first = cache.get("What is MCP?")
+    second = cache.get("  what is   MCP? ")
+
+    assert first == second
+    assert embedder.batches == [["What is MCP?"]]
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_get_many_embeds_all_misses_in_one_batch():
+    embedder = CountingEmbedder()
+    cache = EmbeddingCache(embedder)
+    cache.get("cached")
+
+    results = cache.get_many(["new one", "cached", "new two", "NEW ONE"])
+
+    assert embedder.batches[1] == ["new one", "new two"]
+    assert results[0] == results[3]
+
+
+def test_least_recently_used_entry_is_evicted():
+    embedder = CountingEmbedder()
+    cache = EmbeddingCache(embedder, max_size=2)
+    cache.get("a")
+    cache.get("b")
+    cache.get("a")
+    cache.get("c")
+
+    cache.get("a")
+    cache.get("b")
+
+    assert embedder.batches == [["a"], ["b"], ["c"], ["b"]]
+    assert cache.stats()["size"] == 2
+
+
+def test_expired_entry_is_recomputed(monkeypatch):
+    embedder = CountingEmbedder()
+    cache = EmbeddingCache(embedder, ttl_seconds=60)
+    clock = [1000.0]
+    monkeypatch.setattr("embedding_cache.time.monotonic", lambda: clock[0])
+    cache.get("a")
+
+    clock[0] += 61
+    cache.get("a")
+
+    assert embedder.batches == [["a"], ["a"]]
+    assert cache.evictions == 1
+
+
+def test_repeated_search_reuses_the_query_embedding(config, docs_dir, embedding_model):
+    rag_system = RAGSystem(config)
+    rag_system.add_course_folder(str(docs_dir))
+    store = rag_system.vector_store
+    store.search("reciprocal rank fusion", course_name="Retrieval")
+    calls = embedding_model.calls
+
+    store.search("Reciprocal rank fusion", course_name="Retrieval")
+
+    assert embedding_model.calls == calls
@@ -0,0 +1,85 @@
+import pytest
+
+from lexical_index import BM25Index, reciprocal_rank_fusion, tokenize
+from rag_system import RAGSystem
+
+CHUNKS = {
+    "a": ("Keyword search with BM25 finds exact product codes like XJ-9000.", "Search", 1),
+    "b": ("Dense vectors capture meaning rather than exact words.", "Search", 2),
+    "c": ("The XJ-9000 ships with a manual.", "Hardware", 1),
+    "d": ("Search engines rank documents by relevance.", "Search", 1),
+}
+
+
+@pytest.fixture
+def index():
+    bm25 = BM25Index()
+    bm25.add(
+        list(CHUNKS),
+        [text for text, _, _ in CHUNKS.values()],
+        [{"course_title": course, "lesson_number": lesson} for _, course, lesson in CHUNKS.values()],
+    )
+    return bm25
+
+
+def test_tokenize_drops_stopwords_and_keeps_identifiers():
+    assert tokenize("What is the tool_use block of an XJ-9000?") == ["tool_use", "block", "xj", "9000"]
+
+
+def test_exact_terms_rank_first(index):
+    ranked = [chunk_id for chunk_id, _ in index.search("XJ-9000 product code", limit=4)]
+
+    assert ranked[:2] == ["a", "c"]
+    assert "b" not in ranked
+
+
+def test_search_honours_course_and_lesson_filters(index):
+    assert [chunk_id for chunk_id, _ in index.search("XJ-9000", 4, course_title="Hardware")] == ["c"]
+    assert [chunk_id for chunk_id, _ in index.search("search", 4, course_title="Search", lesson_number=2)] == []
+    assert index.search("XJ-9000", 4, lesson_number=1)
+
+
+def test_removed_chunks_leave_the_index(index):
+    index.remove(["a"])
+    assert index.document_frequency("xj") == 1
+
+    index.remove_course("Hardware")
+    assert index.search("XJ-9000", 4) == []
+    assert len(index) == 2
+
+    # Re-adding an ID replaces the old chunk rather than double counting it
+    index.add(["b"], ["replacement text"], [{"course_title": "Search", "lesson_number": 2}])
+    assert index.document_frequency("dense") == 0
+    assert len(index) == 2
+
+
+def test_reciprocal_rank_fusion_rewards_agreement():
+    fused = reciprocal_rank_fusion([["a", "b", "c"], ["c", "a"]], k=60)
+
+    assert [chunk_id for chunk_id, _ in fused] == ["a", "c", "b"]
+    assert fused[0][1] == pytest.approx(1 / 61 + 1 / 62)
+    assert fused[2][1] == pytest.approx(1 / 62)
+
+
+def test_dense_is_the_default_search_mode(config, docs_dir):
+    rag_system = RAGSystem(config)
+
+    assert config.SEARCH_MODE == "dense"
+    assert rag_system.vector_store.lexical_index is None
+
+
+def test_hybrid_store_finds_exact_codes(config, docs_dir):
+    config.SEARCH_MODE = "hybrid"
+    rag_system = RAGSystem(config)
+    rag_system.add_course_folder(str(docs_dir))
+    store = rag_system.vector_store
+
+    results = store.search("XJ-9000", limit=1)
+
+    assert "XJ-9000" in results.documents[0]
+    assert len(store.lexical_index) == store.course_content.count()
+
+    # Deleting a course keeps the lexical index in step with the vector store
+    store.delete_course("Building Retrieval Systems with Chroma")
+    assert "XJ-9000" not in " ".join(store.search("XJ-9000").documents)
+    assert len(store.lexical_index) == store.course_content.count()
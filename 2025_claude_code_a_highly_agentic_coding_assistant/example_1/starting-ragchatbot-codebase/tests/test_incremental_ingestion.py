@@ -0,0 +1,103 @@
+import os
+
+from conftest import COURSES, course_document
+from document_processor import DocumentProcessor
+from rag_system import RAGSystem
+
+
+def stored_ids(rag_system):
+    return set(rag_system.vector_store.course_content.get()["ids"])
+
+
+def rewrite(docs_dir, file_name, lessons=None, title=None):
+    original_title, original_lessons = COURSES[file_name]
+    (docs_dir / file_name).write_text(
+        course_document(title or original_title, lessons or original_lessons), encoding="utf-8"
+    )
+
+
+def test_unchanged_folder_is_skipped_after_a_restart(config, docs_dir):
+    RAGSystem(config).add_course_folder(str(docs_dir))
+
+    restarted = RAGSystem(config)
+    assert restarted.add_course_folder(str(docs_dir)) == (0, 0)
+    assert restarted.last_ingestion_stats.unchanged_files == len(COURSES)
+
+
+def test_touched_but_identical_file_is_not_re_embedded(config, docs_dir):
+    rag_system = RAGSystem(config)
+    rag_system.add_course_folder(str(docs_dir))
+    path = docs_dir / "course1_script.txt"
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+    assert rag_system.add_course_folder(str(docs_dir)) == (0, 0)
+    stats = rag_system.last_ingestion_stats
+    assert (stats.unchanged_files, stats.embeddings) == (len(COURSES), 0)
+    # The new stamp was recorded, so the next start skips hashing altogether
+    assert rag_system.ingestion_manifest.get(str(path))["stamp"][1] == stat.st_mtime_ns + 10**9
+
+
+def test_edited_lesson_only_re_embeds_its_own_chunks(config, docs_dir):
+    rag_system = RAGSystem(config)
+    rag_system.add_course_folder(str(docs_dir))
+    before = stored_ids(rag_system)
+
+    lessons = dict(COURSES["course1_script.txt"][1])
+    lessons[1] = ("Embeddings", "Embeddings were rewritten for this edition.")
+    rewrite(docs_dir, "course1_script.txt", lessons)
+    courses, chunks = rag_system.add_course_folder(str(docs_dir))
+
+    after = stored_ids(rag_system)
+    stats = rag_system.last_ingestion_stats
+    assert (courses, chunks) == (1, len(after - before))
+    assert stats.embeddings == chunks
+    assert stats.deleted_chunks == len(before - after) > 0
+    assert stats.unchanged_files == len(COURSES) - 1
+    # Other lessons of the edited course keep their stored chunks
+    lesson_two = rag_system.vector_store.course_content.get(
+        where={"$and": [{"course_title": COURSES["course1_script.txt"][0]}, {"lesson_number": 2}]}
+    )["ids"]
+    assert set(lesson_two) <= before
+
+
+def test_deleted_file_removes_its_course(config, docs_dir):
+    rag_system = RAGSystem(config)
+    rag_system.add_course_folder(str(docs_dir))
+
+    (docs_dir / "course3_script.txt").unlink()
+    rag_system.add_course_folder(str(docs_dir))
+
+    title = COURSES["course3_script.txt"][0]
+    assert title not in rag_system.vector_store.get_existing_course_titles()
+    assert rag_system.vector_store.course_content.get(where={"course_title": title})["ids"] == []
+    assert rag_system.ingestion_manifest.get(str(docs_dir / "course3_script.txt")) is None
+
+
+def test_renamed_course_replaces_the_old_title(config, docs_dir):
+    rag_system = RAGSystem(config)
+    rag_system.add_course_folder(str(docs_dir))
+
+    rewrite(docs_dir, "course3_script.txt", title="Prompt Compression, Second Edition")
+    rag_system.add_course_folder(str(docs_dir))
+
+    titles = rag_system.vector_store.get_existing_course_titles()
+    assert "Prompt Compression, Second Edition" in titles
+    assert COURSES["course3_script.txt"][0] not in titles
+
+
+def test_changed_chunking_settings_rechunk_every_file(config, docs_dir):
+    RAGSystem(config).add_course_folder(str(docs_dir))
+
+    config.CHUNK_SIZE = 80
+    rag_system = RAGSystem(config)
+    rag_system.add_course_folder(str(docs_dir))
+
+    assert rag_system.last_ingestion_stats.unchanged_files == 0
+    processor = DocumentProcessor(**rag_system.processor_options)
+    expected = set()
+    for file_name in COURSES:
+        _, chunks = processor.process_course_document(str(docs_dir / file_name))
+        expected.update(rag_system.vector_store.chunk_ids(chunks))
+    # Chunks of the old size are gone
+    assert stored_ids(rag_system) == expected
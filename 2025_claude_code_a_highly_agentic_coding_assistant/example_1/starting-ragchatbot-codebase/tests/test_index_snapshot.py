@@ -0,0 +1,110 @@
+import copy
+import io
+import json
+import tarfile
+
+import pytest
+
+from index_snapshot import export_index, read_snapshot
+from rag_system import RAGSystem
+from startup import StartupState
+
+
+def replica_config(config, tmp_path, backend):
+    """A fresh server's config: same models, an empty index of its own"""
+    replica = copy.copy(config)
+    replica.CHROMA_PATH = str(tmp_path / f"replica_{backend}")
+    replica.INGEST_MANIFEST_PATH = str(tmp_path / f"replica_{backend}" / "ingest_manifest.json")
+    replica.VECTOR_BACKEND = backend
+    return replica
+
+
+def best_match(rag_system, query, **filters):
+    # Backends order equidistant results differently, so compare the best one
+    return rag_system.vector_store.search(query, **filters).documents[0]
+
+
+@pytest.fixture
+def snapshot(rag_system, tmp_path):
+    path = str(tmp_path / "index-snapshot.tar.gz")
+    export_index(rag_system.vector_store, rag_system.config.INGEST_MANIFEST_PATH, path)
+    return path
+
+
+@pytest.mark.parametrize("backend", ["chroma", "numpy"])
+def test_an_imported_snapshot_searches_like_the_original(rag_system, snapshot, config, tmp_path, backend):
+    replica = RAGSystem(replica_config(config, tmp_path, backend))
+
+    header = replica.import_index_snapshot(snapshot)
+
+    assert header["counts"] == {"course_catalog": 3, "course_content": rag_system.vector_store.course_content.count()}
+    assert sorted(replica.vector_store.get_existing_course_titles()) == sorted(
+        rag_system.vector_store.get_existing_course_titles())
+    for query, filters in [("MCP servers and clients", {}), ("vector database", {"course_name": "Chroma"}),
+                           ("compression", {"lesson_number": 1})]:
+        assert best_match(replica, query, **filters) == best_match(rag_system, query, **filters)
+
+
+def test_the_manifest_comes_along_so_nothing_is_re_embedded(rag_system, snapshot, config, tmp_path,
+                                                             docs_dir, embedding_model):
+    replica = RAGSystem(replica_config(config, tmp_path, "numpy"))
+    replica.import_index_snapshot(snapshot)
+    embedded = embedding_model.texts
+
+    courses, chunks = replica.add_course_folder(str(docs_dir))
+
+    assert (courses, chunks) == (0, 0)
+    assert embedding_model.texts == embedded
+
+
+def test_a_snapshot_of_another_embedding_model_is_rejected(snapshot):
+    with pytest.raises(ValueError, match="embedded with"):
+        read_snapshot(snapshot, "another-model")
+
+
+def test_a_corrupted_member_is_rejected(snapshot, config, tmp_path):
+    corrupted = str(tmp_path / "corrupted.tar.gz")
+    with tarfile.open(snapshot, "r:gz") as source, tarfile.open(corrupted, "w:gz") as target:
+        for member in source:
+            data = source.extractfile(member).read()
+            if member.name == "course_content/records.json":
+                data = data.replace(b"MCP", b"XYZ")
+            member.size = len(data)
+            target.addfile(member, io.BytesIO(data))
+
+    with pytest.raises(ValueError, match="Checksum mismatch"):
+        read_snapshot(corrupted, config.EMBEDDING_MODEL)
+    # The failed import left the replica's index alone
+    replica = RAGSystem(replica_config(config, tmp_path, "chroma"))
+    with pytest.raises(ValueError):
+        replica.import_index_snapshot(corrupted)
+    assert replica.vector_store.get_course_count() == 0
+
+
+def test_other_archives_are_rejected(config, tmp_path):
+    path = str(tmp_path / "other.tar.gz")
+    with tarfile.open(path, "w:gz") as archive:
+        data = json.dumps({"hello": "world"}).encode("utf-8")
+        info = tarfile.TarInfo("readme.json")
+        info.size = len(data)
+        archive.addfile(info, io.BytesIO(data))
+
+    with pytest.raises(ValueError, match="not an index snapshot"):
+        read_snapshot(path, config.EMBEDDING_MODEL)
+
+
+def test_a_fresh_server_starts_from_the_snapshot(app_module, snapshot, config, tmp_path, docs_dir,
+                                                 embedding_model, monkeypatch):
+    replica = replica_config(config, tmp_path, "numpy")
+    replica.INDEX_SNAPSHOT_PATH = snapshot
+    monkeypatch.setattr(app_module, "rag_system", None)
+    monkeypatch.setattr(app_module, "startup", StartupState())
+    monkeypatch.setattr(app_module, "config", replica)
+    embedded = embedding_model.texts
+
+    app_module.load_rag_system(str(docs_dir))
+
+    assert "import_snapshot" in app_module.startup.phases
+    assert app_module.rag_system.vector_store.get_course_count() == 3
+    # Only the warm-up text was embedded
+    assert embedding_model.texts == embedded + 1
@@ -0,0 +1,67 @@
+from conftest import COURSES
+from document_processor import DocumentProcessor
+from rag_system import RAGSystem
+
+
+def expected_chunks(rag_system, docs_dir):
+    processor = DocumentProcessor(**rag_system.processor_options)
+    return sum(len(processor.process_course_document(str(docs_dir / name))[1]) for name in COURSES)
+
+
+def stored_ids(rag_system):
+    return sorted(rag_system.vector_store.course_content.get()["ids"])
+
+
+def test_folder_ingestion_indexes_every_course_and_chunk(config, docs_dir):
+    rag_system = RAGSystem(config)
+
+    courses, chunks = rag_system.add_course_folder(str(docs_dir))
+
+    assert courses == len(COURSES)
+    assert chunks == expected_chunks(rag_system, docs_dir)
+    assert rag_system.vector_store.course_content.count() == chunks
+    assert sorted(rag_system.vector_store.get_existing_course_titles()) == sorted(
+        title for title, _ in COURSES.values()
+    )
+    stats = rag_system.last_ingestion_stats
+    assert (stats.files, stats.failed_files, stats.embeddings) == (len(COURSES), 0, chunks)
+
+
+def test_chunks_are_embedded_in_batches_of_the_configured_size(config, docs_dir):
+    config.CHUNK_SIZE = 60
+    config.CHUNK_OVERLAP = 0
+    config.EMBEDDING_BATCH_SIZE = 4
+    rag_system = RAGSystem(config)
+    batches = []
+    embed_texts = rag_system.vector_store.embed_texts
+    rag_system.vector_store.embed_texts = lambda texts: batches.append(len(texts)) or embed_texts(texts)
+
+    _, chunks = rag_system.add_course_folder(str(docs_dir))
+
+    assert chunks > 4
+    assert sum(batches) == chunks
+    assert max(batches) == 4
+
+
+def test_worker_processes_build_the_same_index(config, docs_dir, tmp_path):
+    serial = RAGSystem(config)
+    serial.add_course_folder(str(docs_dir))
+
+    config.CHROMA_PATH = str(tmp_path / "parallel_db")
+    config.INGEST_MANIFEST_PATH = str(tmp_path / "parallel_db" / "ingest_manifest.json")
+    config.INGEST_WORKERS = 2
+    parallel = RAGSystem(config)
+    parallel.add_course_folder(str(docs_dir))
+
+    assert stored_ids(parallel) == stored_ids(serial)
+
+
+def test_a_broken_file_fails_alone(config, docs_dir):
+    (docs_dir / "broken.pdf").write_bytes(b"not a pdf")
+    rag_system = RAGSystem(config)
+
+    courses, _ = rag_system.add_course_folder(str(docs_dir))
+
+    assert courses == len(COURSES)
+    assert rag_system.last_ingestion_stats.failed_files == 1
+    assert rag_system.vector_store.get_course_count() == len(COURSES)
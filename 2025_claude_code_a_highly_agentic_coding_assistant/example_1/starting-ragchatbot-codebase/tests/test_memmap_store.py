@@ -0,0 +1,153 @@
+import json
+import os
+
+import numpy as np
+import pytest
+
+import memmap_store
+from memmap_store import MemmapCollection
+
+
+def vectors(count, seed=0):
+    return np.random.default_rng(seed).normal(size=(count, 8)).astype(np.float32)
+
+
+def fill(collection, count, prefix="doc"):
+    ids = [f"{prefix}-{i}" for i in range(count)]
+    collection.add(ids=ids, documents=[f"Text of {chunk_id}" for chunk_id in ids],
+                   metadatas=[{"lesson_number": i % 3, "course_title": f"Course {i % 2}"} for i in range(count)],
+                   embeddings=vectors(count))
+    return ids
+
+
+def data_files(path):
+    return sorted(name for name in os.listdir(path) if name.startswith(("embeddings", "documents", "columns")))
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / "collection")
+
+
+def test_a_persisted_collection_reopens_unchanged(path):
+    collection = MemmapCollection(path, "course_content")
+    fill(collection, 20)
+    collection.upsert(ids=["doc-3"], documents=["Rewritten"], metadatas=[{"lesson_number": 7}],
+                      embeddings=vectors(1, seed=1))
+    collection.delete(ids=["doc-4"])
+    collection.persist()
+    query = vectors(2, seed=2)
+    expected = collection.query(query_embeddings=query, n_results=5)
+    lesson_zero = collection.get(where={"lesson_number": 0})["ids"]
+    collection.close()
+
+    reopened = MemmapCollection(path, "course_content")
+
+    assert reopened.count() == 19
+    assert reopened.get(ids=["doc-3"])["documents"] == ["Rewritten"]
+    assert reopened.get(ids=["doc-3"])["metadatas"] == [{"lesson_number": 7}]
+    assert reopened.get(ids=["doc-4"])["ids"] == []
+    assert reopened.get(where={"lesson_number": 0})["ids"] == lesson_zero
+    assert reopened.query(query_embeddings=query, n_results=5) == expected
+
+
+def test_writes_after_the_last_snapshot_are_dropped_on_open(path):
+    collection = MemmapCollection(path, "course_content")
+    fill(collection, 5)
+    collection.persist()
+    fill(collection, 5, prefix="unsaved")
+    collection.close()
+
+    reopened = MemmapCollection(path, "course_content")
+
+    assert reopened.count() == 5
+    fill(reopened, 2, prefix="later")
+    assert reopened.get(ids=["later-1"])["documents"] == ["Text of later-1"]
+
+
+def test_compaction_writes_new_files_and_removes_the_old_ones(path):
+    collection = MemmapCollection(path, "course_content")
+    ids = fill(collection, 2000)
+    collection.persist()
+    assert data_files(path) == ["columns-1.npz", "columns.json", "documents-0.bin", "embeddings-0.f16"]
+
+    collection.delete(ids=ids[:1500])
+    collection.persist()
+
+    assert data_files(path) == ["columns-2.npz", "columns.json", "documents-2.bin", "embeddings-2.f16"]
+    assert os.path.getsize(os.path.join(path, "embeddings-2.f16")) == 500 * 8 * 2
+    collection.close()
+    reopened = MemmapCollection(path, "course_content")
+    assert reopened.count() == 500
+    assert reopened.get(ids=["doc-1999"])["documents"] == ["Text of doc-1999"]
+
+
+def test_a_crash_before_the_snapshot_switch_keeps_the_previous_snapshot(path, monkeypatch):
+    collection = MemmapCollection(path, "course_content")
+    ids = fill(collection, 2000)
+    collection.persist()
+    collection.delete(ids=ids[:1500])
+
+    replace = os.replace
+
+    def crash_on_snapshot(source, target):
+        if target.endswith("columns.json"):
+            raise OSError("power cut")
+        replace(source, target)
+
+    monkeypatch.setattr(memmap_store.os, "replace", crash_on_snapshot)
+    with pytest.raises(OSError):
+        collection.persist()
+    monkeypatch.undo()
+
+    # The compacted files were written, but the old ones were not touched
+    assert "embeddings-2.f16" in data_files(path) and "embeddings-0.f16" in data_files(path)
+    reopened = MemmapCollection(path, "course_content")
+
+    assert data_files(path) == ["columns-1.npz", "columns.json", "documents-0.bin", "embeddings-0.f16"]
+    assert reopened.count() == 2000
+    assert reopened.get(ids=["doc-0", "doc-1999"])["documents"] == ["Text of doc-0", "Text of doc-1999"]
+    nearest = reopened.query(query_embeddings=vectors(2000)[:1], n_results=1)
+    assert nearest["ids"] == [["doc-0"]]
+
+
+def test_a_crash_after_the_snapshot_switch_cleans_up_on_open(path, monkeypatch):
+    collection = MemmapCollection(path, "course_content")
+    ids = fill(collection, 2000)
+    collection.persist()
+    collection.delete(ids=ids[:1500])
+
+    def crash(name):
+        raise OSError("power cut")
+
+    monkeypatch.setattr(memmap_store.os, "remove", crash)
+    with pytest.raises(OSError):
+        collection.persist()
+    monkeypatch.undo()
+
+    reopened = MemmapCollection(path, "course_content")
+
+    assert data_files(path) == ["columns-2.npz", "columns.json", "documents-2.bin", "embeddings-2.f16"]
+    assert reopened.count() == 500
+    assert reopened.get(ids=["doc-1500"])["documents"] == ["Text of doc-1500"]
+
+
+def test_stores_with_the_old_file_names_still_open(path):
+    collection = MemmapCollection(path, "course_content")
+    fill(collection, 10)
+    collection.persist()
+    collection.close()
+    # Rewrite the store as older versions laid it out
+    os.rename(os.path.join(path, "embeddings-0.f16"), os.path.join(path, "embeddings.f16"))
+    os.rename(os.path.join(path, "documents-0.bin"), os.path.join(path, "documents.bin"))
+    with open(os.path.join(path, "columns.json"), encoding="utf-8") as f:
+        snapshot = json.load(f)
+    del snapshot["embeddings"], snapshot["documents"]
+    with open(os.path.join(path, "columns.json"), "w", encoding="utf-8") as f:
+        json.dump(snapshot, f)
+
+    reopened = MemmapCollection(path, "course_content")
+
+    assert reopened.count() == 10
+    assert reopened.get(ids=["doc-9"])["documents"] == ["Text of doc-9"]
+    assert "embeddings.f16" in data_files(path)
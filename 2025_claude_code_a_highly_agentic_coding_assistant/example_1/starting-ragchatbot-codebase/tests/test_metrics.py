@@ -0,0 +1,107 @@
+import re
+from types import SimpleNamespace
+
+from metrics import Histogram, Metrics, cache_samples, metrics as registry
+
+
+def sample(text, series, default=None):
+    """Value of one series line in rendered metrics"""
+    match = re.search(rf"^{re.escape(series)} (\S+)$", text, re.MULTILINE)
+    if match is None and default is not None:
+        return default
+    assert match, f"{series} not in metrics"
+    return float(match.group(1))
+
+
+def test_histogram_buckets_are_cumulative():
+    histogram = Histogram("rag_test_seconds", "Test", "stage", buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 0.7, 3.0):
+        histogram.observe("query", value)
+
+    text = "\n".join(histogram.render())
+
+    assert sample(text, 'rag_test_seconds_bucket{stage="query",le="0.1"}') == 1
+    assert sample(text, 'rag_test_seconds_bucket{stage="query",le="1.0"}') == 3
+    assert sample(text, 'rag_test_seconds_bucket{stage="query",le="+Inf"}') == 4
+    assert sample(text, 'rag_test_seconds_count{stage="query"}') == 4
+    assert abs(sample(text, 'rag_test_seconds_sum{stage="query"}') - 4.25) < 1e-9
+    assert "# TYPE rag_test_seconds histogram" in text
+
+
+def test_spans_time_each_stage():
+    local = Metrics()
+
+    with local.span("search"):
+        with local.span("vector_query"):
+            pass
+    local.observe("time_to_first_token", 0.2)
+
+    text = local.render()
+    for stage in ("search", "vector_query", "time_to_first_token"):
+        assert sample(text, f'rag_stage_duration_seconds_count{{stage="{stage}"}}') == 1
+
+
+def test_token_usage_is_counted_per_call():
+    local = Metrics()
+    usage = SimpleNamespace(input_tokens=100, output_tokens=20, cache_read_input_tokens=80,
+                            cache_creation_input_tokens=None)
+
+    local.record_usage("initial", SimpleNamespace(usage=usage))
+    local.record_usage("initial", SimpleNamespace(usage=usage))
+    local.record_usage("final", SimpleNamespace())
+
+    text = local.render()
+    assert sample(text, 'rag_anthropic_tokens_total{call="initial",kind="input_tokens"}') == 200
+    assert sample(text, 'rag_anthropic_tokens_total{call="initial",kind="cache_read_input_tokens"}') == 160
+    assert "cache_creation_input_tokens" not in text
+    assert sample(text, 'rag_anthropic_calls_total{call="final"}') == 1
+
+
+def test_disabled_metrics_record_nothing():
+    local = Metrics(enabled=False)
+
+    with local.span("search"):
+        pass
+    local.observe("query", 1.0)
+    local.record_usage("initial", SimpleNamespace(usage=SimpleNamespace(input_tokens=5)))
+
+    assert local.span("a") is local.span("b")
+    assert "rag_stage_duration_seconds_count" not in local.render()
+    assert "rag_anthropic_calls_total{" not in local.render()
+
+
+def test_collectors_are_read_at_scrape_time_and_failures_skipped():
+    local = Metrics()
+    stats = {"hits": 3, "misses": 1, "hit_ratio": 0.75, "size": 2}
+
+    def failing():
+        raise RuntimeError("cache gone")
+
+    local.register_collector("answers", lambda: cache_samples("answer", stats))
+    local.register_collector("broken", failing)
+    local.register_collector("labels", lambda: [("rag_label_test", (("path", 'C:\\a "b"'),), 1)])
+    stats["hits"] = 4
+
+    text = local.render()
+    assert sample(text, 'rag_cache_hits_total{cache="answer"}') == 4
+    assert "# TYPE rag_cache_hits_total counter" in text and "# TYPE rag_cache_size gauge" in text
+    assert 'rag_label_test{path="C:\\\\a \\"b\\""} 1' in text
+    assert cache_samples("none", None) == []
+
+
+def test_the_metrics_endpoint_covers_the_query_path(client, anthropic_client):
+    # The registry is process-wide, so earlier tests' queries are already counted
+    queries_before = sample(registry.render(), 'rag_stage_duration_seconds_count{stage="query"}', default=0)
+
+    assert client.post("/api/query", json={"query": "What does an MCP client do?"}).status_code == 200
+    response = client.get("/api/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    text = response.text
+    assert sample(text, 'rag_stage_duration_seconds_count{stage="query"}') == queries_before + 1
+    for stage in ("anthropic_initial", "tool_execution", "search", "query_embedding", "anthropic_final"):
+        assert f'rag_stage_duration_seconds_count{{stage="{stage}"}}' in text
+    assert sample(text, 'rag_anthropic_tokens_total{call="final",kind="output_tokens"}') >= 20
+    assert 'rag_cache_hit_ratio{cache="query_embedding"}' in text
+    assert "rag_ready " in text
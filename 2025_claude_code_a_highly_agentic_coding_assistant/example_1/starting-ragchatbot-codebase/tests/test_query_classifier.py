@@ -0,0 +1,91 @@
+import pytest
+
+from conftest import course_document
+from query_classifier import QueryClassifier
+from rag_system import RAGSystem
+
+
+@pytest.fixture
+def hybrid_system(config, docs_dir):
+    config.SEARCH_MODE = "hybrid"
+    rag_system = RAGSystem(config)
+    rag_system.add_course_folder(str(docs_dir))
+    return rag_system
+
+
+@pytest.fixture
+def classifier(hybrid_system):
+    return QueryClassifier(hybrid_system.vector_store)
+
+
+def test_a_named_course_is_retrieved_with_its_filter(classifier):
+    route = classifier.classify("What does lesson 2 of the MCP course say about clients?")
+
+    assert route.retrieve
+    assert (route.course_name, route.lesson_number) == ("MCP: Build Rich-Context AI Apps", 2)
+
+
+def test_words_shared_by_several_titles_name_no_course(classifier):
+    assert classifier.named_course("Which course mentions Chroma and MCP?") is None
+    assert classifier.named_course("How does prompt compression work?") == "Prompt Compression Fundamentals"
+
+
+def test_course_vocabulary_is_retrieved_without_a_filter(classifier):
+    route = classifier.classify("Which lessons cover the instructor's favourite topic?")
+
+    assert route.retrieve
+    assert (route.course_name, route.lesson_number) == (None, None)
+
+
+def test_common_course_terms_are_retrieved(classifier):
+    assert classifier.classify("embedding vector database").retrieve
+
+
+def test_general_questions_are_left_to_the_model(classifier):
+    route = classifier.classify("What is the capital of France?")
+
+    assert not route.retrieve
+    assert route.reason == "no course signal"
+
+
+def test_new_courses_are_picked_up(classifier, hybrid_system, docs_dir):
+    assert classifier.named_course("Tell me about astronomy") is None
+
+    (docs_dir / "astronomy.txt").write_text(course_document("Astronomy Basics", {1: ("Stars", "Stars shine.")}))
+    hybrid_system.add_course_folder(str(docs_dir))
+
+    assert classifier.named_course("Tell me about astronomy") == "Astronomy Basics"
+
+
+def test_tools_is_the_default_query_mode(rag_system, anthropic_client):
+    assert rag_system.config.QUERY_MODE == "tools"
+
+    answer, sources = rag_system.query("What is covered in lesson 1 of the MCP course?")
+
+    # The model searches with the tool, then answers: two calls
+    assert len(anthropic_client.calls) == 2
+    assert "tools" in anthropic_client.calls[0]
+    assert answer.startswith("Answer from:") and sources
+
+
+def test_retrieve_first_answers_course_questions_in_one_call(rag_system, anthropic_client):
+    rag_system.config.QUERY_MODE = "retrieve_first"
+
+    answer, sources = rag_system.query("What is covered in lesson 1 of the MCP course?")
+
+    assert len(anthropic_client.calls) == 1
+    assert "tools" not in anthropic_client.calls[0]
+    assert answer == "Answer from: [MCP: Build Rich-Context AI Apps - Lesson 1]"
+    assert {(source["text"], source["url"]) for source in sources} == {
+        ("MCP: Build Rich-Context AI Apps - Lesson 1", "https://example.com/mcp-build-rich-context-ai-apps/lesson-1")
+    }
+
+
+def test_retrieve_first_leaves_general_questions_to_the_tool_loop(rag_system, anthropic_client):
+    rag_system.config.QUERY_MODE = "retrieve_first"
+    anthropic_client.use_tools = False
+
+    answer, sources = rag_system.query("What is the capital of France?")
+
+    assert (answer, sources) == ("Direct answer", [])
+    assert "tools" in anthropic_client.calls[0]
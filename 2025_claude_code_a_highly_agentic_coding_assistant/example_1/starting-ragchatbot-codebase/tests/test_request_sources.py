@@ -0,0 +1,47 @@
+import asyncio
+
+from search_tools import ToolExecutionContext
+
+
+def course_of(sources):
+    return {source["text"].split(" - ")[0] for source in sources}
+
+
+def test_concurrent_queries_keep_their_own_sources(rag_system, anthropic_client):
+    anthropic_client.delay = 0.05
+    questions = [
+        "What does an MCP client open with each server?",
+        "Why does prompt compression remove redundant words?",
+        "How does reciprocal rank fusion merge BM25 rankings?",
+    ] * 3
+    # The sources each question's search returns on its own
+    expected = [rag_system.search_tool.execute(question).sources for question in questions]
+
+    async def ask_all():
+        return await asyncio.gather(*(rag_system.aquery(question) for question in questions))
+
+    answers = asyncio.run(ask_all())
+
+    assert [sources for _, sources in answers] == expected
+    assert len({course for sources in expected for course in course_of(sources)}) == 3
+
+
+def test_sources_are_collected_in_the_request_context(rag_system):
+    first, second = ToolExecutionContext(), ToolExecutionContext()
+
+    rag_system.tool_manager.execute_tool("search_course_content", {"query": "MCP server"}, context=first)
+    rag_system.tool_manager.execute_tool("search_course_content", {"query": "prompt compression"}, context=second)
+
+    assert first.sources and second.sources
+    assert "MCP: Build Rich-Context AI Apps" in course_of(first.sources)
+    assert "Prompt Compression Fundamentals" not in course_of(first.sources)
+    assert not hasattr(rag_system.search_tool, "last_sources")
+
+
+def test_a_query_without_searches_has_no_sources(rag_system, anthropic_client):
+    rag_system.query("What does an MCP client do?")
+    anthropic_client.use_tools = False
+
+    answer, sources = rag_system.query("What is the capital of France?")
+
+    assert (answer, sources) == ("Direct answer", [])
@@ -0,0 +1,85 @@
+import sys
+import types
+
+import pytest
+
+from rag_system import RAGSystem
+from reranker import CrossEncoderReranker
+
+
+class FakeCrossEncoder:
+    """Scores a pair by how many query words the document contains"""
+
+    instances = []
+
+    def __init__(self, model_name, max_length=None, device=None):
+        self.model_name = model_name
+        self.batches = []
+        FakeCrossEncoder.instances.append(self)
+
+    def predict(self, pairs, batch_size=32, show_progress_bar=False):
+        self.batches.append(len(pairs))
+        return [sum(word in document.lower() for word in query.lower().split()) for query, document in pairs]
+
+
+@pytest.fixture(autouse=True)
+def cross_encoder(monkeypatch):
+    FakeCrossEncoder.instances = []
+    monkeypatch.setitem(sys.modules, "sentence_transformers", types.SimpleNamespace(CrossEncoder=FakeCrossEncoder))
+    return FakeCrossEncoder
+
+
+def test_documents_are_ranked_by_score():
+    reranker = CrossEncoderReranker("fake-model")
+
+    order = reranker.rank("chroma vector store", ["a", "b", "c"],
+                          ["Nothing relevant", "A chroma vector store", "A vector index"], top_k=2)
+
+    assert order == [1, 2]
+    assert reranker.rank("anything", [], [], top_k=3) == []
+
+
+def test_the_model_loads_lazily_and_scores_in_one_batch(cross_encoder):
+    reranker = CrossEncoderReranker("fake-model")
+    assert cross_encoder.instances == []
+
+    reranker.score("query", ["a", "b", "c"], ["query", "other", "query text"])
+
+    model, = cross_encoder.instances
+    assert model.batches == [3]
+
+
+def test_scores_are_cached_per_normalized_query_and_chunk(cross_encoder):
+    reranker = CrossEncoderReranker("fake-model")
+    reranker.score("Chroma store", ["a", "b"], ["chroma", "store"])
+
+    scores = reranker.score("  chroma   STORE ", ["a", "b", "c"], ["chroma", "store", "chroma store"])
+
+    assert scores == [1.0, 1.0, 2.0]
+    assert cross_encoder.instances[0].batches == [2, 1]
+    assert reranker.stats()["hits"] == 2 and reranker.stats()["misses"] == 3
+
+
+def test_the_score_cache_is_bounded():
+    reranker = CrossEncoderReranker("fake-model", cache_size=3)
+
+    reranker.score("query", [str(i) for i in range(5)], ["text"] * 5)
+
+    assert reranker.stats()["size"] == 3
+    reranker.clear()
+    assert reranker.stats()["size"] == 0
+
+
+def test_searches_are_reranked_to_the_top_k(config, docs_dir):
+    config.RERANK_MODEL = "fake-model"
+    config.RERANK_TOP_K = 2
+    rag_system = RAGSystem(config)
+    rag_system.add_course_folder(str(docs_dir))
+    store = rag_system.vector_store
+
+    results = store.search("reciprocal rank fusion BM25")
+
+    assert len(results.documents) == 2
+    scores = store.reranker.score("reciprocal rank fusion BM25", results.ids, results.documents)
+    assert scores == sorted(scores, reverse=True)
+    assert len(store.search("reciprocal rank fusion BM25", rerank=False).documents) == config.MAX_RESULTS
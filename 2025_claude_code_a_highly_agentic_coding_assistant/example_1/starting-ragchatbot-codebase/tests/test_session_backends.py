@@ -0,0 +1,191 @@
+import asyncio
+import threading
+
+import pytest
+
+from session_backends import RedisSessionBackend, SQLiteSessionBackend
+
+
+@pytest.fixture(params=["sqlite", "redis"])
+def make_backend(request, tmp_path):
+    """Factory for backends that share one store, like the workers of a deployment"""
+    if request.param == "sqlite":
+        path = str(tmp_path / "sessions.db")
+        return lambda **options: SQLiteSessionBackend(path, **options)
+
+    fakeredis = pytest.importorskip("fakeredis")
+    server = fakeredis.FakeServer()
+    return lambda **options: RedisSessionBackend(client=fakeredis.FakeRedis(server=server), **options)
+
+
+def test_history_is_shared_between_instances(make_backend):
+    first, second = make_backend(), make_backend()
+    session_id = first.create_session()
+
+    first.add_exchange(session_id, "What is MCP?", "A protocol.")
+    second.add_exchange(session_id, "Who made it?", "Anthropic.")
+
+    expected = "User: What is MCP?\nAssistant: A protocol.\nUser: Who made it?\nAssistant: Anthropic."
+    assert first.get_conversation_history(session_id) == expected
+    assert second.get_conversation_history(session_id) == expected
+    assert first.get_conversation_history("session_unknown") is None
+
+
+def test_appends_trim_to_the_token_budget_oldest_first(make_backend):
+    backend = make_backend(history_token_budget=30)
+    session_id = backend.create_session()
+
+    for number in range(5):
+        backend.add_exchange(session_id, f"Question {number} " + "x" * 20, f"Answer {number} " + "y" * 20)
+
+    lines = backend.get_lines(session_id)
+    assert lines[-1] == "Assistant: Answer 4 " + "y" * 20
+    assert "Question 0" not in backend.get_conversation_history(session_id)
+    assert sum(backend.estimate_tokens(line) for line in lines) <= 30
+
+
+def test_concurrent_appends_from_two_instances_lose_nothing(make_backend):
+    backends = [make_backend(history_token_budget=100000) for _ in range(2)]
+    session_id = backends[0].create_session()
+
+    def append_all(backend, worker):
+        for number in range(20):
+            backend.add_message(session_id, "user", f"{worker}-{number}")
+
+    threads = [threading.Thread(target=append_all, args=(backend, worker)) for worker, backend in enumerate(backends)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    lines = backends[1].get_lines(session_id)
+    assert sorted(lines) == sorted(f"User: {worker}-{number}" for worker in range(2) for number in range(20))
+    # Each worker's messages keep their order
+    for worker in range(2):
+        mine = [line for line in lines if line.startswith(f"User: {worker}-")]
+        assert mine == [f"User: {worker}-{number}" for number in range(20)]
+
+
+def test_fold_replaces_the_oldest_messages(make_backend):
+    first, second = make_backend(), make_backend()
+    session_id = first.create_session()
+    first.add_exchange(session_id, "One", "Two")
+    first.add_exchange(session_id, "Three", "Four")
+
+    assert second.fold(session_id, first.get_lines(session_id)[:2], "They said one and two.")
+
+    assert first.get_lines(session_id) == ["Summary: They said one and two.", "User: Three", "Assistant: Four"]
+    assert first.get_conversation_history(session_id).startswith("Summary: They said one and two.\n")
+
+
+def test_fold_is_rejected_when_the_head_changed(make_backend):
+    first, second = make_backend(history_token_budget=8), make_backend(history_token_budget=8)
+    session_id = first.create_session()
+    first.add_exchange(session_id, "One", "Two")
+    old_lines = first.get_lines(session_id)
+
+    # Another worker's append trims the messages the summary was written for
+    second.add_exchange(session_id, "Three", "Four")
+
+    assert not first.fold(session_id, old_lines, "Stale summary")
+    assert first.get_lines(session_id) == ["User: Three", "Assistant: Four"]
+    assert not first.fold(session_id, [], "Nothing")
+
+
+def test_cleared_sessions_are_gone_for_every_instance(make_backend):
+    first, second = make_backend(), make_backend()
+    session_id = first.create_session()
+    first.add_exchange(session_id, "Hello", "Hi")
+
+    second.clear_session(session_id)
+
+    assert first.get_conversation_history(session_id) is None
+    assert first.get_lines(session_id) == []
+
+
+def test_sqlite_sessions_expire_and_are_purged(tmp_path, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("session_backends.time.time", lambda: now[0])
+    backend = SQLiteSessionBackend(str(tmp_path / "sessions.db"), idle_ttl=60)
+    session_id = backend.create_session()
+    backend.add_exchange(session_id, "Hello", "Hi")
+
+    now[0] += 61
+    assert backend.get_conversation_history(session_id) is None
+
+    backend.add_message(session_id, "user", "Back again")
+    assert backend.get_lines(session_id) == ["User: Back again"]
+
+    now[0] += 61
+    backend.create_session()
+    assert backend.stats()["expirations"] == 1 and backend.get_lines(session_id) == []
+
+
+def test_redis_keys_expire_with_the_idle_ttl():
+    fakeredis = pytest.importorskip("fakeredis")
+    client = fakeredis.FakeRedis()
+    backend = RedisSessionBackend(client=client, idle_ttl=90)
+    session_id = backend.create_session()
+
+    backend.add_exchange(session_id, "Hello", "Hi")
+
+    messages, meta = backend._keys(session_id)
+    assert 0 < client.ttl(messages) <= 90 and 0 < client.ttl(meta) <= 90
+
+
+def test_async_queries_keep_session_io_off_the_event_loop(rag_system, anthropic_client, monkeypatch):
+    manager = rag_system.session_manager
+    threads = []
+    for name in ("create_session", "get_conversation_history", "add_exchange"):
+        method = getattr(manager, name)
+
+        def record(*args, _method=method, **kwargs):
+            threads.append(threading.current_thread())
+            return _method(*args, **kwargs)
+
+        monkeypatch.setattr(manager, name, record)
+
+    async def converse():
+        session_id = await rag_system.acreate_session()
+        await rag_system.aquery("What does an MCP client do?", session_id)
+        async for _ in rag_system.astream_query("And an MCP server?", session_id):
+            pass
+        return threading.current_thread()
+
+    loop_thread = asyncio.run(converse())
+
+    assert len(threads) == 5
+    assert loop_thread not in threads
+
+
+def test_trimming_keeps_the_summary(make_backend):
+    backend = make_backend(history_token_budget=40)
+    session_id = backend.create_session()
+    backend.add_exchange(session_id, "One", "Two")
+    assert backend.fold(session_id, backend.get_lines(session_id), "They counted to two.")
+
+    for number in range(4):
+        backend.add_exchange(session_id, f"Question {number} " + "x" * 20, f"Answer {number} " + "y" * 20)
+
+    lines = backend.get_lines(session_id)
+    assert lines[0] == "Summary: They counted to two."
+    assert "Question 0" not in "\n".join(lines)
+    assert lines[-1] == "Assistant: Answer 3 " + "y" * 20
+    assert backend.get_conversation_history(session_id) == "\n".join(lines)
+
+
+def test_session_stats_are_read_off_the_event_loop(client, rag_system, monkeypatch):
+    manager = rag_system.session_manager
+    stats = manager.stats
+    threads = []
+
+    def record():
+        threads.append(threading.current_thread().name)
+        return stats()
+
+    monkeypatch.setattr(manager, "stats", record)
+
+    response = client.get("/api/sessions/stats")
+
+    assert response.status_code == 200 and "sessions" in response.json()
+    assert threads and threads[0].startswith("rag-io")
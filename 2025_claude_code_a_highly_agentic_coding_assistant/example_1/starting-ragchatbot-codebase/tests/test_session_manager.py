@@ -0,0 +1,119 @@
+import pytest
+
+from session_manager import SessionManager
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("session_manager.time.monotonic", lambda: now[0])
+    return now
+
+
+def test_history_is_formatted_oldest_first():
+    manager = SessionManager()
+    session_id = manager.create_session()
+
+    manager.add_exchange(session_id, "What is MCP?", "A protocol.")
+
+    assert manager.get_conversation_history(session_id) == "User: What is MCP?\nAssistant: A protocol."
+    assert manager.get_conversation_history("session_unknown") is None
+    assert manager.get_conversation_history(None) is None
+
+
+def test_session_ids_are_random():
+    manager = SessionManager()
+
+    ids = {manager.create_session() for _ in range(100)}
+
+    assert len(ids) == 100
+    assert all(len(session_id) == len("session_") + 32 for session_id in ids)
+
+
+def test_history_is_trimmed_to_the_token_budget_oldest_first():
+    manager = SessionManager(history_token_budget=30)
+    session_id = manager.create_session()
+
+    for number in range(5):
+        manager.add_exchange(session_id, f"Question {number} " + "x" * 20, f"Answer {number} " + "y" * 20)
+
+    history = manager.get_conversation_history(session_id)
+    assert "Question 0" not in history
+    assert history.endswith("Assistant: Answer 4 " + "y" * 20)
+    assert sum(manager.estimate_tokens(line) for line in history.splitlines()) <= 30
+
+
+def test_the_newest_message_is_kept_even_beyond_the_budget():
+    manager = SessionManager(history_token_budget=5)
+    session_id = manager.create_session()
+
+    manager.add_exchange(session_id, "Short", "A very long answer " * 10)
+
+    assert manager.get_lines(session_id) == ["Assistant: " + "A very long answer " * 10]
+
+
+def test_least_recently_used_sessions_are_evicted(clock):
+    manager = SessionManager(max_sessions=2)
+    first, second = manager.create_session(), manager.create_session()
+    manager.add_message(first, "user", "Still here")
+
+    third = manager.create_session()
+
+    assert set(manager.sessions) == {first, third}
+    assert manager.get_conversation_history(second) is None
+    assert manager.stats()["evictions"] == 1
+
+
+def test_memory_limit_evicts_sessions():
+    manager = SessionManager(max_memory_bytes=4000)
+    sessions = [manager.create_session() for _ in range(5)]
+
+    for session_id in sessions:
+        manager.add_message(session_id, "user", "z" * 1500)
+
+    stats = manager.stats()
+    assert stats["memory_bytes"] <= 4000
+    assert stats["sessions"] < 5 and stats["evictions"] > 0
+    assert sessions[-1] in manager.sessions
+
+
+def test_idle_sessions_expire(clock):
+    manager = SessionManager(idle_ttl=60)
+    idle, active = manager.create_session(), manager.create_session()
+    manager.add_message(idle, "user", "Hello")
+    manager.add_message(active, "user", "Hello")
+
+    clock[0] += 45
+    manager.get_conversation_history(active)
+    clock[0] += 30
+
+    assert manager.get_conversation_history(idle) is None
+    assert manager.get_conversation_history(active) == "User: Hello"
+    assert manager.stats()["expirations"] == 1
+
+
+def test_memory_accounting_returns_to_zero():
+    manager = SessionManager()
+    session_id = manager.create_session()
+    manager.add_exchange(session_id, "Question", "Answer")
+    manager.get_conversation_history(session_id)
+
+    manager.clear_session(session_id)
+
+    assert manager.memory_bytes == 0
+    assert manager.get_conversation_history(session_id) is None
+
+
+def test_trimming_keeps_the_summary():
+    manager = SessionManager(history_token_budget=40)
+    session_id = manager.create_session()
+    manager.add_exchange(session_id, "One", "Two")
+    assert manager.fold(session_id, manager.get_lines(session_id), "They counted to two.")
+
+    for number in range(4):
+        manager.add_exchange(session_id, f"Question {number} " + "x" * 20, f"Answer {number} " + "y" * 20)
+
+    lines = manager.get_lines(session_id)
+    assert lines[0] == "Summary: They counted to two."
+    assert "Question 0" not in "\n".join(lines)
+    assert lines[-1] == "Assistant: Answer 3 " + "y" * 20
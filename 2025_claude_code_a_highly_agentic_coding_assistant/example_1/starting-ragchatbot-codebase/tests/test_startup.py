@@ -0,0 +1,96 @@
+import sys
+import types
+
+import pytest
+from fastapi.testclient import TestClient
+
+from startup import StartupState
+from vector_store import LazySentenceTransformerEmbeddingFunction
+
+
+@pytest.fixture
+def cold_app(app_module, config, monkeypatch):
+    """The app before its background load ran, with the test config"""
+    monkeypatch.setattr(app_module, "rag_system", None)
+    monkeypatch.setattr(app_module, "startup", StartupState())
+    monkeypatch.setattr(app_module, "config", config)
+    return app_module
+
+
+def test_the_embedding_model_loads_on_first_use(monkeypatch):
+    loaded = []
+
+    class FakeSentenceTransformer:
+        def __init__(self, model_name_or_path, device=None, **kwargs):
+            loaded.append(model_name_or_path)
+
+        def encode(self, sentences, **kwargs):
+            return [[1.0, 0.0] for _ in sentences]
+
+    monkeypatch.setitem(sys.modules, "sentence_transformers",
+                        types.SimpleNamespace(SentenceTransformer=FakeSentenceTransformer))
+    monkeypatch.delitem(LazySentenceTransformerEmbeddingFunction.models, "lazy-test-model", raising=False)
+
+    embed = LazySentenceTransformerEmbeddingFunction(model_name="lazy-test-model")
+    assert loaded == []
+
+    embed(["first"])
+    embed(["second"])
+
+    assert loaded == ["lazy-test-model"]
+
+
+def test_phases_are_timed_and_a_failing_phase_stays_current():
+    state = StartupState()
+
+    with state.phase("open_index"):
+        pass
+    with pytest.raises(RuntimeError):
+        with state.phase("load_models"):
+            raise RuntimeError("no model")
+
+    report = state.report()
+    assert list(report["phases_seconds"]) == ["open_index"]
+    assert report["phase"] == "load_models" and not report["ready"]
+
+
+def test_health_answers_before_the_system_is_ready(cold_app):
+    client = TestClient(cold_app.app)
+
+    assert client.get("/health").json() == {"status": "ok"}
+    ready = client.get("/ready")
+    assert ready.status_code == 503 and not ready.json()["ready"]
+    response = client.post("/api/query", json={"query": "What is MCP?"})
+    assert response.status_code == 503 and response.headers["Retry-After"] == "1"
+    assert response.json()["detail"].startswith("Starting up")
+
+
+def test_the_background_load_makes_the_app_ready(cold_app, docs_dir, anthropic_client):
+    client = TestClient(cold_app.app)
+
+    cold_app.load_rag_system(str(docs_dir))
+
+    ready = client.get("/ready")
+    assert ready.status_code == 200
+    assert list(ready.json()["phases_seconds"]) == ["import", "open_index", "load_models", "index_documents"]
+    assert cold_app.startup.wait(0)
+    assert client.get("/api/courses").json()["total_courses"] == 3
+    assert client.post("/api/query", json={"query": "What is MCP?"}).status_code == 200
+
+
+def test_a_failed_startup_is_reported(cold_app, docs_dir, monkeypatch):
+    import rag_system
+
+    def broken(config):
+        raise RuntimeError("index is corrupt")
+
+    monkeypatch.setattr(rag_system, "RAGSystem", broken)
+    client = TestClient(cold_app.app)
+
+    cold_app.load_rag_system(str(docs_dir))
+
+    ready = client.get("/ready").json()
+    assert (ready["phase"], ready["error"]) == ("open_index", "RuntimeError: index is corrupt")
+    detail = client.post("/api/query", json={"query": "What is MCP?"}).json()["detail"]
+    assert detail == "Startup failed: RuntimeError: index is corrupt"
+    assert client.get("/health").status_code == 200
@@ -0,0 +1,60 @@
+import json
+
+import pytest
+
+
+def read_events(response):
+    """(event, data) pairs of a server-sent event stream"""
+    events = []
+    for block in response.text.strip().split("\n\n"):
+        fields = dict(line.split(": ", 1) for line in block.splitlines())
+        events.append((fields["event"], json.loads(fields["data"])))
+    return events
+
+
+def test_stream_sends_session_tokens_sources_and_timings(client, rag_system):
+    rag_system.config.QUERY_MODE = "tools"
+
+    response = client.post("/api/query/stream", json={"query": "What does an MCP client do?"})
+
+    assert response.headers["content-type"].startswith("text/event-stream")
+    events = read_events(response)
+    names = [name for name, _ in events]
+    assert names[0] == "session"
+    assert names[-2:] == ["sources", "done"]
+    assert set(names[1:-2]) == {"token"} and len(names) > 4
+    answer = "".join(data["text"] for name, data in events if name == "token")
+    assert answer.startswith("Answer from: [MCP: Build Rich-Context AI Apps")
+    assert events[-2][1]["sources"]
+    done = events[-1][1]
+    assert 0 <= done["ttft_ms"] <= done["total_ms"] and done["cached"] is False
+
+    session_id = events[0][1]["session_id"]
+    assert answer in rag_system.session_manager.get_conversation_history(session_id)
+
+
+@pytest.mark.answer_cache
+def test_repeated_question_streams_the_cached_answer(client, anthropic_client):
+    first = read_events(client.post("/api/query/stream", json={"query": "What is prompt compression?"}))
+    calls = len(anthropic_client.calls)
+
+    second = read_events(client.post("/api/query/stream", json={"query": "What is prompt compression?"}))
+
+    assert len(anthropic_client.calls) == calls
+    assert second[-1][1]["cached"] is True
+    assert [data for name, data in second if name == "token"] == [
+        {"text": "".join(data["text"] for name, data in first if name == "token")}
+    ]
+
+
+def test_errors_after_the_headers_are_sent_in_band(client, rag_system, monkeypatch):
+    async def failing_stream(query, session_id):
+        yield {"type": "token", "text": "Partial"}
+        raise RuntimeError("API overloaded")
+
+    monkeypatch.setattr(rag_system, "astream_query", failing_stream)
+
+    events = read_events(client.post("/api/query/stream", json={"query": "What is MCP?"}))
+
+    assert [name for name, _ in events] == ["session", "token", "error"]
+    assert events[-1][1] == {"detail": "API overloaded"}
@@ -0,0 +1,60 @@
+import pytest
+
+from rag_system import RAGSystem
+from title_index import CourseTitleIndex
+
+TITLES = [
+    "MCP: Build Rich-Context AI Apps with Anthropic",
+    "Advanced Retrieval for AI with Chroma",
+    "Prompt Compression and Query Optimization",
+    "Building Towards Computer Use with Anthropic",
+]
+
+
+@pytest.fixture
+def index():
+    title_index = CourseTitleIndex()
+    title_index.rebuild(TITLES)
+    return title_index
+
+
+@pytest.mark.parametrize("course_name, title", [
+    ("Advanced Retrieval for AI with Chroma", TITLES[1]),
+    ("advanced retrieval  for ai with chroma", TITLES[1]),
+    ("MCP", TITLES[0]),
+    ("prompt compression", TITLES[2]),
+    ("Promt Compresion and Query Optimisation", TITLES[2]),
+])
+def test_resolves_exact_prefix_and_misspelled_names(index, course_name, title):
+    assert index.resolve(course_name) == title
+
+
+@pytest.mark.parametrize("course_name", ["with Anthropic", "Astronomy for Beginners", ""])
+def test_ambiguous_or_unknown_names_are_left_to_the_caller(index, course_name):
+    assert index.resolve(course_name) is None
+
+
+def test_added_and_removed_titles(index):
+    index.add(["Astronomy for Beginners"])
+    assert index.resolve("astronomy") == "Astronomy for Beginners"
+
+    index.remove("Astronomy for Beginners")
+    assert index.resolve("astronomy") is None
+    assert len(index) == len(TITLES)
+
+
+def test_store_resolves_lexical_matches_without_a_catalog_query(config, docs_dir):
+    rag_system = RAGSystem(config)
+    rag_system.add_course_folder(str(docs_dir))
+    store = rag_system.vector_store
+    queries = []
+    catalog_query = store.course_catalog.query
+    store.course_catalog.query = lambda **kwargs: queries.append(kwargs) or catalog_query(**kwargs)
+
+    assert store._resolve_course_name("mcp") == "MCP: Build Rich-Context AI Apps"
+    assert queries == []
+
+    # Nothing lexical in common: the vector search over the catalog decides
+    assert store.title_index.resolve("zqx") is None
+    assert store._resolve_course_name("zqx") in store.get_existing_course_titles()
+    assert len(queries) == 1
@@ -0,0 +1,123 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from search_tools import Tool, ToolExecutionContext, ToolManager, ToolResult
+
+
+class EchoTool(Tool):
+    """Returns its input after an optional delay, or blocks until released"""
+
+    def __init__(self, name="echo", delay=0.0, release=None):
+        self.name = name
+        self.delay = delay
+        self.release = release
+        self.threads = []
+
+    def get_tool_definition(self):
+        return {"name": self.name, "description": "Echo", "input_schema": {"type": "object", "properties": {}}}
+
+    def execute(self, text="", context=None):
+        self.threads.append(threading.current_thread().name)
+        if self.release is not None:
+            self.release.wait(5)
+        time.sleep(self.delay)
+        return ToolResult(f"{text}|{context}", sources=[{"text": text, "url": None}])
+
+
+def manager_with(*tools, **options):
+    manager = ToolManager(**options)
+    for tool in tools:
+        manager.register_tool(tool)
+    return manager
+
+
+def test_tool_input_named_context_reaches_the_tool():
+    manager = manager_with(EchoTool())
+    request = ToolExecutionContext()
+
+    content = manager.execute_tool("echo", {"text": "hi", "context": "lesson 2"}, context=request)
+
+    assert content == "hi|lesson 2"
+    assert request.sources == [{"text": "hi", "url": None}]
+
+
+def test_async_tool_input_named_context_reaches_the_tool():
+    manager = manager_with(EchoTool())
+
+    assert asyncio.run(manager.aexecute_tool("echo", {"context": "kept"})) == "|kept"
+
+
+def test_calls_of_one_turn_run_concurrently_and_keep_their_order():
+    manager = manager_with(EchoTool(delay=0.2), max_workers=4, timeout=5)
+    request = ToolExecutionContext()
+
+    start = time.perf_counter()
+    outcomes = manager.execute_tools([("echo", {"text": str(number)}) for number in range(4)], request)
+
+    assert time.perf_counter() - start < 0.6
+    assert [outcome.content for outcome in outcomes] == ["0|None", "1|None", "2|None", "3|None"]
+    assert [source["text"] for source in request.sources] == ["0", "1", "2", "3"]
+
+
+def test_failures_and_unknown_tools_become_error_results():
+    class FailingTool(EchoTool):
+        def execute(self, **kwargs):
+            raise RuntimeError("index unavailable")
+
+    manager = manager_with(FailingTool(name="failing"), timeout=5)
+
+    failed, missing = manager.execute_tools([("failing", {}), ("missing", {})])
+
+    assert failed.is_error and "index unavailable" in failed.content
+    assert missing.is_error and "not found" in missing.content
+
+
+def test_timed_out_calls_report_errors_without_waiting():
+    release = threading.Event()
+    manager = manager_with(EchoTool(release=release), EchoTool(name="fast"), max_workers=2, timeout=0.2)
+    try:
+        start = time.perf_counter()
+        hung, fast = manager.execute_tools([("echo", {}), ("fast", {"text": "ok"})])
+
+        assert time.perf_counter() - start < 1
+        assert hung.is_error and "timed out" in hung.content
+        assert fast.content == "ok|None"
+
+        hung, = asyncio.run(manager.aexecute_tools([("echo", {})]))
+        assert hung.is_error
+    finally:
+        release.set()
+
+
+def test_hung_tools_do_not_starve_searches(rag_system):
+    release = threading.Event()
+    hanging = EchoTool(name="hanging", release=release)
+    manager = rag_system.tool_manager
+    manager.register_tool(hanging)
+    manager.timeout = 0.1
+    try:
+        # More hung calls than the tool pool has threads
+        calls = [("hanging", {})] * (rag_system.config.TOOL_WORKERS + 2)
+        assert all(outcome.is_error for outcome in manager.execute_tools(calls))
+
+        assert {name.split("_")[0] for name in hanging.threads} == {"rag-tools"}
+        start = time.perf_counter()
+        results = rag_system.executor.submit(rag_system.vector_store.search, "MCP servers").result(timeout=5)
+        assert results.documents and time.perf_counter() - start < 1
+    finally:
+        release.set()
+
+
+@pytest.mark.parametrize("workers", [1, 3])
+def test_the_tool_pool_is_bounded(workers):
+    release = threading.Event()
+    tool = EchoTool(release=release)
+    manager = manager_with(tool, max_workers=workers, timeout=0.2)
+    try:
+        manager.execute_tools([("echo", {})] * 5)
+        assert len(set(tool.threads)) == workers
+    finally:
+        release.set()